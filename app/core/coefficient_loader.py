@@ -0,0 +1,270 @@
+"""
+Coefficient Loader - טעינה מרוכזת של טבלאות מקדמי הקצבה מקבצי MEKEDMIM/*.csv
+
+כל הטבלאות נטענות בטרנזקציה אחת (executemany), נוצרים אינדקסים מורכבים לפי
+עמודות החיפוש של שירות מקדמי הקצבה, ונשמר checksum של תוכן כל קובץ כדי
+שהטעינה והאימות בהפעלה ידלגו על טבלאות שלא השתנו.
+"""
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+import csv
+import hashlib
+import logging
+
+from sqlalchemy import text
+from sqlalchemy.engine import Connection, Engine
+
+logger = logging.getLogger(__name__)
+
+PROJECT_ROOT = Path(__file__).resolve().parents[2]
+
+CHECKSUM_TABLE = 'coefficient_table_checksum'
+
+_SQL_TYPES = {int: 'INTEGER', float: 'FLOAT', str: 'TEXT'}
+
+# עמודות (סוג, חובה) ואינדקסים לכל טבלה - לפי כותרות קבצי ה-CSV ושאילתות השירות
+COEFFICIENT_TABLE_SPECS: Dict[str, Dict[str, Any]] = {
+    'pension_fund_coefficient': {
+        'csv_file': 'MEKEDMIM/pension_fund_coefficient.csv',
+        'columns': {
+            'id': (int, True),
+            'fund_name': (str, False),
+            'survivors_option': (str, True),
+            'sex': (str, True),
+            'retirement_age': (int, True),
+            'spouse_age_diff': (int, True),
+            'base_coefficient': (float, True),
+            'adjust_percent': (float, True),
+            'notes': (str, False),
+            'valid_from': (str, False),
+            'valid_to': (str, False),
+        },
+        'indexes': {
+            'ix_pension_fund_coefficient_lookup': ('sex', 'retirement_age', 'survivors_option', 'spouse_age_diff'),
+        },
+    },
+    'policy_generation_coefficient': {
+        'csv_file': 'MEKEDMIM/policy_generation_coefficient.csv',
+        'columns': {
+            'id': (int, True),
+            'generation_code': (str, True),
+            'generation_label': (str, True),
+            'net_rate': (float, False),
+            'guarantee_months': (int, False),
+            'age': (int, True),
+            'male_coefficient': (float, False),
+            'female_coefficient': (float, False),
+            'valid_from': (str, False),
+            'valid_to': (str, False),
+            'notes': (str, False),
+        },
+        'indexes': {
+            'ix_policy_generation_coefficient_lookup': ('generation_code', 'age'),
+        },
+    },
+    'product_to_generation_map': {
+        'csv_file': 'MEKEDMIM/product_to_generation_map.csv',
+        'columns': {
+            'id': (int, True),
+            'product_type': (str, True),
+            'rule_from_date': (str, False),
+            'rule_to_date': (str, False),
+            'generation_code': (str, True),
+        },
+        'indexes': {
+            'ix_product_to_generation_map_lookup': ('product_type', 'rule_from_date', 'rule_to_date'),
+        },
+    },
+    'company_annuity_coefficient': {
+        'csv_file': 'MEKEDMIM/company_annuity_coefficient.csv',
+        'columns': {
+            'id': (int, True),
+            'company_name': (str, True),
+            'option_name': (str, True),
+            'sex': (str, True),
+            'age': (int, True),
+            'base_year': (int, True),
+            'base_coefficient': (float, True),
+            'annual_increment_rate': (float, True),
+            'notes': (str, False),
+            'valid_from': (str, False),
+            'valid_to': (str, False),
+        },
+        'indexes': {
+            'ix_company_annuity_coefficient_lookup': ('company_name', 'option_name', 'sex', 'age'),
+        },
+    },
+}
+
+
+class CoefficientCsvError(ValueError):
+    """קובץ CSV של מקדמים שאינו תקין"""
+
+
+def resolve_csv_path(csv_file: str) -> Path:
+    """נתיב CSV יחסי נפתר מול תיקיית הפרויקט"""
+    path = Path(csv_file)
+    return path if path.is_absolute() else PROJECT_ROOT / path
+
+
+def file_checksum(path: Path) -> str:
+    """sha256 של תוכן הקובץ"""
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(65536), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def _convert(value: str, value_type: type) -> Any:
+    value = value.strip()
+    if value == '':
+        return None
+    if value_type is int:
+        return int(float(value))
+    if value_type is float:
+        return float(value)
+    return value
+
+
+def read_csv_rows(table_name: str, path: Path) -> List[Dict[str, Any]]:
+    """קריאה ואימות של קובץ CSV לפי הגדרות הטבלה"""
+    columns: Dict[str, Tuple[type, bool]] = COEFFICIENT_TABLE_SPECS[table_name]['columns']
+
+    with open(path, 'r', encoding='utf-8-sig', newline='') as f:
+        reader = csv.DictReader(f)
+        missing = [name for name in columns if name not in (reader.fieldnames or [])]
+        if missing:
+            raise CoefficientCsvError(f"{path.name}: עמודות חסרות {missing}")
+
+        rows = []
+        seen_ids = set()
+        for line_number, raw in enumerate(reader, start=2):
+            row = {}
+            for name, (value_type, required) in columns.items():
+                try:
+                    row[name] = _convert(raw[name] or '', value_type)
+                except ValueError:
+                    raise CoefficientCsvError(f"{path.name}:{line_number}: ערך לא תקין בעמודה {name}: {raw[name]!r}")
+                if required and row[name] is None:
+                    raise CoefficientCsvError(f"{path.name}:{line_number}: חסר ערך בעמודה {name}")
+            if row['id'] in seen_ids:
+                raise CoefficientCsvError(f"{path.name}:{line_number}: id כפול {row['id']}")
+            seen_ids.add(row['id'])
+            rows.append(row)
+
+    return rows
+
+
+def _ensure_checksum_table(conn: Connection) -> None:
+    conn.execute(text(f"""
+        CREATE TABLE IF NOT EXISTS {CHECKSUM_TABLE} (
+            table_name VARCHAR(100) PRIMARY KEY,
+            checksum VARCHAR(64) NOT NULL,
+            row_count INTEGER NOT NULL,
+            loaded_at VARCHAR(32)
+        )
+    """))
+
+
+def stored_checksums(conn) -> Dict[str, Dict[str, Any]]:
+    """ה-checksum וכמות השורות שנשמרו בטעינה האחרונה (ריק אם טרם נטען)"""
+    try:
+        rows = conn.execute(text(f"SELECT table_name, checksum, row_count FROM {CHECKSUM_TABLE}")).fetchall()
+    except Exception:
+        if hasattr(conn, 'rollback'):
+            conn.rollback()
+        return {}
+    return {row[0]: {'checksum': row[1], 'row_count': row[2]} for row in rows}
+
+
+def create_coefficient_indexes(conn: Connection, tables: Optional[Iterable[str]] = None) -> None:
+    """יצירת האינדקסים המורכבים (גם לטבלאות שנטענו בסקריפטי SQL)"""
+    for table_name in tables or COEFFICIENT_TABLE_SPECS:
+        for index_name, index_columns in COEFFICIENT_TABLE_SPECS[table_name]['indexes'].items():
+            conn.execute(text(
+                f"CREATE INDEX IF NOT EXISTS {index_name} ON {table_name} ({', '.join(index_columns)})"
+            ))
+
+
+def _replace_table(conn: Connection, table_name: str, rows: List[Dict[str, Any]]) -> None:
+    columns = COEFFICIENT_TABLE_SPECS[table_name]['columns']
+    column_ddl = ', '.join(
+        f"{name} {_SQL_TYPES[value_type]}{' PRIMARY KEY' if name == 'id' else ''}"
+        f"{' NOT NULL' if required and name != 'id' else ''}"
+        for name, (value_type, required) in columns.items()
+    )
+    conn.execute(text(f"DROP TABLE IF EXISTS {table_name}"))
+    conn.execute(text(f"CREATE TABLE {table_name} ({column_ddl})"))
+    if rows:
+        names = list(columns)
+        conn.execute(
+            text(f"INSERT INTO {table_name} ({', '.join(names)}) VALUES ({', '.join(':' + n for n in names)})"),
+            rows
+        )
+    create_coefficient_indexes(conn, [table_name])
+
+
+def load_coefficient_tables(
+    engine: Optional[Engine] = None,
+    tables: Optional[Iterable[str]] = None,
+    force: bool = False
+) -> Dict[str, Dict[str, Any]]:
+    """
+    טוען את טבלאות המקדמים מקבצי ה-CSV בטרנזקציה אחת
+
+    טבלה שה-checksum של קובץ ה-CSV שלה לא השתנה מאז הטעינה האחרונה מדולגת
+    (אלא אם force). כל קובץ נבדק במלואו לפני שמשהו נכתב למסד.
+
+    Returns:
+        dict לכל טבלה: status (loaded/unchanged/missing_csv), rows, checksum
+    """
+    if engine is None:
+        from app.database import engine
+
+    table_names = list(tables or COEFFICIENT_TABLE_SPECS)
+    report: Dict[str, Dict[str, Any]] = {}
+
+    with engine.connect() as conn:
+        previous = stored_checksums(conn)
+
+    to_load: Dict[str, Tuple[str, List[Dict[str, Any]]]] = {}
+    for table_name in table_names:
+        path = resolve_csv_path(COEFFICIENT_TABLE_SPECS[table_name]['csv_file'])
+        if not path.exists():
+            report[table_name] = {'status': 'missing_csv', 'rows': 0, 'checksum': None}
+            continue
+
+        checksum = file_checksum(path)
+        if not force and previous.get(table_name, {}).get('checksum') == checksum:
+            report[table_name] = {
+                'status': 'unchanged', 'rows': previous[table_name]['row_count'], 'checksum': checksum
+            }
+            continue
+
+        to_load[table_name] = (checksum, read_csv_rows(table_name, path))
+
+    if to_load:
+        loaded_at = datetime.now().isoformat(timespec='seconds')
+        with engine.begin() as conn:
+            _ensure_checksum_table(conn)
+            for table_name, (checksum, rows) in to_load.items():
+                _replace_table(conn, table_name, rows)
+                conn.execute(text(f"DELETE FROM {CHECKSUM_TABLE} WHERE table_name = :table_name"),
+                             {'table_name': table_name})
+                conn.execute(
+                    text(f"INSERT INTO {CHECKSUM_TABLE} (table_name, checksum, row_count, loaded_at) "
+                         "VALUES (:table_name, :checksum, :row_count, :loaded_at)"),
+                    {'table_name': table_name, 'checksum': checksum, 'row_count': len(rows), 'loaded_at': loaded_at}
+                )
+                report[table_name] = {'status': 'loaded', 'rows': len(rows), 'checksum': checksum}
+                logger.info(f"✅ Loaded {len(rows)} rows into {table_name}")
+
+        try:
+            from app.services.annuity_coefficient import reload_coefficient_index
+            reload_coefficient_index()
+        except Exception as e:
+            logger.warning(f"⚠️ Annuity coefficient index reload failed: {e}")
+
+    return report
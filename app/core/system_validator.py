@@ -4,7 +4,7 @@ System Validator - מנגנון אימות מרכזי למערכת
 """
 from sqlalchemy import text, inspect
 from sqlalchemy.orm import Session
-from typing import Dict, List, Tuple
+from typing import Dict, List, Optional, Tuple
 import logging
 
 logger = logging.getLogger(__name__)
@@ -41,6 +41,7 @@ class SystemValidator:
     def __init__(self, db: Session):
         self.db = db
         self.validation_results: Dict[str, Dict] = {}
+        self._checksums: Optional[Dict[str, Dict]] = None
     
     def validate_all(self) -> Tuple[bool, List[str]]:
         """
@@ -77,6 +78,22 @@ class SystemValidator:
         
         return all_valid, errors
     
+    def _is_unchanged(self, table_name: str, config: Dict) -> bool:
+        """
+        האם הטבלה נטענה מקובץ ה-CSV הנוכחי (לפי checksum) עם מספיק שורות -
+        במקרה כזה אין צורך לאמת אותה מחדש
+        """
+        from app.core.coefficient_loader import file_checksum, resolve_csv_path, stored_checksums
+        
+        if self._checksums is None:
+            self._checksums = stored_checksums(self.db)
+        stored = self._checksums.get(table_name)
+        if not stored or stored['row_count'] < config['min_rows']:
+            return False
+        
+        path = resolve_csv_path(config['csv_file'])
+        return path.exists() and file_checksum(path) == stored['checksum']
+    
     def _validate_table(self, table_name: str, config: Dict) -> Tuple[bool, str]:
         """
         מאמת טבלה בודדת
@@ -85,6 +102,9 @@ class SystemValidator:
             (is_valid, error_message)
         """
         try:
+            if config.get('csv_file') and self._is_unchanged(table_name, config):
+                return True, ""
+            
             engine = self.db.get_bind()
             inspector = inspect(engine)
 
@@ -158,13 +178,15 @@ class SystemValidator:
         return fix_results
     
     def _load_from_csv(self, table_name: str, csv_file: str):
-        """טוען נתונים מקובץ CSV"""
-        import pandas as pd
-        from app.database import engine
+        """טוען נתונים מקובץ CSV (טעינה מרוכזת עם אינדקסים ו-checksum)"""
+        from app.core.coefficient_loader import COEFFICIENT_TABLE_SPECS, load_coefficient_tables
+        
+        if table_name not in COEFFICIENT_TABLE_SPECS:
+            raise ValueError(f"No loader definition for {table_name} ({csv_file})")
         
-        df = pd.read_csv(csv_file)
-        df.to_sql(table_name, engine, if_exists='replace', index=False)
-        logger.info(f"✅ Loaded {len(df)} rows into {table_name}")
+        report = load_coefficient_tables(engine=self.db.get_bind(), tables=[table_name], force=True)
+        if report[table_name]['status'] != 'loaded':
+            raise FileNotFoundError(f"CSV file not found: {csv_file}")
 
 
 def validate_system_on_startup(db: Session) -> bool:
@@ -185,6 +207,7 @@ def validate_system_on_startup(db: Session) -> bool:
         fix_results = validator.auto_fix_missing_data()
         
         # אמת שוב
+        validator._checksums = None
         is_valid_after_fix, errors_after_fix = validator.validate_all()
         
         if is_valid_after_fix:
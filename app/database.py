@@ -1,25 +1,69 @@
 """
 Database configuration module for SQLAlchemy and connection management
 """
+import logging
 import os
-from sqlalchemy import create_engine
+import threading
+import time
+from functools import partial
+from typing import Any, Dict, Optional
+
+from sqlalchemy import create_engine, event
 from sqlalchemy.orm import declarative_base, sessionmaker
+from sqlalchemy.pool import NullPool
 
 # Get database URL from environment variable or use default SQLite for development
 DATABASE_URL = os.getenv("DATABASE_URL", "sqlite:///./retire.db")
 
+logger = logging.getLogger(__name__)
+
 # Create base class for declarative models
 Base = declarative_base()
 
-def get_engine(url=None):
+# SQLite profile: "default" (driver defaults) or, opt-in, "performance" (WAL, tuned pragmas,
+# larger pool). "performance" converts the file to WAL (-wal/-shm sidecar files) and trades
+# durability of the last commits on power loss for speed - see MD/README.md
+SQLITE_PROFILE = os.getenv("SQLITE_PROFILE", "default")
+
+SQLITE_PERFORMANCE_PRAGMAS = {
+    # Readers no longer block the writer, and commits append to the WAL instead of rewriting pages
+    "journal_mode": "WAL",
+    # With WAL, NORMAL only fsyncs at checkpoints; a power loss can drop the last commits but not corrupt the DB
+    "synchronous": "NORMAL",
+    "cache_size": -int(os.getenv("SQLITE_CACHE_SIZE_KB", "65536")),  # negative value = KiB
+    "mmap_size": int(os.getenv("SQLITE_MMAP_SIZE", str(256 * 1024 * 1024))),
+    "busy_timeout": int(os.getenv("SQLITE_BUSY_TIMEOUT_MS", "5000")),
+    "temp_store": "MEMORY",
+}
+SQLITE_POOL_SIZE = int(os.getenv("SQLITE_POOL_SIZE", "10"))
+SQLITE_MAX_OVERFLOW = int(os.getenv("SQLITE_MAX_OVERFLOW", "20"))
+WAL_CHECKPOINT_INTERVAL_SECONDS = float(os.getenv("WAL_CHECKPOINT_INTERVAL_SECONDS", "300"))
+
+
+def _is_memory_sqlite(url: str) -> bool:
+    return url in ("sqlite://", "sqlite:///:memory:") or "mode=memory" in url
+
+
+def _apply_sqlite_pragmas(dbapi_connection, connection_record, pragmas):
+    cursor = dbapi_connection.cursor()
+    try:
+        for name, value in pragmas.items():
+            cursor.execute(f"PRAGMA {name}={value}")
+    finally:
+        cursor.close()
+
+
+def get_engine(url=None, sqlite_profile=None):
     """Get SQLAlchemy engine with proper configuration"""
     url = url or DATABASE_URL
     is_sqlite = url.startswith("sqlite")
+    sqlite_profile = sqlite_profile or SQLITE_PROFILE
 
-    # SQLite needs special connect args, but we don't use pooling settings there
+    # SQLite needs special connect args
     connect_args = {"check_same_thread": False} if is_sqlite else {}
 
     engine_kwargs = {}
+    pragmas = None
     if not is_sqlite:
         # On managed Postgres (Render) connections can be killed after idle time.
         # pool_pre_ping verifies connections before use, and pool_recycle forces
@@ -30,8 +74,78 @@ def get_engine(url=None):
             pool_size=int(os.getenv("DB_POOL_SIZE", "5")),
             max_overflow=int(os.getenv("DB_MAX_OVERFLOW", "10")),
         )
+    elif sqlite_profile == "performance" and not _is_memory_sqlite(url):
+        # WAL allows concurrent readers alongside the single writer, so the pool
+        # can be larger than the default; writers wait on busy_timeout instead
+        # of failing with "database is locked".
+        pragmas = dict(SQLITE_PERFORMANCE_PRAGMAS)
+        connect_args["timeout"] = pragmas["busy_timeout"] / 1000
+        engine_kwargs.update(pool_size=SQLITE_POOL_SIZE, max_overflow=SQLITE_MAX_OVERFLOW)
+
+    engine = create_engine(url, connect_args=connect_args, **engine_kwargs)
+    if pragmas:
+        event.listen(engine, "connect", partial(_apply_sqlite_pragmas, pragmas=pragmas))
+    return engine
+
 
-    return create_engine(url, connect_args=connect_args, **engine_kwargs)
+def uses_wal(engine) -> bool:
+    """Whether the engine's connections run in WAL mode"""
+    if engine.dialect.name != "sqlite":
+        return False
+    with engine.connect() as connection:
+        return str(connection.exec_driver_sql("PRAGMA journal_mode").scalar()).lower() == "wal"
+
+
+class WalCheckpointer:
+    """Background thread that checkpoints the SQLite WAL periodically.
+
+    SQLite's auto-checkpoint runs inside whichever commit crosses the threshold
+    and cannot complete while readers are active, so under steady traffic the
+    WAL keeps growing. A PASSIVE checkpoint on a timer moves pages back into
+    the database without blocking; stop() finishes with a TRUNCATE checkpoint.
+    """
+
+    def __init__(self, engine, interval: float = WAL_CHECKPOINT_INTERVAL_SECONDS):
+        self.engine = engine
+        self.interval = interval
+        self._stop = threading.Event()
+        self._thread = None
+
+    def checkpoint(self, mode: str = "PASSIVE"):
+        """Run one checkpoint; returns (busy, wal_frames, checkpointed_frames)"""
+        with self.engine.connect() as connection:
+            return tuple(connection.exec_driver_sql(f"PRAGMA wal_checkpoint({mode})").first())
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            try:
+                busy, wal_frames, checkpointed = self.checkpoint()
+                logger.debug(f"WAL checkpoint: {checkpointed}/{wal_frames} frames (busy={busy})")
+            except Exception as e:
+                logger.warning(f"WAL checkpoint failed: {e}")
+
+    def start(self) -> "WalCheckpointer":
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._run, name="wal-checkpoint", daemon=True)
+            self._thread.start()
+        return self
+
+    def stop(self):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout=self.interval)
+            self._thread = None
+        try:
+            self.checkpoint("TRUNCATE")
+        except Exception as e:
+            logger.warning(f"Final WAL checkpoint failed: {e}")
+
+
+def start_wal_checkpointer(engine) -> Optional[WalCheckpointer]:
+    """Start periodic checkpointing if the engine is SQLite in WAL mode"""
+    if WAL_CHECKPOINT_INTERVAL_SECONDS <= 0 or not uses_wal(engine):
+        return None
+    return WalCheckpointer(engine).start()
 
 def setup_database(engine):
     """Setup database with proper mapper clearing"""
@@ -59,3 +173,152 @@ def get_db():
         db.close()
 
 
+# Optional read replica (Postgres streaming replica) for read-only endpoints
+DATABASE_READ_URL = os.getenv("DATABASE_READ_URL")
+REPLICA_MAX_LAG_SECONDS = float(os.getenv("REPLICA_MAX_LAG_SECONDS", "30"))
+REPLICA_RETRY_SECONDS = float(os.getenv("REPLICA_RETRY_SECONDS", "30"))
+REPLICA_CHECK_INTERVAL_SECONDS = float(os.getenv("REPLICA_CHECK_INTERVAL_SECONDS", "5"))
+# libpq connect_timeout takes whole seconds (minimum 2)
+REPLICA_PROBE_TIMEOUT_SECONDS = max(2, int(os.getenv("REPLICA_PROBE_TIMEOUT_SECONDS", "2")))
+
+
+class ReplicaRouter:
+    """Decides whether a read may go to the replica.
+
+    Replication lag is sampled at most every check_interval seconds, by one
+    thread at a time and outside the lock, so a hanging replica delays only the
+    probing request; the others use the last result. When the replica lags more
+    than max_lag, or cannot be reached (then for retry_after seconds), reads
+    fall back to the primary.
+    """
+
+    def __init__(self, engine, max_lag: float, retry_after: float, check_interval: float,
+                 probe_timeout: int = REPLICA_PROBE_TIMEOUT_SECONDS):
+        self.engine = engine
+        self.max_lag = max_lag
+        self.retry_after = retry_after
+        self.check_interval = check_interval
+        self._probe_engine = None
+        if engine.dialect.name == "postgresql":
+            # Separate unpooled engine: the probe fails fast instead of waiting on a hung replica
+            self._probe_engine = create_engine(
+                engine.url,
+                poolclass=NullPool,
+                connect_args={
+                    "connect_timeout": probe_timeout,
+                    "options": f"-c statement_timeout={probe_timeout * 1000}",
+                },
+            )
+        self._lock = threading.Lock()
+        self._checked_at = None
+        self._probing = False
+        self._healthy = False
+        self._unavailable_until = 0.0
+        self.last_lag_seconds = None
+        self.replica_reads = 0
+        self.fallback_reads = 0
+
+    def lag_seconds(self) -> float:
+        if self._probe_engine is None:
+            return 0.0
+        with self._probe_engine.connect() as connection:
+            lag = connection.exec_driver_sql(
+                "SELECT CASE WHEN pg_is_in_recovery() "
+                "THEN COALESCE(EXTRACT(EPOCH FROM now() - pg_last_xact_replay_timestamp()), 0) "
+                "ELSE 0 END"
+            ).scalar()
+        return float(lag or 0)
+
+    def available(self) -> bool:
+        with self._lock:
+            now = time.monotonic()
+            if now < self._unavailable_until:
+                return False
+            due = self._checked_at is None or now - self._checked_at >= self.check_interval
+            if not due or self._probing:
+                return self._healthy
+            self._checked_at = now
+            self._probing = True
+
+        lag, unavailable_until = None, 0.0
+        try:
+            lag = self.lag_seconds()
+            healthy = lag <= self.max_lag
+            if not healthy:
+                logger.warning(f"Read replica lags {lag:.1f}s - reading from primary")
+        except Exception as e:
+            logger.warning(f"Read replica unavailable, reading from primary for {self.retry_after}s: {e}")
+            healthy = False
+            unavailable_until = time.monotonic() + self.retry_after
+
+        with self._lock:
+            self._probing = False
+            self._healthy = healthy
+            if lag is not None:
+                self.last_lag_seconds = lag
+            if unavailable_until:
+                self._unavailable_until = unavailable_until
+        return healthy
+
+    def record(self, used_replica: bool):
+        with self._lock:
+            if used_replica:
+                self.replica_reads += 1
+            else:
+                self.fallback_reads += 1
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "healthy": self._healthy,
+            "last_lag_seconds": self.last_lag_seconds,
+            "max_lag_seconds": self.max_lag,
+            "replica_reads": self.replica_reads,
+            "fallback_reads": self.fallback_reads,
+        }
+
+
+read_engine = get_engine(DATABASE_READ_URL) if DATABASE_READ_URL else None
+ReadSessionLocal = (
+    sessionmaker(autocommit=False, autoflush=False, bind=read_engine) if read_engine is not None else None
+)
+replica_router = (
+    ReplicaRouter(read_engine, REPLICA_MAX_LAG_SECONDS, REPLICA_RETRY_SECONDS, REPLICA_CHECK_INTERVAL_SECONDS)
+    if read_engine is not None else None
+)
+
+
+def get_read_db():
+    """
+    Dependency for read-only endpoints: a session on the read replica when one is
+    configured and fresh enough, otherwise on the primary (same as get_db)
+    
+    Yields:
+        SQLAlchemy session
+    """
+    use_replica = ReadSessionLocal is not None and replica_router.available()
+    if replica_router is not None:
+        replica_router.record(use_replica)
+    db = ReadSessionLocal() if use_replica else SessionLocal()
+    try:
+        yield db
+    finally:
+        db.close()
+
+
+def _pool_metrics(bind) -> Dict[str, Any]:
+    pool = bind.pool
+    metrics = {"url": bind.url.render_as_string(hide_password=True), "pool": type(pool).__name__}
+    for name in ("size", "checkedin", "checkedout", "overflow"):
+        method = getattr(pool, name, None)
+        if callable(method):
+            metrics[name] = method()
+    return metrics
+
+
+def get_pool_metrics() -> Dict[str, Any]:
+    """Connection pool usage per engine (primary and, if configured, read replica)"""
+    return {
+        "primary": _pool_metrics(SessionLocal.kw.get("bind") or engine),
+        "read": _pool_metrics(read_engine) if read_engine is not None else None,
+        "read_routing": replica_router.stats() if replica_router is not None else None,
+    }
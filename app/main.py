@@ -19,7 +19,7 @@ logging.basicConfig(
 logger = logging.getLogger(__name__)
 
 import app.models  # noqa: F401  # מבטיח שכל המודלים נטענים, ל־metadata.create_all
-from app.database import engine, Base
+from app.database import engine, Base, start_wal_checkpointer
 from app.core.system_access import SystemAccessMiddleware
 from app.routers import (
     fixation,
@@ -55,6 +55,14 @@ async def lifespan(app: FastAPI):
     """Initialize database tables on application startup"""
     Base.metadata.create_all(bind=engine)
     
+    # אינדקס חיפוש לקוחות למסדי נתונים קיימים (בטבלה חדשה הוא נוצר עם create_all)
+    try:
+        from app.services.client_search import ensure_client_search_index
+        with engine.begin() as connection:
+            ensure_client_search_index(connection)
+    except Exception as e:
+        logger.error(f"❌ Client search index error: {e}")
+    
     # אימות תקינות המערכת
     logger.info("=" * 60)
     logger.info("🚀 Starting Retirement Planning System")
@@ -76,10 +84,40 @@ async def lifespan(app: FastAPI):
     finally:
         db.close()
     
+    # טעינת נתוני מס (תקרות, מדד, מדרגות) למטמון
+    try:
+        from app.services.tax_data import CacheManager
+        CacheManager.warm_up()
+    except Exception as e:
+        logger.error(f"❌ Tax data cache warm-up error: {e}")
+    
+    # טעינת טבלאות מקדמי הקצבה לאינדקס בזיכרון
+    try:
+        from app.services.annuity_coefficient import reload_coefficient_index
+        reload_coefficient_index()
+    except Exception as e:
+        logger.error(f"❌ Annuity coefficient index load error: {e}")
+    
+    # checkpoint תקופתי ל-WAL של SQLite (None אם לא רלוונטי)
+    wal_checkpointer = None
+    try:
+        wal_checkpointer = start_wal_checkpointer(engine)
+    except Exception as e:
+        logger.error(f"❌ WAL checkpointer start error: {e}")
+    
     logger.info("=" * 60)
     
     yield
-    # Cleanup code can go here (if needed)
+
+    if wal_checkpointer is not None:
+        wal_checkpointer.stop()
+
+    from app.services.pension_portfolio.parallel import shutdown_executor
+    shutdown_executor()
+    from app.services.report_jobs import report_jobs
+    report_jobs.shutdown()
+    from utils.pdf_graphs import shutdown_chart_worker
+    shutdown_chart_worker()
 
 # Create FastAPI app
 app = FastAPI(
@@ -16,11 +16,15 @@ from .pension_fund import PensionFund
 from .pension_fund_coefficient import PensionFundCoefficient
 from .additional_income import AdditionalIncome, IncomeSourceType, PaymentFrequency, IndexationMethod, TaxTreatment
 from .capital_asset import CapitalAsset, AssetType
+from .indexation_factor import IndexationFactor
+from .pension_portfolio import ParsedPensionFile, PensionPortfolio
+from .snapshot import SnapshotBlob, ClientSnapshot
 
 __all__ = [
     'Base', 'Client', 'Employer', 'Employment', 'TerminationEvent', 'TerminationReason',
     'Grant', 'Pension', 'Commutation', 'Scenario', 'FixationResult', 'CurrentEmployer',
     'ActiveContinuityType', 'EmployerGrant', 'GrantType', 'PensionFund', 'PensionFundCoefficient',
     'AdditionalIncome', 'IncomeSourceType', 'PaymentFrequency', 'IndexationMethod', 'TaxTreatment', 
-    'CapitalAsset', 'AssetType'
+    'CapitalAsset', 'AssetType', 'IndexationFactor', 'ParsedPensionFile', 'PensionPortfolio',
+    'SnapshotBlob', 'ClientSnapshot'
 ]
@@ -95,6 +95,8 @@ class Client(Base):
     additional_incomes = relationship("AdditionalIncome", back_populates="client", cascade="all, delete-orphan")
     capital_assets = relationship("CapitalAsset", back_populates="client", cascade="all, delete-orphan")
     scenarios = relationship("Scenario", back_populates="client", cascade="all, delete-orphan")
+    pension_portfolios = relationship("PensionPortfolio", back_populates="client", cascade="all, delete-orphan")
+    snapshots = relationship("ClientSnapshot", back_populates="client", cascade="all, delete-orphan")
     
     def __init__(self, *args, **kwargs):
         # map older or alternate kwarg names to canonical field names
@@ -201,3 +203,14 @@ def _client_fill_full_name_before_update(mapper, connection, target):
         from datetime import date
         # Default to January 1, 1970 as a fallback for tests
         target.birth_date = date(1970, 1, 1)
+
+
+@event.listens_for(Client.__table__, "after_create")
+def _client_create_search_index(target, connection, **kw):
+    """Create the client search index together with the client table.
+
+    Never fails table creation: ensure_client_search_index logs errors and
+    records that search must fall back to ILIKE.
+    """
+    from app.services.client_search import ensure_client_search_index
+    ensure_client_search_index(connection)
@@ -0,0 +1,23 @@
+"""
+Indexation factor model - persisted CPI factors between two months
+"""
+from sqlalchemy import Column, Integer, String, Float, DateTime, UniqueConstraint, func
+from app.database import Base
+
+
+class IndexationFactor(Base):
+    """מקדם הצמדה למדד בין חודש מקור לחודש יעד (כפי שהתקבל מהלמ"ס)"""
+    __tablename__ = "indexation_factor"
+
+    id = Column(Integer, primary_key=True, autoincrement=True)
+    from_month = Column(String(7), nullable=False)  # YYYY-MM
+    to_month = Column(String(7), nullable=False)    # YYYY-MM
+    factor = Column(Float, nullable=False)
+    created_at = Column(DateTime(timezone=True), server_default=func.now(), nullable=False)
+
+    __table_args__ = (
+        UniqueConstraint('from_month', 'to_month', name='uq_indexation_factor_months'),
+    )
+
+    def __repr__(self):
+        return f"<IndexationFactor({self.from_month} -> {self.to_month} = {self.factor})>"
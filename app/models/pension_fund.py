@@ -1,7 +1,10 @@
 from sqlalchemy import Column, Integer, String, Date, Float, ForeignKey, Enum, CheckConstraint, DateTime, func, event, Text
-from sqlalchemy.orm import relationship
+from sqlalchemy import inspect
+from sqlalchemy.orm import Session, relationship
+from sqlalchemy.orm.util import identity_key
 from app.database import Base
-import traceback
+import logging
+import os
 
 InputMode = Enum("calculated", "manual", name="pension_input_mode")
 IndexationMethod = Enum("none", "cpi", "fixed", name="pension_indexation_method")
@@ -52,51 +55,101 @@ class PensionFund(Base):
     )
 
 
-# Event listener to track balance changes
+# Balance change tracing (debugging aid). Off unless PENSION_BALANCE_TRACE=1 and the
+# "app.pension_fund.balance" logger is enabled for DEBUG.
+BALANCE_TRACE_ENABLED = os.getenv("PENSION_BALANCE_TRACE", "0") == "1"
+balance_logger = logging.getLogger("app.pension_fund.balance")
+
+
 @event.listens_for(PensionFund, "before_update")
 def log_balance_change(mapper, connection, target):
     """Log when balance is being changed"""
-    if hasattr(target, '_sa_instance_state'):
-        history = target._sa_instance_state.get_history('balance', True)
-        if history.has_changes():
-            old_balance = history.deleted[0] if history.deleted else None
-            new_balance = target.balance
-            print(f"🔴🔴🔴 BALANCE CHANGE DETECTED!")
-            print(f"  Fund ID: {target.id}")
-            print(f"  Old Balance: {old_balance}")
-            print(f"  New Balance: {new_balance}")
-            print(f"  Input Mode: {target.input_mode}")
-            print(f"  Stack trace:")
-            for line in traceback.format_stack()[-5:]:
-                print(f"    {line.strip()}")
-            print()
-
-
-@event.listens_for(PensionFund, "after_insert")
-@event.listens_for(PensionFund, "after_update")
-@event.listens_for(PensionFund, "after_delete")
-def sync_client_pension_start_date(mapper, connection, target):
+    if not BALANCE_TRACE_ENABLED or not balance_logger.isEnabledFor(logging.DEBUG):
+        return
+    history = inspect(target).attrs.balance.history
+    if history.has_changes():
+        balance_logger.debug(
+            "pension fund balance change",
+            extra={
+                "fund_id": target.id,
+                "old_balance": history.deleted[0] if history.deleted else None,
+                "new_balance": target.balance,
+                "input_mode": target.input_mode,
+            },
+            stack_info=True,
+        )
+
+
+_PENDING_SYNC_KEY = "pension_start_date_sync"
+
+
+def _affected_client_ids(session) -> set:
+    """Clients whose earliest pension start date may change with this flush"""
+    client_ids = set()
+    for obj in session.new:
+        if isinstance(obj, PensionFund):
+            client_ids.add(obj.client_id)
+    for obj in session.deleted:
+        if isinstance(obj, PensionFund):
+            client_ids.add(obj.client_id)
+    for obj in session.dirty:
+        if not isinstance(obj, PensionFund):
+            continue
+        attrs = inspect(obj).attrs
+        if attrs.pension_start_date.history.has_changes() or attrs.client_id.history.has_changes():
+            client_ids.add(obj.client_id)
+            client_ids.update(attrs.client_id.history.deleted)
+    client_ids.discard(None)
+    return client_ids
+
+
+@event.listens_for(Session, "after_flush")
+def sync_client_pension_start_date(session, flush_context):
     """Keep Client.pension_start_date in sync with the earliest pension fund start date.
 
-    Whenever a PensionFund row is inserted, updated or deleted, we recompute the
-    minimum non-null pension_start_date for the same client and store it on
-    the Client record. This ensures the client-level field always reflects the
-    first pension payment date derived from all existing pensions.
+    Runs once per flush: every client with a PensionFund inserted, deleted, or
+    whose pension_start_date/client_id changed gets the minimum non-null
+    pension_start_date of its funds, in a single UPDATE for all of them.
+    """
+    client_ids = _affected_client_ids(session)
+    if not client_ids:
+        return
+
+    update_client_pension_start_dates(session.connection(), client_ids)
+    session.info.setdefault(_PENDING_SYNC_KEY, set()).update(client_ids)
+
+
+@event.listens_for(Session, "after_flush_postexec")
+def _expire_synced_clients(session, flush_context):
+    """Loaded Client objects pick up the recomputed date on next access"""
+    from app.models.client import Client
+
+    for client_id in session.info.pop(_PENDING_SYNC_KEY, ()):
+        client = session.identity_map.get(identity_key(Client, client_id))
+        if client is not None:
+            session.expire(client, ["pension_start_date"])
+
+
+def update_client_pension_start_dates(connection, client_ids) -> None:
+    """Recompute Client.pension_start_date for many clients with one UPDATE.
+
+    Called once per flush by sync_client_pension_start_date, and directly by bulk
+    write paths (insert()/delete() statements), which bypass the session flush.
     """
-    client_id = getattr(target, "client_id", None)
-    if not client_id:
+    client_ids = [client_id for client_id in set(client_ids) if client_id]
+    if not client_ids:
         return
 
     from sqlalchemy import select
     from app.models.client import Client
 
-    result = connection.execute(
-        select(func.min(PensionFund.pension_start_date)).where(PensionFund.client_id == client_id)
+    earliest_start = (
+        select(func.min(PensionFund.pension_start_date))
+        .where(PensionFund.client_id == Client.__table__.c.id)
+        .scalar_subquery()
     )
-    min_start_date = result.scalar()
-
     connection.execute(
         Client.__table__.update()
-        .where(Client.id == client_id)
-        .values(pension_start_date=min_start_date)
+        .where(Client.__table__.c.id.in_(client_ids))
+        .values(pension_start_date=earliest_start)
     )
@@ -0,0 +1,38 @@
+"""
+Pension portfolio models - parsed clearing-house files and saved client portfolios
+"""
+from sqlalchemy import Column, Integer, String, DateTime, ForeignKey, JSON, func
+from sqlalchemy.orm import relationship
+from app.database import Base
+
+
+class ParsedPensionFile(Base):
+    """תוצאת עיבוד של קובץ מסלקה, לפי sha256 של תוכן הקובץ"""
+    __tablename__ = "parsed_pension_file"
+
+    id = Column(Integer, primary_key=True, autoincrement=True)
+    content_sha256 = Column(String(64), nullable=False, unique=True, index=True)
+    parser_version = Column(String(20), nullable=False)
+    file_name = Column(String(255), nullable=True)
+    result = Column(JSON, nullable=False)
+    created_at = Column(DateTime(timezone=True), server_default=func.now(), nullable=False)
+
+    def __repr__(self):
+        return f"<ParsedPensionFile(id={self.id}, file_name={self.file_name}, sha256={self.content_sha256[:12]})>"
+
+
+class PensionPortfolio(Base):
+    """תיק פנסיוני שמור של לקוח - כל שמירה יוצרת גרסה חדשה שאינה משתנה"""
+    __tablename__ = "pension_portfolio"
+
+    id = Column(Integer, primary_key=True, index=True)
+    client_id = Column(Integer, ForeignKey("client.id"), nullable=False, index=True)
+    content_sha256 = Column(String(64), nullable=False)
+    accounts = Column(JSON, nullable=False)
+    source_files = Column(JSON, nullable=True)
+    created_at = Column(DateTime(timezone=True), server_default=func.now(), nullable=False)
+
+    client = relationship("Client", back_populates="pension_portfolios")
+
+    def __repr__(self):
+        return f"<PensionPortfolio(id={self.id}, client_id={self.client_id}, accounts={len(self.accounts or [])})>"
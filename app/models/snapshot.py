@@ -0,0 +1,69 @@
+"""
+System snapshot models - compressed content-addressed sections and per-client snapshot history
+"""
+from sqlalchemy import Column, Integer, String, DateTime, ForeignKey, JSON, LargeBinary, event, func, select
+from sqlalchemy.orm import Session, relationship
+from app.database import Base
+
+
+class SnapshotBlob(Base):
+    """סעיף snapshot דחוס (zlib) לפי sha256 של ה-JSON הקנוני - משותף לכל ה-snapshots שמכילים אותו"""
+    __tablename__ = "snapshot_blob"
+
+    id = Column(Integer, primary_key=True, autoincrement=True)
+    content_sha256 = Column(String(64), nullable=False, unique=True, index=True)
+    data = Column(LargeBinary, nullable=False)
+    size = Column(Integer, nullable=False)
+    created_at = Column(DateTime(timezone=True), server_default=func.now(), nullable=False)
+
+    def __repr__(self):
+        return f"<SnapshotBlob(id={self.id}, sha256={self.content_sha256[:12]}, size={self.size})>"
+
+
+class ClientSnapshot(Base):
+    """snapshot שמור של לקוח - מיפוי שם סעיף ל-sha256 של הסעיף"""
+    __tablename__ = "client_snapshot"
+
+    id = Column(Integer, primary_key=True, index=True)
+    client_id = Column(Integer, ForeignKey("client.id"), nullable=False, index=True)
+    snapshot_name = Column(String(255), nullable=True)
+    sections = Column(JSON, nullable=False)
+    total_items = Column(Integer, nullable=False, default=0)
+    created_at = Column(DateTime(timezone=True), server_default=func.now(), nullable=False)
+
+    client = relationship("Client", back_populates="snapshots")
+
+    def __repr__(self):
+        return f"<ClientSnapshot(id={self.id}, client_id={self.client_id}, name={self.snapshot_name})>"
+
+
+@event.listens_for(Session, "after_flush")
+def _collect_orphan_snapshot_blobs(session, flush_context):
+    """מחיקת סעיפים שאף snapshot כבר אינו מפנה אליהם, כשנמחקים snapshots מההיסטוריה
+    (כולל מחיקה דרך cascade של לקוח)"""
+    digests = set()
+    for obj in session.deleted:
+        if isinstance(obj, ClientSnapshot) and obj.sections:
+            digests.update(obj.sections.values())
+    if digests:
+        delete_orphan_snapshot_blobs(session.connection(), digests)
+
+
+def delete_orphan_snapshot_blobs(connection, digests) -> int:
+    """מוחק מתוך digests את הסעיפים שאינם בשימוש אף snapshot שנותר. מחזיר את מספר הסעיפים שנמחקו.
+
+    נקרא פעם אחת לכל flush ע"י _collect_orphan_snapshot_blobs, וישירות ממסלולי מחיקה
+    בכמות (delete() על client_snapshot) שעוקפים את ה-flush.
+    """
+    candidates = set(digests)
+    if not candidates:
+        return 0
+    # sections הוא JSON - ההפניות נבדקות בקוד ולא ב-SQL
+    for (sections,) in connection.execute(select(ClientSnapshot.sections)):
+        candidates.difference_update((sections or {}).values())
+        if not candidates:
+            return 0
+    result = connection.execute(
+        SnapshotBlob.__table__.delete().where(SnapshotBlob.content_sha256.in_(candidates))
+    )
+    return result.rowcount
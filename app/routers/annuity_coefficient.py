@@ -3,11 +3,15 @@ API endpoints למקדמי קצבה
 """
 from fastapi import APIRouter, HTTPException
 from pydantic import BaseModel
-from typing import Optional
+from typing import List, Optional
 from datetime import date
 import logging
 
-from app.services.annuity_coefficient import get_annuity_coefficient
+from app.services.annuity_coefficient import (
+    coefficient_index,
+    get_annuity_coefficient,
+    get_annuity_coefficients
+)
 
 logger = logging.getLogger(__name__)
 router = APIRouter()
@@ -38,31 +42,54 @@ class AnnuityCoefficientResponse(BaseModel):
     notes: str
 
 
+class AnnuityCoefficientBatchRequest(BaseModel):
+    """בקשה לחישוב מקדמי קצבה לכמה תכניות בבת אחת"""
+    items: List[AnnuityCoefficientRequest]
+
+
+class AnnuityCoefficientBatchItem(BaseModel):
+    """תוצאה לפריט בודד בבקשה מרוכזת"""
+    index: int
+    product_type: str
+    factor_value: Optional[float] = None
+    source_table: Optional[str] = None
+    source_keys: dict = {}
+    target_year: Optional[int] = None
+    guarantee_months: Optional[int] = None
+    notes: str = ''
+    error: Optional[str] = None
+
+
+class AnnuityCoefficientBatchResponse(BaseModel):
+    """תגובה מרוכזת - התוצאות בסדר הבקשות"""
+    results: List[AnnuityCoefficientBatchItem]
+
+
+def _to_service_kwargs(request: AnnuityCoefficientRequest) -> dict:
+    """המרת בקשת API לפרמטרים של get_annuity_coefficient"""
+    return {
+        'product_type': request.product_type,
+        'start_date': date.fromisoformat(request.start_date),
+        'gender': request.gender,
+        'retirement_age': request.retirement_age,
+        'company_name': request.company_name,
+        'option_name': request.option_name,
+        'survivors_option': request.survivors_option,
+        'spouse_age_diff': request.spouse_age_diff,
+        'target_year': request.target_year,
+        'birth_date': date.fromisoformat(request.birth_date) if request.birth_date else None,
+        'pension_start_date': date.fromisoformat(request.pension_start_date) if request.pension_start_date else None
+    }
+
+
 @router.post("/calculate", response_model=AnnuityCoefficientResponse)
 async def calculate_annuity_coefficient(request: AnnuityCoefficientRequest):
     """
     מחשב מקדם קצבה לפי פרמטרים
     """
     try:
-        # המרת תאריכים
-        start_date_obj = date.fromisoformat(request.start_date)
-        birth_date_obj = date.fromisoformat(request.birth_date) if request.birth_date else None
-        pension_start_date_obj = date.fromisoformat(request.pension_start_date) if request.pension_start_date else None
-        
-        # חישוב מקדם
-        result = get_annuity_coefficient(
-            product_type=request.product_type,
-            start_date=start_date_obj,
-            gender=request.gender,
-            retirement_age=request.retirement_age,
-            company_name=request.company_name,
-            option_name=request.option_name,
-            survivors_option=request.survivors_option,
-            spouse_age_diff=request.spouse_age_diff,
-            target_year=request.target_year,
-            birth_date=birth_date_obj,
-            pension_start_date=pension_start_date_obj
-        )
+        # המרת תאריכים וחישוב מקדם
+        result = get_annuity_coefficient(**_to_service_kwargs(request))
         
         logger.info(f"[API מקדם קצבה] חושב מקדם: {result['factor_value']}")
         
@@ -76,15 +103,57 @@ async def calculate_annuity_coefficient(request: AnnuityCoefficientRequest):
         raise HTTPException(status_code=500, detail=str(e))
 
 
+@router.post("/calculate-batch", response_model=AnnuityCoefficientBatchResponse)
+def calculate_annuity_coefficients_batch(request: AnnuityCoefficientBatchRequest):
+    """
+    מחשב מקדמי קצבה לכל תכניות התיק בקריאה אחת (התוצאות בסדר הבקשות)
+    """
+    results: List[Optional[dict]] = [None] * len(request.items)
+    valid_positions = []
+    valid_kwargs = []
+    
+    for position, item in enumerate(request.items):
+        try:
+            valid_kwargs.append(_to_service_kwargs(item))
+            valid_positions.append(position)
+        except ValueError as e:
+            results[position] = {'error': f"שגיאת ולידציה: {e}"}
+    
+    for position, result in zip(valid_positions, get_annuity_coefficients(valid_kwargs)):
+        results[position] = result
+    
+    items = []
+    for position, (item, result) in enumerate(zip(request.items, results)):
+        if result.get('error'):
+            items.append(AnnuityCoefficientBatchItem(
+                index=position, product_type=item.product_type, error=result['error']
+            ))
+            continue
+        items.append(AnnuityCoefficientBatchItem(
+            index=position,
+            product_type=item.product_type,
+            factor_value=result['factor_value'],
+            source_table=result['source_table'],
+            source_keys=result['source_keys'],
+            target_year=result['target_year'],
+            guarantee_months=result['guarantee_months'],
+            notes=result['notes']
+        ))
+    
+    logger.info(f"[API מקדם קצבה] חושבו {len(items)} מקדמים בבקשה מרוכזת")
+    return AnnuityCoefficientBatchResponse(results=items)
+
+
 @router.get("/tables/status")
 async def get_tables_status():
     """
     בודק סטטוס טבלאות המקדמים
     """
-    from app.database import get_db
+    from app.database import get_read_db
     from sqlalchemy import text
     
-    db = next(get_db())
+    db_session = get_read_db()
+    db = next(db_session)
     
     try:
         tables = [
@@ -102,7 +171,8 @@ async def get_tables_status():
         return {
             'status': 'ok',
             'tables': status,
-            'total_records': sum(status.values())
+            'total_records': sum(status.values()),
+            'index': coefficient_index.stats()
         }
         
     except Exception as e:
@@ -111,3 +181,18 @@ async def get_tables_status():
             'status': 'error',
             'error': str(e)
         }
+    finally:
+        db_session.close()
+
+
+@router.post("/tables/reload")
+async def reload_coefficient_tables():
+    """
+    טעינה מחדש של אינדקס המקדמים בזיכרון (אחרי ייבוא טבלאות)
+    """
+    try:
+        coefficient_index.reload()
+        return {'status': 'ok', 'index': coefficient_index.stats()}
+    except Exception as e:
+        logger.error(f"[API מקדם קצבה] שגיאה בטעינת אינדקס מקדמים: {e}")
+        raise HTTPException(status_code=500, detail=str(e))
@@ -5,7 +5,7 @@ from sqlalchemy.orm import Session
 
 from typing import List
 
-from app.database import get_db
+from app.database import get_read_db
 from app.schemas.cashflow import (
     CashflowGenerateRequest,
     CashflowGenerateResponse,
@@ -65,7 +65,7 @@ def generate_cashflow_endpoint(
     scenario_id: int,
     req: CashflowGenerateRequest,
     client_id: int = Query(..., description="Client ID"),
-    db: Session = Depends(get_db),
+    db: Session = Depends(get_read_db),
 ):
     try:
         data = generate_cashflow(
@@ -5,13 +5,13 @@ from typing import Optional, List
 from fastapi import APIRouter, Depends, HTTPException, Query, Path, status
 from sqlalchemy.orm import Session
 from sqlalchemy.exc import IntegrityError
-from sqlalchemy import or_
 
 from app.database import get_db
 from app.models.client import Client
 from app.models.current_employment import CurrentEmployer
 from app.services.retirement.utils.pension_utils import compute_pension_start_date_from_funds
 from app.services.client_service import normalize_id_number
+from app.services.client_search import search_clients
 from app.services.current_employer import EmploymentService as CurrentEmployerEmploymentService
 # ייבוא סכמות הלקוח
 from app.schemas.client import ClientCreate, ClientUpdate, ClientResponse, ClientList
@@ -185,35 +185,36 @@ def list_clients(
     gender: Optional[str] = Query(None, description="Filter by gender"),
     search: Optional[str] = Query(None, description="Search by name or ID"),
     sort: Optional[str] = Query(None, description="Sort field, e.g. 'full_name'"),
+    cursor: Optional[str] = Query(None, description="next_cursor of the previous page (replaces skip)"),
+    include_total: bool = Query(True, description="Count all matching clients"),
     db: Session = Depends(get_db),
 ):
     """List clients with pagination, filtering, sorting, and search"""
-    query = db.query(Client)
-
-    if is_active is not None:
-        query = query.filter(Client.is_active == is_active)
-    if gender is not None:
-        query = query.filter(Client.gender == gender)
-    if search:
-        pattern = f"%{search}%"
-        query = query.filter(
-            or_(
-                Client.full_name.ilike(pattern),
-                Client.id_number.ilike(pattern),
-            )
+    try:
+        result = search_clients(
+            db,
+            search=search,
+            is_active=is_active,
+            gender=gender,
+            sort=sort,
+            limit=limit,
+            skip=skip,
+            cursor=cursor,
+            include_total=include_total,
         )
-
-    total = query.count()
-
-    if sort == "full_name":
-        query = query.order_by(Client.full_name.asc())
-
-    items = query.offset(skip).limit(limit).all()
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
 
     page_size = limit
-    page = (skip // page_size) + 1 if page_size else 1
-
-    return ClientList(items=items, total=total, page=page, page_size=page_size)
+    page = (skip // page_size) + 1 if page_size and not cursor else 1
+
+    return ClientList(
+        items=result.items,
+        total=result.total,
+        page=page,
+        page_size=page_size,
+        next_cursor=result.next_cursor,
+    )
 
 
 """Current Employer CRUD operations bound to /api/v1/clients/{client_id}/current-employer"""
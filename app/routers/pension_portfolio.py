@@ -1,4 +1,5 @@
 from fastapi import APIRouter, HTTPException, UploadFile, File, Depends
+from fastapi.concurrency import run_in_threadpool
 from typing import List, Optional
 from sqlalchemy.orm import Session
 import json
@@ -7,24 +8,34 @@ import subprocess
 from pathlib import Path
 
 from app.database import get_db
-from app.services.pension_portfolio import PensionPortfolioProcessor
+from app.services.pension_portfolio import UnsupportedEncodingError, process_pension_files
+from app.services.pension_portfolio.conversion import bulk_convert_accounts
+from app.services.pension_portfolio.store import (
+    content_sha256,
+    get_parsed_files,
+    get_portfolio,
+    relabel_result,
+    save_portfolio,
+    store_parsed_files,
+)
 
 router = APIRouter()
 
 @router.post("/clients/{client_id}/pension-portfolio/process-xml")
 async def process_pension_xml_files(
     client_id: int,
-    files: List[UploadFile] = File(...)
+    files: List[UploadFile] = File(...),
+    db: Session = Depends(get_db)
 ):
     """עיבוד קבצי XML ו-DAT של המסלקה"""
     
     if not files:
         raise HTTPException(status_code=400, detail="לא נבחרו קבצים")
     
-    processor = PensionPortfolioProcessor()
     all_accounts = []
     processed_files = []
     skipped_files = []
+    uploads = []
     
     for file in files:
         filename_lower = file.filename.lower()
@@ -37,49 +48,66 @@ async def process_pension_xml_files(
             })
             continue
         
-        try:
-            content = await file.read()
-            
-            # ניסיון לפענח עם קידודים שונים
-            file_content = None
-            for encoding in ['utf-8', 'windows-1255', 'iso-8859-8', 'latin1']:
-                try:
-                    file_content = content.decode(encoding)
-                    break
-                except UnicodeDecodeError:
-                    continue
-            
-            if file_content is None:
-                raise HTTPException(
-                    status_code=400,
-                    detail=f"לא הצלחתי לפענח את הקובץ {file.filename}. קידוד לא נתמך"
-                )
-            
-            result = processor.process_file(file_content, file.filename)
-            if result is None:
-                raise HTTPException(
-                    status_code=400,
-                    detail=f"לא הצלחתי לחלץ נתונים מקובץ {file.filename}. הקובץ עשוי להיות פגום או בפורמט לא נתמך."
-                )
-
-            accounts = result.get('accounts', [])
-            all_accounts.extend(accounts)
-            
-            processed_files.append({
-                'file': result.get('file', file.filename),
-                'file_type': 'DAT' if filename_lower.endswith('.dat') else 'XML',
-                'accounts_count': len(accounts),
-                'accounts': accounts,
-                'processed_at': result.get('processed_at', datetime.now().isoformat())
-            })
-            
-        except HTTPException:
-            raise
-        except Exception as e:
+        uploads.append((file.filename, await file.read()))
+    
+    # קבצים שכבר עובדו (לפי sha256 של התוכן) נטענים מהמסד ללא עיבוד מחדש
+    # (גישת ה-DB הסינכרונית רצה ב-threadpool כדי לא לחסום את ה-event loop)
+    digests = [content_sha256(content) for _filename, content in uploads]
+    cached = await run_in_threadpool(
+        get_parsed_files, db, {digest: filename for (filename, _content), digest in zip(uploads, digests)}
+    )
+    
+    # פענוח ועיבוד שאר הקבצים במקביל ב-process pool (הקידוד נקבע לפי BOM / הצהרת XML)
+    pending = {}
+    for (filename, content), digest in zip(uploads, digests):
+        if digest not in cached and digest not in pending:
+            pending[digest] = (filename, content)
+    parsed = {}
+    if pending:
+        parsed = dict(zip(pending, await process_pension_files(list(pending.values()))))
+    
+    to_store = [
+        (digest, result) for digest, result in parsed.items()
+        if isinstance(result, dict)
+    ]
+    if to_store:
+        await run_in_threadpool(store_parsed_files, db, to_store)
+    
+    for (filename, _content), digest in zip(uploads, digests):
+        from_cache = digest in cached
+        result = cached[digest] if from_cache else parsed[digest]
+        if isinstance(result, dict) and result.get('file') != filename:
+            # קובץ זהה שהועלה (עכשיו או בעבר) בשם אחר
+            result = relabel_result(result, filename)
+        
+        if isinstance(result, UnsupportedEncodingError):
+            raise HTTPException(
+                status_code=400,
+                detail=f"לא הצלחתי לפענח את הקובץ {filename}. קידוד לא נתמך"
+            )
+        if isinstance(result, BaseException):
             raise HTTPException(
                 status_code=500, 
-                detail=f"שגיאה בעיבוד קובץ {file.filename}: {str(e)}"
+                detail=f"שגיאה בעיבוד קובץ {filename}: {str(result)}"
             )
+        if result is None:
+            raise HTTPException(
+                status_code=400,
+                detail=f"לא הצלחתי לחלץ נתונים מקובץ {filename}. הקובץ עשוי להיות פגום או בפורמט לא נתמך."
+            )
+
+        accounts = result.get('accounts', [])
+        all_accounts.extend(accounts)
+        
+        processed_files.append({
+            'file': result.get('file', filename),
+            'file_type': 'DAT' if filename.lower().endswith('.dat') else 'XML',
+            'accounts_count': len(accounts),
+            'accounts': accounts,
+            'processed_at': result.get('processed_at', datetime.now().isoformat()),
+            'content_sha256': digest,
+            'from_cache': from_cache
+        })
     
     return {
         'total_accounts': len(all_accounts),
@@ -90,25 +118,52 @@ async def process_pension_xml_files(
         'accounts': all_accounts
     }
 
+def _portfolio_response(portfolio) -> dict:
+    return {
+        'portfolio_id': portfolio.id,
+        'client_id': portfolio.client_id,
+        'accounts': portfolio.accounts,
+        'accounts_count': len(portfolio.accounts or []),
+        'source_files': portfolio.source_files or [],
+        'created_at': portfolio.created_at.isoformat() if portfolio.created_at else None
+    }
+
 @router.get("/clients/{client_id}/pension-portfolio/")
-async def get_pension_portfolio(client_id: int):
-    """קבלת נתוני תיק פנסיוני קיימים"""
-    # כאן ניתן לטעון נתונים שנשמרו קודם במסד הנתונים
-    # לעת עתה נחזיר רשימה ריקה
-    return []
+def get_pension_portfolio(client_id: int, db: Session = Depends(get_db)):
+    """קבלת חשבונות התיק הפנסיוני האחרון שנשמר (רשימה ריקה אם לא נשמר)"""
+    portfolio = get_portfolio(db, client_id)
+    return portfolio.accounts if portfolio is not None else []
+
+@router.get("/clients/{client_id}/pension-portfolio/{portfolio_id}")
+def get_saved_pension_portfolio(client_id: int, portfolio_id: int, db: Session = Depends(get_db)):
+    """קבלת גרסה שמורה של התיק הפנסיוני לפי מזהה"""
+    portfolio = get_portfolio(db, client_id, portfolio_id)
+    if portfolio is None:
+        raise HTTPException(status_code=404, detail=f"תיק פנסיוני {portfolio_id} לא נמצא")
+    return _portfolio_response(portfolio)
 
 @router.post("/clients/{client_id}/pension-portfolio/save")
-async def save_pension_portfolio(
+def save_pension_portfolio(
     client_id: int,
-    portfolio_data: dict
+    portfolio_data: dict,
+    db: Session = Depends(get_db)
 ):
-    """שמירת נתוני תיק פנסיוני"""
-    # כאן ניתן לשמור את הנתונים במסד הנתונים
-    # לעת עתה נחזיר הצלחה
+    """שמירת נתוני תיק פנסיוני - מחזיר portfolio_id שניתן להעביר לבקשות תרחישים"""
+    from app.models.client import Client
+    
+    if db.query(Client.id).filter(Client.id == client_id).first() is None:
+        raise HTTPException(status_code=404, detail=f"לקוח {client_id} לא נמצא")
+    
+    accounts = portfolio_data.get('accounts', [])
+    if not isinstance(accounts, list):
+        raise HTTPException(status_code=400, detail="accounts חייב להיות רשימה")
+    
+    portfolio = save_portfolio(db, client_id, accounts, portfolio_data.get('source_files'))
     return {
         'message': 'נתוני התיק הפנסיוני נשמרו בהצלחה',
         'client_id': client_id,
-        'accounts_count': len(portfolio_data.get('accounts', []))
+        'portfolio_id': portfolio.id,
+        'accounts_count': len(accounts)
     }
 
 @router.post("/clients/{client_id}/pension-portfolio/convert")
@@ -123,61 +178,8 @@ async def convert_pension_accounts(
     if not accounts:
         raise HTTPException(status_code=400, detail="לא נבחרו חשבונות להמרה")
     
-    from app.models.pension_fund import PensionFund
-    from app.models.capital_asset import CapitalAsset
-    from datetime import date
-    from decimal import Decimal
-    
-    converted_count = 0
-    
-    for account in accounts:
-        conversion_type = account.get('conversion_type', 'pension')  # ברירת מחדל: קצבה
-        balance = float(account.get('יתרה', 0))
-        
-        if balance <= 0:
-            continue
-        
-        if conversion_type == 'pension':
-            # המרה לקצבה - שמירה ישירה ל-DB
-            pension_amount = balance / 200  # מקדם המרה
-            
-            # קביעת יחס מס לפי סוג המוצר
-            product_type = account.get('סוג_מוצר', '')
-            tax_treatment = "exempt" if 'השתלמות' in product_type else "taxable"
-            
-            pf = PensionFund(
-                client_id=client_id,
-                fund_name=account.get('שם_תכנית', 'תכנית ללא שם'),
-                fund_type=account.get('סוג_מוצר', 'קופת גמל'),
-                input_mode='manual',
-                balance=balance,
-                annuity_factor=200,
-                pension_amount=pension_amount,
-                pension_start_date=date(2025, 1, 1),
-                indexation_method='none',
-                tax_treatment=tax_treatment,
-                deduction_file=account.get('מספר_חשבון', ''),
-                remarks=f"הומר מתיק פנסיוני - {account.get('חברה_מנהלת', '')}"
-            )
-            db.add(pf)
-            converted_count += 1
-            
-        elif conversion_type == 'capital_asset':
-            # המרה לנכס הון - שמירה ישירה ל-DB
-            ca = CapitalAsset(
-                client_id=client_id,
-                asset_name=account.get('שם_תכנית', 'נכס ללא שם'),
-                asset_type='provident_fund',
-                current_value=Decimal(str(balance)),
-                annual_return_rate=Decimal('0.03'),
-                payment_frequency='monthly',
-                start_date=date(2025, 1, 1),
-                indexation_method='none',
-                tax_treatment='taxable',
-                description=f"הומר מתיק פנסיוני - {account.get('חברה_מנהלת', '')}"
-            )
-            db.add(ca)
-            converted_count += 1
+    # כל השורות נבנות בזיכרון ונכתבות ב-INSERT אחד לכל טבלה
+    converted_count = bulk_convert_accounts(db, client_id, accounts)
     
     db.commit()
     
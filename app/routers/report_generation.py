@@ -1,17 +1,61 @@
 from fastapi import APIRouter, Depends, HTTPException, Query
-from fastapi.responses import StreamingResponse
+from fastapi.responses import FileResponse
 from sqlalchemy.orm import Session
-import io
 import logging
 
 from app.database import get_db
+from app.models.client import Client
+from app.models.scenario import Scenario
 from app.schemas.report import ReportPdfRequest
-from app.utils.contract_adapter import ReportServiceAdapter
+from app.services.report_jobs import JOB_DONE, JOB_FAILED, report_data_fingerprint, report_jobs
 
 router = APIRouter(prefix="/api/v1", tags=["report-generation"])
 logger = logging.getLogger(__name__)
 
 
+def submit_scenario_report_job(db: Session, client_id: int, scenario_id: int, request: ReportPdfRequest):
+    """Queue a scenario cashflow report (deduplicated against identical requests over unchanged data)"""
+    params = {
+        "client_id": client_id,
+        "scenario_id": scenario_id,
+        "request": request.dict(by_alias=True),
+    }
+    return report_jobs.submit(
+        "scenario_report",
+        params,
+        report_data_fingerprint(db, client_id),
+        filename=f"report_{client_id}_{scenario_id}.pdf",
+    )
+
+
+def ensure_client_scenario(db: Session, client_id: int, scenario_id: int) -> None:
+    """404 unless the client exists and owns the scenario (checked before a job takes a worker slot)"""
+    if not db.query(Client.id).filter(Client.id == client_id).first():
+        raise HTTPException(status_code=404, detail=f"Client {client_id} not found")
+    owned = db.query(Scenario.id).filter(
+        Scenario.id == scenario_id,
+        Scenario.client_id == client_id
+    ).first()
+    if not owned:
+        raise HTTPException(status_code=404, detail=f"Scenario {scenario_id} not found for client {client_id}")
+
+
+def report_file_response(job) -> FileResponse:
+    """The job's PDF artifact (FileResponse serves HTTP range requests)"""
+    if job.status == JOB_FAILED:
+        raise HTTPException(
+            status_code=500,
+            detail={"error": f"שגיאה ביצירת דוח: {job.error}"}
+        )
+    path = report_jobs.artifact_path(job) if job.status == JOB_DONE else None
+    if path is None:
+        raise HTTPException(
+            status_code=409,
+            detail={"error": "הדוח עדיין בהכנה", "status": job.status}
+        )
+    return FileResponse(path, media_type="application/pdf", filename=job.filename)
+
+
 @router.post("/scenarios/{scenario_id}/report/pdf")
 async def generate_pdf_report(
     scenario_id: int,
@@ -69,41 +113,23 @@ async def generate_pdf_report(
     try:
         logger.info(f"PDF report request: client_id={client_id}, scenario_id={scenario_id}, range={request.from_}-{request.to}")
         
-        # Generate PDF using the adapter with detailed error handling
-        try:
-            pdf_bytes = ReportServiceAdapter.generate_pdf_report(
-                db=db,
-                client_id=client_id,
-                scenario_id=scenario_id,
-                request=request
-            )
-            
-            # Verify PDF content
-            if not pdf_bytes or len(pdf_bytes) < 100 or not pdf_bytes.startswith(b'%PDF'):
-                logger.error(f"Generated invalid PDF format: {len(pdf_bytes)} bytes, starts with: {pdf_bytes[:20]}")
-                raise ValueError("Invalid PDF format generated")
-                
-            logger.info(f"PDF generated successfully: {len(pdf_bytes)} bytes")
-            
-            # Create filename
-            filename = f"report_{client_id}_{scenario_id}.pdf"
-            
-            # Return as streaming response
-            return StreamingResponse(
-                io.BytesIO(pdf_bytes),
-                media_type="application/pdf",
-                headers={"Content-Disposition": f"attachment; filename={filename}"}
-            )
-            
-        except ValueError as e:
-            logger.warning(f"Validation error in PDF generation: {e}")
-            raise HTTPException(status_code=400, detail=str(e))
-        except Exception as e:
-            # Log full exception details including traceback
-            import traceback
-            logger.error(f"Detailed PDF error: {traceback.format_exc()}")
-            logger.error(f"Error generating PDF: {e}")
-            raise HTTPException(status_code=500, detail=f"Internal server error during PDF generation: {type(e).__name__}")
+        # Render in the report worker pool (the PDF format check runs in the worker)
+        job = submit_scenario_report_job(db, client_id, scenario_id, request)
+        await report_jobs.wait(job)
+        
+        if job.status == JOB_FAILED:
+            if job.error_type == "ValueError":
+                logger.warning(f"Validation error in PDF generation: {job.error}")
+                raise HTTPException(status_code=400, detail=job.error)
+            logger.error(f"Error generating PDF: {job.error}")
+            raise HTTPException(status_code=500, detail=f"Internal server error during PDF generation: {job.error_type}")
+        
+        logger.info(f"PDF generated successfully: {job.size} bytes")
+        return FileResponse(
+            report_jobs.artifact_path(job),
+            media_type="application/pdf",
+            filename=job.filename
+        )
     except HTTPException:
         # Just re-raise if it's already an HTTP exception
         raise
@@ -111,3 +137,38 @@ async def generate_pdf_report(
         # Catch any unexpected errors in the router itself
         logger.error(f"Unexpected router error: {e}")
         raise HTTPException(status_code=500, detail="Internal server error in PDF endpoint")
+
+
+@router.post("/scenarios/{scenario_id}/report/pdf/jobs", status_code=202)
+def submit_pdf_report_job(
+    scenario_id: int,
+    request: ReportPdfRequest,
+    client_id: int = Query(..., description="Client ID for the report"),
+    db: Session = Depends(get_db)
+):
+    """Queue a scenario PDF report; poll and download via /api/v1/reports/jobs/{job_id}."""
+    ensure_client_scenario(db, client_id, scenario_id)
+    job = submit_scenario_report_job(db, client_id, scenario_id, request)
+    return job.to_dict()
+
+
+@router.get("/reports/jobs/{job_id}")
+def get_report_job(job_id: str):
+    """
+    Report job status
+    """
+    job = report_jobs.get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail={"error": "משימת דוח לא נמצאה"})
+    return job.to_dict()
+
+
+@router.get("/reports/jobs/{job_id}/download")
+def download_report_job(job_id: str):
+    """
+    Download a finished report (supports HTTP range requests)
+    """
+    job = report_jobs.get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail={"error": "משימת דוח לא נמצאה"})
+    return report_file_response(job)
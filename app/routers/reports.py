@@ -1,20 +1,43 @@
 """
 Reports API router - PDF report generation
+
+Not mounted in app.main: the client report renderer needs the app.services.report
+package, which can't be imported in this tree (its config/fonts/charts modules
+are missing). Job status and download live in report_generation.
 """
-from fastapi import APIRouter, Depends, HTTPException, Response
+from fastapi import APIRouter, Depends, HTTPException
 from sqlalchemy.orm import Session
 from typing import List, Optional
 from pydantic import BaseModel
-import io
 from datetime import datetime
 
-from app.database import get_db
+from app.database import get_db, get_read_db
 from app.models.client import Client
 from app.models.scenario import Scenario
-from app.services.report_service import ReportService
+from app.routers.report_generation import report_file_response
+from app.services.report_jobs import report_data_fingerprint, report_jobs
 
 router = APIRouter()
 
+
+def submit_client_report_job(db: Session, client_id: int, scenario_ids: List[int], options: dict):
+    """Queue a client report (deduplicated against identical requests over unchanged data)"""
+    timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+    params = {
+        "client_id": client_id,
+        "scenario_ids": list(scenario_ids),
+        "report_type": options.get("report_type", "comprehensive"),
+        "include_charts": options.get("include_charts", True),
+        "include_cashflow": options.get("include_cashflow", True),
+    }
+    return report_jobs.submit(
+        "client_report",
+        params,
+        report_data_fingerprint(db, client_id),
+        filename=f"retirement_report_{client_id}_{timestamp}.pdf",
+    )
+
+
 class ReportRequest(BaseModel):
     scenario_ids: List[int]
     report_type: str = "comprehensive"  # comprehensive, summary, cashflow, comparison
@@ -22,7 +45,7 @@ class ReportRequest(BaseModel):
     include_cashflow: bool = True
 
 @router.post("/clients/{client_id}/reports/generate")
-def generate_report(
+async def generate_report(
     client_id: int,
     request: ReportRequest,
     db: Session = Depends(get_db)
@@ -50,39 +73,16 @@ def generate_report(
             detail={"error": "חלק מהתרחישים לא נמצאו או לא שייכים ללקוח"}
         )
     
-    try:
-        # Generate PDF report
-        pdf_buffer = ReportService.generate_pdf_report(
-            client=client,
-            scenarios=scenarios,
-            report_type=request.report_type,
-            include_charts=request.include_charts,
-            include_cashflow=request.include_cashflow
-        )
-        
-        # Return PDF as response
-        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-        filename = f"retirement_report_{client_id}_{timestamp}.pdf"
-        
-        return Response(
-            content=pdf_buffer.getvalue(),
-            media_type="application/pdf",
-            headers={
-                "Content-Disposition": f"attachment; filename={filename}"
-            }
-        )
-        
-    except Exception as e:
-        raise HTTPException(
-            status_code=500,
-            detail={"error": f"שגיאה ביצירת דוח: {str(e)}"}
-        )
+    # Render in the report worker pool and wait without blocking the API worker
+    job = submit_client_report_job(db, client_id, request.scenario_ids, request.dict())
+    await report_jobs.wait(job)
+    return report_file_response(job)
 
 @router.get("/clients/{client_id}/reports/preview")
 def preview_report_data(
     client_id: int,
     scenario_ids: str,  # comma-separated scenario IDs
-    db: Session = Depends(get_db)
+    db: Session = Depends(get_read_db)
 ):
     """
     Preview report data without generating PDF
@@ -137,7 +137,7 @@ def preview_report_data(
     }
 
 @router.post("/clients/{client_id}/reports/pdf")
-def generate_simple_pdf_report(
+async def generate_simple_pdf_report(
     client_id: int,
     request: dict,
     db: Session = Depends(get_db)
@@ -163,42 +163,42 @@ def generate_simple_pdf_report(
     ).first()
     
     if not scenario:
-        # Create a default scenario if none exists
-        scenario = Scenario(
-            client_id=client_id,
-            scenario_name="דוח ברירת מחדל",
-            parameters="{}",
-            summary_results="{}",
-            cashflow_projection="{}"
+        raise HTTPException(
+            status_code=404,
+            detail={"error": "תרחיש לא נמצא"}
         )
-        db.add(scenario)
-        db.commit()
-        db.refresh(scenario)
     
-    try:
-        # Generate PDF report using the existing service
-        pdf_buffer = ReportService.generate_pdf_report(
-            client=client,
-            scenarios=[scenario],
-            report_type=request.get('report_type', 'comprehensive'),
-            include_charts=request.get('include_charts', True),
-            include_cashflow=request.get('include_cashflow', True)
-        )
-        
-        # Return PDF as response
-        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-        filename = f"retirement_report_{client_id}_{timestamp}.pdf"
-        
-        return Response(
-            content=pdf_buffer.getvalue(),
-            media_type="application/pdf",
-            headers={
-                "Content-Disposition": f"attachment; filename={filename}"
-            }
+    # Render in the report worker pool and wait without blocking the API worker
+    job = submit_client_report_job(db, client_id, [scenario.id], request)
+    await report_jobs.wait(job)
+    return report_file_response(job)
+
+
+@router.post("/clients/{client_id}/reports/jobs", status_code=202)
+def submit_report_job(
+    client_id: int,
+    request: ReportRequest,
+    db: Session = Depends(get_db)
+):
+    """
+    Queue a PDF report for selected scenarios and return its job id
+    """
+    client = db.query(Client).filter(Client.id == client_id).first()
+    if not client:
+        raise HTTPException(
+            status_code=404, 
+            detail={"error": "לקוח לא נמצא"}
         )
-        
-    except Exception as e:
+    
+    found = db.query(Scenario.id).filter(
+        Scenario.id.in_(request.scenario_ids),
+        Scenario.client_id == client_id
+    ).count()
+    if found != len(set(request.scenario_ids)):
         raise HTTPException(
-            status_code=500,
-            detail={"error": f"שגיאה ביצירת דוח: {str(e)}"}
+            status_code=400,
+            detail={"error": "חלק מהתרחישים לא נמצאו או לא שייכים ללקוח"}
         )
+    
+    job = submit_client_report_job(db, client_id, request.scenario_ids, request.dict())
+    return job.to_dict()
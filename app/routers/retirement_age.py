@@ -3,11 +3,12 @@ API endpoints for retirement age settings and calculations
 """
 from fastapi import APIRouter, HTTPException
 from pydantic import BaseModel
-from typing import Dict, Optional
+from typing import Dict, List, Optional
 from datetime import date
 
 from app.services.retirement_age_service import (
     calculate_retirement_age,
+    calculate_retirement_ages,
     get_retirement_age_simple,
     get_retirement_date,
     load_retirement_age_settings,
@@ -45,6 +46,28 @@ def calculate_retirement_age_endpoint(request: RetirementAgeRequest):
         raise HTTPException(status_code=400, detail=str(e))
 
 
+@router.post("/calculate-bulk")
+def calculate_retirement_age_bulk_endpoint(requests: List[RetirementAgeRequest]):
+    """
+    חישוב גיל פרישה לרשימת לקוחות בקריאה אחת
+    """
+    try:
+        results = calculate_retirement_ages((request.birth_date, request.gender) for request in requests)
+        return [
+            {
+                "birth_date": request.birth_date.isoformat(),
+                "gender": request.gender,
+                "age_years": result["age_years"],
+                "age_months": result["age_months"],
+                "retirement_date": result["retirement_date"].isoformat(),
+                "source": result["source"]
+            }
+            for request, result in zip(requests, results)
+        ]
+    except Exception as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+
 @router.post("/calculate-simple")
 def calculate_retirement_age_simple_endpoint(request: RetirementAgeRequest):
     """
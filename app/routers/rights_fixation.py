@@ -1,18 +1,21 @@
 """
 נקודות קצה API לקיבוע זכויות
 """
-from fastapi import APIRouter, HTTPException, Depends, Response
+from fastapi import APIRouter, HTTPException, Depends, Query, Response
+from fastapi.concurrency import run_in_threadpool
 from typing import Dict, List, Any, Optional
 from datetime import date, datetime
 import logging
 
 from sqlalchemy.orm import Session
 
+from app.database import get_db
 from app.models.client import Client
 from app.models.grant import Grant
 from app.models.fixation_result import FixationResult
 from app.services.rights_fixation import (
     calculate_full_fixation,
+    calculate_full_fixation_memoized,
     compute_grant_effect,
     compute_client_exemption,
     calculate_eligibility_age,
@@ -21,6 +24,9 @@ from app.services.rights_fixation import (
     calc_exempt_capital,
     compute_idf_fixation_impact,
 )
+from app.services.rights_fixation.indexation_factors import is_index_final
+from app.services.rights_fixation.payload import build_fixation_payload
+from app.services.fixation_recompute_service import DEFAULT_WORKERS, MAX_WORKERS, FixationRecomputeService
 from app.services.retirement.utils.pension_utils import get_effective_pension_start_date
 from app.services.retirement_age_service import calc_eligibility_date
 from app.services.retirement.services.commutation_exemption_service import (
@@ -49,46 +55,31 @@ def calculate_and_save_fixation_for_client(db: Session, client_id: int) -> Optio
     # Determine effective pension start date from actual pensions
     pension_start_date = get_effective_pension_start_date(db, client)
 
-    # Determine statutory eligibility date (retirement date)
-    eligibility_date = calc_eligibility_date(client.birth_date, client.gender) if client.birth_date and client.gender else None
-
     # For internal flows (e.g. retirement scenarios) we always calculate and persist fixation,
     # even if the client is not yet "eligible" by today's date, so we deliberately
     # do NOT enforce the age/pension start date conditions here.
-    today = date.today()
-
-    # Build formatted data similar to the /calculate endpoint (client_id branch)
     # Effective eligibility date for calculation is the later of statutory eligibility
-    # and actual pension start date, falling back to statutory eligibility or today's
-    # date when needed.
-    effective_eligibility_date: Optional[date] = None
-    if eligibility_date:
-        effective_eligibility_date = eligibility_date
-        if pension_start_date and pension_start_date > effective_eligibility_date:
-            effective_eligibility_date = pension_start_date
-
-    eligibility_date_to_use = effective_eligibility_date or eligibility_date or today
-    formatted_data: Dict[str, Any] = {
-        "id": client_id,
-        "birth_date": client.birth_date.isoformat() if client.birth_date else None,
-        "gender": client.gender,
-        "grants": [
-            {
-                "grant_amount": grant.grant_amount,
-                "work_start_date": grant.work_start_date.isoformat() if grant.work_start_date else None,
-                "work_end_date": grant.work_end_date.isoformat() if grant.work_end_date else None,
-                "grant_date": grant.grant_date.isoformat() if getattr(grant, "grant_date", None) else None,
-                "employer_name": grant.employer_name,
-            }
-            for grant in grants
-        ],
-        "eligibility_date": eligibility_date_to_use.isoformat(),
-        "eligibility_year": eligibility_date_to_use.year,
-        "effective_pension_start_date": pension_start_date.isoformat() if pension_start_date else None,
-    }
+    # and actual pension start date, falling back to today's date when needed.
+    formatted_data = build_fixation_payload(client, grants, pension_start_date)
+
+    # Upsert FixationResult for this client using the same semantics as /save
+    existing = (
+        db.query(FixationResult)
+        .filter(FixationResult.client_id == client_id)
+        .order_by(FixationResult.created_at.desc())
+        .first()
+    )
 
-    logger.info("Rights fixation: calculating full fixation for client %s", client_id)
-    result = calculate_full_fixation(formatted_data)
+    # Inputs unchanged since the saved fixation - reuse it instead of re-indexing grants
+    result = _result_from_saved_fixation(existing, formatted_data)
+    if result is not None:
+        remaining_exempt_capital = result["exemption_summary"].get("remaining_exempt_capital", 0) or 0.0
+        if abs((existing.exempt_capital_remaining or 0.0) - remaining_exempt_capital) < 0.005:
+            logger.info("Rights fixation: inputs unchanged for client %s, keeping saved fixation %s", client_id, existing.id)
+            return existing
+    else:
+        logger.info("Rights fixation: calculating full fixation for client %s", client_id)
+        result = calculate_full_fixation_memoized(formatted_data)
 
     # If calculation failed, do not save a broken result
     if not isinstance(result, dict) or result.get("error"):
@@ -98,14 +89,6 @@ def calculate_and_save_fixation_for_client(db: Session, client_id: int) -> Optio
     exemption_summary = result.get("exemption_summary", {}) or {}
     remaining_exempt_capital = exemption_summary.get("remaining_exempt_capital", 0) or 0.0
 
-    # Upsert FixationResult for this client using the same semantics as /save
-    existing = (
-        db.query(FixationResult)
-        .filter(FixationResult.client_id == client_id)
-        .order_by(FixationResult.created_at.desc())
-        .first()
-    )
-
     now = datetime.now()
 
     if existing:
@@ -131,6 +114,41 @@ def calculate_and_save_fixation_for_client(db: Session, client_id: int) -> Optio
     return fixation_record
 
 
+def _result_from_saved_fixation(existing: Optional[FixationResult], formatted_data: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+    """Rebuild the pristine calculation result from a saved fixation with the same input hash.
+
+    Indexed grants are taken from the saved row, so no CBS call is needed. The
+    exemption summary is recomputed from them, because downstream flows (e.g. the
+    max-capital scenario) reduce the saved remaining exempt capital in place.
+    Returns None if the saved fixation cannot be reused.
+    """
+    if existing is None or not isinstance(existing.raw_payload, dict) or not isinstance(existing.raw_result, dict):
+        return None
+    if existing.raw_payload.get("input_hash") != formatted_data.get("input_hash"):
+        return None
+
+    # While the eligibility month index is unpublished, indexation may still change
+    eligibility_date = formatted_data["eligibility_date"]
+    if not is_index_final(eligibility_date) and (
+        existing.created_at is None or existing.created_at.date() != date.today()
+    ):
+        return None
+
+    grants = existing.raw_result.get("grants")
+    if not isinstance(grants, list) or any(
+        "indexed_full" not in grant or grant.get("indexation_fallback") for grant in grants
+    ):
+        return None
+
+    eligibility_year = formatted_data["eligibility_year"]
+    return {
+        "grants": grants,
+        "exemption_summary": compute_client_exemption(grants, eligibility_year),
+        "eligibility_date": eligibility_date,
+        "eligibility_year": eligibility_year,
+    }
+
+
 def update_fixation_exempt_pension_fields(fixation: FixationResult) -> None:
     """Update exempt pension-related fields on a FixationResult record.
 
@@ -370,7 +388,8 @@ async def calculate_rights_fixation(client_data: Dict[str, Any], response: Respo
 
                 print(f"DEBUG: Formatted data for service: {formatted_data}")
                 try:
-                    result = calculate_full_fixation(formatted_data)
+                    # החישוב כולל קריאות HTTP ללמ"ס - מריצים מחוץ ל-event loop
+                    result = await run_in_threadpool(calculate_full_fixation_memoized, formatted_data)
                 except Exception as e:
                     logger.error(f"שגיאה בחישוב קיבוע זכויות (client_id gateway): {e}")
                     # לשער הקיבוע החיצוני אנחנו מפרשים שגיאות חישוב כשגיאות שרת (500)
@@ -391,7 +410,7 @@ async def calculate_rights_fixation(client_data: Dict[str, Any], response: Respo
                 return result
         else:
             # פורמט מפורט - שימוש ישיר
-            result = calculate_full_fixation(client_data)
+            result = await run_in_threadpool(calculate_full_fixation, client_data)
             return result
             
     except HTTPException:
@@ -598,7 +617,7 @@ async def calculate_grant_effect(grant_data: Dict[str, Any]):
     """
     try:
         eligibility_date = grant_data.pop('eligibility_date')
-        effect = compute_grant_effect(grant_data, eligibility_date)
+        effect = await run_in_threadpool(compute_grant_effect, grant_data, eligibility_date)
         
         if effect is None:
             raise HTTPException(status_code=400, detail="כשל בחישוב השפעת המענק")
@@ -627,7 +646,7 @@ async def calculate_exemption_summary(data: Dict[str, Any]):
         grants = data.get('grants', [])
         eligibility_year = data.get('eligibility_year', 2025)
         
-        summary = compute_client_exemption(grants, eligibility_year)
+        summary = await run_in_threadpool(compute_client_exemption, grants, eligibility_year)
         return summary
     except Exception as e:
         logger.error(f"שגיאה בחישוב סיכום פטור: {e}")
@@ -787,6 +806,30 @@ async def delete_fixation(client_id: int):
             detail=f"שגיאה במחיקת קיבוע זכויות: {str(e)}",
         )
 
+@router.post("/recompute-all")
+def recompute_all_fixations(
+    dry_run: bool = False,
+    include_missing: bool = False,
+    workers: int = Query(DEFAULT_WORKERS, ge=1, le=MAX_WORKERS),
+    db: Session = Depends(get_db),
+):
+    """
+    חישוב מחדש של קיבועי זכויות שמורים שהתיישנו
+
+    לקוח נחשב "מיושן" אם נתוני הקלט שלו (מענקים, תאריך זכאות) או גרסת
+    פרמטרי הקיבוע (תקרות ואחוזי פטור) השתנו מאז השמירה האחרונה.
+    """
+    try:
+        return FixationRecomputeService(db).run(
+            workers=workers,
+            include_missing=include_missing,
+            dry_run=dry_run,
+        )
+    except Exception as e:
+        db.rollback()
+        logger.error(f"שגיאה בחישוב מחדש של קיבועי זכויות: {e}")
+        raise HTTPException(status_code=500, detail=f"שגיאה בחישוב מחדש: {str(e)}")
+
 @router.get("/test")
 async def test_cbs_api():
     """
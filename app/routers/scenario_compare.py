@@ -2,7 +2,7 @@ from fastapi import APIRouter, Depends, HTTPException, Query, status
 from fastapi.responses import JSONResponse
 from sqlalchemy.orm import Session
 from typing import Any, Dict
-from app.database import get_db
+from app.database import get_read_db
 from app.schemas.compare import ScenarioCompareRequest
 from app.services.compare_service import compare_scenarios
 
@@ -16,7 +16,7 @@ router = APIRouter(
 def compare_scenarios_endpoint(
     client_id: int,
     body: ScenarioCompareRequest,
-    db: Session = Depends(get_db)
+    db: Session = Depends(get_read_db)
 ):
     """
     משווה מספר תרחישים עבור לקוח נתון ומחזיר תזרים חודשי וטוטלים שנתיים.
@@ -8,7 +8,7 @@ from typing import Optional
 from fastapi import APIRouter, Depends, HTTPException, Path, status
 from sqlalchemy.orm import Session
 
-from app.database import get_db
+from app.database import get_db, get_read_db
 from app.models.client import Client
 from app.models.scenario import Scenario
 from app.models.pension_fund import PensionFund
@@ -25,6 +25,7 @@ from app.routers.rights_fixation import (
 from app.services.retirement.services.commutation_exemption_service import (
     CommutationExemptionService,
 )
+from app.services.pension_portfolio.store import get_portfolio
 from ..schemas import RetirementScenariosRequest
 
 logger = logging.getLogger(__name__)
@@ -32,6 +33,23 @@ logger = logging.getLogger(__name__)
 router = APIRouter()
 
 
+def _load_saved_pension_portfolio(
+    db: Session,
+    client_id: int,
+    portfolio_id: int,
+    include_current_employer_termination: bool,
+) -> Optional[list]:
+    """חשבונות תיק פנסיוני שמור, כפי שהיו נשלחים מהממשק (None אם לא נמצא)"""
+    portfolio = get_portfolio(db, client_id, portfolio_id)
+    if portfolio is None:
+        return None
+    accounts = portfolio.accounts or []
+    if not include_current_employer_termination:
+        # כמו בממשק: ללא עזיבת המעסיק הנוכחי פיצויי המעסיק הנוכחי אינם נכללים
+        accounts = [{**account, "פיצויים_מעסיק_נוכחי": 0} for account in accounts]
+    return accounts
+
+
 @router.post("/{client_id}/retirement-scenarios")
 def generate_retirement_scenarios(
     request: RetirementScenariosRequest,
@@ -70,13 +88,27 @@ def generate_retirement_scenarios(
             detail="לא ניתן להפיק תרחיש לגיל עבר. ניתן להפיק תרחישים רק לגיל נוכחי או עתידי."
         )
     
+    pension_portfolio = request.pension_portfolio
+    if pension_portfolio is None and request.pension_portfolio_id is not None:
+        pension_portfolio = _load_saved_pension_portfolio(
+            db,
+            client_id,
+            request.pension_portfolio_id,
+            request.include_current_employer_termination or False,
+        )
+        if pension_portfolio is None:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail=f"תיק פנסיוני {request.pension_portfolio_id} לא נמצא"
+            )
+
     try:
         # Build all scenarios
         builder = RetirementScenariosBuilder(
             db,
             client_id,
             retirement_age,
-            request.pension_portfolio,
+            pension_portfolio,
             request.include_current_employer_termination or False,
         )
         scenarios = builder.build_all_scenarios()
@@ -99,6 +131,7 @@ def generate_retirement_scenarios(
                     "retirement_age": retirement_age,
                     "scenario_type": scenario_key,
                     "pension_portfolio": request.pension_portfolio,  # שמירת נתוני תיק פנסיוני
+                    "pension_portfolio_id": request.pension_portfolio_id,  # או הפניה לתיק שמור
                     "include_current_employer_termination": request.include_current_employer_termination or False,
                 }),
                 summary_results=json.dumps(scenario_data),
@@ -138,7 +171,7 @@ def generate_retirement_scenarios(
 def get_saved_retirement_scenarios(
     client_id: int = Path(..., description="Client ID"),
     retirement_age: Optional[int] = None,
-    db: Session = Depends(get_db)
+    db: Session = Depends(get_read_db)
 ):
     """
     שולף תרחישי פרישה שמורים עבור לקוח.
@@ -345,6 +378,10 @@ def execute_retirement_scenario(
         
         # קריאת נתוני תיק פנסיוני מהפרמטרים השמורים
         pension_portfolio_data = params.get("pension_portfolio")
+        if not pension_portfolio_data and params.get("pension_portfolio_id") is not None:
+            pension_portfolio_data = _load_saved_pension_portfolio(
+                db, client_id, params["pension_portfolio_id"], include_current_employer_termination
+            )
         
         if not pension_portfolio_data:
             logger.warning("  ⚠️ No pension portfolio data found in saved scenario")
@@ -5,7 +5,7 @@ from typing import List
 from fastapi import APIRouter, Depends, Path, status
 from sqlalchemy.orm import Session
 
-from app.database import get_db
+from app.database import get_db, get_read_db
 from .schemas import ScenarioCreate, ScenarioUpdate, ScenarioResponse
 from .crud import (
     create_scenario_with_cashflow,
@@ -40,7 +40,7 @@ def create_scenario(
 @router.get("/{client_id}/scenarios", response_model=List[ScenarioResponse])
 def get_client_scenarios(
     client_id: int = Path(..., description="Client ID"),
-    db: Session = Depends(get_db)
+    db: Session = Depends(get_read_db)
 ):
     """Get all scenarios for a client"""
     return get_scenarios_by_client(db, client_id)
@@ -50,7 +50,7 @@ def get_client_scenarios(
 def get_scenario(
     client_id: int = Path(..., description="Client ID"),
     scenario_id: int = Path(..., description="Scenario ID"),
-    db: Session = Depends(get_db)
+    db: Session = Depends(get_read_db)
 ):
     """Get specific scenario"""
     return get_scenario_by_id(db, client_id, scenario_id)
@@ -81,7 +81,7 @@ def delete_scenario(
 def get_cashflow(
     client_id: int = Path(..., description="Client ID"),
     scenario_id: int = Path(..., description="Scenario ID"),
-    db: Session = Depends(get_db)
+    db: Session = Depends(get_read_db)
 ):
     """Get cashflow data for a specific scenario"""
     return get_scenario_cashflow(db, client_id, scenario_id)
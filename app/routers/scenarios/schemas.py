@@ -58,6 +58,10 @@ class RetirementScenariosRequest(BaseModel):
     """Request schema for retirement scenarios"""
     retirement_age: int = Field(..., ge=50, le=80, description="גיל פרישה מבוקש")
     pension_portfolio: Optional[List[dict]] = Field(default=None, description="נתוני תיק פנסיוני (אופציונלי)")
+    pension_portfolio_id: Optional[int] = Field(
+        default=None,
+        description="מזהה תיק פנסיוני שמור - במקום לשלוח את נתוני התיק (אופציונלי)",
+    )
     include_current_employer_termination: Optional[bool] = Field(
         default=False,
         description="האם לכלול סיום עבודה מהמעסיק הנוכחי בתרחישים",
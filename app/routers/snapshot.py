@@ -4,11 +4,11 @@ System Snapshot API Endpoints
 """
 from fastapi import APIRouter, Depends, HTTPException, Path, Body
 from sqlalchemy.orm import Session
-from typing import Dict
+from typing import Dict, List, Optional
 import logging
 
 from app.database import get_db
-from app.services.snapshot_service import SnapshotService
+from app.services.snapshot_service import SnapshotNotFoundError, SnapshotService
 
 router = APIRouter(prefix="/api/v1/clients", tags=["snapshots"])
 logger = logging.getLogger(__name__)
@@ -18,10 +18,14 @@ logger = logging.getLogger(__name__)
 def save_system_snapshot(
     client_id: int = Path(..., description="Client ID"),
     snapshot_name: str = Body(None, embed=True, description="שם אופציונלי ל-snapshot"),
+    pension_portfolio: Optional[List] = Body(None, embed=True, description="תיק פנסיוני מצד הלקוח"),
+    converted_accounts: Optional[List] = Body(None, embed=True, description="חשבונות שהומרו מצד הלקוח"),
     db: Session = Depends(get_db)
 ):
     """
-    💾 שמירת snapshot מלא של מצב הלקוח
+    💾 שמירת snapshot מלא של מצב הלקוח בצד השרת
+    
+    ה-snapshot נשמר דחוס עם היסטוריה ללקוח; מוחזר מזהה snapshot לשחזור.
     
     שומר:
     - קצבאות (Pension Funds)
@@ -36,7 +40,14 @@ def save_system_snapshot(
     
     try:
         service = SnapshotService(db)
-        result = service.save_snapshot(client_id, snapshot_name)
+        result = service.save_snapshot(
+            client_id,
+            snapshot_name,
+            client_side_data={
+                "pension_portfolio": pension_portfolio,
+                "converted_accounts": converted_accounts,
+            },
+        )
         
         logger.info(f"✅ Snapshot saved: {result['total_items']} items")
         
@@ -52,7 +63,7 @@ def save_system_snapshot(
 
 @router.post("/{client_id}/snapshot/restore")
 def restore_system_snapshot(
-    snapshot_data: Dict = Body(..., description="נתוני snapshot לשחזור"),
+    snapshot_data: Dict = Body(..., description='{"snapshot_id": ...} של snapshot שמור, או נתוני snapshot מלאים (תאימות לאחור)'),
     client_id: int = Path(..., description="Client ID"),
     db: Session = Depends(get_db)
 ):
@@ -69,12 +80,17 @@ def restore_system_snapshot(
     
     try:
         service = SnapshotService(db)
-        result = service.restore_snapshot(client_id, snapshot_data)
+        if snapshot_data.get("snapshot_id") is not None:
+            result = service.restore_snapshot_by_id(client_id, int(snapshot_data["snapshot_id"]))
+        else:
+            result = service.restore_snapshot(client_id, snapshot_data)
         
         logger.info(f"✅ Snapshot restored: deleted {result['deleted_count']}, restored {result['restored_count']}")
         
         return result
         
+    except SnapshotNotFoundError as e:
+        raise HTTPException(status_code=404, detail=str(e))
     except ValueError as e:
         logger.error(f"❌ Validation error: {e}")
         raise HTTPException(status_code=422, detail=str(e))
@@ -99,8 +115,8 @@ def get_snapshot_info(
     try:
         service = SnapshotService(db)
         
-        # קריאת snapshot זמני כדי לקבל סטטיסטיקה
-        snapshot = service.save_snapshot(client_id, "temp")
+        # איסוף snapshot זמני (ללא שמירה) כדי לקבל סטטיסטיקה
+        snapshot = service.collect_snapshot(client_id, "temp")
         
         return {
             "client_id": client_id,
@@ -121,3 +137,30 @@ def get_snapshot_info(
     except Exception as e:
         logger.error(f"❌ Failed to get snapshot info: {e}")
         raise HTTPException(status_code=500, detail=f"שגיאה בקבלת מידע: {str(e)}")
+
+
+@router.get("/{client_id}/snapshots")
+def list_system_snapshots(
+    client_id: int = Path(..., description="Client ID"),
+    db: Session = Depends(get_db)
+):
+    """
+    📚 היסטוריית ה-snapshots השמורים של הלקוח
+    """
+    service = SnapshotService(db)
+    return {"client_id": client_id, "snapshots": service.list_snapshots(client_id)}
+
+
+@router.get("/{client_id}/snapshots/{snapshot_id}")
+def get_system_snapshot(
+    client_id: int = Path(..., description="Client ID"),
+    snapshot_id: int = Path(..., description="Snapshot ID"),
+    db: Session = Depends(get_db)
+):
+    """
+    📄 נתוני snapshot שמור במלואם
+    """
+    try:
+        return SnapshotService(db).load_snapshot(client_id, snapshot_id)
+    except ValueError as e:
+        raise HTTPException(status_code=404, detail=str(e))
@@ -6,7 +6,7 @@ from fastapi import APIRouter, Depends
 from sqlalchemy.orm import Session
 from sqlalchemy import inspect, text
 from typing import Dict, Any
-from app.database import get_db
+from app.database import get_db, get_pool_metrics
 from app.core.system_validator import SystemValidator
 import logging
 
@@ -176,3 +176,18 @@ def get_table_info(table_name: str, db: Session = Depends(get_db)) -> Dict[str,
             "exists": False,
             "error": str(e)
         }
+
+
+@router.get("/db/pools")
+def get_db_pools() -> Dict[str, Any]:
+    """
+    ניצול מאגרי החיבורים לכל engine (ראשי ו-replica לקריאה אם מוגדר)
+    
+    Returns:
+        {
+            "primary": {"pool": str, "size": int, "checkedin": int, "checkedout": int, "overflow": int},
+            "read": {...} | None,
+            "read_routing": {"healthy": bool, "last_lag_seconds": float, "replica_reads": int, "fallback_reads": int} | None
+        }
+    """
+    return get_pool_metrics()
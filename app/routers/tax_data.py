@@ -192,6 +192,16 @@ def update_tax_data_cache():
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Error updating tax data cache: {str(e)}")
 
+@router.get("/cache-stats")
+def get_tax_data_cache_stats():
+    """
+    Get tax data cache metrics (hits, misses, stale hits and age of each entry)
+    """
+    try:
+        return TaxDataService.get_cache_stats()
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Error fetching tax data cache stats: {str(e)}")
+
 @router.get("/summary")
 def get_tax_data_summary(year: Optional[int] = Query(None, description="Year (default: current year)")):
     """
@@ -176,7 +176,8 @@ class ClientResponse(ClientBase):
 class ClientList(BaseModel):
     """Schema for list of clients"""
     items: List[ClientResponse]
-    total: int
+    total: Optional[int] = None
     page: int
     page_size: int
+    next_cursor: Optional[str] = None
 
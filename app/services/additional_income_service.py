@@ -12,6 +12,7 @@ from app.models.additional_income import AdditionalIncome, PaymentFrequency, Ind
 from app.models.client import Client
 from app.providers.tax_params import TaxParamsProvider, InMemoryTaxParamsProvider
 from app.schemas.additional_income import AdditionalIncomeCashflowItem
+from app.services.client_aggregate import ClientAggregate, get_client_aggregate
 from app.services.tax_calculator import TaxCalculator
 
 logger = logging.getLogger(__name__)
@@ -219,18 +220,24 @@ class AdditionalIncomeService:
         client_id: int,
         start_date: date,
         end_date: date,
-        reference_date: Optional[date] = None
+        reference_date: Optional[date] = None,
+        aggregate: Optional[ClientAggregate] = None
     ) -> List[Dict[str, Any]]:
-        """Generate combined cashflow for all client's additional incomes."""
+        """Generate combined cashflow for all client's additional incomes.
+
+        The client and its incomes come from ``aggregate`` (default: the
+        request's shared client aggregate).
+        """
         logger.debug(f"Generating combined additional income cashflow for client {client_id}")
         
-        # Get all additional incomes for the client
-        incomes = db_session.query(AdditionalIncome).filter(
-            AdditionalIncome.client_id == client_id
-        ).all()
+        aggregate = aggregate or get_client_aggregate(db_session, client_id)
+        if aggregate is None:
+            logger.debug("Client not found")
+            return []
         
-        # Get client details for age calculation
-        client = db_session.query(Client).filter(Client.id == client_id).first()
+        # Client details are used for age calculation
+        incomes = aggregate.additional_incomes
+        client = aggregate.client
         
         if not incomes:
             logger.debug("No additional incomes found for client")
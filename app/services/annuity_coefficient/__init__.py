@@ -3,11 +3,12 @@
 Updated: 2025-11-04
 """
 from datetime import date, datetime
-from typing import Optional, Dict, Any
+from typing import Optional, Dict, Any, List
 import logging
 from .utils import normalize_gender, is_pension_fund
 from .pension_fund import get_pension_fund_coefficient
 from .insurance import get_insurance_coefficient
+from .index import coefficient_index
 
 logger = logging.getLogger(__name__)
 # Force reload: 2025-11-04 15:35
@@ -64,7 +65,7 @@ def get_annuity_coefficient(
         if (pension_start_date.month, pension_start_date.day) < (birth_date.month, birth_date.day):
             age_years -= 1
         actual_age = age_years
-        logger.info(
+        logger.debug(
             f"[מקדם קצבה] גיל מחושב: {actual_age} "
             f"(לידה: {birth_date}, תחילת קצבה: {pension_start_date})"
         )
@@ -75,8 +76,8 @@ def get_annuity_coefficient(
     
     # בדיקה אם זו קרן פנסיה
     if is_pension_fund(product_type):
-        logger.info(
-            f"🔵 [DEBUG] Product is pension fund, calling get_pension_fund_coefficient "
+        logger.debug(
+            f"Product is pension fund, calling get_pension_fund_coefficient "
             f"with survivors_option='{survivors_option or 'תקנוני'}'"
         )
         return get_pension_fund_coefficient(
@@ -97,4 +98,36 @@ def get_annuity_coefficient(
     )
 
 
-__all__ = ['get_annuity_coefficient']
+def get_annuity_coefficients(items: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """
+    מחשב מקדמי קצבה לרשימת בקשות (קרנות פנסיה וביטוח מנהלים יחד) מתוך האינדקס המשותף
+    
+    Args:
+        items: רשימת מילונים עם הפרמטרים של get_annuity_coefficient
+    
+    Returns:
+        רשימת תוצאות באותו סדר; פריט שנכשל מחזיר מילון עם error
+    """
+    coefficient_index.ensure_loaded()
+    
+    results = []
+    for item in items:
+        try:
+            results.append(get_annuity_coefficient(**item))
+        except Exception as e:
+            logger.error(f"[מקדם קצבה] שגיאה בחישוב מקדם לפריט {item}: {e}")
+            results.append({'error': str(e)})
+    return results
+
+
+def reload_coefficient_index() -> None:
+    """טעינה מחדש של אינדקס המקדמים (אחרי ייבוא טבלאות)"""
+    coefficient_index.reload()
+
+
+__all__ = [
+    'get_annuity_coefficient',
+    'get_annuity_coefficients',
+    'coefficient_index',
+    'reload_coefficient_index'
+]
@@ -48,6 +48,13 @@ def get_company_specific_coefficient(
         'age': age
     }).fetchone()
     
+    return format_company_coefficient(result, company_name, option_name, sex, age, target_year)
+
+
+def format_company_coefficient(
+    result, company_name: str, option_name: str, sex: str, age: int, target_year: int
+) -> Optional[dict]:
+    """בונה תוצאת מקדם חברה משורה (base_coefficient, annual_increment_rate, base_year, notes)"""
     if result:
         base_coef = result[0]
         annual_rate = result[1]
@@ -57,7 +64,7 @@ def get_company_specific_coefficient(
         # חישוב מקדם מותאם לשנת יעד
         factor = base_coef * (1 + annual_rate * (target_year - base_year))
         
-        logger.info(
+        logger.debug(
             f"[מקדם קצבה] חברה={company_name}, מסלול={option_name}, "
             f"מין={sex}, גיל={age}, שנה={target_year} → מקדם={factor:.2f}"
         )
@@ -81,8 +88,6 @@ def get_company_specific_coefficient(
 
 def get_generation_coefficient(db, generation_code: str, age: int, sex: str) -> dict:
     """שולף מקדם לפי דור פוליסה, גיל ומין"""
-    from .utils import get_default_coefficient
-    
     # בחירת עמודת המקדם לפי מין (sex כבר מנורמל ל-זכר/נקבה)
     coef_column = 'male_coefficient' if sex == 'זכר' else 'female_coefficient'
     
@@ -103,6 +108,13 @@ def get_generation_coefficient(db, generation_code: str, age: int, sex: str) ->
         'age': age
     }).fetchone()
     
+    return format_generation_coefficient(result, generation_code, age, sex)
+
+
+def format_generation_coefficient(result, generation_code: str, age: int, sex: str) -> dict:
+    """בונה תוצאת מקדם דור משורה (coefficient, guarantee_months, generation_label, notes)"""
+    from .utils import get_default_coefficient
+    
     if result:
         factor = result[0]
         guarantee = result[1]
@@ -116,7 +128,7 @@ def get_generation_coefficient(db, generation_code: str, age: int, sex: str) ->
             )
             return get_default_coefficient()
         
-        logger.info(
+        logger.debug(
             f"[מקדם קצבה] דור={generation_code} ({label}), גיל={age}, מין={sex} → מקדם={factor:.2f}"
         )
         
@@ -165,6 +177,11 @@ def get_pension_fund_coefficient_from_db(
         'spouse_age_diff': spouse_age_diff
     }).fetchone()
     
+    return format_pension_fund_row(result)
+
+
+def format_pension_fund_row(result) -> Optional[dict]:
+    """ממיר שורה (base_coefficient, adjust_percent, fund_name, notes) למקדם קרן פנסיה"""
     if result:
         base_coef = result[0]
         adjust_pct = result[1]
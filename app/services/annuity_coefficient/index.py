@@ -0,0 +1,245 @@
+"""
+אינדקס בזיכרון לטבלאות מקדמי הקצבה
+
+הטבלאות קטנות ולקריאה בלבד, ולכן נטענות פעם אחת למילונים לפי מפתחות החיפוש
+המדויקים. הטעינה מחדש מתבצעת רק כאשר גרסת הטבלאות משתנה - מספר שורות, id מקסימלי,
+updated_at מקסימלי (בטבלאות שיש להן עמודה כזו) וה-checksum שנשמר בטעינת קובץ ה-CSV -
+הבדיקה עצמה מתבצעת לכל היותר פעם ב-CHECK_INTERVAL_SECONDS.
+"""
+from datetime import date
+from typing import Any, Dict, Optional, Tuple
+import logging
+import os
+import threading
+import time
+
+from sqlalchemy import inspect, text
+
+from app.core.coefficient_loader import CHECKSUM_TABLE
+
+logger = logging.getLogger(__name__)
+
+CHECK_INTERVAL_SECONDS = float(os.getenv("ANNUITY_COEFFICIENT_CHECK_INTERVAL", "60"))
+
+INSURANCE_PRODUCT_TYPE = 'ביטוח מנהלים'
+
+COEFFICIENT_TABLES = (
+    'pension_fund_coefficient',
+    'product_to_generation_map',
+    'company_annuity_coefficient',
+    'policy_generation_coefficient',
+)
+
+# שאילתות הטעינה - ממוינות לפי id כדי לשמר את סדר העדיפות של השאילתות המקוריות
+_LOAD_QUERIES = {
+    'pension_fund_coefficient': """
+        SELECT sex, retirement_age, survivors_option, spouse_age_diff,
+               base_coefficient, adjust_percent, fund_name, notes
+        FROM pension_fund_coefficient
+        ORDER BY id
+    """,
+    'product_to_generation_map': """
+        SELECT rule_from_date, rule_to_date, generation_code
+        FROM product_to_generation_map
+        WHERE product_type = :product_type
+        ORDER BY id
+    """,
+    'company_annuity_coefficient': """
+        SELECT company_name, option_name, sex, age,
+               base_coefficient, annual_increment_rate, base_year, notes
+        FROM company_annuity_coefficient
+        ORDER BY id
+    """,
+    'policy_generation_coefficient': """
+        SELECT generation_code, age, male_coefficient, female_coefficient,
+               guarantee_months, generation_label, notes
+        FROM policy_generation_coefficient
+        ORDER BY id
+    """,
+}
+
+
+def _as_iso(value: Any) -> Optional[str]:
+    if value is None:
+        return None
+    if isinstance(value, date):
+        return value.isoformat()
+    return str(value)
+
+
+class TableUnavailableError(LookupError):
+    """טבלת מקדמים שלא ניתן היה לטעון"""
+
+
+class CoefficientIndex:
+    """אינדקס חיפוש O(1) למקדמי קצבה, עם טעינה מחדש בשינוי גרסת הטבלאות"""
+
+    def __init__(self, check_interval: float = CHECK_INTERVAL_SECONDS):
+        self.check_interval = check_interval
+        self._lock = threading.Lock()
+        self._version: Optional[Tuple] = None
+        self._has_updated_at: Dict[str, bool] = {}
+        self._checked_at = 0.0
+        self._loaded_at: Optional[float] = None
+        self._errors: Dict[str, str] = {}
+        self._pension: Dict[Tuple, Tuple] = {}
+        self._generation_ranges: list = []
+        self._generation_by_date: Dict[str, Optional[str]] = {}
+        self._company: Dict[Tuple, Tuple] = {}
+        self._generation: Dict[Tuple, Tuple] = {}
+
+    def _updated_at_column(self, db, table: str) -> bool:
+        if table not in self._has_updated_at:
+            try:
+                columns = inspect(db.get_bind()).get_columns(table)
+            except Exception:
+                return False
+            self._has_updated_at[table] = any(column['name'] == 'updated_at' for column in columns)
+        return self._has_updated_at[table]
+
+    def _table_version(self, db, table: str) -> Tuple:
+        # MAX(updated_at) תופס עדכונים במקום, שאינם משנים את מספר השורות או את ה-id המקסימלי
+        changed_at = ", MAX(updated_at)" if self._updated_at_column(db, table) else ""
+        try:
+            row = db.execute(text(f"SELECT COUNT(*), MAX(id){changed_at} FROM {table}")).fetchone()
+            return (table,) + tuple(row)
+        except Exception:
+            db.rollback()
+            return (table, None, None)
+
+    @staticmethod
+    def _loaded_checksums(db) -> Tuple:
+        """ה-checksum ומועד הטעינה של קבצי ה-CSV - טעינה מחדש של טבלה מחליפה את כל השורות"""
+        try:
+            rows = db.execute(text(
+                f"SELECT table_name, checksum, loaded_at FROM {CHECKSUM_TABLE} ORDER BY table_name"
+            )).fetchall()
+        except Exception:
+            db.rollback()
+            return ()
+        return tuple(tuple(row) for row in rows)
+
+    def _read_version(self, db) -> Tuple:
+        versions = tuple(self._table_version(db, table) for table in COEFFICIENT_TABLES)
+        return versions + (('checksums',) + self._loaded_checksums(db),)
+
+    def _load_table(self, db, table: str) -> list:
+        params = {'product_type': INSURANCE_PRODUCT_TYPE} if table == 'product_to_generation_map' else {}
+        return db.execute(text(_LOAD_QUERIES[table]), params).fetchall()
+
+    def _load(self, db, version: Tuple) -> None:
+        pension: Dict[Tuple, Tuple] = {}
+        generation_ranges: list = []
+        company: Dict[Tuple, Tuple] = {}
+        generation: Dict[Tuple, Tuple] = {}
+        errors: Dict[str, str] = {}
+
+        for table in COEFFICIENT_TABLES:
+            try:
+                rows = self._load_table(db, table)
+            except Exception as e:
+                db.rollback()
+                errors[table] = str(e)
+                logger.warning(f"[מקדם קצבה] טעינת הטבלה {table} לאינדקס נכשלה: {e}")
+                continue
+
+            if table == 'pension_fund_coefficient':
+                # השאילתה המקורית בוחרת את השורה עם ה-id הגבוה ביותר - השורה האחרונה גוברת
+                for row in rows:
+                    pension[(row[0], row[1], row[2], row[3])] = (row[4], row[5], row[6], row[7])
+            elif table == 'product_to_generation_map':
+                generation_ranges = [(_as_iso(row[0]), _as_iso(row[1]), row[2]) for row in rows]
+            elif table == 'company_annuity_coefficient':
+                for row in rows:
+                    company.setdefault((row[0], row[1], row[2], row[3]), (row[4], row[5], row[6], row[7]))
+            else:
+                for row in rows:
+                    generation.setdefault((row[0], row[1]), (row[2], row[3], row[4], row[5], row[6]))
+
+        self._pension = pension
+        self._generation_ranges = generation_ranges
+        self._generation_by_date = {}
+        self._company = company
+        self._generation = generation
+        self._errors = errors
+        self._version = version
+        self._loaded_at = time.time()
+        logger.info(
+            f"[מקדם קצבה] אינדקס מקדמים נטען: קרנות={len(pension)}, חברות={len(company)}, "
+            f"דורות={len(generation)}, מיפוי דורות={len(generation_ranges)}"
+        )
+
+    def ensure_loaded(self, force: bool = False) -> None:
+        """טוען את האינדקס אם טרם נטען או אם גרסת הטבלאות השתנתה"""
+        now = time.monotonic()
+        if not force and self._version is not None and now - self._checked_at < self.check_interval:
+            return
+
+        from app.database import SessionLocal
+
+        with self._lock:
+            if not force and self._version is not None and now - self._checked_at < self.check_interval:
+                return
+            with SessionLocal() as db:
+                version = self._read_version(db)
+                if force or version != self._version:
+                    self._load(db, version)
+            self._checked_at = time.monotonic()
+
+    def reload(self) -> None:
+        """טעינה מחדש מיידית (למשל אחרי ייבוא טבלאות)"""
+        self.ensure_loaded(force=True)
+
+    def _check_table(self, table: str) -> None:
+        if table in self._errors:
+            raise TableUnavailableError(f"{table}: {self._errors[table]}")
+
+    def pension_fund_row(
+        self, sex: str, retirement_age: int, survivors_option: str, spouse_age_diff: int
+    ) -> Optional[Tuple]:
+        self.ensure_loaded()
+        self._check_table('pension_fund_coefficient')
+        return self._pension.get((sex, retirement_age, survivors_option, spouse_age_diff))
+
+    def generation_code(self, start_date: date) -> Optional[str]:
+        self.ensure_loaded()
+        self._check_table('product_to_generation_map')
+        key = start_date.isoformat()
+        if key not in self._generation_by_date:
+            self._generation_by_date[key] = next(
+                (
+                    code for rule_from, rule_to, code in self._generation_ranges
+                    if rule_from is not None and rule_to is not None and rule_from <= key <= rule_to
+                ),
+                None
+            )
+        return self._generation_by_date[key]
+
+    def company_row(self, company_name: str, option_name: str, sex: str, age: int) -> Optional[Tuple]:
+        self.ensure_loaded()
+        self._check_table('company_annuity_coefficient')
+        return self._company.get((company_name, option_name, sex, age))
+
+    def generation_row(self, generation_code: str, age: int, sex: str) -> Optional[Tuple]:
+        """שורה בפורמט (coefficient, guarantee_months, generation_label, notes) לפי מין"""
+        self.ensure_loaded()
+        self._check_table('policy_generation_coefficient')
+        row = self._generation.get((generation_code, age))
+        if row is None:
+            return None
+        male_coefficient, female_coefficient, guarantee, label, notes = row
+        return (male_coefficient if sex == 'זכר' else female_coefficient, guarantee, label, notes)
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            'loaded_at': self._loaded_at,
+            'version': [list(item) for item in self._version] if self._version else None,
+            'pension_fund_coefficient': len(self._pension),
+            'product_to_generation_map': len(self._generation_ranges),
+            'company_annuity_coefficient': len(self._company),
+            'policy_generation_coefficient': len(self._generation),
+            'errors': dict(self._errors),
+        }
+
+
+coefficient_index = CoefficientIndex()
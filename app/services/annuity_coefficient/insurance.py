@@ -4,11 +4,10 @@
 from datetime import date
 from typing import Optional, Dict, Any
 import logging
-from app.database import get_db
+from .index import coefficient_index
 from .database import (
-    get_generation_code,
-    get_company_specific_coefficient,
-    get_generation_coefficient
+    format_company_coefficient,
+    format_generation_coefficient
 )
 from .utils import get_default_coefficient
 
@@ -24,13 +23,11 @@ def get_insurance_coefficient(
     target_year: int
 ) -> Dict[str, Any]:
     """
-    שולף מקדם קצבה לביטוח מנהלים
+    שולף מקדם קצבה לביטוח מנהלים (מהאינדקס בזיכרון)
     """
-    db = next(get_db())
-    
     try:
         # שלב 1: מציאת דור הפוליסה
-        generation_code = get_generation_code(db, start_date)
+        generation_code = coefficient_index.generation_code(start_date)
         
         if not generation_code:
             logger.warning(f"[מקדם קצבה] לא נמצא דור לתאריך {start_date}")
@@ -38,14 +35,18 @@ def get_insurance_coefficient(
         
         # שלב 2: ניסיון למצוא מקדם ספציפי לחברה
         if company_name and option_name:
-            company_coef = get_company_specific_coefficient(
-                db, company_name, option_name, sex, age, target_year
+            company_coef = format_company_coefficient(
+                coefficient_index.company_row(company_name, option_name, sex, age),
+                company_name, option_name, sex, age, target_year
             )
             if company_coef:
                 return company_coef
         
         # שלב 3: fallback למקדם דור (לפי גיל ומין)
-        return get_generation_coefficient(db, generation_code, age, sex)
+        return format_generation_coefficient(
+            coefficient_index.generation_row(generation_code, age, sex),
+            generation_code, age, sex
+        )
         
     except Exception as e:
         logger.error(f"[מקדם קצבה] שגיאה בשליפת מקדם ביטוח: {e}")
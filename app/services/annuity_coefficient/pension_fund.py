@@ -3,8 +3,8 @@
 """
 import logging
 from typing import Dict, Any
-from app.database import get_db
-from .database import get_pension_fund_coefficient_from_db
+from .index import coefficient_index
+from .database import format_pension_fund_row
 
 logger = logging.getLogger(__name__)
 
@@ -16,26 +16,23 @@ def get_pension_fund_coefficient(
     spouse_age_diff: int
 ) -> Dict[str, Any]:
     """
-    שולף מקדם קצבה לקרן פנסיה
+    שולף מקדם קצבה לקרן פנסיה (מהאינדקס בזיכרון)
     """
-    logger.info(
-        f"🔵 [DEBUG] get_pension_fund_coefficient called with: sex={sex}, "
+    logger.debug(
+        f"get_pension_fund_coefficient called with: sex={sex}, "
         f"retirement_age={retirement_age}, survivors_option={survivors_option}, "
         f"spouse_age_diff={spouse_age_diff}"
     )
-    db = next(get_db())
     
     try:
-        result = get_pension_fund_coefficient_from_db(
-            db, sex, retirement_age, survivors_option, spouse_age_diff
+        result = format_pension_fund_row(
+            coefficient_index.pension_fund_row(sex, retirement_age, survivors_option, spouse_age_diff)
         )
         
-        logger.info(f"🔵 [DEBUG] Query result: {result}")
-        
         if result:
             factor = result['factor']
             
-            logger.info(
+            logger.debug(
                 f"[מקדם קצבה] קרן פנסיה: מין={sex}, גיל={retirement_age}, "
                 f"שארים={survivors_option}, הפרש גיל={spouse_age_diff} → מקדם={factor:.2f}"
             )
@@ -51,9 +51,9 @@ def is_pension_fund(product_type: str) -> bool:
     
     # לוג מפורט לדיבאג
     if result:
-        logger.info(f"🔵 [DEBUG] is_pension_fund('{product_type}') = True → ישתמש בטבלת pension_fund_coefficient")
+        logger.debug(f"is_pension_fund('{product_type}') = True → ישתמש בטבלת pension_fund_coefficient")
     else:
-        logger.info(f"🔵 [DEBUG] is_pension_fund('{product_type}') = False → ישתמש בטבלת policy_generation_coefficient (ביטוח מנהלים)")
+        logger.debug(f"is_pension_fund('{product_type}') = False → ישתמש בטבלת policy_generation_coefficient (ביטוח מנהלים)")
     
     return result
 
@@ -10,6 +10,7 @@ from sqlalchemy.orm import Session
 from app.models.capital_asset import CapitalAsset
 from app.schemas.capital_asset import CapitalAssetCashflowItem
 from app.providers.tax_params import TaxParamsProvider, InMemoryTaxParamsProvider
+from app.services.client_aggregate import ClientAggregate, get_client_aggregate
 from app.services.capital_asset.indexation_calculator import IndexationCalculator
 from app.services.capital_asset.tax_calculator import TaxCalculator
 from app.services.capital_asset.payment_calculator import PaymentCalculator
@@ -128,7 +129,8 @@ class CapitalAssetService:
         client_id: int,
         start_date: date,
         end_date: date,
-        reference_date: Optional[date] = None
+        reference_date: Optional[date] = None,
+        aggregate: Optional[ClientAggregate] = None
     ) -> List[Dict[str, Any]]:
         """
         צור תזרים מזומנים משולב לכל נכסי ההון של הלקוח.
@@ -139,6 +141,7 @@ class CapitalAssetService:
             start_date: תאריך התחלה
             end_date: תאריך סיום
             reference_date: תאריך ייחוס
+            aggregate: נתוני הלקוח הטעונים (ברירת מחדל: האגרגט המשותף של הבקשה)
             
         Returns:
             רשימת פריטי תזרים מצטברים לפי תאריך
@@ -147,10 +150,9 @@ class CapitalAssetService:
             f"Generating combined capital asset cashflow for client {client_id}"
         )
         
-        # שלוף את כל נכסי ההון של הלקוח
-        assets = db_session.query(CapitalAsset).filter(
-            CapitalAsset.client_id == client_id
-        ).all()
+        # נכסי ההון של הלקוח מתוך האגרגט המשותף
+        aggregate = aggregate or get_client_aggregate(db_session, client_id)
+        assets = aggregate.capital_assets if aggregate else []
         
         if not assets:
             logger.debug("No capital assets found for client")
@@ -10,9 +10,16 @@ from app.models.client import Client
 from app.models.current_employment import CurrentEmployer
 from app.models.additional_income import AdditionalIncome
 from app.schemas.case import ClientCase, CaseDetectionResult
+from app.services.client_aggregate import ClientAggregate, get_client_aggregate
 from app.utils.calculation_log import log_calc
 
-def detect_case(db: Session, client_id: int, *, retirement_age: int = 67) -> CaseDetectionResult:
+def detect_case(
+    db: Session,
+    client_id: int,
+    *,
+    retirement_age: int = 67,
+    aggregate: Optional[ClientAggregate] = None,
+) -> CaseDetectionResult:
     """
     Detect client case based on specified rules
     
@@ -27,14 +34,16 @@ def detect_case(db: Session, client_id: int, *, retirement_age: int = 67) -> Cas
         db: Database session
         client_id: Client ID
         retirement_age: Retirement age threshold (default: 67)
+        aggregate: Loaded client aggregate (default: the request's shared aggregate)
         
     Returns:
         CaseDetectionResult with client_id, case_id, case_name, and reasons
     """
     # Get client data
-    client = db.query(Client).filter(Client.id == client_id).first()
-    if not client:
+    aggregate = aggregate or get_client_aggregate(db, client_id)
+    if not aggregate:
         raise ValueError(f"Client with ID {client_id} not found")
+    client = aggregate.client
     
     # Check if client's birth date is available
     if not client.birth_date:
@@ -53,14 +62,14 @@ def detect_case(db: Session, client_id: int, *, retirement_age: int = 67) -> Cas
         reasons.append(f"client_age_{age}_exceeds_retirement_age_{retirement_age}")
     else:
         # Check for current employer
-        current_employer = db.query(CurrentEmployer).filter(CurrentEmployer.client_id == client_id).first()
+        current_employer = aggregate.current_employer
         
         if not current_employer:
             # No current employer - check for business income (Case 2 vs Case 1)
-            business_income = db.query(AdditionalIncome).filter(
-                AdditionalIncome.client_id == client_id,
-                AdditionalIncome.source_type == "business"
-            ).first()
+            business_income = next(
+                (income for income in aggregate.additional_incomes if income.source_type == "business"),
+                None,
+            )
             
             if business_income:
                 case_id = ClientCase.SELF_EMPLOYED_ONLY
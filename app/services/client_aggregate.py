@@ -0,0 +1,147 @@
+"""
+Request-scoped client aggregate
+
+Loads a client together with its related collections (one SELECT per table via
+selectin loading) and caches it on the session, so every service that runs in
+the same request shares the same identity-mapped objects instead of issuing
+its own ``db.query(Client)`` and per-table queries.
+
+Each request gets its own session from ``get_db``, so caching on ``Session.info``
+makes the aggregate live exactly as long as the request.
+"""
+import logging
+from typing import Dict, List, Optional
+
+from sqlalchemy import event
+from sqlalchemy.orm import Session, selectinload
+
+from app.models.additional_income import AdditionalIncome
+from app.models.capital_asset import CapitalAsset
+from app.models.client import Client
+from app.models.current_employment import CurrentEmployer
+from app.models.fixation_result import FixationResult
+from app.models.grant import Grant
+from app.models.pension_fund import PensionFund
+
+logger = logging.getLogger(__name__)
+
+_SESSION_KEY = "client_aggregates"
+_STALE_KEY = "client_aggregates_stale"
+
+# Client relationship -> model it holds
+AGGREGATE_COLLECTIONS = {
+    "pension_funds": PensionFund,
+    "capital_assets": CapitalAsset,
+    "additional_incomes": AdditionalIncome,
+    "current_employers": CurrentEmployer,
+    "fixation_results": FixationResult,
+    "grants": Grant,
+}
+_AGGREGATE_MODELS = tuple(AGGREGATE_COLLECTIONS.values())
+
+
+class ClientAggregate:
+    """A client with all of its related rows, loaded once per request"""
+
+    def __init__(self, db: Session, client: Client):
+        self.db = db
+        self.client = client
+
+    @property
+    def client_id(self) -> int:
+        return self.client.id
+
+    @property
+    def pension_funds(self) -> List[PensionFund]:
+        return self.client.pension_funds
+
+    @property
+    def capital_assets(self) -> List[CapitalAsset]:
+        return self.client.capital_assets
+
+    @property
+    def additional_incomes(self) -> List[AdditionalIncome]:
+        return self.client.additional_incomes
+
+    @property
+    def grants(self) -> List[Grant]:
+        return self.client.grants
+
+    @property
+    def current_employer(self) -> Optional[CurrentEmployer]:
+        employers = self.client.current_employers
+        return employers[0] if employers else None
+
+    @property
+    def latest_fixation(self) -> Optional[FixationResult]:
+        """The most recent fixation result (by created_at), if any"""
+        fixations = [f for f in self.client.fixation_results if f.created_at is not None]
+        if fixations:
+            return max(fixations, key=lambda f: f.created_at)
+        return self.client.fixation_results[0] if self.client.fixation_results else None
+
+    def refresh(self) -> "ClientAggregate":
+        """Reload the collections on next access, e.g. after bulk writes that bypass the session.
+
+        Only the collections are expired, so unflushed changes on loaded rows are kept.
+        """
+        if self.client in self.db:
+            self.db.expire(self.client, list(AGGREGATE_COLLECTIONS))
+        return self
+
+
+def load_client_aggregate(db: Session, client_id: int) -> Optional[ClientAggregate]:
+    """Load a fresh aggregate (not cached). Returns None if the client does not exist."""
+    client = db.query(Client).options(
+        *(selectinload(getattr(Client, name)) for name in AGGREGATE_COLLECTIONS)
+    ).filter(Client.id == client_id).first()
+    if client is None:
+        return None
+    return ClientAggregate(db, client)
+
+
+def get_client_aggregate(db: Session, client_id: int) -> Optional[ClientAggregate]:
+    """Return the session's aggregate for the client, loading it on first use.
+
+    Returns None if the client does not exist.
+    """
+    aggregates: Dict[int, ClientAggregate] = db.info.setdefault(_SESSION_KEY, {})
+    aggregate = aggregates.get(client_id)
+    if aggregate is not None and aggregate.client in db:
+        return aggregate
+
+    aggregate = load_client_aggregate(db, client_id)
+    if aggregate is None:
+        aggregates.pop(client_id, None)
+        return None
+    aggregates[client_id] = aggregate
+    return aggregate
+
+
+def invalidate_client_aggregate(db: Session, client_id: Optional[int] = None) -> None:
+    """Expire cached collections after writes the session does not track (bulk insert/delete).
+
+    With no client_id every aggregate cached on the session is expired.
+    """
+    aggregates: Dict[int, ClientAggregate] = db.info.get(_SESSION_KEY) or {}
+    targets = aggregates.values() if client_id is None else filter(None, [aggregates.get(client_id)])
+    for aggregate in targets:
+        aggregate.refresh()
+
+
+@event.listens_for(Session, "after_flush")
+def _mark_aggregates_stale(session, flush_context):
+    """Flushed changes to related rows make the loaded collections stale"""
+    if not session.info.get(_SESSION_KEY):
+        return
+    for obj in (*session.new, *session.dirty, *session.deleted):
+        if isinstance(obj, _AGGREGATE_MODELS):
+            session.info[_STALE_KEY] = True
+            return
+
+
+@event.listens_for(Session, "after_flush_postexec")
+def _expire_stale_aggregates(session, flush_context):
+    if session.info.pop(_STALE_KEY, False):
+        # Collections reload lazily on next access
+        invalidate_client_aggregate(session)
@@ -0,0 +1,264 @@
+"""
+Client search backed by a text index, with keyset (cursor) pagination
+
+Name and ID number search use a trigram index so substring matches don't scan
+the client table: an FTS5 ``trigram`` table on SQLite, ``pg_trgm`` GIN indexes on
+Postgres. Numeric terms match ID numbers: exactly for a full (or
+zero-padding-less) ID, by prefix through the ``id_number`` index and by
+substring through the trigram index for partial numbers.
+
+If the index can't be created (e.g. an SQLite build without the trigram
+tokenizer) substring search falls back to ``ILIKE``.
+"""
+import base64
+import json
+import logging
+import re
+from dataclasses import dataclass
+from typing import Any, Dict, List, Optional, Tuple
+
+from sqlalchemy import and_, column, or_, text
+from sqlalchemy.orm import Session
+
+from app.models.client import Client
+from app.services.client_service import normalize_id_number
+
+logger = logging.getLogger(__name__)
+
+CLIENT_SEARCH_TABLE = "client_search"
+# Trigram indexes can only match terms of at least three characters
+MIN_INDEXED_TERM_LENGTH = 3
+# Partial ID numbers of this length or more also match a zero-padded full ID
+MIN_UNPADDED_ID_LENGTH = 7
+ID_NUMBER_LENGTH = 9
+
+_SQLITE_SEARCH_DDL = [
+    f"DROP TABLE IF EXISTS {CLIENT_SEARCH_TABLE}",
+    f"CREATE VIRTUAL TABLE {CLIENT_SEARCH_TABLE} USING fts5("
+    f"full_name, id_number, content='client', content_rowid='id', tokenize='trigram')",
+    f"CREATE TRIGGER {CLIENT_SEARCH_TABLE}_ai AFTER INSERT ON client BEGIN "
+    f"INSERT INTO {CLIENT_SEARCH_TABLE}(rowid, full_name, id_number) "
+    f"VALUES (new.id, new.full_name, new.id_number); END",
+    f"CREATE TRIGGER {CLIENT_SEARCH_TABLE}_ad AFTER DELETE ON client BEGIN "
+    f"INSERT INTO {CLIENT_SEARCH_TABLE}({CLIENT_SEARCH_TABLE}, rowid, full_name, id_number) "
+    f"VALUES ('delete', old.id, old.full_name, old.id_number); END",
+    f"CREATE TRIGGER {CLIENT_SEARCH_TABLE}_au AFTER UPDATE OF full_name, id_number ON client BEGIN "
+    f"INSERT INTO {CLIENT_SEARCH_TABLE}({CLIENT_SEARCH_TABLE}, rowid, full_name, id_number) "
+    f"VALUES ('delete', old.id, old.full_name, old.id_number); "
+    f"INSERT INTO {CLIENT_SEARCH_TABLE}(rowid, full_name, id_number) "
+    f"VALUES (new.id, new.full_name, new.id_number); END",
+    f"INSERT INTO {CLIENT_SEARCH_TABLE}({CLIENT_SEARCH_TABLE}) VALUES ('rebuild')",
+]
+
+_POSTGRES_SEARCH_DDL = [
+    "CREATE EXTENSION IF NOT EXISTS pg_trgm",
+    "CREATE INDEX IF NOT EXISTS ix_client_full_name_trgm ON client USING gin (full_name gin_trgm_ops)",
+    "CREATE INDEX IF NOT EXISTS ix_client_id_number_trgm ON client USING gin (id_number gin_trgm_ops)",
+]
+
+
+_SQLITE_SEARCH_CLEANUP = [
+    f"DROP TRIGGER IF EXISTS {CLIENT_SEARCH_TABLE}_ai",
+    f"DROP TRIGGER IF EXISTS {CLIENT_SEARCH_TABLE}_ad",
+    f"DROP TRIGGER IF EXISTS {CLIENT_SEARCH_TABLE}_au",
+    f"DROP TABLE IF EXISTS {CLIENT_SEARCH_TABLE}",
+]
+
+# Database URL -> whether the SQLite FTS5 index is usable
+_sqlite_index_available: Dict[str, bool] = {}
+
+
+def _index_key(bind) -> str:
+    return str(bind.engine.url)
+
+
+def _sqlite_index_current(connection) -> bool:
+    """Whether the FTS5 table and its triggers exist with the current columns"""
+    trigger_sql = connection.execute(
+        text("SELECT sql FROM sqlite_master WHERE type = 'trigger' AND name = :name"),
+        {"name": f"{CLIENT_SEARCH_TABLE}_ai"},
+    ).scalar()
+    # Indexes created before id_number was indexed only have full_name
+    return trigger_sql is not None and "id_number" in trigger_sql
+
+
+def sqlite_search_index_available(db: Session) -> bool:
+    """Whether search can use the FTS5 table (checked once per database)"""
+    key = _index_key(db.get_bind())
+    if key not in _sqlite_index_available:
+        _sqlite_index_available[key] = _sqlite_index_current(db)
+    return _sqlite_index_available[key]
+
+
+def ensure_client_search_index(connection) -> bool:
+    """Create the client search index for the connection's dialect if it is missing.
+
+    On SQLite the FTS5 table is kept in sync by triggers on ``client``; when the
+    triggers are missing (new database, or the client table was recreated) or
+    predate the ``id_number`` column, the index is rebuilt from the table.
+    Returns whether the index is available; failures are logged, not raised,
+    and substring search then falls back to ``ILIKE``.
+    """
+    dialect = connection.dialect.name
+    if dialect == "sqlite":
+        key = _index_key(connection)
+        if _sqlite_index_current(connection):
+            _sqlite_index_available[key] = True
+            return True
+        try:
+            for statement in _SQLITE_SEARCH_CLEANUP + _SQLITE_SEARCH_DDL:
+                connection.execute(text(statement))
+        except Exception as e:
+            # Don't leave triggers that write into a missing table
+            for statement in _SQLITE_SEARCH_CLEANUP:
+                connection.execute(text(statement))
+            logger.warning(f"Client search index not created, search uses ILIKE: {e}")
+            _sqlite_index_available[key] = False
+            return False
+        _sqlite_index_available[key] = True
+        logger.info("Created client search index (FTS5 trigram)")
+        return True
+    elif dialect == "postgresql":
+        try:
+            with connection.begin_nested():
+                for statement in _POSTGRES_SEARCH_DDL:
+                    connection.execute(text(statement))
+        except Exception as e:
+            # pg_trgm needs CREATE privileges; search still works, just without the index
+            logger.warning(f"Client trigram index not created: {e}")
+            return False
+    return True
+
+
+@dataclass
+class ClientSearchPage:
+    """One page of client search results"""
+    items: List[Client]
+    next_cursor: Optional[str]
+    total: Optional[int]
+
+
+def encode_cursor(values: Tuple[Any, ...]) -> str:
+    return base64.urlsafe_b64encode(json.dumps(list(values), ensure_ascii=False).encode("utf-8")).decode("ascii")
+
+
+def decode_cursor(cursor: str) -> List[Any]:
+    try:
+        values = json.loads(base64.urlsafe_b64decode(cursor.encode("ascii")))
+    except (ValueError, UnicodeError) as e:
+        raise ValueError("Invalid cursor") from e
+    if not isinstance(values, list) or not values or not isinstance(values[-1], int):
+        raise ValueError("Invalid cursor")
+    return values
+
+
+def _substring_filter(db: Session, column_name: str, term: str):
+    """``column ILIKE '%term%'``, served by the trigram index where there is one"""
+    bind = db.get_bind()
+    if (
+        bind.dialect.name == "sqlite"
+        and len(term) >= MIN_INDEXED_TERM_LENGTH
+        and sqlite_search_index_available(db)
+    ):
+        match_query = f'{column_name} : "' + term.replace('"', '""') + '"'
+        matching_ids = text(
+            f"SELECT rowid FROM {CLIENT_SEARCH_TABLE} WHERE {CLIENT_SEARCH_TABLE} MATCH :match_query"
+        ).bindparams(match_query=match_query).columns(column("rowid"))
+        return Client.id.in_(matching_ids)
+    # On Postgres ILIKE is served by the pg_trgm GIN index; on SQLite without the index it scans
+    return getattr(Client, column_name).ilike(f"%{term}%")
+
+
+def _id_number_filter(db: Session, digits: str):
+    """Exact match for a full ID number, prefix/substring match for a partial one.
+
+    IDs are stored zero-padded to 9 digits, so 7-8 digit terms (an ID typed
+    without its leading zeros) also match the padded ID exactly. Prefixes are a
+    range scan on the ``id_number`` index; substrings of 3+ digits go through the
+    trigram index.
+
+    Raises:
+        ValueError: if the term is longer than an ID number (extra leading zeros aside)
+    """
+    if len(digits) > ID_NUMBER_LENGTH:
+        if digits[:-ID_NUMBER_LENGTH].strip("0"):
+            raise ValueError(f"ID number search term has more than {ID_NUMBER_LENGTH} digits")
+        digits = digits[-ID_NUMBER_LENGTH:]
+    if len(digits) == ID_NUMBER_LENGTH:
+        return Client.id_number == digits
+
+    # Same as LIKE 'digits%' (IDs are digits only, and ':' sorts right after '9'),
+    # but usable as an index range on every backend regardless of LIKE collation
+    upper_bound = digits[:-1] + chr(ord(digits[-1]) + 1)
+    conditions = [and_(Client.id_number >= digits, Client.id_number < upper_bound)]
+    if len(digits) >= MIN_UNPADDED_ID_LENGTH:
+        conditions.append(Client.id_number == normalize_id_number(digits))
+    if len(digits) >= MIN_INDEXED_TERM_LENGTH:
+        conditions.append(_substring_filter(db, "id_number", digits))
+    return or_(*conditions)
+
+
+def search_clients(
+    db: Session,
+    search: Optional[str] = None,
+    is_active: Optional[bool] = None,
+    gender: Optional[str] = None,
+    sort: Optional[str] = None,
+    limit: int = 10,
+    skip: int = 0,
+    cursor: Optional[str] = None,
+    include_total: bool = True,
+) -> ClientSearchPage:
+    """Search and page through clients.
+
+    With ``cursor`` the page starts after the last row of the previous page
+    (keyset pagination, ``skip`` is ignored); ``next_cursor`` is None on the last
+    page. ``include_total=False`` skips the COUNT query.
+
+    Numeric terms shorter than three digits only match ID prefixes.
+
+    Raises:
+        ValueError: if the cursor is malformed or a numeric term is longer than an ID number
+    """
+    query = db.query(Client)
+
+    if is_active is not None:
+        query = query.filter(Client.is_active == is_active)
+    if gender is not None:
+        query = query.filter(Client.gender == gender)
+    if search and search.strip():
+        term = search.strip()
+        digits = re.sub(r"[\s-]", "", term)
+        if digits.isdigit():
+            query = query.filter(_id_number_filter(db, digits))
+        else:
+            query = query.filter(_substring_filter(db, "full_name", term))
+
+    total = query.order_by(None).count() if include_total else None
+
+    by_name = sort == "full_name"
+    if cursor:
+        values = decode_cursor(cursor)
+        if by_name:
+            if len(values) != 2:
+                raise ValueError("Invalid cursor")
+            last_name, last_id = values
+            query = query.filter(or_(
+                Client.full_name > last_name,
+                and_(Client.full_name == last_name, Client.id > last_id),
+            ))
+        else:
+            query = query.filter(Client.id > values[-1])
+
+    query = query.order_by(Client.full_name.asc(), Client.id.asc()) if by_name else query.order_by(Client.id.asc())
+    if skip and not cursor:
+        query = query.offset(skip)
+
+    rows = query.limit(limit + 1).all()
+    items = rows[:limit]
+    next_cursor = None
+    if len(rows) > limit:
+        last = items[-1]
+        next_cursor = encode_cursor((last.full_name, last.id) if by_name else (last.id,))
+
+    return ClientSearchPage(items=items, next_cursor=next_cursor, total=total)
@@ -21,6 +21,7 @@ from typing import Optional
 # ייבוא מהמודול המודולרי החדש
 from app.services.documents import (
     generate_document_package,
+    generate_document_package_zip,
     fill_161d_form,
     generate_grants_appendix,
     generate_commutations_appendix,
@@ -38,6 +39,7 @@ from app.services.documents.converters import html_to_pdf
 # ייצוא לצורך backward compatibility
 __all__ = [
     'generate_document_package',
+    'generate_document_package_zip',
     'fill_161d_form',
     'generate_grants_appendix',
     'generate_commutations_appendix',
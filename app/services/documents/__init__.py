@@ -9,8 +9,8 @@
 - generators: יצירת מסמכים ספציפיים
 """
 
-from .generators.package_generator import generate_document_package
-from .generators.form_161d_generator import fill_161d_form
+from .generators.package_generator import generate_document_package, generate_document_package_zip
+from .generators.form_161d_generator import fill_161d_form, fill_161d_forms
 from .generators.grants_generator import generate_grants_appendix
 from .generators.commutations_generator import (
     generate_commutations_appendix,
@@ -20,7 +20,9 @@ from .generators.summary_generator import generate_summary_table
 
 __all__ = [
     'generate_document_package',
+    'generate_document_package_zip',
     'fill_161d_form',
+    'fill_161d_forms',
     'generate_grants_appendix',
     'generate_commutations_appendix',
     'generate_actual_commutations_appendix',
@@ -2,9 +2,10 @@
 מודול המרת HTML ל-PDF
 """
 
-from .html_to_pdf import html_to_pdf, find_wkhtmltopdf
+from .html_to_pdf import html_to_pdf, find_wkhtmltopdf, reset_wkhtmltopdf_cache
 
 __all__ = [
     'html_to_pdf',
     'find_wkhtmltopdf',
+    'reset_wkhtmltopdf_cache',
 ]
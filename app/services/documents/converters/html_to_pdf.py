@@ -1,44 +1,100 @@
 """
 המרת HTML ל-PDF באמצעות wkhtmltopdf
+
+נתיב ה-wkhtmltopdf נמצא פעם אחת ונשמר לכל חיי התהליך. מספר ההמרות
+המקבילות בכל התהליך מוגבל (HTML_TO_PDF_WORKERS) - מחוללי החבילה רצים
+במקביל וכל אחד ממיר דרך אותו סמפור.
 """
 from pathlib import Path
+import os
 import subprocess
 import logging
-from typing import Optional
+import threading
+from typing import List, Optional
 
 logger = logging.getLogger(__name__)
 
+HTML_TO_PDF_WORKERS = max(1, int(os.getenv("HTML_TO_PDF_WORKERS", "4")))
+CONVERSION_TIMEOUT_SECONDS = 30
+
+_wkhtmltopdf_path: Optional[str] = None
+_wkhtmltopdf_lock = threading.Lock()
+_conversion_slots = threading.BoundedSemaphore(HTML_TO_PDF_WORKERS)
+
 
 def find_wkhtmltopdf() -> Optional[str]:
     """
     מחפש את wkhtmltopdf במיקומים נפוצים
-    
+    הנתיב שנמצא נשמר במטמון לכל חיי התהליך (כישלון לא נשמר)
+
     Returns:
         נתיב ל-wkhtmltopdf או None אם לא נמצא
     """
-    wkhtmltopdf_paths = [
-        r"C:\Program Files\wkhtmltopdf\bin\wkhtmltopdf.exe",
-        r"C:\Program Files (x86)\wkhtmltopdf\bin\wkhtmltopdf.exe",
-        "wkhtmltopdf"  # אם זמין ב-PATH
-    ]
-    
-    for path in wkhtmltopdf_paths:
-        try:
-            subprocess.run(
-                [path, "--version"],
-                capture_output=True,
-                check=True,
-                timeout=5
-            )
-            logger.info(f"✅ Found wkhtmltopdf at: {path}")
-            return path
-        except (FileNotFoundError, subprocess.CalledProcessError, subprocess.TimeoutExpired):
-            continue
-    
+    global _wkhtmltopdf_path
+    if _wkhtmltopdf_path:
+        return _wkhtmltopdf_path
+
+    with _wkhtmltopdf_lock:
+        if _wkhtmltopdf_path:
+            return _wkhtmltopdf_path
+
+        wkhtmltopdf_paths = [
+            r"C:\Program Files\wkhtmltopdf\bin\wkhtmltopdf.exe",
+            r"C:\Program Files (x86)\wkhtmltopdf\bin\wkhtmltopdf.exe",
+            "wkhtmltopdf"  # אם זמין ב-PATH
+        ]
+
+        for path in wkhtmltopdf_paths:
+            try:
+                subprocess.run(
+                    [path, "--version"],
+                    capture_output=True,
+                    check=True,
+                    timeout=5
+                )
+                logger.info(f"✅ Found wkhtmltopdf at: {path}")
+                _wkhtmltopdf_path = path
+                return path
+            # OSError - גם קובץ שאינו בר-הרצה (הרשאות, ארכיטקטורה), לא רק קובץ חסר
+            except (OSError, subprocess.CalledProcessError, subprocess.TimeoutExpired):
+                continue
+
     logger.error("❌ wkhtmltopdf not found in any common location")
     return None
 
 
+def reset_wkhtmltopdf_cache() -> None:
+    """מאפס את הנתיב השמור (למשל אחרי התקנה או העברה של wkhtmltopdf)"""
+    global _wkhtmltopdf_path
+    with _wkhtmltopdf_lock:
+        _wkhtmltopdf_path = None
+
+
+def _convert(cmd: List[str], html_path: Path, pdf_path: Path) -> Path:
+    logger.info(f"🔄 Converting HTML to PDF: {html_path} -> {pdf_path}")
+
+    try:
+        with _conversion_slots:
+            result = subprocess.run(
+                cmd,
+                capture_output=True,
+                text=True,
+                timeout=CONVERSION_TIMEOUT_SECONDS
+            )
+
+        if result.returncode != 0:
+            raise RuntimeError(f"wkhtmltopdf failed: {result.stderr.strip()}")
+
+        logger.info(f"✅ PDF created successfully: {pdf_path}")
+        return pdf_path
+
+    except subprocess.TimeoutExpired:
+        raise RuntimeError(f"wkhtmltopdf timed out after {CONVERSION_TIMEOUT_SECONDS} seconds")
+    except Exception as e:
+        logger.error(f"❌ Error converting HTML to PDF: {e}")
+        raise
+
+
 def html_to_pdf(
     html_path: Path,
     pdf_path: Path,
@@ -50,7 +106,7 @@ def html_to_pdf(
 ) -> Path:
     """
     ממיר קובץ HTML ל-PDF באמצעות wkhtmltopdf
-    
+
     Args:
         html_path: נתיב לקובץ HTML
         pdf_path: נתיב לקובץ PDF היעד
@@ -59,21 +115,21 @@ def html_to_pdf(
         margin_right: שוליים ימניים
         margin_bottom: שוליים תחתונים
         margin_left: שוליים שמאליים
-        
+
     Returns:
         נתיב לקובץ PDF שנוצר
-        
+
     Raises:
         RuntimeError: אם wkhtmltopdf לא נמצא או ההמרה נכשלה
     """
     wkhtmltopdf_path = find_wkhtmltopdf()
-    
+
     if not wkhtmltopdf_path:
         raise RuntimeError(
             "wkhtmltopdf not found. Please install it from: "
             "https://wkhtmltopdf.org/downloads.html"
         )
-    
+
     cmd = [
         wkhtmltopdf_path,
         '--encoding', 'UTF-8',
@@ -85,25 +141,5 @@ def html_to_pdf(
         str(html_path),
         str(pdf_path)
     ]
-    
-    logger.info(f"🔄 Converting HTML to PDF: {html_path} -> {pdf_path}")
-    
-    try:
-        result = subprocess.run(
-            cmd,
-            capture_output=True,
-            text=True,
-            timeout=30
-        )
-        
-        if result.returncode != 0:
-            raise RuntimeError(f"wkhtmltopdf failed: {result.stderr.strip()}")
-        
-        logger.info(f"✅ PDF created successfully: {pdf_path}")
-        return pdf_path
-        
-    except subprocess.TimeoutExpired:
-        raise RuntimeError("wkhtmltopdf timed out after 30 seconds")
-    except Exception as e:
-        logger.error(f"❌ Error converting HTML to PDF: {e}")
-        raise
+
+    return _convert(cmd, html_path, pdf_path)
@@ -7,6 +7,7 @@ from .client_data import fetch_client_data
 from .grants_data import fetch_grants_data
 from .pension_data import fetch_pension_data
 from .commutations_data import fetch_commutations_data
+from .package_context import PackageDataContext, load_package_context
 
 __all__ = [
     'fetch_fixation_data',
@@ -15,4 +16,6 @@ __all__ = [
     'fetch_grants_data',
     'fetch_pension_data',
     'fetch_commutations_data',
+    'PackageDataContext',
+    'load_package_context',
 ]
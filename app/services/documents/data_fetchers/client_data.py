@@ -6,6 +6,7 @@ from typing import Optional
 import logging
 
 from app.models.client import Client
+from app.services.client_aggregate import get_client_aggregate
 
 logger = logging.getLogger(__name__)
 
@@ -22,12 +23,13 @@ def fetch_client_data(db: Session, client_id: int) -> Optional[Client]:
         Client או None אם לא נמצא
     """
     try:
-        client = db.query(Client).filter(Client.id == client_id).first()
+        aggregate = get_client_aggregate(db, client_id)
         
-        if not client:
+        if not aggregate:
             logger.warning(f"Client {client_id} not found")
             return None
-        
+        client = aggregate.client
+
         logger.info(f"✅ Client data loaded: {client.first_name} {client.last_name}")
         return client
         
@@ -6,6 +6,7 @@ from typing import List
 import logging
 
 from app.models.capital_asset import CapitalAsset
+from app.services.client_aggregate import get_client_aggregate
 
 logger = logging.getLogger(__name__)
 
@@ -23,12 +24,13 @@ def fetch_commutations_data(db: Session, client_id: int) -> List[CapitalAsset]:
     """
     try:
         # שליפת היוונים מנכסי הון (asset_type = 'commutation') - רק פטורים ממס
-        commutations = db.query(CapitalAsset).filter(
-            CapitalAsset.client_id == client_id,
-            CapitalAsset.remarks.like('%pension_fund_id=%'),
-            CapitalAsset.tax_treatment == 'exempt'  # רק היוונים פטורים ממס
-        ).all()
-        
+        aggregate = get_client_aggregate(db, client_id)
+        commutations = [
+            asset for asset in (aggregate.capital_assets if aggregate else [])
+            if 'pension_fund_id=' in (asset.remarks or '')
+            and asset.tax_treatment == 'exempt'  # רק היוונים פטורים ממס
+        ]
+
         logger.info(f"✅ Fetched {len(commutations)} exempt commutations for client {client_id}")
         return commutations
         
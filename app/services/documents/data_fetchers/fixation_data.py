@@ -4,11 +4,10 @@
 from dataclasses import dataclass
 from typing import Optional, Dict, Any, List
 from sqlalchemy.orm import Session
-from sqlalchemy import desc
 import logging
 
 from app.models.client import Client
-from app.models.fixation_result import FixationResult
+from app.services.client_aggregate import get_client_aggregate
 
 logger = logging.getLogger(__name__)
 
@@ -37,17 +36,14 @@ def fetch_fixation_data(db: Session, client_id: int) -> Optional[FixationData]:
         FixationData או None אם לא נמצא
     """
     try:
-        # שליפת לקוח
-        client = db.query(Client).filter(Client.id == client_id).first()
-        if not client:
+        # לקוח ותוצאות קיבוע הזכויות האחרונות מתוך האגרגט המשותף של הבקשה
+        aggregate = get_client_aggregate(db, client_id)
+        if not aggregate:
             logger.warning(f"Client {client_id} not found")
             return None
-        
-        # שליפת תוצאות קיבוע זכויות מה-DB (האחרונות)
-        fixation = db.query(FixationResult).filter(
-            FixationResult.client_id == client_id
-        ).order_by(desc(FixationResult.created_at)).first()
-        
+        client = aggregate.client
+        fixation = aggregate.latest_fixation
+
         if not fixation or not fixation.raw_result:
             logger.warning(f"No fixation data found for client {client_id}")
             return None
@@ -5,7 +5,7 @@ from sqlalchemy.orm import Session
 from typing import List, Dict
 import logging
 
-from app.models.grant import Grant
+from app.services.client_aggregate import get_client_aggregate
 
 logger = logging.getLogger(__name__)
 
@@ -22,8 +22,9 @@ def fetch_grants_data(db: Session, client_id: int) -> Dict[str, Dict[str, str]]:
         Dict: מיפוי של שם מעסיק לתאריכי עבודה
     """
     try:
-        grants = db.query(Grant).filter(Grant.client_id == client_id).all()
-        
+        aggregate = get_client_aggregate(db, client_id)
+        grants = aggregate.grants if aggregate else []
+
         grants_dates_map = {
             g.employer_name: {
                 'work_start_date': g.work_start_date.strftime("%d/%m/%Y") if g.work_start_date else "-",
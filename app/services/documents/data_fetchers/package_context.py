@@ -0,0 +1,87 @@
+"""
+הקשר נתונים משותף לחבילת מסמכים
+
+כל נתוני הלקוח הדרושים למחוללי החבילה נשלפים פעם אחת לתמונת מצב
+בלתי ניתנת לשינוי, כך שהמחוללים יכולים לרוץ במקביל ללא גישה ל-DB.
+"""
+from dataclasses import dataclass
+from datetime import date
+from types import MappingProxyType, SimpleNamespace
+from typing import Any, Dict, Mapping, Optional, Tuple
+from sqlalchemy import inspect
+from sqlalchemy.orm import Session
+import logging
+
+from .client_data import fetch_client_data
+from .commutations_data import fetch_commutations_data
+from .fixation_data import FixationData, fetch_fixation_data
+from .grants_data import fetch_grants_data
+from .pension_data import fetch_pension_data
+
+logger = logging.getLogger(__name__)
+
+
+def _snapshot(obj) -> SimpleNamespace:
+    """עותק של עמודות אובייקט ORM (לקריאה בלבד, ללא טעינה עצלה)"""
+    return SimpleNamespace(**{
+        attr.key: getattr(obj, attr.key) for attr in inspect(obj).mapper.column_attrs
+    })
+
+
+@dataclass(frozen=True)
+class PackageDataContext:
+    """
+    נתוני לקוח לחבילת מסמכים
+    """
+    client_id: int
+    client: SimpleNamespace
+    fixation: Optional[FixationData]
+    grants_dates_map: Mapping[str, Dict[str, str]]
+    pensions: Tuple[SimpleNamespace, ...]
+    commutations: Tuple[SimpleNamespace, ...]
+
+    @property
+    def client_name(self) -> str:
+        return f"{self.client.first_name} {self.client.last_name}"
+
+    @property
+    def effective_pension_start_date(self) -> Optional[date]:
+        """תאריך תחילת הקצבה המוקדם ביותר מקרנות הלקוח (כמו get_effective_pension_start_date)"""
+        candidates = [p.pension_start_date for p in self.pensions if p.pension_start_date]
+        return min(candidates) if candidates else None
+
+
+def load_package_context(db: Session, client_id: int) -> Optional[PackageDataContext]:
+    """
+    שולף את כל נתוני הלקוח לחבילת המסמכים במעבר אחד
+
+    Args:
+        db: סשן DB
+        client_id: מזהה לקוח
+
+    Returns:
+        PackageDataContext או None אם הלקוח לא נמצא
+    """
+    client = fetch_client_data(db, client_id)
+    if not client:
+        return None
+
+    fixation = fetch_fixation_data(db, client_id)
+    client_snapshot = _snapshot(client)
+    if fixation is not None:
+        fixation = FixationData(
+            client=client_snapshot,
+            exemption_summary=MappingProxyType(dict(fixation.exemption_summary)),
+            grants_summary=tuple(fixation.grants_summary),
+            raw_result=MappingProxyType(dict(fixation.raw_result)),
+            eligibility_date=fixation.eligibility_date,
+        )
+
+    return PackageDataContext(
+        client_id=client_id,
+        client=client_snapshot,
+        fixation=fixation,
+        grants_dates_map=MappingProxyType(fetch_grants_data(db, client_id)),
+        pensions=tuple(_snapshot(p) for p in fetch_pension_data(db, client_id)),
+        commutations=tuple(_snapshot(c) for c in fetch_commutations_data(db, client_id)),
+    )
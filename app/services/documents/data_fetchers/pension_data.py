@@ -6,6 +6,7 @@ from typing import List
 import logging
 
 from app.models.pension_fund import PensionFund
+from app.services.client_aggregate import get_client_aggregate
 
 logger = logging.getLogger(__name__)
 
@@ -22,10 +23,9 @@ def fetch_pension_data(db: Session, client_id: int) -> List[PensionFund]:
         List[PensionFund]: רשימת קצבאות
     """
     try:
-        pensions = db.query(PensionFund).filter(
-            PensionFund.client_id == client_id
-        ).all()
-        
+        aggregate = get_client_aggregate(db, client_id)
+        pensions = list(aggregate.pension_funds) if aggregate else []
+
         logger.info(f"✅ Fetched {len(pensions)} pension funds for client {client_id}")
         return pensions
         
@@ -2,20 +2,22 @@
 מודול מחוללי מסמכים
 """
 
-from .form_161d_generator import fill_161d_form
+from .form_161d_generator import fill_161d_form, fill_161d_forms
 from .grants_generator import generate_grants_appendix
 from .commutations_generator import (
     generate_commutations_appendix,
     generate_actual_commutations_appendix
 )
 from .summary_generator import generate_summary_table
-from .package_generator import generate_document_package
+from .package_generator import generate_document_package, generate_document_package_zip
 
 __all__ = [
     'fill_161d_form',
+    'fill_161d_forms',
     'generate_grants_appendix',
     'generate_commutations_appendix',
     'generate_actual_commutations_appendix',
     'generate_summary_table',
     'generate_document_package',
+    'generate_document_package_zip',
 ]
@@ -6,7 +6,7 @@ from sqlalchemy.orm import Session
 from typing import Optional
 import logging
 
-from ..data_fetchers import fetch_client_data, fetch_pension_data, fetch_commutations_data
+from ..data_fetchers import fetch_client_data, fetch_pension_data, PackageDataContext, load_package_context
 from ..templates import CommutationsHTMLTemplate
 from ..converters import html_to_pdf
 
@@ -157,13 +157,27 @@ def generate_actual_commutations_appendix(db: Session, client_id: int, output_di
     Returns:
         נתיב לנספח שנוצר או None אם נכשל
     """
-    try:
-        client = fetch_client_data(db, client_id)
-        if not client:
-            return None
+    context = load_package_context(db, client_id)
+    if context is None:
+        return None
+    return build_actual_commutations_appendix(context, output_dir)
+
+
+def build_actual_commutations_appendix(context: PackageDataContext, output_dir: Path) -> Optional[Path]:
+    """
+    יוצר נספח היוונים מהקשר נתונים שכבר נשלף (ללא גישה ל-DB)
+    
+    Args:
+        context: נתוני הלקוח לחבילה
+        output_dir: תיקיית פלט
         
-        # שליפת היוונים
-        commutations = fetch_commutations_data(db, client_id)
+    Returns:
+        נתיב לנספח שנוצר או None אם נכשל
+    """
+    client_id = context.client_id
+    try:
+        client = context.client
+        commutations = context.commutations
         
         if not commutations:
             logger.info(f"No exempt commutations found for client {client_id}")
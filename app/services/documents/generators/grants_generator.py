@@ -6,7 +6,7 @@ from sqlalchemy.orm import Session
 from typing import Optional
 import logging
 
-from ..data_fetchers import fetch_fixation_data, fetch_grants_data
+from ..data_fetchers import PackageDataContext, load_package_context
 from ..templates import GrantsHTMLTemplate
 from ..converters import html_to_pdf
 
@@ -25,11 +25,28 @@ def generate_grants_appendix(db: Session, client_id: int, output_dir: Path) -> O
     Returns:
         נתיב לנספח שנוצר או None אם נכשל
     """
+    context = load_package_context(db, client_id)
+    if context is None:
+        return None
+    return build_grants_appendix(context, output_dir)
+
+
+def build_grants_appendix(context: PackageDataContext, output_dir: Path) -> Optional[Path]:
+    """
+    יוצר נספח מענקים מהקשר נתונים שכבר נשלף (ללא גישה ל-DB)
+    
+    Args:
+        context: נתוני הלקוח לחבילה
+        output_dir: תיקיית פלט
+        
+    Returns:
+        נתיב לנספח שנוצר או None אם נכשל
+    """
+    client_id = context.client_id
     try:
         logger.info(f"📄 Generating grants appendix for client {client_id}")
         
-        # שליפת נתוני קיבוע זכויות
-        fixation_data = fetch_fixation_data(db, client_id)
+        fixation_data = context.fixation
         if not fixation_data:
             return None
         
@@ -39,8 +56,7 @@ def generate_grants_appendix(db: Session, client_id: int, output_dir: Path) -> O
             logger.warning(f"⚠️ No grants in fixation data for client {client_id}")
             return None
         
-        # שליפת תאריכי עבודה מה-DB
-        grants_dates_map = fetch_grants_data(db, client_id)
+        grants_dates_map = context.grants_dates_map
         
         # יצירת תבנית HTML
         client_name = f"{fixation_data.client.first_name} {fixation_data.client.last_name}"
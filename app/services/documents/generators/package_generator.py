@@ -1,101 +1,131 @@
 """
 מחולל חבילת מסמכים מלאה
+
+נתוני הלקוח נשלפים פעם אחת להקשר משותף (PackageDataContext), וארבעת
+המחוללים רצים עליו במקביל - זמן יצירת החבילה הוא בערך שליפה אחת
+ועוד המחולל האיטי ביותר.
 """
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
 from sqlalchemy.orm import Session
+from typing import List
 import logging
+import tempfile
+import zipfile
 
 from ..utils import get_client_package_dir, PACKAGES_DIR
-from ..data_fetchers import fetch_client_data
-from .form_161d_generator import fill_161d_form
-from .grants_generator import generate_grants_appendix
-from .commutations_generator import generate_actual_commutations_appendix
-from .summary_generator import generate_summary_table
+from ..data_fetchers import PackageDataContext, load_package_context
+from .form_161d_generator import build_161d_form
+from .grants_generator import build_grants_appendix
+from .commutations_generator import build_actual_commutations_appendix
+from .summary_generator import build_summary_table
 
 logger = logging.getLogger(__name__)
 
+# ZIP עד גודל זה נשאר בזיכרון, מעליו נכתב לקובץ זמני
+ZIP_SPOOL_MAX_SIZE = 10 * 1024 * 1024
+
+PACKAGE_GENERATORS = [
+    ("Form 161d", build_161d_form),
+    ("Grants appendix", build_grants_appendix),
+    ("Commutations appendix", build_actual_commutations_appendix),
+    ("Summary table", build_summary_table),
+]
+
+
+def _run_generators(context: PackageDataContext, output_dir: Path) -> List[str]:
+    """מריץ את מחוללי החבילה במקביל ומחזיר את שמות הקבצים שנוצרו (בסדר החבילה)"""
+    with ThreadPoolExecutor(max_workers=len(PACKAGE_GENERATORS), thread_name_prefix="package") as executor:
+        futures = [
+            (title, executor.submit(generator, context, output_dir))
+            for title, generator in PACKAGE_GENERATORS
+        ]
+
+    files = []
+    for title, future in futures:
+        try:
+            path = future.result()
+        except Exception as e:
+            logger.error(f"❌ Exception in {title}: {e}", exc_info=True)
+            continue
+        if path and path.exists():
+            files.append(path.name)
+            logger.info(f"✅ {title} created: {path.name}")
+        else:
+            logger.warning(f"⚠️ {title} not created")
+    return files
+
 
 def generate_document_package(db: Session, client_id: int) -> dict:
     """
     מייצר חבילת מסמכים מלאה ללקוח
     ממלא טופס 161ד ריק + יוצר נספחים
-    
+
     Args:
         db: סשן DB
         client_id: מזהה לקוח
-        
+
     Returns:
         dict: {"success": True, "folder": str, "files": list} או {"success": False, "error": str}
     """
     try:
         logger.info(f"📦 Starting package generation for client {client_id}")
-        
-        # שליפת לקוח
-        client = fetch_client_data(db, client_id)
-        if not client:
+
+        context = load_package_context(db, client_id)
+        if context is None:
             logger.error(f"❌ Client {client_id} not found in database")
             return {"success": False, "error": "לקוח לא נמצא"}
-        
-        logger.info(f"✅ Client found: {client.first_name} {client.last_name}")
-        
+
         # יצירת תיקייה
-        output_dir = get_client_package_dir(client_id, client.first_name or "", client.last_name or "")
+        output_dir = get_client_package_dir(client_id, context.client.first_name or "", context.client.last_name or "")
         logger.info(f"📁 Output directory: {output_dir}")
-        
-        files = []
-        
-        # 1. מילוי טופס 161ד המקורי
-        logger.info(f"📄 Filling form 161d...")
-        try:
-            form_161d = fill_161d_form(db, client_id, output_dir)
-            if form_161d and form_161d.exists():
-                files.append(form_161d.name)
-                logger.info(f"✅ Form 161d created: {form_161d.name}")
-            else:
-                logger.error(f"❌ Form 161d not created - returned None or doesn't exist")
-        except Exception as e:
-            logger.error(f"❌ Exception in fill_161d_form: {e}", exc_info=True)
-        
-        # 2. נספח מענקים מפורט
-        logger.info(f"📄 Generating grants appendix...")
-        grants_app = generate_grants_appendix(db, client_id, output_dir)
-        if grants_app and grants_app.exists():
-            files.append(grants_app.name)
-            logger.info(f"✅ Grants appendix created: {grants_app.name}")
-        else:
-            logger.warning(f"⚠️ Grants appendix not created")
-        
-        # 3. נספח היוונים
-        logger.info(f"📄 Generating commutations appendix...")
-        try:
-            commutations_app = generate_actual_commutations_appendix(db, client_id, output_dir)
-            if commutations_app and commutations_app.exists():
-                files.append(commutations_app.name)
-                logger.info(f"✅ Commutations appendix created: {commutations_app.name}")
-            else:
-                logger.warning(f"⚠️ Commutations appendix not created")
-        except Exception as e:
-            logger.error(f"❌ Exception in generate_commutations_appendix: {e}", exc_info=True)
-        
-        # 4. טבלת סיכום
-        logger.info(f"📄 Generating summary table...")
-        try:
-            summary_table = generate_summary_table(db, client_id, output_dir)
-            if summary_table and summary_table.exists():
-                files.append(summary_table.name)
-                logger.info(f"✅ Summary table created: {summary_table.name}")
-            else:
-                logger.warning(f"⚠️ Summary table not created")
-        except Exception as e:
-            logger.error(f"❌ Exception in generate_summary_table: {e}", exc_info=True)
-        
+
+        files = _run_generators(context, output_dir)
+
         logger.info(f"✅ Package generated for client {client_id}: {len(files)} files")
-        
+
         return {
             "success": True,
             "folder": str(output_dir.relative_to(PACKAGES_DIR.parent)),
             "files": files
         }
-        
+
+    except Exception as e:
+        logger.error(f"❌ Error generating package: {e}", exc_info=True)
+        return {"success": False, "error": str(e)}
+
+
+def generate_document_package_zip(db: Session, client_id: int) -> dict:
+    """
+    מייצר חבילת מסמכים ללקוח ישירות כקובץ ZIP, בלי להשאיר קבצים בתיקיית packages
+
+    Args:
+        db: סשן DB
+        client_id: מזהה לקוח
+
+    Returns:
+        dict: {"success": True, "zip": קובץ פתוח במיקום 0, "files": list, "client": נתוני הלקוח}
+              או {"success": False, "error": str}
+    """
+    try:
+        logger.info(f"📦 Starting zipped package generation for client {client_id}")
+
+        context = load_package_context(db, client_id)
+        if context is None:
+            logger.error(f"❌ Client {client_id} not found in database")
+            return {"success": False, "error": "לקוח לא נמצא"}
+
+        archive = tempfile.SpooledTemporaryFile(max_size=ZIP_SPOOL_MAX_SIZE)
+        with tempfile.TemporaryDirectory(prefix=f"package_{client_id}_") as work_dir:
+            files = _run_generators(context, Path(work_dir))
+            with zipfile.ZipFile(archive, "w", zipfile.ZIP_DEFLATED) as zipf:
+                for file_name in files:
+                    zipf.write(Path(work_dir) / file_name, file_name)
+        archive.seek(0)
+
+        logger.info(f"✅ Package zipped for client {client_id}: {len(files)} files")
+        return {"success": True, "zip": archive, "files": files, "client": context.client}
+
     except Exception as e:
         logger.error(f"❌ Error generating package: {e}", exc_info=True)
         return {"success": False, "error": str(e)}
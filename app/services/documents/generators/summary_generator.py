@@ -6,7 +6,7 @@ from sqlalchemy.orm import Session
 from typing import Optional
 import logging
 
-from ..data_fetchers import fetch_fixation_data
+from ..data_fetchers import PackageDataContext, load_package_context
 from ..templates import SummaryHTMLTemplate
 from ..converters import html_to_pdf
 
@@ -25,9 +25,26 @@ def generate_summary_table(db: Session, client_id: int, output_dir: Path) -> Opt
     Returns:
         נתיב לטבלה שנוצרה או None אם נכשל
     """
+    context = load_package_context(db, client_id)
+    if context is None:
+        return None
+    return build_summary_table(context, output_dir)
+
+
+def build_summary_table(context: PackageDataContext, output_dir: Path) -> Optional[Path]:
+    """
+    יוצר טבלת סיכום מהקשר נתונים שכבר נשלף (ללא גישה ל-DB)
+    
+    Args:
+        context: נתוני הלקוח לחבילה
+        output_dir: תיקיית פלט
+        
+    Returns:
+        נתיב לטבלה שנוצרה או None אם נכשל
+    """
+    client_id = context.client_id
     try:
-        # שליפת נתוני קיבוע זכויות
-        fixation_data = fetch_fixation_data(db, client_id)
+        fixation_data = context.fixation
         if not fixation_data:
             logger.info(f"No fixation data found for client {client_id}")
             return None
@@ -0,0 +1,209 @@
+"""
+Bulk recomputation of saved rights-fixation results across all clients
+"""
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from typing import Any, Dict, List, Optional
+import logging
+import time
+
+from sqlalchemy import func, insert, update
+from sqlalchemy.orm import Session
+
+from app.database import engine
+from app.models.client import Client
+from app.models.fixation_result import FixationResult
+from app.models.grant import Grant
+from app.models.pension_fund import PensionFund
+from app.services.rights_fixation import calculate_full_fixation
+from app.services.rights_fixation.exemption_caps import get_parameters_version
+from app.services.rights_fixation.payload import build_fixation_payload
+
+logger = logging.getLogger(__name__)
+
+
+def _pool_bounded_workers(limit: int = 16) -> int:
+    """Worker cap: at most the primary pool size, so a run can't exhaust the connection pool"""
+    pool_size = getattr(engine.pool, "size", None)
+    return max(1, min(limit, pool_size())) if callable(pool_size) else limit
+
+
+MAX_WORKERS = _pool_bounded_workers()
+DEFAULT_WORKERS = min(8, MAX_WORKERS)
+
+
+class FixationRecomputeService:
+    """
+    Finds clients whose saved fixation is stale (grants, eligibility inputs or
+    fixation parameters changed since it was saved) and recomputes them in
+    parallel, writing results back with bulk statements.
+    """
+
+    def __init__(self, db: Session):
+        self.db = db
+
+    def _load_payloads(self, client_ids: Optional[List[int]] = None) -> Dict[int, Dict[str, Any]]:
+        """Build fixation payloads for many clients with one query per table"""
+        clients_query = self.db.query(Client)
+        grants_query = self.db.query(Grant)
+        pension_query = (
+            self.db.query(PensionFund.client_id, func.min(PensionFund.pension_start_date))
+            .filter(PensionFund.pension_start_date.isnot(None))
+        )
+        if client_ids is not None:
+            clients_query = clients_query.filter(Client.id.in_(client_ids))
+            grants_query = grants_query.filter(Grant.client_id.in_(client_ids))
+            pension_query = pension_query.filter(PensionFund.client_id.in_(client_ids))
+
+        grants_by_client: Dict[int, List[Grant]] = {}
+        for grant in grants_query.order_by(Grant.client_id, Grant.id).all():
+            grants_by_client.setdefault(grant.client_id, []).append(grant)
+
+        pension_start_by_client = dict(pension_query.group_by(PensionFund.client_id).all())
+
+        return {
+            client.id: build_fixation_payload(
+                client,
+                grants_by_client.get(client.id, []),
+                pension_start_by_client.get(client.id),
+            )
+            for client in clients_query.all()
+        }
+
+    def _latest_results(self, client_ids: List[int]) -> Dict[int, FixationResult]:
+        """Latest FixationResult per client (the row the single-client upsert updates)"""
+        latest: Dict[int, FixationResult] = {}
+        if not client_ids:
+            return latest
+        rows = (
+            self.db.query(FixationResult)
+            .filter(FixationResult.client_id.in_(client_ids))
+            .order_by(FixationResult.client_id, FixationResult.created_at.desc())
+            .all()
+        )
+        for row in rows:
+            latest.setdefault(row.client_id, row)
+        return latest
+
+    def find_stale(self, include_missing: bool = False, client_ids: Optional[List[int]] = None) -> Dict[str, Any]:
+        """
+        Compare stored input hashes with freshly built payloads.
+
+        Returns payloads to recompute, the matching existing rows and the
+        number of clients already up to date.
+        """
+        payloads = self._load_payloads(client_ids)
+        latest = self._latest_results(list(payloads.keys()))
+
+        stale: Dict[int, Dict[str, Any]] = {}
+        up_to_date = 0
+        missing = 0
+        for client_id, payload in payloads.items():
+            existing = latest.get(client_id)
+            if existing is None:
+                missing += 1
+                if include_missing:
+                    stale[client_id] = payload
+                continue
+            stored_payload = existing.raw_payload if isinstance(existing.raw_payload, dict) else {}
+            if stored_payload.get("input_hash") == payload["input_hash"]:
+                up_to_date += 1
+            else:
+                stale[client_id] = payload
+
+        return {
+            "payloads": stale,
+            "existing": latest,
+            "checked": len(payloads),
+            "up_to_date": up_to_date,
+            "missing": missing,
+        }
+
+    def run(
+        self,
+        workers: int = DEFAULT_WORKERS,
+        include_missing: bool = False,
+        dry_run: bool = False,
+        client_ids: Optional[List[int]] = None,
+    ) -> Dict[str, Any]:
+        """
+        Recompute all stale fixations and return a summary report
+
+        :param workers: number of parallel calculation workers (capped at MAX_WORKERS)
+        :param include_missing: also create fixations for clients that have none
+        :param dry_run: only report which clients are stale
+        :param client_ids: restrict the job to these clients
+        """
+        started = time.perf_counter()
+        found = self.find_stale(include_missing=include_missing, client_ids=client_ids)
+        payloads: Dict[int, Dict[str, Any]] = found["payloads"]
+        existing: Dict[int, FixationResult] = found["existing"]
+
+        report: Dict[str, Any] = {
+            "parameters_version": get_parameters_version(),
+            "checked": found["checked"],
+            "up_to_date": found["up_to_date"],
+            "without_fixation": found["missing"],
+            "stale": len(payloads),
+            "stale_client_ids": sorted(payloads.keys()),
+            "recomputed": 0,
+            "inserted": 0,
+            "updated": 0,
+            "failed": [],
+            "dry_run": dry_run,
+        }
+
+        if dry_run or not payloads:
+            report["duration_seconds"] = round(time.perf_counter() - started, 3)
+            return report
+
+        client_order = list(payloads.keys())
+        with ThreadPoolExecutor(max_workers=min(max(1, workers), MAX_WORKERS), thread_name_prefix="fixation-recompute") as executor:
+            results = list(executor.map(lambda cid: calculate_full_fixation(payloads[cid]), client_order))
+
+        now = datetime.now()
+        updates: List[Dict[str, Any]] = []
+        inserts: List[Dict[str, Any]] = []
+        for client_id, result in zip(client_order, results):
+            if not isinstance(result, dict) or result.get("error"):
+                error = result.get("error") if isinstance(result, dict) else "invalid result"
+                report["failed"].append({"client_id": client_id, "error": error})
+                continue
+
+            remaining = (result.get("exemption_summary") or {}).get("remaining_exempt_capital", 0) or 0.0
+            row = existing.get(client_id)
+            if row is not None:
+                updates.append({
+                    "id": row.id,
+                    "raw_result": result,
+                    "raw_payload": payloads[client_id],
+                    "exempt_capital_remaining": remaining,
+                    "created_at": now,
+                })
+            else:
+                inserts.append({
+                    "client_id": client_id,
+                    "created_at": now,
+                    "exempt_capital_remaining": remaining,
+                    "used_commutation": 0.0,
+                    "raw_payload": payloads[client_id],
+                    "raw_result": result,
+                    "notes": "Saved by bulk fixation recomputation",
+                })
+
+        if updates:
+            self.db.execute(update(FixationResult), updates)
+        if inserts:
+            self.db.execute(insert(FixationResult), inserts)
+        self.db.commit()
+
+        report["updated"] = len(updates)
+        report["inserted"] = len(inserts)
+        report["recomputed"] = len(updates) + len(inserts)
+        report["duration_seconds"] = round(time.perf_counter() - started, 3)
+        logger.info(
+            "Bulk fixation recomputation: checked=%s stale=%s recomputed=%s failed=%s in %.1fs",
+            report["checked"], report["stale"], report["recomputed"], len(report["failed"]),
+            report["duration_seconds"],
+        )
+        return report
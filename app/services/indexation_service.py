@@ -1,15 +1,13 @@
 """
 שירות הצמדה מתקדם המבוסס על מערכת קיבוע הזכויות הקיימת
 """
-import requests
 from datetime import datetime, date, timedelta
 from typing import Optional, Dict, Any
 import logging
 
-logger = logging.getLogger(__name__)
+from app.services.rights_fixation.indexation_factors import CBS_CPI_API, index_amount  # noqa: F401
 
-# CBS Consumer Price Index API endpoint
-CBS_CPI_API = 'https://api.cbs.gov.il/index/data/calculator/120010'
+logger = logging.getLogger(__name__)
 
 class IndexationService:
     """שירות הצמדה מתקדם"""
@@ -29,29 +27,11 @@ class IndexationService:
             if to_date and not isinstance(to_date, str):
                 to_date = to_date.isoformat()
                 
-            params = {
-                'value': amount, 
-                'date': end_work_date,
-                'toDate': to_date if to_date else datetime.today().date().isoformat(), 
-                'format': 'json', 
-                'download': 'false'
-            }
-            
-            resp = requests.get(CBS_CPI_API, params=params, timeout=10)
-            resp.raise_for_status()
-            data = resp.json()
-            
-            answer = data.get('answer')
-            if not answer:
-                logger.warning(f'אזהרה: API ללא answer עבור {end_work_date} | תשובה: {data}')
-                return None
-                
-            to_value = answer.get('to_value')
-            if to_value is None:
-                logger.warning(f'אזהרה: אין to_value עבור {end_work_date} | תשובה: {data}')
-                return None
-                
-            return round(float(to_value), 2)
+            # מקדם ההצמדה נשלף מהמטמון המשותף (זיכרון + מסד נתונים) והמכפלה מקומית
+            result = index_amount(amount, end_work_date, to_date or datetime.today().date())
+            if result is None:
+                logger.warning(f'אזהרה: לא התקבל מקדם הצמדה עבור {end_work_date}')
+            return result
             
         except Exception as e:
             logger.error(f'שגיאה בהצמדה עבור {end_work_date}: {e}')
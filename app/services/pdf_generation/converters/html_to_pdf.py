@@ -4,39 +4,11 @@
 from pathlib import Path
 import subprocess
 import logging
-from typing import Optional
-
-logger = logging.getLogger(__name__)
 
+# איתור wkhtmltopdf משותף עם מודול המסמכים (הנתיב נשמר במטמון לכל חיי התהליך)
+from app.services.documents.converters.html_to_pdf import find_wkhtmltopdf
 
-def find_wkhtmltopdf() -> Optional[str]:
-    """
-    מחפש את wkhtmltopdf במיקומים נפוצים
-    
-    Returns:
-        נתיב ל-wkhtmltopdf או None אם לא נמצא
-    """
-    wkhtmltopdf_paths = [
-        r"C:\Program Files\wkhtmltopdf\bin\wkhtmltopdf.exe",
-        r"C:\Program Files (x86)\wkhtmltopdf\bin\wkhtmltopdf.exe",
-        "wkhtmltopdf"
-    ]
-    
-    for path in wkhtmltopdf_paths:
-        try:
-            subprocess.run(
-                [path, "--version"],
-                capture_output=True,
-                check=True,
-                timeout=5
-            )
-            logger.info(f"✅ Found wkhtmltopdf at: {path}")
-            return path
-        except Exception:
-            continue
-    
-    logger.error("❌ wkhtmltopdf not found in any common location")
-    return None
+logger = logging.getLogger(__name__)
 
 
 def html_to_pdf(
@@ -1,3 +1,4 @@
 from .processor import PensionPortfolioProcessor
+from .parallel import UnsupportedEncodingError, process_pension_files
 
-__all__ = ["PensionPortfolioProcessor"]
+__all__ = ["PensionPortfolioProcessor", "UnsupportedEncodingError", "process_pension_files"]
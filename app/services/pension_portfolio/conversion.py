@@ -0,0 +1,84 @@
+"""Bulk conversion of pension portfolio accounts into pension funds and capital assets.
+
+All target rows are built in memory and written with one INSERT per table. Bulk
+inserts bypass the per-row PensionFund mapper events, so the derived
+Client.pension_start_date is recomputed once at the end.
+"""
+
+from __future__ import annotations
+
+from datetime import date
+from decimal import Decimal
+from typing import Any, Dict, List, Tuple
+
+from sqlalchemy import insert
+from sqlalchemy.orm import Session
+
+from app.models.capital_asset import CapitalAsset
+from app.models.pension_fund import PensionFund, update_client_pension_start_dates
+
+DEFAULT_ANNUITY_FACTOR = 200
+CONVERSION_START_DATE = date(2025, 1, 1)
+
+
+def build_conversion_rows(
+    client_id: int, accounts: List[Dict[str, Any]]
+) -> Tuple[List[Dict[str, Any]], List[Dict[str, Any]]]:
+    """PensionFund and CapitalAsset rows for the accounts (accounts without a balance are skipped)."""
+    pension_rows: List[Dict[str, Any]] = []
+    capital_rows: List[Dict[str, Any]] = []
+
+    for account in accounts:
+        conversion_type = account.get("conversion_type", "pension")  # ברירת מחדל: קצבה
+        balance = float(account.get("יתרה", 0))
+        if balance <= 0:
+            continue
+
+        company = account.get("חברה_מנהלת", "")
+        if conversion_type == "pension":
+            product_type = account.get("סוג_מוצר", "")
+            pension_rows.append({
+                "client_id": client_id,
+                "fund_name": account.get("שם_תכנית", "תכנית ללא שם"),
+                "fund_type": account.get("סוג_מוצר", "קופת גמל"),
+                "input_mode": "manual",
+                "balance": balance,
+                "annuity_factor": DEFAULT_ANNUITY_FACTOR,
+                "pension_amount": balance / DEFAULT_ANNUITY_FACTOR,
+                "pension_start_date": CONVERSION_START_DATE,
+                "indexation_method": "none",
+                "tax_treatment": "exempt" if "השתלמות" in product_type else "taxable",
+                "deduction_file": account.get("מספר_חשבון", ""),
+                "remarks": f"הומר מתיק פנסיוני - {company}",
+            })
+        elif conversion_type == "capital_asset":
+            capital_rows.append({
+                "client_id": client_id,
+                "asset_name": account.get("שם_תכנית", "נכס ללא שם"),
+                "asset_type": "provident_fund",
+                "current_value": Decimal(str(balance)),
+                "annual_return_rate": Decimal("0.03"),
+                "payment_frequency": "monthly",
+                "start_date": CONVERSION_START_DATE,
+                "indexation_method": "none",
+                "tax_treatment": "taxable",
+                "description": f"הומר מתיק פנסיוני - {company}",
+            })
+
+    return pension_rows, capital_rows
+
+
+def bulk_convert_accounts(db: Session, client_id: int, accounts: List[Dict[str, Any]]) -> int:
+    """Insert the converted rows (without committing) and return how many accounts were converted."""
+    pension_rows, capital_rows = build_conversion_rows(client_id, accounts)
+
+    if pension_rows:
+        db.execute(insert(PensionFund), pension_rows)
+        update_client_pension_start_dates(db, [client_id])
+    if capital_rows:
+        db.execute(insert(CapitalAsset), capital_rows)
+
+    return len(pension_rows) + len(capital_rows)
+
+
+__all__ = ["build_conversion_rows", "bulk_convert_accounts"]
@@ -0,0 +1,172 @@
+"""Parallel processing of uploaded pension clearing house files.
+
+Files are decoded and parsed in a process pool so that a multi-file upload takes
+about as long as its largest file and the event loop never runs the parse itself.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import codecs
+import logging
+import multiprocessing
+import os
+import re
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import Iterator, List, Optional, Sequence, Tuple
+
+from .processor import STREAM_CHUNK_SIZE, PensionPortfolioProcessor
+
+logger = logging.getLogger(__name__)
+
+# Used only when the file has neither a BOM nor an encoding declaration
+# latin1 is deliberately absent: it decodes any byte string, so garbage would be parsed
+# as text instead of being reported as an unsupported encoding
+FALLBACK_ENCODINGS = ["utf-8", "windows-1255", "iso-8859-8"]
+
+_BOMS = [
+    (codecs.BOM_UTF8, "utf-8-sig"),
+    (codecs.BOM_UTF32_LE, "utf-32"),
+    (codecs.BOM_UTF32_BE, "utf-32"),
+    (codecs.BOM_UTF16_LE, "utf-16"),
+    (codecs.BOM_UTF16_BE, "utf-16"),
+]
+
+_XML_DECLARATION_ENCODING = re.compile(rb"""^\s*<\?xml[^>]*?\bencoding\s*=\s*["']([A-Za-z0-9._\-]+)["']""")
+
+MAX_WORKERS = int(os.getenv("PENSION_PORTFOLIO_WORKERS", "0")) or min(8, os.cpu_count() or 1)
+
+# Forked workers would inherit the server's threads, locks and DB connections
+_MP_CONTEXT = multiprocessing.get_context(
+    "forkserver" if "forkserver" in multiprocessing.get_all_start_methods() else "spawn"
+)
+
+_executor: Optional[ProcessPoolExecutor] = None
+_executor_lock = threading.Lock()
+
+
+class UnsupportedEncodingError(ValueError):
+    """The file could not be decoded with its declared or any fallback encoding."""
+
+
+def detect_xml_encoding(data: bytes) -> Optional[str]:
+    """Encoding from the BOM or the XML declaration, or None when neither is present."""
+    for bom, encoding in _BOMS:
+        if data.startswith(bom):
+            return encoding
+
+    match = _XML_DECLARATION_ENCODING.match(data[:512])
+    if not match:
+        return None
+    declared = match.group(1).decode("ascii")
+    try:
+        return codecs.lookup(declared).name
+    except LookupError:
+        logger.warning("Unknown declared encoding %r - using fallback decoding", declared)
+        return None
+
+
+def decoded_chunks(data: bytes, encoding: str, chunk_size: Optional[int] = None) -> Iterator[str]:
+    """Decode ``data`` incrementally, ``chunk_size`` bytes at a time."""
+    chunk_size = chunk_size or STREAM_CHUNK_SIZE
+    decoder = codecs.getincrementaldecoder(encoding)()
+    view = memoryview(data)
+    for offset in range(0, len(view), chunk_size):
+        text = decoder.decode(view[offset:offset + chunk_size])
+        if text:
+            yield text
+    text = decoder.decode(b"", final=True)
+    if text:
+        yield text
+
+
+def _decodes_as(data: bytes, encoding: str) -> bool:
+    try:
+        for _text in decoded_chunks(data, encoding):
+            pass
+    except UnicodeDecodeError:
+        return False
+    return True
+
+
+def pension_file_encoding(data: bytes, file_name: str = "") -> str:
+    """The declared encoding if the whole file decodes with it, otherwise the first fallback that does."""
+    encoding = detect_xml_encoding(data)
+    if encoding:
+        if _decodes_as(data, encoding):
+            return encoding
+        logger.warning("Declared encoding %s failed for %s", encoding, file_name)
+
+    for candidate in FALLBACK_ENCODINGS:
+        if candidate != encoding and _decodes_as(data, candidate):
+            return candidate
+    raise UnsupportedEncodingError(file_name)
+
+
+def decode_pension_file(data: bytes, file_name: str = "") -> str:
+    return data.decode(pension_file_encoding(data, file_name))
+
+
+def process_pension_file(data: bytes, file_name: str) -> Optional[dict]:
+    """Decode and process one file - runs inside a pool worker.
+
+    The file is decoded chunk by chunk while it is parsed, so the decoded text is
+    never held in memory as a whole.
+    """
+    encoding = pension_file_encoding(data, file_name)
+    return PensionPortfolioProcessor().process_chunks(lambda: decoded_chunks(data, encoding), file_name)
+
+
+def _get_executor() -> ProcessPoolExecutor:
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            _executor = ProcessPoolExecutor(max_workers=MAX_WORKERS, mp_context=_MP_CONTEXT)
+        return _executor
+
+
+def shutdown_executor() -> None:
+    global _executor
+    with _executor_lock:
+        if _executor is not None:
+            _executor.shutdown(wait=False, cancel_futures=True)
+            _executor = None
+
+
+async def process_pension_files(files: Sequence[Tuple[str, bytes]]) -> List[object]:
+    """Process (file_name, data) pairs in parallel.
+
+    Returns one entry per file in input order: the processor result (or None),
+    or the exception raised while processing that file.
+    """
+    global _executor
+    if not files:
+        return []
+
+    loop = asyncio.get_running_loop()
+    executor = _get_executor()
+    futures = [
+        loop.run_in_executor(executor, process_pension_file, data, file_name)
+        for file_name, data in files
+    ]
+    results = await asyncio.gather(*futures, return_exceptions=True)
+    if any(isinstance(result, BrokenProcessPool) for result in results):
+        logger.error("Pension file worker pool is broken - it will be recreated on the next upload")
+        with _executor_lock:
+            if _executor is executor:
+                _executor = None
+    return results
+
+
+__all__ = [
+    "UnsupportedEncodingError",
+    "decode_pension_file",
+    "decoded_chunks",
+    "detect_xml_encoding",
+    "pension_file_encoding",
+    "process_pension_file",
+    "process_pension_files",
+    "shutdown_executor",
+]
@@ -1,7 +1,8 @@
 import logging
 import re
+from bisect import bisect_right
 from datetime import datetime
-from typing import Any, Dict, List, Optional, Tuple
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, Tuple
 import xml.etree.ElementTree as ET
 
 MANAGING_COMPANY_TAGS = [
@@ -121,6 +122,31 @@ EMPLOYER_SUG_CODES = {"3", "7", "9", "11"}
 BALANCE_TOLERANCE = 0.5
 NUMERIC_SENTINELS = {"", "0", "0.0", "0.00", "NIL", "None", "none"}
 
+ACCOUNT_NODE_TAGS = [
+    "HeshbonOPolisa",
+    "Heshbon",
+    "Account",
+    "Policy",
+    "Polisa",
+    "PensionAccount",
+    "PensionPolicy",
+    "KupatGemel",
+    "BituachMenahalim",
+    "KerenPensia",
+]
+
+MANAGING_COMPANY_NAME_TAGS = ["SHEM-YATZRAN", "SHEM-METAFEL", "SHEM_HA_MOSAD", "Provider", "Company"]
+
+PLAN_NAME_TAGS = ["SHEM-TOCHNIT", "TOCHNIT", "SHEM_TOCHNIT"]
+
+# Tags that are looked up in the account and in all of its ancestors' subtrees
+ANCESTOR_LOOKUP_TAGS = set(EMPLOYER_NAME_TAGS) | set(MANAGING_COMPANY_NAME_TAGS) | set(PLAN_NAME_TAGS) | {"SUG-MUTZAR"}
+
+STREAM_CHUNK_SIZE = 1 << 20
+
+# Bump when the extracted account fields change - invalidates stored parse results
+PARSER_VERSION = "2"
+
 
 class PensionPortfolioProcessor:
     """Service wrapper around the XML processing pipeline used in the misłaka tool."""
@@ -129,10 +155,57 @@ class PensionPortfolioProcessor:
         self.logger = logger or logging.getLogger(__name__)
 
     def process_file(self, content: str, file_name: str) -> dict:
-        processor = _PensionFileProcessor(content=content, file_name=file_name, logger=self.logger)
+        processor = _StreamingPensionFileProcessor(content=content, file_name=file_name, logger=self.logger)
+        return processor.process()
+
+    def process_chunks(self, chunks: Callable[[], Iterable[str]], file_name: str) -> dict:
+        """Process a file given as text chunks; ``chunks()`` must restart from the beginning on each call"""
+        processor = _StreamingPensionFileProcessor(content=None, file_name=file_name, logger=self.logger, chunks=chunks)
         return processor.process()
 
 
+class _AccountTagIndex:
+    """Tag index over a single account subtree, built in one pass.
+
+    Replaces repeated ``.//TAG`` descendant searches: every element gets a preorder
+    position and the position of its last descendant, so descendants of an element
+    with a given tag are a bisect slice of that tag's position list.
+    """
+
+    def __init__(self, account_elem: ET.Element):
+        self.elements: List[ET.Element] = []
+        self._ends: List[int] = []
+        self._positions: Dict[str, List[int]] = {}
+        self._walk(account_elem)
+
+    def _walk(self, elem: ET.Element) -> None:
+        position = len(self.elements)
+        self.elements.append(elem)
+        self._ends.append(position)
+        self._positions.setdefault(elem.tag, []).append(position)
+        for child in elem:
+            self._walk(child)
+        self._ends[position] = len(self.elements) - 1
+
+    def find_all(self, tag: str) -> List[ET.Element]:
+        """Same as ``account.findall(".//TAG")``"""
+        return [self.elements[position] for position in self._positions.get(tag, []) if position != 0]
+
+    def find_within(self, outer_tag: str, tag: str) -> List[ET.Element]:
+        """Same as ``account.findall(".//OUTER//TAG")`` (including duplicates for nested OUTER)"""
+        inner = self._positions.get(tag, [])
+        found: List[ET.Element] = []
+        if not inner:
+            return found
+        for outer in self._positions.get(outer_tag, []):
+            if outer == 0:
+                continue
+            low = bisect_right(inner, outer)
+            high = bisect_right(inner, self._ends[outer])
+            found.extend(self.elements[position] for position in inner[low:high])
+        return found
+
+
 class _PensionFileProcessor:
     """Processes the content of a single pension clearing house file."""
 
@@ -193,20 +266,8 @@ class _PensionFileProcessor:
         }
 
     def _locate_account_nodes(self, root: ET.Element) -> List[ET.Element]:
-        candidates = [
-            "HeshbonOPolisa",
-            "Heshbon",
-            "Account",
-            "Policy",
-            "Polisa",
-            "PensionAccount",
-            "PensionPolicy",
-            "KupatGemel",
-            "BituachMenahalim",
-            "KerenPensia",
-        ]
         nodes: List[ET.Element] = []
-        for name in candidates:
+        for name in ACCOUNT_NODE_TAGS:
             nodes.extend(root.findall(f".//{name}"))
 
         if not nodes:
@@ -242,6 +303,15 @@ class _PensionFileProcessor:
         return any(elem.find(f".//{tag}") is not None for tag in tag_candidates)
 
     def _extract_account(self, account_elem: ET.Element) -> Optional[Dict[str, Any]]:
+        fields = self._extract_account_fields(account_elem)
+        if fields is None:
+            return None
+        return self._build_account(fields, account_elem)
+
+    def _extract_account_fields(self, account_elem: ET.Element) -> Optional[Dict[str, Any]]:
+        """Values that depend only on the account subtree"""
+        index = _AccountTagIndex(account_elem)
+
         account_number = self._get_first_text(account_elem, [
             "MISPAR-POLISA-O-HESHBON",
             "MISPAR-HESHBON",
@@ -254,7 +324,14 @@ class _PensionFileProcessor:
             "SHEM_TOCHNIT",
         ]) or "לא ידוע"
 
-        managing_company = self._resolve_managing_company(account_elem)
+        balance = self._find_balance(account_elem, index)
+
+        if (
+            account_number == "לא ידוע"
+            and plan_name == "לא ידוע"
+            and balance == 0
+        ):
+            return None
 
         managing_code = self._get_first_text(account_elem, [
             "KOD-MEZAHE-YATZRAN",
@@ -262,7 +339,6 @@ class _PensionFileProcessor:
             "MEZAHE-YATZRAN",
         ])
 
-        balance = self._find_balance(account_elem)
         balance_date = self._get_first_text(account_elem, [
             "TAARICH-NECHONUT-YITROT",
             "TAARICH-YITROT",
@@ -281,12 +357,38 @@ class _PensionFileProcessor:
             "SUG-TOCHNIT-O-CHESHBON",
             "SUG-POLISA",
         ])
-        product_type = self._resolve_product_type(account_elem, product_type_code, plan_name)
 
-        employers = self._collect_employer_names(account_elem)
-        balance_fields = self._collect_balance_related_fields(account_elem)
+        return {
+            "account_number": account_number,
+            "plan_name": plan_name,
+            "managing_code": managing_code,
+            "balance": balance,
+            "balance_date": balance_date,
+            "start_date": start_date,
+            "product_type_code": product_type_code,
+            "direct_product_code": self._get_text(account_elem, "SUG-MUTZAR"),
+            "balance_fields": self._collect_balance_related_fields(index),
+            "tagmul_periods": self._collect_tagmul_periods(index),
+        }
+
+    def _build_account(self, fields: Dict[str, Any], scope: Any) -> Dict[str, Any]:
+        """Complete an account with values looked up in the account and its ancestors.
+
+        ``scope`` is the account element (DOM mode) or its ancestor chain (streaming mode).
+        """
+        account_number = fields["account_number"]
+        plan_name = fields["plan_name"]
+        balance = fields["balance"]
+        balance_fields = fields["balance_fields"]
+        tagmul_periods = fields["tagmul_periods"]
+
+        managing_company = self._resolve_managing_company(scope)
+        product_type = self._resolve_product_type(
+            scope, fields["product_type_code"], plan_name, fields["direct_product_code"]
+        )
+
+        employers = self._collect_employer_names(scope)
         severance_components = self._extract_severance_components(balance_fields)
-        tagmul_periods = self._collect_tagmul_periods(account_elem)
 
         total_contributions = sum(tagmul_periods.values())
         total_severance = sum(severance_components.values())
@@ -295,21 +397,14 @@ class _PensionFileProcessor:
         if abs(discrepancy) <= BALANCE_TOLERANCE:
             discrepancy = 0.0
 
-        if (
-            account_number == "לא ידוע"
-            and plan_name == "לא ידוע"
-            and balance == 0
-        ):
-            return None
-
         account = {
             "מספר_חשבון": account_number,
             "שם_תכנית": plan_name,
             "חברה_מנהלת": managing_company,
-            "קוד_חברה_מנהלת": managing_code or "",
+            "קוד_חברה_מנהלת": fields["managing_code"] or "",
             "יתרה": balance,
-            "תאריך_נכונות_יתרה": balance_date,
-            "תאריך_התחלה": start_date or "",
+            "תאריך_נכונות_יתרה": fields["balance_date"],
+            "תאריך_התחלה": fields["start_date"] or "",
             "סוג_מוצר": product_type,
             "מעסיקים_היסטוריים": ", ".join(employers),
             "רכיבי_פיצויים": severance_components,
@@ -343,10 +438,9 @@ class _PensionFileProcessor:
 
         return account
 
-    def _find_balance(self, account_elem: ET.Element) -> float:
+    def _find_balance(self, account_elem: ET.Element, index: _AccountTagIndex) -> float:
         total, count = self._sum_fields(
-            account_elem,
-            ".//BlockItrot//PerutYitrot",
+            index.find_within("BlockItrot", "PerutYitrot"),
             ["TOTAL-CHISACHON-MTZBR", "TOTAL-ERKEI-PIDION"],
         )
         if count > 0:
@@ -356,8 +450,7 @@ class _PensionFileProcessor:
                 return 0.0
 
         total, count = self._sum_fields(
-            account_elem,
-            ".//PerutMasluleiHashkaa",
+            index.find_all("PerutMasluleiHashkaa"),
             ["SCHUM-TZVIRA-BAMASLUL", "TOTAL-CHISACHON-MTZBR"],
         )
         if count > 0:
@@ -367,8 +460,7 @@ class _PensionFileProcessor:
                 return 0.0
 
         total, count = self._sum_fields(
-            account_elem,
-            ".//PerutYitrotLesofShanaKodemet",
+            index.find_all("PerutYitrotLesofShanaKodemet"),
             ["YITRAT-SOF-SHANA", "TOTAL-CHISACHON-MTZBR"],
         )
         if count > 0:
@@ -394,7 +486,7 @@ class _PensionFileProcessor:
                 return value
 
         potential: List[Tuple[float, float, str]] = []
-        for elem in account_elem.iter():
+        for elem in index.elements:
             if elem.text and any(ch.isdigit() for ch in elem.text):
                 try:
                     numeric = float(elem.text.replace(",", ""))
@@ -411,10 +503,10 @@ class _PensionFileProcessor:
 
         return 0.0
 
-    def _sum_fields(self, base_elem: ET.Element, xpath: str, field_candidates: List[str]) -> Tuple[float, int]:
+    def _sum_fields(self, nodes: List[ET.Element], field_candidates: List[str]) -> Tuple[float, int]:
         total = 0.0
         count = 0
-        for node in base_elem.findall(xpath):
+        for node in nodes:
             value: Optional[float] = None
             for field in field_candidates:
                 value = self._get_float(node, field)
@@ -475,10 +567,10 @@ class _PensionFileProcessor:
                 collected[tag] = " | ".join(values)
         return collected
 
-    def _collect_balance_related_fields(self, account_elem: ET.Element) -> Dict[str, str]:
+    def _collect_balance_related_fields(self, index: _AccountTagIndex) -> Dict[str, str]:
         collected: Dict[str, List[str]] = {}
         explicit = set(BALANCE_EXPLICIT_TAGS)
-        for node in account_elem.iter():
+        for node in index.elements:
             if not node.text or not node.text.strip():
                 continue
             tag_upper = node.tag.upper()
@@ -500,11 +592,11 @@ class _PensionFileProcessor:
             result[tag] = " | ".join(unique_values)
         return result
 
-    def _collect_tagmul_periods(self, account_elem: ET.Element) -> Dict[str, float]:
+    def _collect_tagmul_periods(self, index: _AccountTagIndex) -> Dict[str, float]:
         totals: Dict[Tuple[str, str], float] = {key: 0.0 for key in TAGMUL_PERIOD_COLUMNS}
         has_period_data = {"employee": False, "employer": False}
 
-        for period in account_elem.findall(".//BlockItrot//PerutYitraLeTkufa"):
+        for period in index.find_within("BlockItrot", "PerutYitraLeTkufa"):
             rekiv = self._get_text(period, "REKIV-ITRA-LETKUFA")
             techulat = self._get_text(period, "KOD-TECHULAT-SHICHVA")
             amount = self._get_float(period, "SACH-ITRA-LESHICHVA-BESHACH")
@@ -520,7 +612,7 @@ class _PensionFileProcessor:
             totals[(role, period_key)] += amount
 
         if not all(has_period_data.values()):
-            for yitrot in account_elem.findall(".//BlockItrot//PerutYitrot"):
+            for yitrot in index.find_within("BlockItrot", "PerutYitrot"):
                 sug = self._get_text(yitrot, "KOD-SUG-HAFRASHA")
                 amount = self._get_float(yitrot, "TOTAL-CHISACHON-MTZBR")
                 if amount is None or not sug:
@@ -541,7 +633,7 @@ class _PensionFileProcessor:
                 result[column_name] = total
         return result
 
-    def _collect_employer_names(self, account_elem: ET.Element) -> List[str]:
+    def _collect_employer_names(self, account_elem: Any) -> List[str]:
         names: List[str] = []
         seen: set[str] = set()
         for tag in EMPLOYER_NAME_TAGS:
@@ -553,9 +645,9 @@ class _PensionFileProcessor:
                     names.append(clean)
         return names
 
-    def _resolve_managing_company(self, account_elem: ET.Element) -> str:
+    def _resolve_managing_company(self, account_elem: Any) -> str:
         # חיפוש קודם כל ברמת החשבון וההורים
-        for tag in ["SHEM-YATZRAN", "SHEM-METAFEL", "SHEM_HA_MOSAD", "Provider", "Company"]:
+        for tag in MANAGING_COMPANY_NAME_TAGS:
             values = self._collect_tag_values(account_elem, tag, include_parents=True)
             for value in values:
                 clean = value.strip()
@@ -563,14 +655,20 @@ class _PensionFileProcessor:
                     return clean
 
         # fallback גלובלי
-        for tag in ["SHEM-YATZRAN", "SHEM-METAFEL", "SHEM_HA_MOSAD", "Provider", "Company"]:
+        for tag in MANAGING_COMPANY_NAME_TAGS:
             global_value = self._get_global_text(tag)
             if global_value:
                 return global_value
 
         return "לא ידוע"
 
-    def _resolve_product_type(self, account_elem: ET.Element, product_type_code: Optional[str], plan_name: str) -> str:
+    def _resolve_product_type(
+        self,
+        account_elem: Any,
+        product_type_code: Optional[str],
+        plan_name: str,
+        direct_code: str = "",
+    ) -> str:
         """Determine product type using the same rules as the mislaka PensionFileProcessor._get_product_type.
 
         The product_type_code argument is intentionally ignored to avoid overriding SUG-MUTZAR
@@ -578,9 +676,8 @@ class _PensionFileProcessor:
         """
 
         # 1. Try to infer from plan names (SHEM-TOCHNIT/TOCHNIT/SHEM_TOCHNIT)
-        plan_name_tags = ["SHEM-TOCHNIT", "TOCHNIT", "SHEM_TOCHNIT"]
         plan_names: List[str] = []
-        for tag in plan_name_tags:
+        for tag in PLAN_NAME_TAGS:
             names = self._collect_tag_values(account_elem, tag, include_parents=True)
             for name in names:
                 normalized = (name or "").strip()
@@ -619,8 +716,7 @@ class _PensionFileProcessor:
         # 2. Try to infer from SUG-MUTZAR codes only (no overrides from other type codes)
         codes = self._collect_tag_values(account_elem, "SUG-MUTZAR", include_parents=True)
         if not codes:
-            code = self._get_text(account_elem, "SUG-MUTZAR")
-            codes = [code] if code else []
+            codes = [direct_code] if direct_code else []
 
         code_type: Optional[str] = None
         for code in codes:
@@ -771,5 +867,211 @@ class _PensionFileProcessor:
             return None
 
 
+def _string_chunks(content: str) -> Iterator[str]:
+    for offset in range(0, len(content), STREAM_CHUNK_SIZE):
+        yield content[offset:offset + STREAM_CHUNK_SIZE]
+
+
+class _Frame:
+    """An open (or closed) element in the streaming parse.
+
+    ``values`` holds, per ancestor-lookup tag, the unique non-empty texts among the
+    element's descendants in document order (like ``elem.findall(".//TAG")``). It is
+    complete once the element closes, and merged into the parent at that point.
+    """
+
+    __slots__ = ("elem", "start", "rank", "values")
+
+    def __init__(self, elem: ET.Element, start: int, rank: Optional[int]):
+        self.elem = elem
+        self.start = start
+        self.rank = rank
+        self.values: Optional[Dict[str, Dict[str, None]]] = None
+
+    def add(self, tag: str, value: str) -> None:
+        if self.values is None:
+            self.values = {}
+        self.values.setdefault(tag, {}).setdefault(value)
+
+    def merge_into(self, parent: "_Frame") -> None:
+        for tag, values in (self.values or {}).items():
+            for value in values:
+                parent.add(tag, value)
+
+
+class _AccountScope:
+    """An account's ancestor chain (account first, root last) - stands in for the element
+    when looking up tags in the account and its ancestors after the tree was freed."""
+
+    __slots__ = ("frames",)
+
+    def __init__(self, frames: List[_Frame]):
+        self.frames = frames
+
+
+class _StreamingPensionFileProcessor(_PensionFileProcessor):
+    """Single-pass variant of _PensionFileProcessor with identical output.
+
+    Input is read as a sequence of text chunks (``chunks`` re-reads the source, e.g.
+    decoding the upload bytes incrementally), so the decoded file is never held as one
+    string. Each account subtree is extracted when it closes and then freed. Tags that
+    the DOM version searches for in the account's ancestors (managing company,
+    employers, plan names, product codes) are collected per open element and merged
+    into the parent as elements close, so only the open ancestor chain and the unique
+    values under it are kept; pending accounts are completed at the end of the file.
+
+    Files that fail to parse are repaired and files without any known account element
+    fall back to the DOM pipeline - both read the whole file into memory.
+    """
+
+    def __init__(
+        self,
+        content: Optional[str],
+        file_name: str,
+        logger: logging.Logger,
+        chunks: Optional[Callable[[], Iterable[str]]] = None,
+    ):
+        super().__init__(content=content or "", file_name=file_name, logger=logger)
+        self._chunks = chunks or (lambda: _string_chunks(self.content))
+        self._reset_stream_state()
+
+    def _reset_stream_state(self) -> None:
+        self._pending: List[Tuple[int, int, Dict[str, Any], _AccountScope]] = []
+        self._found_account_node = False
+        self._has_content = False
+        self._global_first: Dict[str, Tuple[int, Optional[str]]] = {}
+
+    def _cleaned(self, chunks: Iterable[str]) -> Iterator[str]:
+        """Drop EOF/NUL characters and leading whitespace, chunk by chunk"""
+        for chunk in chunks:
+            chunk = chunk.replace("\x1a", "").replace("\x00", "")
+            if not self._has_content:
+                chunk = chunk.lstrip()
+                if not chunk:
+                    continue
+                self._has_content = True
+            yield chunk
+
+    def _read_all(self) -> str:
+        return "".join(self._chunks()).replace("\x1a", "").replace("\x00", "").strip()
+
+    def process(self) -> Optional[dict]:
+        try:
+            self._stream(self._cleaned(self._chunks()))
+        except ET.ParseError as exc:
+            self.logger.warning("XML parse attempt 1 failed for %s: %s", self.file_name, exc)
+            # Repair needs the whole text - only files that failed to parse pay for it
+            repaired = self._try_fix_xml(self._read_all())
+            if repaired is None:
+                return None
+            self._reset_stream_state()
+            try:
+                self._stream(self._cleaned(_string_chunks(repaired)))
+            except ET.ParseError as exc:
+                self.logger.warning("XML parse attempt 2 failed for %s: %s", self.file_name, exc)
+                return None
+            self.logger.info("Successfully repaired XML for %s", self.file_name)
+        except Exception as exc:  # pragma: no cover - defensive
+            self.logger.exception("Unexpected error loading %s: %s", self.file_name, exc)
+            return None
+
+        if not self._has_content:
+            self.logger.warning("Empty content received for %s", self.file_name)
+            return None
+        if not self._found_account_node:
+            # Non-standard layout - account detection needs the whole tree
+            self.content = self._read_all()
+            return super().process()
+        return self._finish()
+
+    def _stream(self, chunks: Iterable[str]) -> None:
+        parser = ET.XMLPullParser(events=("start", "end"))
+        account_ranks = {tag: rank for rank, tag in enumerate(ACCOUNT_NODE_TAGS)}
+        stack: List[_Frame] = []
+        open_accounts = 0
+        seq = 0
+
+        for chunk in chunks:
+            parser.feed(chunk)
+            for event, elem in parser.read_events():
+                if event == "start":
+                    seq += 1
+                    # Like root.findall(".//TAG") - the root itself is never an account
+                    rank = account_ranks.get(elem.tag) if stack else None
+                    if rank is not None:
+                        open_accounts += 1
+                        self._found_account_node = True
+                    stack.append(_Frame(elem, seq, rank))
+                    continue
+
+                frame = stack.pop()
+                if stack:
+                    parent = stack[-1]
+                    # The element itself precedes its descendants in document order
+                    self._record_tag(elem, frame.start, parent)
+                    frame.merge_into(parent)
+
+                if frame.rank is not None:
+                    open_accounts -= 1
+                    fields = self._extract_account_fields(elem)
+                    if fields is not None:
+                        scope = _AccountScope([frame] + stack[::-1])
+                        self._pending.append((frame.rank, frame.start, fields, scope))
+
+                # Free everything that no open account still needs
+                if open_accounts == 0 and stack:
+                    stack[-1].elem.remove(elem)
+                    elem.clear()
+                frame.elem = None
+
+        if not self._has_content:
+            return
+        parser.close()
+        for _event, _elem in parser.read_events():  # pragma: no cover - close() emits no pending events
+            pass
+
+    def _record_tag(self, elem: ET.Element, start: int, parent: _Frame) -> None:
+        tag = elem.tag
+        if tag not in ANCESTOR_LOOKUP_TAGS:
+            return
+        text = elem.text
+        if text and text.strip():
+            parent.add(tag, text.strip())
+        if tag in MANAGING_COMPANY_NAME_TAGS:
+            first = self._global_first.get(tag)
+            if first is None or start < first[0]:
+                self._global_first[tag] = (start, text.strip() if text else None)
+
+    def _finish(self) -> dict:
+        accounts: List[Dict[str, Any]] = []
+        for _rank, _start, fields, scope in sorted(self._pending, key=lambda item: (item[0], item[1])):
+            accounts.append(self._build_account(fields, scope))
+
+        return {
+            "file": self.file_name,
+            "accounts": accounts,
+            "processed_at": datetime.now().isoformat(),
+        }
+
+    def _collect_tag_values(self, start_elem: Any, tag: str, include_parents: bool = True) -> List[str]:
+        if not isinstance(start_elem, _AccountScope):
+            return super()._collect_tag_values(start_elem, tag, include_parents=include_parents)
+
+        frames = start_elem.frames if include_parents else start_elem.frames[:1]
+        seen: set[str] = set()
+        unique_values: List[str] = []
+        for frame in frames:
+            for value in (frame.values or {}).get(tag, ()):
+                if value not in seen:
+                    seen.add(value)
+                    unique_values.append(value)
+        return unique_values
+
+    def _get_global_text(self, tag: str) -> Optional[str]:
+        if self.root is not None:
+            return super()._get_global_text(tag)
+        first = self._global_first.get(tag)
+        return first[1] if first and first[1] else None
+
 
 __all__ = ["PensionPortfolioProcessor"]
@@ -0,0 +1,116 @@
+"""Server-side storage for parsed clearing-house files and saved client portfolios.
+
+Parsed file results are keyed by the SHA-256 of the uploaded bytes, so re-uploading
+the same file skips decoding and parsing. Saved portfolios are immutable versions
+that scenario requests can reference by id instead of carrying the accounts.
+"""
+
+from __future__ import annotations
+
+import copy
+import hashlib
+import json
+import logging
+from typing import Any, Dict, Iterable, List, Optional
+
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+
+from app.models.pension_portfolio import ParsedPensionFile, PensionPortfolio
+
+from .processor import PARSER_VERSION
+
+logger = logging.getLogger(__name__)
+
+
+def content_sha256(data: bytes) -> str:
+    return hashlib.sha256(data).hexdigest()
+
+
+def accounts_sha256(accounts: List[Dict[str, Any]]) -> str:
+    encoded = json.dumps(accounts, sort_keys=True, default=str, ensure_ascii=False).encode("utf-8")
+    return hashlib.sha256(encoded).hexdigest()
+
+
+def relabel_result(result: Dict[str, Any], file_name: str) -> Dict[str, Any]:
+    """A stored result re-labelled with the name the file was uploaded under this time."""
+    result = copy.deepcopy(result)
+    result["file"] = file_name
+    for account in result.get("accounts", []):
+        if isinstance(account, dict) and "קובץ_מקור" in account:
+            account["קובץ_מקור"] = file_name
+    return result
+
+
+def get_parsed_files(db: Session, uploads: Dict[str, str]) -> Dict[str, Dict[str, Any]]:
+    """Stored results for {sha256: file_name}, parsed by the current parser version."""
+    if not uploads:
+        return {}
+    rows = (
+        db.query(ParsedPensionFile)
+        .filter(ParsedPensionFile.content_sha256.in_(list(uploads)))
+        .filter(ParsedPensionFile.parser_version == PARSER_VERSION)
+        .all()
+    )
+    return {row.content_sha256: relabel_result(row.result, uploads[row.content_sha256]) for row in rows}
+
+
+def store_parsed_files(db: Session, results: Iterable[tuple[str, Dict[str, Any]]]) -> None:
+    """Store (sha256, result) pairs, replacing results of an older parser version."""
+    for digest, result in results:
+        row = db.query(ParsedPensionFile).filter(ParsedPensionFile.content_sha256 == digest).first()
+        if row is None:
+            row = ParsedPensionFile(content_sha256=digest)
+            db.add(row)
+        row.parser_version = PARSER_VERSION
+        row.file_name = result.get("file")
+        row.result = result
+    try:
+        db.commit()
+    except IntegrityError:
+        # Same file uploaded concurrently - the other request already stored it
+        db.rollback()
+        logger.info("Parsed pension file already stored by a concurrent upload")
+
+
+def save_portfolio(
+    db: Session,
+    client_id: int,
+    accounts: List[Dict[str, Any]],
+    source_files: Optional[List[str]] = None,
+) -> PensionPortfolio:
+    """Save a new portfolio version, or return the latest one if its accounts are unchanged."""
+    digest = accounts_sha256(accounts)
+    latest = get_portfolio(db, client_id)
+    if latest is not None and latest.content_sha256 == digest:
+        return latest
+
+    portfolio = PensionPortfolio(
+        client_id=client_id,
+        content_sha256=digest,
+        accounts=accounts,
+        source_files=source_files,
+    )
+    db.add(portfolio)
+    db.commit()
+    db.refresh(portfolio)
+    return portfolio
+
+
+def get_portfolio(db: Session, client_id: int, portfolio_id: Optional[int] = None) -> Optional[PensionPortfolio]:
+    """A client's saved portfolio by id, or the latest one when no id is given."""
+    query = db.query(PensionPortfolio).filter(PensionPortfolio.client_id == client_id)
+    if portfolio_id is not None:
+        return query.filter(PensionPortfolio.id == portfolio_id).first()
+    return query.order_by(PensionPortfolio.id.desc()).first()
+
+
+__all__ = [
+    "accounts_sha256",
+    "content_sha256",
+    "get_parsed_files",
+    "get_portfolio",
+    "relabel_result",
+    "save_portfolio",
+    "store_parsed_files",
+]
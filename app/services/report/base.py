@@ -4,7 +4,7 @@ Provides backward compatibility with original report_service.py
 """
 import io
 import logging
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Optional
 from sqlalchemy.orm import Session
 
 from app.models import Client, Scenario
@@ -77,7 +77,8 @@ class ReportService:
         scenarios: List[Scenario],
         report_type: str = "comprehensive",
         include_charts: bool = True,
-        include_cashflow: bool = True
+        include_cashflow: bool = True,
+        db: Optional[Session] = None
     ) -> io.BytesIO:
         """
         Generate PDF report for client scenarios.
@@ -88,14 +89,17 @@ class ReportService:
             report_type: Type of report to generate
             include_charts: Whether to include charts
             include_cashflow: Whether to include cashflow data
+            db: Database session (a short-lived session is opened when omitted)
             
         Returns:
             PDF buffer
         """
+        own_session = db is None
         try:
             # Build summary data
-            from app.database import get_db
-            db = next(get_db())
+            if own_session:
+                from app.database import SessionLocal
+                db = SessionLocal()
             summary = DataService.build_summary_table(client, scenarios, db)
             
             # Generate charts if requested
@@ -145,6 +149,9 @@ class ReportService:
             doc.build(story)
             buffer.seek(0)
             return buffer
+        finally:
+            if own_session and db is not None:
+                db.close()
 
     @staticmethod
     def compose_pdf(
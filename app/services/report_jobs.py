@@ -0,0 +1,360 @@
+"""
+Background PDF report jobs.
+
+Report requests are submitted as jobs and rendered in a bounded process pool,
+so reportlab/matplotlib work never runs on an API worker. Finished PDFs go to
+a content-addressed artifact store; requests with the same parameters over the
+same client data map to the same request key and reuse the stored artifact (or
+the job already rendering it).
+"""
+import asyncio
+import hashlib
+import json
+import logging
+import multiprocessing
+import os
+import tempfile
+import threading
+import uuid
+from concurrent.futures import Executor, Future, ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from dataclasses import dataclass, field
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional
+
+from sqlalchemy import func, select
+from sqlalchemy.orm import Session
+
+_logger = logging.getLogger(__name__)
+
+REPORT_WORKERS = int(os.getenv("REPORT_WORKERS", "2"))
+REPORT_ARTIFACT_DIR = Path(os.getenv("REPORT_ARTIFACT_DIR", Path(tempfile.gettempdir()) / "retire_report_artifacts"))
+MAX_TRACKED_JOBS = 500
+
+# Bump when report layout changes - stored artifacts are then re-rendered
+REPORT_VERSION = "1"
+
+JOB_QUEUED = "queued"
+JOB_RUNNING = "running"
+JOB_DONE = "done"
+JOB_FAILED = "failed"
+
+
+class ArtifactStore:
+    """PDF files stored by the sha256 of their content, plus a request-key index."""
+
+    def __init__(self, root: Path):
+        self.root = Path(root)
+
+    def _artifact_path(self, digest: str) -> Path:
+        return self.root / "artifacts" / digest[:2] / f"{digest}.pdf"
+
+    def _key_path(self, request_key: str) -> Path:
+        return self.root / "keys" / request_key
+
+    @staticmethod
+    def _write_atomic(path: Path, data: bytes) -> None:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = path.with_name(f"{path.name}.{os.getpid()}.{threading.get_ident()}.tmp")
+        tmp_path.write_bytes(data)
+        os.replace(tmp_path, path)
+
+    def put(self, data: bytes, request_key: Optional[str] = None) -> str:
+        digest = hashlib.sha256(data).hexdigest()
+        path = self._artifact_path(digest)
+        if not path.exists():
+            self._write_atomic(path, data)
+        if request_key:
+            self._write_atomic(self._key_path(request_key), digest.encode("ascii"))
+        return digest
+
+    def path(self, digest: str) -> Optional[Path]:
+        path = self._artifact_path(digest)
+        return path if path.exists() else None
+
+    def lookup(self, request_key: str) -> Optional[str]:
+        """Artifact digest previously stored for this request key (if the file still exists)"""
+        try:
+            digest = self._key_path(request_key).read_text(encoding="ascii").strip()
+        except OSError:
+            return None
+        return digest if self.path(digest) else None
+
+
+@dataclass
+class ReportJob:
+    id: str
+    kind: str
+    request_key: str
+    filename: str
+    status: str = JOB_QUEUED
+    artifact: Optional[str] = None
+    size: Optional[int] = None
+    error: Optional[str] = None
+    error_type: Optional[str] = None
+    created_at: datetime = field(default_factory=datetime.now)
+    finished_at: Optional[datetime] = None
+    future: Optional[Future] = field(default=None, repr=False)
+    # Set once status/artifact/error are final
+    done: threading.Event = field(default_factory=threading.Event, repr=False, compare=False)
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "job_id": self.id,
+            "kind": self.kind,
+            "status": self.status,
+            "filename": self.filename,
+            "artifact": self.artifact,
+            "size": self.size,
+            "error": self.error,
+            "created_at": self.created_at.isoformat(),
+            "finished_at": self.finished_at.isoformat() if self.finished_at else None,
+        }
+
+
+def report_request_key(kind: str, params: Dict[str, Any], data_fingerprint: str) -> str:
+    payload = json.dumps([REPORT_VERSION, kind, params, data_fingerprint], sort_keys=True, default=str)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+def _client_row_filters(client_id: int):
+    """(table, where clause) for every row of the client that report renderers read"""
+    from app.models import (
+        AdditionalIncome, CapitalAsset, Client, Commutation, CurrentEmployer, Employer, EmployerGrant,
+        Employment, FixationResult, Grant, Pension, PensionFund, Scenario, TerminationEvent,
+    )
+
+    for model in (
+        Client, Scenario, PensionFund, CapitalAsset, AdditionalIncome, Grant, Pension,
+        Employment, TerminationEvent, CurrentEmployer, FixationResult,
+    ):
+        table = model.__table__
+        key_column = table.c.id if model is Client else table.c.client_id
+        yield table, key_column == client_id
+
+    # Rows that hang off the client's rows
+    yield EmployerGrant.__table__, EmployerGrant.__table__.c.employer_id.in_(
+        select(CurrentEmployer.id).where(CurrentEmployer.client_id == client_id)
+    )
+    yield Commutation.__table__, Commutation.__table__.c.pension_id.in_(
+        select(Pension.id).where(Pension.client_id == client_id)
+    )
+    yield Employer.__table__, Employer.__table__.c.id.in_(
+        select(Employment.employer_id).where(Employment.client_id == client_id)
+    )
+
+
+def reference_data_version(db: Session) -> str:
+    """Version of the shared reference data reports read (coefficients, indexation, tax data)"""
+    from app.models import IndexationFactor, PensionFundCoefficient
+    from app.services.tax_data.cache import tax_data_cache
+
+    digest = hashlib.sha256()
+    for table, changed_column in (
+        (PensionFundCoefficient.__table__, PensionFundCoefficient.__table__.c.updated_at),
+        (IndexationFactor.__table__, IndexationFactor.__table__.c.created_at),
+    ):
+        summary = db.execute(
+            select(func.count(), func.max(table.c.id), func.max(changed_column)).select_from(table)
+        ).one()
+        digest.update(f"{table.name}:{tuple(summary)!r}".encode("utf-8"))
+    digest.update(tax_data_cache.content_version().encode("ascii"))
+    return digest.hexdigest()
+
+
+def report_data_fingerprint(db: Session, client_id: int) -> str:
+    """Hash of the data a report reads - changes whenever the report content can change"""
+    digest = hashlib.sha256()
+    for table, where_clause in _client_row_filters(client_id):
+        rows = db.execute(select(table).where(where_clause).order_by(table.c.id)).all()
+        digest.update(table.name.encode("utf-8"))
+        digest.update(repr([tuple(row) for row in rows]).encode("utf-8"))
+    digest.update(reference_data_version(db).encode("ascii"))
+    return digest.hexdigest()
+
+
+def _init_worker() -> None:
+    """Report workers are already off the API workers - render charts in-process
+    instead of handing them to a nested chart worker pool"""
+    from utils import pdf_graphs
+
+    pdf_graphs.RENDER_IN_WORKER = False
+
+
+def _client_report(db: Session, params: Dict[str, Any]) -> bytes:
+    from app.models import Client, Scenario
+    from app.services.report_service import ReportService
+
+    client = db.query(Client).filter(Client.id == params["client_id"]).first()
+    if client is None:
+        raise ValueError(f"Client {params['client_id']} not found")
+    scenarios = db.query(Scenario).filter(Scenario.id.in_(params["scenario_ids"])).all()
+    scenarios.sort(key=lambda scenario: params["scenario_ids"].index(scenario.id))
+    buffer = ReportService.generate_pdf_report(
+        client=client,
+        scenarios=scenarios,
+        report_type=params.get("report_type", "comprehensive"),
+        include_charts=params.get("include_charts", True),
+        include_cashflow=params.get("include_cashflow", True),
+        db=db,
+    )
+    return buffer.getvalue()
+
+
+def _scenario_report(db: Session, params: Dict[str, Any]) -> bytes:
+    from app.schemas.report import ReportPdfRequest
+    from app.utils.contract_adapter import ReportServiceAdapter
+
+    pdf_bytes = ReportServiceAdapter.generate_pdf_report(
+        db=db,
+        client_id=params["client_id"],
+        scenario_id=params["scenario_id"],
+        request=ReportPdfRequest(**params["request"]),
+    )
+    if not pdf_bytes or len(pdf_bytes) < 100 or not pdf_bytes.startswith(b"%PDF"):
+        raise ValueError("Invalid PDF format generated")
+    return pdf_bytes
+
+
+_JOB_RENDERERS = {
+    "client_report": _client_report,
+    "scenario_report": _scenario_report,
+}
+
+
+def render_report(kind: str, params: Dict[str, Any]) -> bytes:
+    """Render one report with its own DB session (runs in a pool worker)"""
+    from app.database import SessionLocal
+
+    db = SessionLocal()
+    try:
+        return _JOB_RENDERERS[kind](db, params)
+    finally:
+        db.close()
+
+
+def _process_pool(max_workers: int) -> ProcessPoolExecutor:
+    # Forked workers would inherit the server's threads, locks and DB connections
+    start_method = "forkserver" if "forkserver" in multiprocessing.get_all_start_methods() else "spawn"
+    return ProcessPoolExecutor(
+        max_workers=max_workers,
+        mp_context=multiprocessing.get_context(start_method),
+        initializer=_init_worker,
+    )
+
+
+class ReportJobManager:
+    """Tracks report jobs and runs them in a bounded pool.
+
+    ``executor_factory`` builds the pool from ``max_workers`` (a process pool by default).
+    """
+
+    def __init__(
+        self,
+        store: ArtifactStore,
+        max_workers: int = REPORT_WORKERS,
+        executor_factory: Callable[[int], Executor] = _process_pool,
+    ):
+        self.store = store
+        self.max_workers = max(1, max_workers)
+        self._executor_factory = executor_factory
+        self._executor: Optional[Executor] = None
+        self._jobs: Dict[str, ReportJob] = {}
+        self._active_by_key: Dict[str, str] = {}
+        # Reentrant: a future that is already done runs _on_done inside submit
+        self._lock = threading.RLock()
+
+    def _get_executor(self) -> Executor:
+        if self._executor is None:
+            self._executor = self._executor_factory(self.max_workers)
+        return self._executor
+
+    def submit(self, kind: str, params: Dict[str, Any], data_fingerprint: str, filename: str) -> ReportJob:
+        """Submit a report job; identical requests return the running job or the stored artifact"""
+        if kind not in _JOB_RENDERERS:
+            raise ValueError(f"Unknown report kind: {kind}")
+        request_key = report_request_key(kind, params, data_fingerprint)
+
+        with self._lock:
+            active_id = self._active_by_key.get(request_key)
+            if active_id and active_id in self._jobs:
+                return self._jobs[active_id]
+
+            job = ReportJob(id=uuid.uuid4().hex, kind=kind, request_key=request_key, filename=filename)
+            self._jobs[job.id] = job
+            self._prune()
+
+            artifact = self.store.lookup(request_key)
+            if artifact:
+                self._finish(job, artifact)
+                job.done.set()
+                return job
+
+            self._active_by_key[request_key] = job.id
+            job.status = JOB_RUNNING
+            job.future = self._get_executor().submit(render_report, kind, params)
+            # Registered under the lock, so no request can join the job before its callback exists
+            job.future.add_done_callback(lambda future: self._on_done(job, future))
+        return job
+
+    def _finish(self, job: ReportJob, artifact: str) -> None:
+        job.artifact = artifact
+        path = self.store.path(artifact)
+        job.size = path.stat().st_size if path else None
+        job.status = JOB_DONE
+        job.finished_at = datetime.now()
+
+    def _on_done(self, job: ReportJob, future: Future) -> None:
+        try:
+            pdf_bytes = future.result()
+            artifact = self.store.put(pdf_bytes, job.request_key)
+            with self._lock:
+                self._finish(job, artifact)
+            _logger.info(f"Report job {job.id} ({job.kind}) done: {len(pdf_bytes)} bytes")
+        except Exception as e:
+            with self._lock:
+                job.status = JOB_FAILED
+                job.error = str(e)
+                job.error_type = type(e).__name__
+                job.finished_at = datetime.now()
+            _logger.error(f"Report job {job.id} ({job.kind}) failed: {e}")
+            if isinstance(e, BrokenProcessPool):
+                with self._lock:
+                    self._executor = None
+        finally:
+            with self._lock:
+                if self._active_by_key.get(job.request_key) == job.id:
+                    del self._active_by_key[job.request_key]
+                job.future = None
+            job.done.set()
+
+    def _prune(self) -> None:
+        """Forget the oldest finished jobs (their artifacts stay in the store)"""
+        if len(self._jobs) <= MAX_TRACKED_JOBS:
+            return
+        finished: List[ReportJob] = [job for job in self._jobs.values() if job.status in (JOB_DONE, JOB_FAILED)]
+        for job in finished[:len(self._jobs) - MAX_TRACKED_JOBS]:
+            del self._jobs[job.id]
+
+    async def wait(self, job: ReportJob) -> ReportJob:
+        """Wait (without blocking the event loop) until the job's result is recorded"""
+        if not job.done.is_set():
+            await asyncio.to_thread(job.done.wait)
+        return job
+
+    def get(self, job_id: str) -> Optional[ReportJob]:
+        with self._lock:
+            return self._jobs.get(job_id)
+
+    def artifact_path(self, job: ReportJob) -> Optional[Path]:
+        return self.store.path(job.artifact) if job.artifact else None
+
+    def shutdown(self) -> None:
+        with self._lock:
+            if self._executor is not None:
+                self._executor.shutdown(wait=False, cancel_futures=True)
+                self._executor = None
+
+
+report_jobs = ReportJobManager(ArtifactStore(REPORT_ARTIFACT_DIR))
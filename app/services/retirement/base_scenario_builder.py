@@ -15,6 +15,7 @@ from app.models.client import Client
 from app.models.pension_fund import PensionFund
 from app.models.capital_asset import CapitalAsset
 from app.models.additional_income import AdditionalIncome
+from app.services.client_aggregate import ClientAggregate, get_client_aggregate
 from .services import ConversionService, TerminationService, PortfolioImportService
 from .utils.calculation_utils import calculate_npv_dcf, calculate_years_to_age
 from .constants import DEFAULT_DISCOUNT_RATE
@@ -32,6 +33,7 @@ class BaseScenarioBuilder:
         retirement_age: int,
         pension_portfolio: Optional[List[Dict]] = None,
         use_current_employer_termination: bool = False,
+        aggregate: Optional[ClientAggregate] = None,
     ):
         self.db = db
         self.client_id = client_id
@@ -41,10 +43,9 @@ class BaseScenarioBuilder:
         self.scenario_results: Dict = {}
         self.execution_plan: List[Dict] = []
         
-        # Cache client and retirement date/year
-        self._client: Optional[Client] = (
-            self.db.query(Client).filter(Client.id == self.client_id).first()
-        )
+        # Cache client (shared request aggregate) and retirement date/year
+        self.aggregate: Optional[ClientAggregate] = aggregate or get_client_aggregate(self.db, self.client_id)
+        self._client: Optional[Client] = self.aggregate.client if self.aggregate else None
         self._retirement_date: Optional[date] = None
         self._retirement_year: Optional[int] = None
         
@@ -241,17 +242,15 @@ class BaseScenarioBuilder:
 
     def _calculate_scenario_results(self, scenario_name: str) -> Dict:
         """Calculate and return the scenario results"""
-        client = self._client or self.db.query(Client).filter(Client.id == self.client_id).first()
+        client = self._client
         
-        pension_funds = self.db.query(PensionFund).filter(
-            PensionFund.client_id == self.client_id
-        ).all()
-        capital_assets = self.db.query(CapitalAsset).filter(
-            CapitalAsset.client_id == self.client_id
-        ).all()
-        additional_incomes = self.db.query(AdditionalIncome).filter(
-            AdditionalIncome.client_id == self.client_id
-        ).all()
+        # התרחיש משנה את הנתונים (גם בכתיבות מרובות שעוקפות את הסשן), לכן האגרגט נטען מחדש
+        pension_funds = capital_assets = additional_incomes = []
+        if self.aggregate:
+            self.aggregate.refresh()
+            pension_funds = self.aggregate.pension_funds
+            capital_assets = self.aggregate.capital_assets
+            additional_incomes = self.aggregate.additional_incomes
         
         total_pension_monthly = sum(float(pf.pension_amount or 0) for pf in pension_funds)
 
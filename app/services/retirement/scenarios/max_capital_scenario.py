@@ -104,9 +104,7 @@ class MaxCapitalScenario(BaseScenarioBuilder):
         results = self._calculate_scenario_results(scenario_name)
 
         # חישוב סך הון בפועל לפי נכסי הון הקיימים לאחר התרחיש
-        capital_assets = self.db.query(CapitalAsset).filter(
-            CapitalAsset.client_id == self.client_id
-        ).all()
+        capital_assets = self.aggregate.capital_assets if self.aggregate else []
 
         total_capital = 0.0
         for ca in capital_assets:
@@ -71,9 +71,7 @@ class MaxNPVScenario(BaseScenarioBuilder):
         """
         results = self._calculate_scenario_results(scenario_name)
 
-        capital_assets = self.db.query(CapitalAsset).filter(
-            CapitalAsset.client_id == self.client_id
-        ).all()
+        capital_assets = self.aggregate.capital_assets if self.aggregate else []
 
         total_capital = 0.0
         for ca in capital_assets:
@@ -6,10 +6,11 @@ import logging
 import json
 from datetime import date, datetime
 from typing import List, Dict, Optional, Callable
+from sqlalchemy import insert, update
 from sqlalchemy.orm import Session
-from app.models.pension_fund import PensionFund
+from app.models.pension_fund import PensionFund, update_client_pension_start_dates
 from app.models.client import Client
-from app.services.annuity_coefficient import get_annuity_coefficient
+from app.services.annuity_coefficient import get_annuity_coefficients
 
 logger = logging.getLogger("app.scenarios.portfolio")
 
@@ -59,6 +60,9 @@ class PortfolioImportService:
         else:
             retirement_year = date.today().year
         
+        # שלב 1: חישוב היתרה, הרכיבים ויחס המס לכל חשבון בזיכרון
+        prepared: List[Dict] = []
+        coefficient_requests: List[Dict] = []
         for account in pension_portfolio:
             # חישוב יתרה כוללת מכל הרכיבים
             raw_balance = float(account.get('יתרה', 0) or 0)
@@ -112,79 +116,111 @@ class PortfolioImportService:
                     f"{account.get('שם_תכנית')} - tax exempt"
                 )
 
-            # ניסיון לחישוב מקדם קצבה דינמי מטבלאות המקדמים
-            annuity_factor = 180.0  # ברירת מחדל אם אין נתונים
-            try:
-                # נגזרת תאריך התחלת התכנית
-                start_date_raw = account.get('תאריך_התחלה')
-                start_date_obj: Optional[date] = None
-                if start_date_raw:
+            # נגזרת תאריך התחלת התכנית
+            start_date_raw = account.get('תאריך_התחלה')
+            start_date_obj: Optional[date] = None
+            if start_date_raw:
+                try:
+                    # ניסיון כפורמט ISO (YYYY-MM-DD)
+                    start_date_obj = date.fromisoformat(start_date_raw)
+                except (TypeError, ValueError):
                     try:
-                        # ניסיון כפורמט ISO (YYYY-MM-DD)
-                        start_date_obj = date.fromisoformat(start_date_raw)
-                    except ValueError:
-                        try:
-                            # ניסיון כפורמט DD/MM/YYYY
-                            start_date_obj = datetime.strptime(
-                                start_date_raw, "%d/%m/%Y"
-                            ).date()
-                        except Exception:
-                            start_date_obj = None
-                
-                coeff = get_annuity_coefficient(
-                    product_type=product_type,
-                    start_date=start_date_obj or date(retirement_year, 1, 1),
-                    gender=getattr(client, "gender", None) or "זכר",
-                    retirement_age=retirement_age or 67,
-                    company_name=account.get('חברה_מנהלת'),
-                    option_name=None,
-                    survivors_option='תקנוני',
-                    spouse_age_diff=0,
-                    target_year=retirement_year,
-                    birth_date=getattr(client, "birth_date", None),
-                    pension_start_date=retirement_date or None,
+                        # ניסיון כפורמט DD/MM/YYYY
+                        start_date_obj = datetime.strptime(
+                            start_date_raw, "%d/%m/%Y"
+                        ).date()
+                    except Exception:
+                        start_date_obj = None
+
+            prepared.append({
+                "account": account,
+                "balance": balance,
+                "specific_amounts": specific_amounts,
+                "product_type": product_type,
+                "tax_treatment": tax_treatment,
+            })
+            coefficient_requests.append(dict(
+                product_type=product_type,
+                start_date=start_date_obj or date(retirement_year, 1, 1),
+                gender=getattr(client, "gender", None) or "זכר",
+                retirement_age=retirement_age or 67,
+                company_name=account.get('חברה_מנהלת'),
+                option_name=None,
+                survivors_option='תקנוני',
+                spouse_age_diff=0,
+                target_year=retirement_year,
+                birth_date=getattr(client, "birth_date", None),
+                pension_start_date=retirement_date or None,
+            ))
+
+        # שלב 2: מקדמי קצבה דינמיים לכל החשבונות בקריאה אחת לאינדקס המקדמים
+        try:
+            coefficients = get_annuity_coefficients(coefficient_requests)
+        except Exception as e:
+            logger.warning(f"  ⚠️ Failed to get annuity coefficients, using defaults: {e}")
+            coefficients = [{"error": str(e)}] * len(prepared)
+
+        # שלב 3: שליפת כל המוצרים שכבר יובאו בשאילתה אחת (למניעת כפילויות)
+        account_numbers = {item["account"].get('מספר_חשבון', '') for item in prepared}
+        existing_by_number: Dict[str, PensionFund] = {}
+        if account_numbers:
+            existing_rows = self.db.query(PensionFund).filter(
+                PensionFund.client_id == self.client_id,
+                PensionFund.deduction_file.in_(account_numbers),
+                PensionFund.conversion_source.like('%"source": "pension_portfolio"%')
+            ).order_by(PensionFund.id).all()
+            for row in existing_rows:
+                existing_by_number.setdefault(row.deduction_file, row)
+
+        updates: Dict[int, Dict] = {}
+        inserts: Dict[str, Dict] = {}
+        for item, coeff in zip(prepared, coefficients):
+            account = item["account"]
+            balance = item["balance"]
+            tax_treatment = item["tax_treatment"]
+            product_type = item["product_type"]
+
+            annuity_factor = 180.0  # ברירת מחדל אם אין נתונים
+            if coeff.get("error"):
+                logger.warning(
+                    f"  ⚠️ Failed to get annuity coefficient for "
+                    f"{account.get('שם_תכנית')}, using default {annuity_factor}: {coeff['error']}"
                 )
+            else:
                 annuity_factor = float(coeff.get("factor_value") or annuity_factor)
                 logger.info(
                     f"  📊 Annuity factor from table for {account.get('שם_תכנית')}: "
                     f"{annuity_factor} (source={coeff.get('source_table')})"
                 )
-            except Exception as e:
-                logger.warning(
-                    f"  ⚠️ Failed to get annuity coefficient for "
-                    f"{account.get('שם_תכנית')}, using default {annuity_factor}: {e}"
-                )
             
-            # בדיקה אם המוצר כבר קיים (למניעת כפילויות)
             account_number = account.get('מספר_חשבון', '')
-            existing_pf = self.db.query(PensionFund).filter(
-                PensionFund.client_id == self.client_id,
-                PensionFund.deduction_file == account_number,
-                PensionFund.conversion_source.like('%"source": "pension_portfolio"%')
-            ).first()
+            existing_pf = existing_by_number.get(account_number)
+            changes = {"balance": balance, "annuity_factor": annuity_factor, "tax_treatment": tax_treatment}
             
-            if existing_pf:
+            if existing_pf is not None:
                 # עדכן מוצר קיים
-                existing_pf.balance = balance
-                existing_pf.annuity_factor = annuity_factor
-                existing_pf.tax_treatment = tax_treatment
-                logger.info(f"  🔄 Updated existing: {existing_pf.fund_name} - Balance: {balance:,.0f} ₪")
-                pf = existing_pf
+                updates[existing_pf.id] = {"id": existing_pf.id, **changes}
+                fund_name = existing_pf.fund_name
+                logger.info(f"  🔄 Updated existing: {fund_name} - Balance: {balance:,.0f} ₪")
+            elif account_number in inserts:
+                # אותו מספר חשבון הופיע כבר בייבוא הנוכחי
+                inserts[account_number].update(changes)
+                fund_name = inserts[account_number]["fund_name"]
+                logger.info(f"  🔄 Updated existing: {fund_name} - Balance: {balance:,.0f} ₪")
             else:
                 # יצירת PensionFund חדש
-                pf = PensionFund(
-                    client_id=self.client_id,
-                    fund_name=account.get('שם_תכנית', 'תכנית ללא שם'),
-                    fund_type=account.get('סוג_מוצר', 'unknown'),
-                    input_mode="manual",
-                    balance=balance,
-                    annuity_factor=annuity_factor,
-                    pension_amount=None,  # יחושב בתרחיש
-                    pension_start_date=None,  # יוגדר בתרחיש
-                    indexation_method="none",
-                    tax_treatment=tax_treatment,  # יחס למס
-                    deduction_file=account_number,
-                    conversion_source=json.dumps({
+                fund_name = account.get('שם_תכנית', 'תכנית ללא שם')
+                inserts[account_number] = {
+                    "client_id": self.client_id,
+                    "fund_name": fund_name,
+                    "fund_type": account.get('סוג_מוצר', 'unknown'),
+                    "input_mode": "manual",
+                    **changes,
+                    "pension_amount": None,  # יחושב בתרחיש
+                    "pension_start_date": None,  # יוגדר בתרחיש
+                    "indexation_method": "none",
+                    "deduction_file": account_number,
+                    "conversion_source": json.dumps({
                         "type": "pension_portfolio",
                         "source": "pension_portfolio",
                         "account_name": account.get('שם_תכנית'),
@@ -192,27 +228,35 @@ class PortfolioImportService:
                         "account_number": account_number,
                         "product_type": product_type,
                         "amount": balance,
-                        "specific_amounts": specific_amounts,
+                        "specific_amounts": item["specific_amounts"],
                         "conversion_date": date.today().isoformat(),
                         "tax_treatment": tax_treatment,
                         "original_balance": balance,
-                    }, ensure_ascii=False)
-                )
-                
-                self.db.add(pf)
-                logger.info(f"  ✅ Imported NEW: {pf.fund_name} - Balance: {balance:,.0f} ₪")
+                    }, ensure_ascii=False),
+                }
+                logger.info(f"  ✅ Imported NEW: {fund_name} - Balance: {balance:,.0f} ₪")
             
             tax_status = "פטור ממס" if tax_treatment == "exempt" else "חייב במס"
-            logger.info(f"  ✅ Imported: {pf.fund_name} - Balance: {balance:,.0f} ₪ (Factor: {annuity_factor}, {tax_status})")
+            logger.info(f"  ✅ Imported: {fund_name} - Balance: {balance:,.0f} ₪ (Factor: {annuity_factor}, {tax_status})")
             
             if self.add_action:
                 self.add_action(
                     "import",
-                    f"ייבוא מתיק פנסיוני: {pf.fund_name} ({tax_status})",
+                    f"ייבוא מתיק פנסיוני: {fund_name} ({tax_status})",
                     from_asset=f"תיק פנסיוני: {account.get('מספר_חשבון')}",
                     to_asset=f"יתרה: {balance:,.0f} ₪ ({tax_status})",
                     amount=balance
                 )
         
+        # שלב 4: כתיבה מרוכזת - UPDATE אחד ו-INSERT אחד, ועדכון שדות הלקוח הנגזרים פעם אחת
         self.db.flush()
+        if updates:
+            self.db.execute(update(PensionFund), list(updates.values()))
+            # האובייקטים שנטענו אינם מתעדכנים אוטומטית מ-UPDATE מרוכז
+            for pf in existing_by_number.values():
+                self.db.expire(pf)
+        if inserts:
+            self.db.execute(insert(PensionFund), list(inserts.values()))
+        if updates or inserts:
+            update_client_pension_start_dates(self.db, [self.client_id])
         logger.info(f"  ✅ Imported {len(pension_portfolio)} pension accounts")
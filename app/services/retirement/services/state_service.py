@@ -4,13 +4,14 @@ State management service for retirement scenarios
 """
 import logging
 from typing import Dict
+from sqlalchemy import insert
 from sqlalchemy.orm import Session
-from app.models.pension_fund import PensionFund
+from app.models.pension_fund import PensionFund, update_client_pension_start_dates
 from app.models.capital_asset import CapitalAsset
 from app.models.additional_income import AdditionalIncome
 from app.models.termination_event import TerminationEvent
 from app.models.client import Client
-from ..utils.pension_utils import compute_pension_start_date_from_funds
+from app.services.client_aggregate import invalidate_client_aggregate
 from ..utils.serialization_utils import (
     serialize_pension_fund,
     serialize_capital_asset,
@@ -64,29 +65,22 @@ class StateService:
         self.db.query(AdditionalIncome).filter(AdditionalIncome.client_id == self.client_id).delete()
         self.db.query(TerminationEvent).filter(TerminationEvent.client_id == self.client_id).delete()
         
-        # Restore from state
-        for pf_data in state["pension_funds"]:
-            pf = PensionFund(**pf_data)
-            self.db.add(pf)
+        # Restore from state - one multi-row INSERT per table
+        for model, key in (
+            (PensionFund, "pension_funds"),
+            (CapitalAsset, "capital_assets"),
+            (AdditionalIncome, "additional_incomes"),
+            (TerminationEvent, "termination_events"),
+        ):
+            if state[key]:
+                self.db.execute(insert(model), state[key])
         
-        for ca_data in state["capital_assets"]:
-            ca = CapitalAsset(**ca_data)
-            self.db.add(ca)
-        
-        for ai_data in state["additional_incomes"]:
-            ai = AdditionalIncome(**ai_data)
-            self.db.add(ai)
-        
-        for te_data in state["termination_events"]:
-            te = TerminationEvent(**te_data)
-            self.db.add(te)
-        
-        # לאחר השחזור, נעדכן את תאריך תחילת הקצבה של הלקוח לפי הקצבאות
-        client = self.db.query(Client).filter(Client.id == self.client_id).first()
+        # הכנסה מרובה עוקפת את מאזיני השורה - תאריך תחילת הקצבה של הלקוח מחושב פעם אחת
+        update_client_pension_start_dates(self.db, [self.client_id])
+        client = self.db.get(Client, self.client_id)
         if client:
-            effective_pension_start_date = compute_pension_start_date_from_funds(self.db, client)
-            client.pension_start_date = effective_pension_start_date
-            self.db.add(client)
+            self.db.expire(client, ["pension_start_date"])
+        invalidate_client_aggregate(self.db, self.client_id)
 
         self.db.flush()
         logger.info(f"  🔄 Restored state: {len(state['pension_funds'])} pension funds, {len(state['capital_assets'])} capital assets")
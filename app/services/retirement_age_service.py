@@ -2,11 +2,15 @@
 שירות חישוב גיל פרישה לפי חוק ישראלי
 מחשב את גיל הפרישה המדויק לפי תאריך לידה ומגדר
 """
+from bisect import bisect_right
 from datetime import date
 from dateutil.relativedelta import relativedelta
-from typing import Dict, Optional
+from functools import lru_cache
+from typing import Dict, Iterable, List, Optional, Tuple
+import copy
 import json
 import os
+import threading
 
 # נתיב לקובץ הגדרות
 SETTINGS_FILE = os.path.join(os.path.dirname(__file__), '..', '..', 'retirement_age_settings.json')
@@ -72,33 +76,83 @@ FEMALE_RETIREMENT_AGE_TABLE = {
     ("1970-01", "2100-12"): {"years": 65, "months": 0},
 }
 
+MALE_GENDERS = {"male", "m", "זכר"}
+FEMALE_GENDERS = {"female", "f", "נקבה"}
 
-def load_retirement_age_settings() -> Dict:
-    """טעינת הגדרות גיל פרישה מקובץ JSON"""
-    try:
-        if os.path.exists(SETTINGS_FILE):
-            with open(SETTINGS_FILE, 'r', encoding='utf-8') as f:
-                return json.load(f)
-    except Exception as e:
-        print(f"Error loading retirement age settings: {e}")
-    
-    # ברירת מחדל
+
+def _month_key(value: str) -> int:
+    """המרת 'YYYY-MM' למספר חודש רציף (לחיפוש בינארי)"""
+    year, month = value.split("-")
+    return int(year) * 12 + int(month) - 1
+
+
+def _compile_female_table() -> Tuple[List[int], List[int], List[Dict[str, int]]]:
+    """טבלת החוק כרשימות ממוינות של תחילת/סוף טווח (מספרי חודש) וגיל הפרישה"""
+    rows = sorted(
+        (_month_key(start), _month_key(end), age_data)
+        for (start, end), age_data in FEMALE_RETIREMENT_AGE_TABLE.items()
+    )
+    return [row[0] for row in rows], [row[1] for row in rows], [row[2] for row in rows]
+
+
+# הטבלה המהודרת נבנית פעם אחת בטעינת המודול
+_FEMALE_TABLE_STARTS, _FEMALE_TABLE_ENDS, _FEMALE_TABLE_AGES = _compile_female_table()
+
+# מטמון הגדרות - נטען מחדש רק כאשר זמן השינוי של הקובץ משתנה
+_settings_cache: Dict[str, object] = {"mtime": None, "settings": None}
+_settings_lock = threading.Lock()
+
+
+def _default_settings() -> Dict:
     return {
         "male_retirement_age": DEFAULT_MALE_RETIREMENT_AGE,
         "use_legal_table_for_women": True
     }
 
 
+def load_retirement_age_settings() -> Dict:
+    """טעינת הגדרות גיל פרישה מקובץ JSON (מהמטמון אם הקובץ לא השתנה)"""
+    try:
+        mtime = os.stat(SETTINGS_FILE).st_mtime_ns
+    except OSError:
+        mtime = None
+
+    with _settings_lock:
+        if _settings_cache["settings"] is not None and _settings_cache["mtime"] == mtime:
+            return copy.deepcopy(_settings_cache["settings"])
+
+        settings = None
+        if mtime is not None:
+            try:
+                with open(SETTINGS_FILE, 'r', encoding='utf-8') as f:
+                    settings = json.load(f)
+            except Exception as e:
+                print(f"Error loading retirement age settings: {e}")
+
+        if settings is None:
+            # ברירת מחדל
+            settings = _default_settings()
+
+        _settings_cache["mtime"] = mtime
+        _settings_cache["settings"] = settings
+        return copy.deepcopy(settings)
+
+
 def save_retirement_age_settings(settings: Dict) -> bool:
     """שמירת הגדרות גיל פרישה לקובץ JSON"""
     try:
         with open(SETTINGS_FILE, 'w', encoding='utf-8') as f:
             json.dump(settings, f, ensure_ascii=False, indent=2)
-        return True
     except Exception as e:
         print(f"Error saving retirement age settings: {e}")
         return False
 
+    # אילוץ טעינה מחדש גם אם זמן השינוי לא השתנה (רזולוציית שעון של מערכת הקבצים)
+    with _settings_lock:
+        _settings_cache["mtime"] = None
+        _settings_cache["settings"] = None
+    return True
+
 
 def get_female_retirement_age_from_table(birth_date: date) -> Dict[str, int]:
     """
@@ -110,16 +164,56 @@ def get_female_retirement_age_from_table(birth_date: date) -> Dict[str, int]:
     Returns:
         Dict עם years ו-months
     """
-    birth_str = birth_date.strftime("%Y-%m")
-    
-    for (start, end), age_data in FEMALE_RETIREMENT_AGE_TABLE.items():
-        if start <= birth_str <= end:
-            return age_data
+    birth_key = birth_date.year * 12 + birth_date.month - 1
+
+    index = bisect_right(_FEMALE_TABLE_STARTS, birth_key) - 1
+    if index >= 0 and birth_key <= _FEMALE_TABLE_ENDS[index]:
+        return _FEMALE_TABLE_AGES[index]
     
     # ברירת מחדל - 65 שנים (לנשים שנולדו מ-1970 ואילך)
     return {"years": 65, "months": 0}
 
 
+def _settings_signature(settings: Dict) -> Tuple:
+    return (
+        settings.get("male_retirement_age", DEFAULT_MALE_RETIREMENT_AGE),
+        settings.get("use_legal_table_for_women", True),
+        settings.get("female_retirement_age", 65),
+    )
+
+
+@lru_cache(maxsize=8192)
+def _retirement_age_for_month(birth_year: int, birth_month: int, is_male: bool, signature: Tuple) -> Tuple[int, int, str]:
+    """
+    גיל פרישה (שנים, חודשים, מקור) לפי חודש לידה ומגדר - מחושב פעם אחת לכל צירוף.
+    signature כולל את ההגדרות הרלוונטיות, כך ששינוי הגדרות יוצר מפתח חדש.
+    """
+    male_age, use_legal_table_for_women, female_age = signature
+    if is_male:
+        # גברים - גיל פרישה קבוע
+        return male_age, 0, "settings"
+    if use_legal_table_for_women:
+        # נשים - לפי טבלת החוק
+        age_data = get_female_retirement_age_from_table(date(birth_year, birth_month, 1))
+        return age_data["years"], age_data["months"], "legal_table"
+    # אם לא משתמשים בטבלה, משתמשים בהגדרה ידנית
+    return female_age, 0, "settings"
+
+
+def _calculate_retirement_age(birth_date: date, gender: str, signature: Tuple) -> Dict[str, any]:
+    # נרמול מגדר
+    is_male = (gender or "").strip().lower() in MALE_GENDERS
+    age_years, age_months, source = _retirement_age_for_month(
+        birth_date.year, birth_date.month, is_male, signature
+    )
+    return {
+        "age_years": age_years,
+        "age_months": age_months,
+        "retirement_date": birth_date + relativedelta(years=age_years, months=age_months),
+        "source": source
+    }
+
+
 def calculate_retirement_age(birth_date: date, gender: str) -> Dict[str, any]:
     """
     חישוב גיל פרישה מדויק לפי תאריך לידה ומגדר
@@ -136,38 +230,21 @@ def calculate_retirement_age(birth_date: date, gender: str) -> Dict[str, any]:
         - source: מקור החישוב (settings/legal_table)
     """
     settings = load_retirement_age_settings()
+    return _calculate_retirement_age(birth_date, gender, _settings_signature(settings))
+
+
+def calculate_retirement_ages(people: Iterable[Tuple[date, str]]) -> List[Dict[str, any]]:
+    """
+    חישוב גיל פרישה לרשימת לקוחות בבת אחת (ההגדרות נטענות פעם אחת)
     
-    # נרמול מגדר
-    gender_normalized = (gender or "").strip().lower()
-    is_male = gender_normalized in {"male", "m", "זכר"}
-    
-    if is_male:
-        # גברים - גיל פרישה קבוע
-        age_years = settings.get("male_retirement_age", DEFAULT_MALE_RETIREMENT_AGE)
-        age_months = 0
-        retirement_date = birth_date + relativedelta(years=age_years)
-        source = "settings"
-    else:
-        # נשים - לפי טבלת החוק או הגדרות
-        if settings.get("use_legal_table_for_women", True):
-            age_data = get_female_retirement_age_from_table(birth_date)
-            age_years = age_data["years"]
-            age_months = age_data["months"]
-            retirement_date = birth_date + relativedelta(years=age_years, months=age_months)
-            source = "legal_table"
-        else:
-            # אם לא משתמשים בטבלה, משתמשים בהגדרה ידנית
-            age_years = settings.get("female_retirement_age", 65)
-            age_months = 0
-            retirement_date = birth_date + relativedelta(years=age_years)
-            source = "settings"
-    
-    return {
-        "age_years": age_years,
-        "age_months": age_months,
-        "retirement_date": retirement_date,
-        "source": source
-    }
+    Args:
+        people: זוגות של (תאריך לידה, מגדר)
+        
+    Returns:
+        רשימת תוצאות בפורמט calculate_retirement_age, באותו סדר
+    """
+    signature = _settings_signature(load_retirement_age_settings())
+    return [_calculate_retirement_age(birth_date, gender, signature) for birth_date, gender in people]
 
 
 def get_retirement_age_simple(birth_date: date, gender: str) -> int:
@@ -213,11 +290,16 @@ def calc_eligibility_date(birthdate: date, gender: str) -> date:
     # גבר / זכר / מין לא ידוע -> זכאות בגיל 67
     # אישה / נקבה -> זכאות בגיל 62
     gender_normalized = (gender or "").strip().lower()
-    is_female = gender_normalized in {"female", "f", "נקבה"}
+    is_female = gender_normalized in FEMALE_GENDERS
     years = 62 if is_female else 67
     return birthdate + relativedelta(years=years)
 
 
+def calc_eligibility_dates(people: Iterable[Tuple[date, str]]) -> List[date]:
+    """חישוב תאריכי זכאות לקיבוע זכויות לרשימת לקוחות (זוגות של תאריך לידה ומגדר)"""
+    return [calc_eligibility_date(birthdate, gender) for birthdate, gender in people]
+
+
 # קבועים לתאימות לאחור
 ELIG_AGE_MALE = DEFAULT_MALE_RETIREMENT_AGE
 ELIG_AGE_FEMALE = 65  # ערך ברירת מחדל לנשים
@@ -4,6 +4,7 @@
 
 מודול זה מפוצל למספר תת-מודולים לשיפור הארגון והתחזוקה:
 - indexation: חישובי הצמדה למדד
+- indexation_factors: מטמון מקדמי הצמדה לפי (חודש מקור, חודש יעד)
 - work_ratio: חישוב יחס עבודה ב-32 השנים האחרונות
 - exemption_caps: תקרות והון פטור
 - grant_impact: חישוב פגיעה בהון הפטור
@@ -17,6 +18,12 @@ from .indexation import (
     index_grant
 )
 
+from .indexation_factors import (
+    get_indexation_factor,
+    clear_indexation_factor_cache,
+    indexation_factor_cache_info
+)
+
 from .work_ratio import (
     work_ratio_within_last_32y,
     ratio_last_32y
@@ -26,6 +33,7 @@ from .exemption_caps import (
     get_monthly_cap,
     get_exemption_percentage,
     calc_exempt_capital,
+    get_parameters_version,
     ANNUAL_CAPS,
     EXEMPTION_PERCENTAGES,
     MULTIPLIER
@@ -47,7 +55,10 @@ from .idf_fixation import (
 
 from .core import (
     process_grant,
-    calculate_full_fixation
+    process_grants,
+    calculate_full_fixation,
+    calculate_full_fixation_memoized,
+    clear_fixation_result_cache
 )
 
 # רשימת כל הפונקציות והמשתנים הציבוריים
@@ -55,6 +66,9 @@ __all__ = [
     # Indexation
     'calculate_adjusted_amount',
     'index_grant',
+    'get_indexation_factor',
+    'clear_indexation_factor_cache',
+    'indexation_factor_cache_info',
     
     # Work Ratio
     'work_ratio_within_last_32y',
@@ -64,6 +78,7 @@ __all__ = [
     'get_monthly_cap',
     'get_exemption_percentage',
     'calc_exempt_capital',
+    'get_parameters_version',
     'ANNUAL_CAPS',
     'EXEMPTION_PERCENTAGES',
     'MULTIPLIER',
@@ -81,5 +96,8 @@ __all__ = [
     
     # Core
     'process_grant',
-    'calculate_full_fixation'
+    'process_grants',
+    'calculate_full_fixation',
+    'calculate_full_fixation_memoized',
+    'clear_fixation_result_cache'
 ]
@@ -1,14 +1,46 @@
 """
 מודול ליבה - פונקציות שירות מרכזיות לקיבוע זכויות
 """
-from typing import Dict, Any, Optional, Union
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Any, List, Optional, Tuple, Union
 from datetime import date
+import copy
 import logging
+import os
+import threading
 
+from .exemption_caps import get_parameters_version
 from .grant_impact import compute_grant_effect, compute_client_exemption
+from .indexation_factors import is_index_final
+from .payload import fixation_input_hash
 
 logger = logging.getLogger(__name__)
 
+# מספר מרבי של מענקים המעובדים במקביל (משותף לכל הבקשות בתהליך)
+MAX_CONCURRENT_GRANTS = int(os.getenv("FIXATION_MAX_CONCURRENT_GRANTS", "8"))
+
+_grant_executor: Optional[ThreadPoolExecutor] = None
+_grant_executor_lock = threading.Lock()
+
+# מטמון תוצאות קיבוע לפי hash של נתוני הקלט
+RESULT_CACHE_MAX_SIZE = int(os.getenv("FIXATION_RESULT_CACHE_SIZE", "512"))
+
+_result_cache: "OrderedDict[Tuple[str, str], Dict[str, Any]]" = OrderedDict()
+_result_cache_lock = threading.Lock()
+
+
+def _get_grant_executor() -> ThreadPoolExecutor:
+    global _grant_executor
+    if _grant_executor is None:
+        with _grant_executor_lock:
+            if _grant_executor is None:
+                _grant_executor = ThreadPoolExecutor(
+                    max_workers=MAX_CONCURRENT_GRANTS,
+                    thread_name_prefix="fixation-grant",
+                )
+    return _grant_executor
+
 
 def process_grant(
     grant: Dict[str, Any], 
@@ -31,6 +63,43 @@ def process_grant(
     return grant
 
 
+def _process_grant_safely(
+    grant: Dict[str, Any],
+    eligibility_date: Union[str, date],
+    birth_date: Optional[Union[str, date]],
+    gender: Optional[str]
+) -> Dict[str, Any]:
+    """עיבוד מענק שכשל בו לא מפיל את שאר המענקים - המענק מוחזר ללא חישובים"""
+    try:
+        return process_grant(grant, eligibility_date, birth_date, gender)
+    except Exception as e:
+        logger.error(f"שגיאה בעיבוד מענק {grant.get('employer_name')}: {e}")
+        return grant
+
+
+def process_grants(
+    grants: List[Dict[str, Any]],
+    eligibility_date: Union[str, date],
+    birth_date: Optional[Union[str, date]] = None,
+    gender: Optional[str] = None
+) -> List[Dict[str, Any]]:
+    """
+    מעבד רשימת מענקים במקביל (הצמדה מול הלמ"ס היא החלק האיטי)
+
+    זמן הריצה הכולל הוא בערך זמן המענק האיטי ביותר ולא סכום כל המענקים.
+    הסדר המקורי של המענקים נשמר.
+    """
+    if len(grants) <= 1:
+        return [_process_grant_safely(g, eligibility_date, birth_date, gender) for g in grants]
+
+    executor = _get_grant_executor()
+    futures = [
+        executor.submit(_process_grant_safely, grant, eligibility_date, birth_date, gender)
+        for grant in grants
+    ]
+    return [future.result() for future in futures]
+
+
 def calculate_full_fixation(client_data: Dict[str, Any]) -> Dict[str, Any]:
     """
     מחשב קיבוע זכויות מלא עבור לקוח
@@ -48,11 +117,8 @@ def calculate_full_fixation(client_data: Dict[str, Any]) -> Dict[str, Any]:
         if not eligibility_date:
             raise ValueError("חסר תאריך זכאות")
             
-        # עיבוד כל המענקים עם נתוני לקוח
-        processed_grants = []
-        for grant in grants:
-            processed_grant = process_grant(grant, eligibility_date, birth_date, gender)
-            processed_grants.append(processed_grant)
+        # עיבוד כל המענקים עם נתוני לקוח (במקביל)
+        processed_grants = process_grants(grants, eligibility_date, birth_date, gender)
         
         # חישוב סיכום הפטור
         exemption_summary = compute_client_exemption(processed_grants, eligibility_year)
@@ -71,3 +137,59 @@ def calculate_full_fixation(client_data: Dict[str, Any]) -> Dict[str, Any]:
             'exemption_summary': {},
             'error': str(e)
         }
+
+
+def fixation_cache_key(client_data: Dict[str, Any]) -> Tuple[str, str]:
+    """
+    מפתח מטמון לתוצאת קיבוע: hash של נתוני הקלט וגרסת הפרמטרים.
+
+    כאשר מדד חודש הזכאות טרם פורסם ההצמדה עשויה להשתנות, ולכן
+    המפתח כולל גם את תאריך החישוב (התוצאה תקפה עד סוף היום).
+    """
+    key_data = dict(client_data)
+    key_data['parameters_version'] = get_parameters_version()
+    eligibility_date = client_data.get('eligibility_date')
+    final = bool(eligibility_date) and is_index_final(eligibility_date)
+    return fixation_input_hash(key_data), '' if final else (client_data.get('computation_date') or date.today().isoformat())
+
+
+def _is_cacheable(result: Dict[str, Any]) -> bool:
+    """לא שומרים במטמון תוצאה שבה הצמדה של מענק נכשלה"""
+    if not isinstance(result, dict) or result.get('error'):
+        return False
+    return all(
+        'indexed_full' in grant and not grant.get('indexation_fallback')
+        for grant in result.get('grants', [])
+    )
+
+
+def calculate_full_fixation_memoized(client_data: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    כמו calculate_full_fixation, אך מחזיר תוצאה שמורה כאשר נתוני הקלט
+    (מענקים, תאריך לידה, מגדר, תאריך זכאות, גרסת פרמטרים) לא השתנו
+    """
+    key = fixation_cache_key(client_data)
+    with _result_cache_lock:
+        cached = _result_cache.get(key)
+        if cached is not None:
+            _result_cache.move_to_end(key)
+
+    if cached is not None:
+        result = copy.deepcopy(cached)
+        # calculate_full_fixation מעדכן את המענקים בקלט במקום - שומרים על אותה התנהגות
+        client_data['grants'] = copy.deepcopy(result.get('grants', []))
+        return result
+
+    result = calculate_full_fixation(client_data)
+    if _is_cacheable(result):
+        with _result_cache_lock:
+            _result_cache[key] = copy.deepcopy(result)
+            while len(_result_cache) > RESULT_CACHE_MAX_SIZE:
+                _result_cache.popitem(last=False)
+    return result
+
+
+def clear_fixation_result_cache() -> None:
+    """ניקוי מטמון תוצאות הקיבוע"""
+    with _result_cache_lock:
+        _result_cache.clear()
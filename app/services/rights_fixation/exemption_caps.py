@@ -1,6 +1,8 @@
 """
 מודול תקרות והון פטור - ניהול תקרות פיצויים ואחוזי פטור לפי שנים
 """
+import hashlib
+import json
 
 # מיפוי שנה → תקרה שנתית פיצויים
 ANNUAL_CAPS = {
@@ -75,3 +77,18 @@ def calc_exempt_capital(year: int) -> float:
     חישוב: תקרה שנתית פיצויים × 180 × אחוז פטור
     """
     return get_monthly_cap(year) * MULTIPLIER * get_exemption_percentage(year)
+
+
+def get_parameters_version() -> str:
+    """
+    גרסת פרמטרי הקיבוע - hash קצר של התקרות, אחוזי הפטור והמכפיל.
+    שינוי באחד מהם (למשל עדכון שנתי) משנה את הגרסה, וכך ניתן לזהות
+    תוצאות קיבוע שמורות שחושבו לפי פרמטרים ישנים.
+    """
+    params = {
+        "annual_caps": ANNUAL_CAPS,
+        "exemption_percentages": EXEMPTION_PERCENTAGES,
+        "multiplier": MULTIPLIER,
+    }
+    encoded = json.dumps(params, sort_keys=True).encode("utf-8")
+    return hashlib.sha256(encoded).hexdigest()[:12]
@@ -42,7 +42,8 @@ def compute_grant_effect(
         logger.info(f"DEBUG: Indexed amount result: {indexed_full}")
         
         # אם יש כשל בהצמדה (למשל בעיית תקשורת ל-API), נ fallback לסכום הנומינלי
-        if indexed_full is None:
+        indexation_fallback = indexed_full is None
+        if indexation_fallback:
             logger.error(f"כשל בהצמדת מענק, שימוש בסכום נומינלי כ-fallback: {grant}")
             indexed_full = float(grant['grant_amount'])
             
@@ -98,6 +99,8 @@ def compute_grant_effect(
         # הוספת סיבת החרגה אם קיימת
         if exclusion_reason:
             result['exclusion_reason'] = exclusion_reason
+        if indexation_fallback:
+            result['indexation_fallback'] = True
             
         return result
         
@@ -1,15 +1,13 @@
 """
 מודול הצמדה למדד - חישובי הצמדה באמצעות API של הלמ"ס
 """
-import requests
 from datetime import datetime, date
 from typing import Optional, Union
 import logging
 
-logger = logging.getLogger(__name__)
+from .indexation_factors import CBS_CPI_API, index_amount  # noqa: F401
 
-# CBS Consumer Price Index API endpoint
-CBS_CPI_API = "https://api.cbs.gov.il/index/data/calculator/120010"
+logger = logging.getLogger(__name__)
 
 
 def calculate_adjusted_amount(
@@ -52,33 +50,11 @@ def calculate_adjusted_amount(
             logger.error(f"שגיאה בניתוח תאריכים: {e}")
             return None
             
-        params = {
-            'value': amount, 
-            'date': grant_date_str,  # תאריך המענק
-            'toDate': to_date_str,  # תאריך יעד להצמדה
-            'format': 'json', 
-            'download': 'false',
-            'lang': 'he'  # לוודא שהתוצאות בעברית
-        }
-        
-        logger.info(f"Calling CBS API with params: {params}")
-        response = requests.get(CBS_CPI_API, params=params, timeout=10)
-        response.raise_for_status()
-        data = response.json()
-        
-        logger.info(f"Raw API response: {data}")
-        
-        answer = data.get('answer')
-        if not answer:
-            logger.warning(f'אזהרה: API ללא answer | תשובה: {data}')
-            return None
-            
-        to_value = answer.get('to_value')
-        if to_value is None:
-            logger.warning(f'אזהרה: אין to_value | תשובה: {data}')
+        # ההצמדה לינארית בסכום - מקדם החודשים נשלף מהמטמון והמכפלה מתבצעת מקומית
+        result = index_amount(amount, from_date, to_date_parsed)
+        if result is None:
             return None
         
-        result = round(float(to_value), 2)
         logger.info(f"Calculated adjusted amount: {amount} from {grant_date_str} to {to_date_str} = {result}")
         return result
         
@@ -0,0 +1,202 @@
+"""
+מטמון מקדמי הצמדה למדד - מקדם אחד לכל צמד (חודש מקור, חודש יעד)
+
+ההצמדה לינארית בסכום, ולכן אין צורך לשאול את הלמ"ס על כל סכום בנפרד:
+מספיק לקבל פעם אחת את המקדם בין שני החודשים ולהכפיל בו מקומית.
+המטמון דו-שכבתי:
+- LRU בזיכרון התהליך
+- טבלת indexation_factor במסד הנתונים (רק למקדמים סופיים, שהמדדים שלהם כבר פורסמו)
+"""
+from datetime import datetime, date
+from functools import lru_cache
+from typing import Optional, Union
+import logging
+import os
+import threading
+
+import requests
+from requests.adapters import HTTPAdapter
+from sqlalchemy.exc import IntegrityError, SQLAlchemyError
+
+logger = logging.getLogger(__name__)
+
+# CBS Consumer Price Index API endpoint
+CBS_CPI_API = "https://api.cbs.gov.il/index/data/calculator/120010"
+
+# סכום בסיס לשאילתת המקדם - גדול מספיק כדי שעיגול התשובה לאגורות לא יפגע בדיוק
+FACTOR_BASE_VALUE = 1_000_000
+
+# מדד של חודש מתפרסם באמצע החודש שאחריו; מקדם נחשב סופי רק אם שני החודשים
+# רחוקים לפחות כמספר זה של חודשים מהחודש הנוכחי
+FINAL_INDEX_LAG_MONTHS = 2
+
+LRU_MAX_SIZE = 4096
+
+# גודל מאגר החיבורים המשותף ל-API של הלמ"ס (מקביל למספר המענקים המעובדים במקביל)
+CBS_HTTP_POOL_SIZE = int(os.getenv("CBS_HTTP_POOL_SIZE", "8"))
+
+_http_session: Optional[requests.Session] = None
+_http_session_lock = threading.Lock()
+
+
+def get_cbs_session() -> requests.Session:
+    """Session משותף עם מאגר חיבורים, כדי לא לפתוח חיבור TLS חדש לכל מענק"""
+    global _http_session
+    if _http_session is None:
+        with _http_session_lock:
+            if _http_session is None:
+                session = requests.Session()
+                adapter = HTTPAdapter(pool_connections=1, pool_maxsize=CBS_HTTP_POOL_SIZE)
+                session.mount("https://", adapter)
+                _http_session = session
+    return _http_session
+
+
+def month_key(value: Union[str, date]) -> str:
+    """ממיר תאריך (או מחרוזת YYYY-MM-DD) למפתח חודש בפורמט YYYY-MM"""
+    if isinstance(value, str):
+        value = datetime.strptime(value[:10], '%Y-%m-%d').date()
+    return f"{value.year:04d}-{value.month:02d}"
+
+
+def _month_index(key: str) -> int:
+    year, month = key.split('-')
+    return int(year) * 12 + int(month) - 1
+
+
+def _is_final(from_month: str, to_month: str, today: Optional[date] = None) -> bool:
+    """האם שני המדדים כבר פורסמו, כך שהמקדם לא ישתנה בעתיד"""
+    today = today or date.today()
+    current = today.year * 12 + today.month - 1
+    return max(_month_index(from_month), _month_index(to_month)) <= current - FINAL_INDEX_LAG_MONTHS
+
+
+def is_index_final(value: Union[str, date], today: Optional[date] = None) -> bool:
+    """האם המדד של החודש הנתון כבר פורסם (ולכן הצמדה אליו לא תשתנה)"""
+    key = month_key(value)
+    return _is_final(key, key, today)
+
+
+def _fetch_factor_from_cbs(from_month: str, to_month: str) -> Optional[float]:
+    """שאילתת מקדם הצמדה מה-API של הלמ"ס (לפי היום הראשון בכל חודש)"""
+    params = {
+        'value': FACTOR_BASE_VALUE,
+        'date': f"{from_month}-01",
+        'toDate': f"{to_month}-01",
+        'format': 'json',
+        'download': 'false',
+        'lang': 'he'
+    }
+    response = get_cbs_session().get(CBS_CPI_API, params=params, timeout=10)
+    response.raise_for_status()
+    data = response.json()
+
+    answer = data.get('answer')
+    if not answer or answer.get('to_value') is None:
+        logger.warning(f'אזהרה: API ללא to_value עבור {from_month} -> {to_month} | תשובה: {data}')
+        return None
+
+    return float(answer['to_value']) / FACTOR_BASE_VALUE
+
+
+def _load_persisted_factor(from_month: str, to_month: str) -> Optional[float]:
+    from app.database import SessionLocal
+    from app.models.indexation_factor import IndexationFactor
+
+    try:
+        with SessionLocal() as db:
+            row = (
+                db.query(IndexationFactor.factor)
+                .filter(
+                    IndexationFactor.from_month == from_month,
+                    IndexationFactor.to_month == to_month,
+                )
+                .first()
+            )
+            return float(row[0]) if row else None
+    except SQLAlchemyError as e:
+        logger.warning(f"שגיאה בקריאת מקדם הצמדה שמור {from_month} -> {to_month}: {e}")
+        return None
+
+
+def _persist_factor(from_month: str, to_month: str, factor: float) -> None:
+    from app.database import SessionLocal
+    from app.models.indexation_factor import IndexationFactor
+
+    try:
+        with SessionLocal() as db:
+            db.add(IndexationFactor(from_month=from_month, to_month=to_month, factor=factor))
+            try:
+                db.commit()
+            except IntegrityError:
+                # תהליך אחר כבר שמר את אותו מקדם
+                db.rollback()
+    except SQLAlchemyError as e:
+        logger.warning(f"שגיאה בשמירת מקדם הצמדה {from_month} -> {to_month}: {e}")
+
+
+@lru_cache(maxsize=LRU_MAX_SIZE)
+def _cached_factor(from_month: str, to_month: str, as_of: str) -> float:
+    """
+    מקדם הצמדה עם מטמון בזיכרון.
+
+    as_of ריק עבור מקדמים סופיים; עבור מקדמים זמניים הוא התאריך הנוכחי,
+    כך שהם מתחדשים פעם ביום. כשל נזרק כחריגה כדי שלא יישמר במטמון.
+    """
+    final = not as_of
+    if final:
+        persisted = _load_persisted_factor(from_month, to_month)
+        if persisted is not None:
+            return persisted
+
+    factor = _fetch_factor_from_cbs(from_month, to_month)
+    if factor is None:
+        raise LookupError(f"no CPI factor for {from_month} -> {to_month}")
+
+    if final:
+        _persist_factor(from_month, to_month, factor)
+    return factor
+
+
+def get_indexation_factor(
+    from_date: Union[str, date],
+    to_date: Union[str, date]
+) -> Optional[float]:
+    """
+    מחזיר את מקדם ההצמדה בין חודש from_date לחודש to_date
+
+    :return: מקדם (1.0 כאשר החודשים זהים) או None בשגיאה
+    """
+    from_month = month_key(from_date)
+    to_month = month_key(to_date)
+    if from_month == to_month:
+        return 1.0
+
+    as_of = '' if _is_final(from_month, to_month) else date.today().isoformat()
+    try:
+        return _cached_factor(from_month, to_month, as_of)
+    except Exception as e:
+        logger.error(f'שגיאה בקבלת מקדם הצמדה {from_month} -> {to_month}: {e}')
+        return None
+
+
+def index_amount(
+    amount: float,
+    from_date: Union[str, date],
+    to_date: Union[str, date]
+) -> Optional[float]:
+    """מצמיד סכום באמצעות מקדם מהמטמון; מחזיר None אם אין מקדם"""
+    factor = get_indexation_factor(from_date, to_date)
+    if factor is None:
+        return None
+    return round(float(amount) * factor, 2)
+
+
+def clear_indexation_factor_cache() -> None:
+    """ניקוי המטמון בזיכרון (הטבלה השמורה אינה נמחקת)"""
+    _cached_factor.cache_clear()
+
+
+def indexation_factor_cache_info():
+    """סטטיסטיקות LRU (hits/misses/currsize)"""
+    return _cached_factor.cache_info()
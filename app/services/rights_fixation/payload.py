@@ -0,0 +1,80 @@
+"""
+מודול קלט לקיבוע זכויות - בניית payload אחיד מנתוני לקוח ומענקים, וחתימת hash שלו
+"""
+from datetime import date
+from typing import Any, Dict, Iterable, Optional
+import hashlib
+import json
+
+from .exemption_caps import get_parameters_version
+
+
+def build_fixation_payload(
+    client,
+    grants: Iterable,
+    pension_start_date: Optional[date],
+    today: Optional[date] = None
+) -> Dict[str, Any]:
+    """
+    בונה את נתוני הקלט לחישוב קיבוע זכויות מלא עבור לקוח
+
+    תאריך הזכאות לחישוב הוא המאוחר מבין גיל הפרישה החוקי לתחילת הקצבה בפועל,
+    ובהיעדר תאריך לידה/מגדר - תאריך החישוב (computation_date), שאינו נכלל ב-input_hash.
+
+    :param client: אובייקט Client
+    :param grants: מענקי הלקוח (Grant)
+    :param pension_start_date: תאריך תחילת קצבה אפקטיבי (מקרנות הפנסיה)
+    :param today: תאריך החישוב (ברירת מחדל - היום)
+    :return: payload כולל parameters_version ו-input_hash
+    """
+    from app.services.retirement_age_service import calc_eligibility_date
+
+    eligibility_date = (
+        calc_eligibility_date(client.birth_date, client.gender)
+        if client.birth_date and client.gender else None
+    )
+
+    effective_eligibility_date: Optional[date] = None
+    if eligibility_date:
+        effective_eligibility_date = eligibility_date
+        if pension_start_date and pension_start_date > effective_eligibility_date:
+            effective_eligibility_date = pension_start_date
+
+    computation_date = None if effective_eligibility_date else (today or date.today())
+    eligibility_date_to_use = effective_eligibility_date or computation_date
+    payload: Dict[str, Any] = {
+        "id": client.id,
+        "birth_date": client.birth_date.isoformat() if client.birth_date else None,
+        "gender": client.gender,
+        "grants": [
+            {
+                "grant_amount": grant.grant_amount,
+                "work_start_date": grant.work_start_date.isoformat() if grant.work_start_date else None,
+                "work_end_date": grant.work_end_date.isoformat() if grant.work_end_date else None,
+                "grant_date": grant.grant_date.isoformat() if getattr(grant, "grant_date", None) else None,
+                "employer_name": grant.employer_name,
+            }
+            for grant in grants
+        ],
+        "eligibility_date": eligibility_date_to_use.isoformat(),
+        "eligibility_year": eligibility_date_to_use.year,
+        "effective_pension_start_date": pension_start_date.isoformat() if pension_start_date else None,
+        "computation_date": computation_date.isoformat() if computation_date else None,
+        "parameters_version": get_parameters_version(),
+    }
+    payload["input_hash"] = fixation_input_hash(payload)
+    return payload
+
+
+def fixation_input_hash(payload: Dict[str, Any]) -> str:
+    """hash יציב של נתוני הקלט (ללא השדה input_hash עצמו)
+
+    תאריך זכאות שנלקח מתאריך החישוב אינו נתון של הלקוח - נחתם כ-None,
+    אחרת ה-hash היה משתנה מדי יום והתוצאה השמורה נחשבת מיושנת.
+    """
+    data = {key: value for key, value in payload.items() if key not in ("input_hash", "computation_date")}
+    if payload.get("computation_date"):
+        data["eligibility_date"] = None
+        data["eligibility_year"] = None
+    encoded = json.dumps(data, sort_keys=True, default=str, ensure_ascii=False).encode("utf-8")
+    return hashlib.sha256(encoded).hexdigest()
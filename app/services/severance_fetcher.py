@@ -3,6 +3,7 @@
 Severance Cap Fetcher - Real API integration with unit detection and normalization
 """
 import requests
+import hashlib
 import json
 import re
 import os
@@ -14,17 +15,21 @@ from decimal import Decimal
 from typing import Dict, Any, Optional, List
 
 logger = logging.getLogger("severance_fetcher")
-os.makedirs("/tmp/data_snapshots", exist_ok=True)
+SNAPSHOT_DIR = "/tmp/data_snapshots"
 
 def save_raw(bytes_or_text, prefix="api_raw", ext="bin"):
-    ts = datetime.datetime.utcnow().strftime("%Y%m%dT%H%M%SZ")
-    fn = f"/tmp/data_snapshots/{prefix}_{ts}.{ext}"
-    mode = "wb" if isinstance(bytes_or_text, (bytes, bytearray)) else "w"
-    with open(fn, mode, encoding="utf-8" if mode=="w" else None) as f:
-        if mode == "wb":
-            f.write(bytes_or_text)
-        else:
-            f.write(bytes_or_text)
+    """
+    Save a raw API snapshot, named by content hash so an unchanged response
+    is written only once
+    """
+    data = bytes_or_text if isinstance(bytes_or_text, (bytes, bytearray)) else bytes_or_text.encode("utf-8")
+    digest = hashlib.sha256(data).hexdigest()[:16]
+    fn = f"{SNAPSHOT_DIR}/{prefix}_{digest}.{ext}"
+    if os.path.exists(fn):
+        return fn
+    os.makedirs(SNAPSHOT_DIR, exist_ok=True)
+    with open(fn, "wb") as f:
+        f.write(data)
     return fn
 
 def clean_number_token(s):
@@ -2,24 +2,55 @@
 System Snapshot Service
 שירות לשמירה ושחזור מצב מערכת מלא
 """
+import hashlib
 import logging
-from typing import Dict, Optional
+import zlib
+from decimal import Decimal
+from enum import Enum
+from typing import Any, Dict, List, Optional
+from sqlalchemy import insert
+from sqlalchemy.exc import IntegrityError
 from sqlalchemy.orm import Session
 from datetime import datetime, date
 import json
 
 from app.models.client import Client
-from app.models.pension_fund import PensionFund
+from app.models.pension_fund import PensionFund, update_client_pension_start_dates
 from app.models.capital_asset import CapitalAsset
 from app.models.additional_income import AdditionalIncome
 from app.models.grant import Grant
 from app.models.current_employment import CurrentEmployer, EmployerGrant
 from app.models.termination_event import TerminationEvent
 from app.models.fixation_result import FixationResult
-from app.services.retirement.utils.pension_utils import compute_pension_start_date_from_funds
+from app.models.snapshot import ClientSnapshot, SnapshotBlob
 
 logger = logging.getLogger("app.snapshot")
 
+# סעיפים שמגיעים מצד הלקוח (localStorage) ונשמרים יחד עם ה-snapshot
+CLIENT_SIDE_SECTIONS = ("pension_portfolio", "converted_accounts")
+SNAPSHOT_COMPRESSION_LEVEL = 6
+
+
+class SnapshotNotFoundError(ValueError):
+    """snapshot שאינו קיים בהיסטוריה של הלקוח"""
+
+
+def _json_default(value: Any):
+    if isinstance(value, Enum):
+        return value.value
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    if isinstance(value, Decimal):
+        return float(value)
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+
+
+def _encode_section(value: Any) -> bytes:
+    """JSON קנוני של סעיף - אותו תוכן נותן תמיד אותו hash"""
+    return json.dumps(
+        value, sort_keys=True, ensure_ascii=False, separators=(",", ":"), default=_json_default
+    ).encode("utf-8")
+
 
 def _parse_date(date_str: Optional[str]) -> Optional[date]:
     """ממיר string של תאריך לאובייקט date"""
@@ -51,9 +82,9 @@ class SnapshotService:
     def __init__(self, db: Session):
         self.db = db
     
-    def save_snapshot(self, client_id: int, snapshot_name: str = None) -> Dict:
+    def collect_snapshot(self, client_id: int, snapshot_name: str = None) -> Dict:
         """
-        שמירת snapshot מלא של מצב הלקוח
+        איסוף snapshot מלא של מצב הלקוח (ללא שמירה)
         
         Args:
             client_id: מזהה לקוח
@@ -108,9 +139,6 @@ class SnapshotService:
         logger.info(f"     - Grants (current employer): {len(snapshot_data['data']['grants'])}")
         logger.info(f"     - Legacy Grants (rights fixation): {len(snapshot_data['data']['legacy_grants'])}")
 
-        # שמירה ב-localStorage (client-side) או בקובץ (server-side)
-        # כרגע נחזיר את הנתונים, הם יישמרו ב-localStorage בצד הלקוח
-        
         return {
             "success": True,
             "snapshot": snapshot_data,
@@ -118,6 +146,159 @@ class SnapshotService:
             "message": f"נשמרו {total_items} פריטים בהצלחה"
         }
     
+    def save_snapshot(self, client_id: int, snapshot_name: str = None, client_side_data: Optional[Dict] = None) -> Dict:
+        """
+        שמירת snapshot בצד השרת
+        
+        כל סעיף נשמר דחוס לפי ה-hash של התוכן שלו, כך שסעיפים שלא השתנו
+        מאז ה-snapshot הקודם אינם נשמרים שוב.
+        
+        Args:
+            client_id: מזהה לקוח
+            snapshot_name: שם אופציונלי ל-snapshot
+            client_side_data: סעיפים מצד הלקוח (תיק פנסיוני, חשבונות שהומרו)
+            
+        Returns:
+            Dict עם מזהה ה-snapshot ופרטיו
+        """
+        collected = self.collect_snapshot(client_id, snapshot_name)
+        snapshot_data = collected["snapshot"]
+        
+        sections = dict(snapshot_data["data"])
+        for name in CLIENT_SIDE_SECTIONS:
+            if client_side_data and client_side_data.get(name) is not None:
+                sections[name] = client_side_data[name]
+        
+        section_hashes, new_sections = self._store_sections(sections)
+        
+        snapshot = ClientSnapshot(
+            client_id=client_id,
+            snapshot_name=snapshot_data["snapshot_name"],
+            sections=section_hashes,
+            total_items=collected["total_items"],
+            created_at=datetime.fromisoformat(snapshot_data["created_at"]),
+        )
+        self.db.add(snapshot)
+        self.db.commit()
+        
+        logger.info(
+            f"  💾 Snapshot {snapshot.id} stored: {new_sections} new sections, "
+            f"{len(section_hashes) - new_sections} unchanged"
+        )
+        
+        return {
+            "success": True,
+            "snapshot_id": snapshot.id,
+            "snapshot_name": snapshot.snapshot_name,
+            "created_at": snapshot_data["created_at"],
+            "total_items": collected["total_items"],
+            "new_sections": new_sections,
+            "reused_sections": len(section_hashes) - new_sections,
+            "message": collected["message"]
+        }
+    
+    def _store_sections(self, sections: Dict[str, Any]) -> tuple:
+        """שומר סעיפים דחוסים שעוד לא קיימים. מחזיר (שם סעיף -> hash, מספר סעיפים חדשים)"""
+        encoded = {}
+        section_hashes = {}
+        for name, value in sections.items():
+            raw = _encode_section(value)
+            digest = hashlib.sha256(raw).hexdigest()
+            section_hashes[name] = digest
+            encoded[digest] = raw
+        
+        existing = {
+            row.content_sha256
+            for row in self.db.query(SnapshotBlob.content_sha256).filter(
+                SnapshotBlob.content_sha256.in_(list(encoded))
+            )
+        }
+        
+        new_sections = 0
+        for digest, raw in encoded.items():
+            if digest in existing:
+                continue
+            try:
+                with self.db.begin_nested():
+                    self.db.add(SnapshotBlob(
+                        content_sha256=digest,
+                        data=zlib.compress(raw, SNAPSHOT_COMPRESSION_LEVEL),
+                        size=len(raw),
+                    ))
+                new_sections += 1
+            except IntegrityError:
+                # נשמר במקביל ע"י בקשה אחרת
+                pass
+        
+        return section_hashes, new_sections
+    
+    def list_snapshots(self, client_id: int) -> List[Dict]:
+        """היסטוריית ה-snapshots של הלקוח (מהחדש לישן)"""
+        snapshots = self.db.query(ClientSnapshot).filter(
+            ClientSnapshot.client_id == client_id
+        ).order_by(ClientSnapshot.id.desc()).all()
+        
+        return [
+            {
+                "snapshot_id": s.id,
+                "snapshot_name": s.snapshot_name,
+                "created_at": s.created_at.isoformat() if s.created_at else None,
+                "total_items": s.total_items,
+            }
+            for s in snapshots
+        ]
+    
+    def load_snapshot(self, client_id: int, snapshot_id: int) -> Dict:
+        """
+        טעינת snapshot שמור בפורמט המלא (כמו שהוחזר בעבר לצד הלקוח)
+        
+        Raises:
+            SnapshotNotFoundError: אם ה-snapshot לא נמצא
+        """
+        snapshot = self.db.query(ClientSnapshot).filter(
+            ClientSnapshot.id == snapshot_id,
+            ClientSnapshot.client_id == client_id
+        ).first()
+        if not snapshot:
+            raise SnapshotNotFoundError(f"snapshot {snapshot_id} לא נמצא ללקוח {client_id}")
+        
+        blobs = {
+            row.content_sha256: row.data
+            for row in self.db.query(SnapshotBlob.content_sha256, SnapshotBlob.data).filter(
+                SnapshotBlob.content_sha256.in_(list(snapshot.sections.values()))
+            )
+        }
+        sections = {
+            name: json.loads(zlib.decompress(blobs[digest]))
+            for name, digest in snapshot.sections.items()
+        }
+        
+        snapshot_data = {
+            "snapshot_id": snapshot.id,
+            "client_id": client_id,
+            "snapshot_name": snapshot.snapshot_name,
+            "created_at": snapshot.created_at.isoformat() if snapshot.created_at else None,
+        }
+        for name in CLIENT_SIDE_SECTIONS:
+            if name in sections:
+                snapshot_data[name] = sections.pop(name)
+        snapshot_data["data"] = sections
+        return snapshot_data
+    
+    def restore_snapshot_by_id(self, client_id: int, snapshot_id: int) -> Dict:
+        """
+        שחזור מצב מ-snapshot שמור בצד השרת
+        
+        Returns:
+            Dict עם פרטי השחזור וסעיפי צד הלקוח לשחזור ב-localStorage
+        """
+        snapshot_data = self.load_snapshot(client_id, snapshot_id)
+        result = self.restore_snapshot(client_id, snapshot_data)
+        result["snapshot_id"] = snapshot_id
+        for name in CLIENT_SIDE_SECTIONS:
+            result[name] = snapshot_data.get(name)
+        return result
+    
     def restore_snapshot(self, client_id: int, snapshot_data: Dict) -> Dict:
         """
         שחזור מצב מ-snapshot
@@ -193,39 +374,38 @@ class SnapshotService:
             # שלב 2: שחזור הנתונים מה-snapshot
             logger.info("  📦 Restoring from snapshot...")
             
-            # שחזור קרנות פנסיה
+            # שחזור קרנות פנסיה, נכסי הון והכנסות נוספות - INSERT מרובה שורות לכל טבלה
+            pension_rows = []
             for pf_data in data.get("pension_funds", []):
                 pf_data = dict(pf_data)
                 pf_data["pension_start_date"] = _parse_date(pf_data.get("pension_start_date"))
                 pf_data.pop("created_at", None)
                 pf_data.pop("updated_at", None)
-                pf = PensionFund(**pf_data)
-                self.db.add(pf)
-                restored_count += 1
+                pension_rows.append(pf_data)
+            restored_count += self._bulk_insert(PensionFund, pension_rows)
             
-            # שחזור נכסי הון
+            asset_rows = []
             for ca_data in data.get("capital_assets", []):
                 ca_data = dict(ca_data)
                 ca_data["start_date"] = _parse_date(ca_data.get("start_date"))
                 ca_data["end_date"] = _parse_date(ca_data.get("end_date"))
                 ca_data.pop("created_at", None)
                 ca_data.pop("updated_at", None)
-                ca = CapitalAsset(**ca_data)
-                self.db.add(ca)
-                restored_count += 1
+                asset_rows.append(ca_data)
+            restored_count += self._bulk_insert(CapitalAsset, asset_rows)
             
-            # שחזור הכנסות נוספות
+            income_rows = []
             for ai_data in data.get("additional_incomes", []):
                 ai_data = dict(ai_data)
                 ai_data["start_date"] = _parse_date(ai_data.get("start_date"))
                 ai_data["end_date"] = _parse_date(ai_data.get("end_date"))
                 ai_data.pop("created_at", None)
                 ai_data.pop("updated_at", None)
-                ai = AdditionalIncome(**ai_data)
-                self.db.add(ai)
-                restored_count += 1
+                income_rows.append(ai_data)
+            restored_count += self._bulk_insert(AdditionalIncome, income_rows)
 
             # שחזור מענקים מטבלת grant (legacy rights fixation)
+            legacy_grant_rows = []
             for grant_data in data.get("legacy_grants", []):
                 grant_data = dict(grant_data)
                 grant_data["client_id"] = client_id
@@ -235,11 +415,11 @@ class SnapshotService:
                 grant_data.pop("id", None)
                 grant_data.pop("created_at", None)
                 grant_data.pop("updated_at", None)
-                grant = Grant(**grant_data)
-                self.db.add(grant)
-                restored_count += 1
+                legacy_grant_rows.append(grant_data)
+            restored_count += self._bulk_insert(Grant, legacy_grant_rows)
 
             # שחזור מעסיק נוכחי
+            employer = None
             employer_data = data.get("current_employer")
             if employer_data:
                 # יצירת עותק כדי לא לשנות את המקור
@@ -260,6 +440,8 @@ class SnapshotService:
                 restored_count += 1
                 
                 # שחזור מענקים
+                from app.models.current_employment.enums import GrantType
+                employer_grant_rows = []
                 for grant_data in data.get("grants", []):
                     grant_data = dict(grant_data)
                     grant_data["employer_id"] = employer.id
@@ -268,14 +450,12 @@ class SnapshotService:
                     
                     # המרת grant_type מ-string ל-enum
                     if grant_data.get("grant_type") and isinstance(grant_data["grant_type"], str):
-                        from app.models.current_employment.enums import GrantType
                         grant_data["grant_type"] = GrantType(grant_data["grant_type"])
                     
                     grant_data.pop("created_at", None)
                     grant_data.pop("updated_at", None)
-                    grant = EmployerGrant(**grant_data)
-                    self.db.add(grant)
-                    restored_count += 1
+                    employer_grant_rows.append(grant_data)
+                restored_count += self._bulk_insert(EmployerGrant, employer_grant_rows)
             
             # שחזור עזיבת עבודה
             termination_data = data.get("termination_event")
@@ -294,12 +474,11 @@ class SnapshotService:
                 self.db.add(fixation)
                 restored_count += 1
             
-            # לאחר שיחזור כל הנתונים, נעדכן את תאריך תחילת הקצבה של הלקוח לפי הקצבאות
-            effective_pension_start_date = compute_pension_start_date_from_funds(self.db, client)
-            client.pension_start_date = effective_pension_start_date
-            self.db.add(client)
-
             self.db.flush()
+
+            # ה-INSERT המרובה עוקף את מאזיני השורה, לכן תאריך תחילת הקצבה
+            # של הלקוח מחושב כאן פעם אחת לאחר שחזור כל הנתונים
+            update_client_pension_start_dates(self.db, [client_id])
             self.db.commit()
             
             logger.info(f"  ✅ Restored {restored_count} items")
@@ -316,6 +495,12 @@ class SnapshotService:
             logger.error(f"  ❌ Restore failed: {e}")
             raise
     
+    def _bulk_insert(self, model, rows: List[Dict]) -> int:
+        """INSERT מרובה שורות (executemany) לטבלה אחת, ללא מאזיני ORM לכל שורה"""
+        if rows:
+            self.db.execute(insert(model), rows)
+        return len(rows)
+    
     # Helper methods לאיסוף נתונים
     
     def _collect_pension_funds(self, client_id: int) -> list:
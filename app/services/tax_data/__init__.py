@@ -9,6 +9,7 @@ from .cpi_service import CPIService
 from .tax_brackets import TaxBracketsService
 from .indexation import IndexationService
 from .cache_manager import CacheManager
+from .cache import TaxDataCache, tax_data_cache
 
 # Export all services
 __all__ = [
@@ -18,6 +19,8 @@ __all__ = [
     'TaxBracketsService',
     'IndexationService',
     'CacheManager',
+    'TaxDataCache',
+    'tax_data_cache',
     'TaxDataService'  # Backward compatibility class
 ]
 
@@ -102,3 +105,13 @@ class TaxDataService:
     def update_tax_data_cache(cls):
         """Update tax data cache"""
         return CacheManager.update_tax_data_cache()
+    
+    @classmethod
+    def warm_up_cache(cls):
+        """Warm up tax data cache"""
+        return CacheManager.warm_up()
+    
+    @classmethod
+    def get_cache_stats(cls):
+        """Get tax data cache metrics"""
+        return CacheManager.get_cache_stats()
@@ -0,0 +1,168 @@
+"""
+In-memory TTL cache for tax reference data, persisted to disk between restarts
+"""
+from typing import Any, Callable, Dict, Optional, Tuple
+import copy
+import hashlib
+import json
+import logging
+import os
+import tempfile
+import threading
+import time
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_TTL_SECONDS = int(os.getenv("TAX_DATA_CACHE_TTL", str(24 * 60 * 60)))
+DEFAULT_PERSIST_PATH = os.getenv(
+    "TAX_DATA_CACHE_PATH",
+    os.path.join(tempfile.gettempdir(), "retire_tax_data_cache.json"),
+)
+
+
+class TaxDataCache:
+    """
+    Stale-while-revalidate cache for reference data (caps, CPI, brackets).
+
+    Fresh entries are served from memory. Entries older than the TTL are still
+    served, while a background thread reloads them. Values must be JSON
+    serializable, since every store is also written to the persist file.
+    """
+
+    def __init__(self, ttl_seconds: int = DEFAULT_TTL_SECONDS, persist_path: Optional[str] = DEFAULT_PERSIST_PATH):
+        self.ttl_seconds = ttl_seconds
+        self.persist_path = persist_path
+        self._entries: Dict[str, Tuple[Any, float]] = {}
+        self._refreshing: set = set()
+        self._lock = threading.RLock()
+        self._disk_loaded = False
+        self.hits = 0
+        self.misses = 0
+        self.stale_hits = 0
+        self.refreshes = 0
+        self.refresh_errors = 0
+
+    def get(self, key: str, loader: Callable[[], Any]) -> Any:
+        """Return the cached value for key, loading it on a miss"""
+        with self._lock:
+            self._load_from_disk()
+            entry = self._entries.get(key)
+            if entry is not None:
+                value, stored_at = entry
+                self.hits += 1
+                if time.time() - stored_at > self.ttl_seconds:
+                    self.stale_hits += 1
+                    self._schedule_refresh(key, loader)
+                return copy.deepcopy(value)
+            self.misses += 1
+
+        value = loader()
+        self.set(key, value)
+        return copy.deepcopy(value)
+
+    def set(self, key: str, value: Any, stored_at: Optional[float] = None) -> None:
+        with self._lock:
+            self._entries[key] = (copy.deepcopy(value), stored_at or time.time())
+            self._save_to_disk()
+
+    def refresh(self, key: str, loader: Callable[[], Any]) -> Any:
+        """Reload key synchronously (used by explicit cache updates)"""
+        value = loader()
+        self.set(key, value)
+        with self._lock:
+            self.refreshes += 1
+        return copy.deepcopy(value)
+
+    def invalidate(self, key: Optional[str] = None) -> None:
+        with self._lock:
+            if key is None:
+                self._entries.clear()
+            else:
+                self._entries.pop(key, None)
+            self._save_to_disk()
+
+    def content_version(self) -> str:
+        """Hash of the cached values (not their timestamps) - changes when reference data changes"""
+        with self._lock:
+            self._load_from_disk()
+            payload = json.dumps(
+                {key: value for key, (value, _) in self._entries.items()},
+                sort_keys=True, ensure_ascii=False, default=str,
+            )
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+    def stats(self) -> Dict[str, Any]:
+        now = time.time()
+        with self._lock:
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "stale_hits": self.stale_hits,
+                "refreshes": self.refreshes,
+                "refresh_errors": self.refresh_errors,
+                "ttl_seconds": self.ttl_seconds,
+                "persist_path": self.persist_path,
+                "entries": {
+                    key: {
+                        "age_seconds": round(now - stored_at, 1),
+                        "fresh": now - stored_at <= self.ttl_seconds,
+                        "refreshing": key in self._refreshing,
+                    }
+                    for key, (_, stored_at) in sorted(self._entries.items())
+                },
+            }
+
+    def _schedule_refresh(self, key: str, loader: Callable[[], Any]) -> None:
+        if key in self._refreshing:
+            return
+        self._refreshing.add(key)
+
+        def _run():
+            try:
+                self.refresh(key, loader)
+                logger.info(f"Tax data cache entry refreshed: {key}")
+            except Exception as e:
+                with self._lock:
+                    self.refresh_errors += 1
+                logger.warning(f"Tax data cache refresh failed for {key}, serving stale value: {e}")
+            finally:
+                with self._lock:
+                    self._refreshing.discard(key)
+
+        threading.Thread(target=_run, name=f"tax-data-refresh-{key}", daemon=True).start()
+
+    def _load_from_disk(self) -> None:
+        if self._disk_loaded:
+            return
+        self._disk_loaded = True
+        if not self.persist_path or not os.path.exists(self.persist_path):
+            return
+        try:
+            with open(self.persist_path, "r", encoding="utf-8") as f:
+                stored = json.load(f)
+            for key, item in stored.items():
+                self._entries.setdefault(key, (item["value"], float(item["stored_at"])))
+            logger.info(f"Loaded {len(stored)} tax data cache entries from {self.persist_path}")
+        except Exception as e:
+            logger.warning(f"Ignoring unreadable tax data cache file {self.persist_path}: {e}")
+
+    def _save_to_disk(self) -> None:
+        if not self.persist_path:
+            return
+        try:
+            directory = os.path.dirname(os.path.abspath(self.persist_path))
+            os.makedirs(directory, exist_ok=True)
+            payload = {
+                key: {"value": value, "stored_at": stored_at}
+                for key, (value, stored_at) in self._entries.items()
+            }
+            fd, tmp_path = tempfile.mkstemp(dir=directory, suffix=".tmp")
+            with os.fdopen(fd, "w", encoding="utf-8") as f:
+                json.dump(payload, f, ensure_ascii=False)
+            os.replace(tmp_path, self.persist_path)
+        except Exception as e:
+            logger.warning(f"Failed to persist tax data cache to {self.persist_path}: {e}")
+
+
+# Process-wide cache shared by all tax data services
+tax_data_cache = TaxDataCache()
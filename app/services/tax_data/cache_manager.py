@@ -6,15 +6,51 @@ from datetime import datetime
 from decimal import Decimal
 import logging
 from .base_service import BaseTaxDataService
+from .cache import tax_data_cache
 from .severance_caps import SeveranceCapsService
 from .cpi_service import CPIService
 from .tax_brackets import TaxBracketsService
 
 logger = logging.getLogger(__name__)
 
+# Number of past years of CPI data kept warm in the cache
+CPI_WARM_YEARS = 5
+
 class CacheManager(BaseTaxDataService):
     """Service for managing tax data cache"""
-    
+
+    @classmethod
+    def _core_loaders(cls, current_year: int) -> Dict[str, callable]:
+        """Cache keys (and their loaders) that are kept warm for the current year"""
+        start_year = current_year - CPI_WARM_YEARS
+        return {
+            SeveranceCapsService.CACHE_KEY: SeveranceCapsService._load_severance_caps,
+            f"cpi:{start_year}:{current_year}": lambda: CPIService._load_cpi_data(start_year, current_year),
+            f"tax_brackets:{current_year}": lambda: TaxBracketsService._load_tax_brackets(current_year),
+        }
+
+    @classmethod
+    def warm_up(cls) -> Dict[str, any]:
+        """
+        Populate the cache at startup (persisted entries are reused, stale ones
+        are refreshed in the background)
+        """
+        current_year = cls._get_current_year()
+        for key, loader in cls._core_loaders(current_year).items():
+            try:
+                tax_data_cache.get(key, loader)
+            except Exception as e:
+                logger.warning(f"Tax data cache warm-up failed for {key}: {e}")
+
+        stats = tax_data_cache.stats()
+        logger.info(f"Tax data cache warmed up with {len(stats['entries'])} entries")
+        return stats
+
+    @classmethod
+    def get_cache_stats(cls) -> Dict[str, any]:
+        """Hit/miss counters and per-entry age of the tax data cache"""
+        return tax_data_cache.stats()
+
     @classmethod
     def update_tax_data_cache(cls) -> Dict[str, any]:
         """
@@ -22,28 +58,28 @@ class CacheManager(BaseTaxDataService):
         Returns summary of updated data
         """
         current_year = cls._get_current_year()
-        
+
         try:
-            # Update severance caps
+            # Force reload of the warm entries
+            for key, loader in cls._core_loaders(current_year).items():
+                tax_data_cache.refresh(key, loader)
+
             severance_cap = SeveranceCapsService.get_current_severance_cap(current_year)
-            
-            # Update CPI data (last 5 years)
-            cpi_data = CPIService.get_cpi_data(current_year - 5, current_year)
-            
-            # Update tax brackets
+            cpi_data = CPIService.get_cpi_data(current_year - CPI_WARM_YEARS, current_year)
             tax_brackets = TaxBracketsService.get_tax_brackets(current_year)
-            
+
             summary = {
                 "updated_at": datetime.utcnow().isoformat(),
                 "severance_cap": float(severance_cap),
                 "cpi_records_count": len(cpi_data),
                 "tax_brackets_count": len(tax_brackets),
+                "cache": tax_data_cache.stats(),
                 "status": "success"
             }
-            
+
             logger.info(f"Tax data cache updated successfully: {summary}")
             return summary
-            
+
         except Exception as e:
             error_summary = {
                 "updated_at": datetime.utcnow().isoformat(),
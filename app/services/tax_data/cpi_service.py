@@ -4,6 +4,7 @@ CPI (Consumer Price Index) data service
 from typing import Dict, List
 import logging
 from .base_service import BaseTaxDataService
+from .cache import tax_data_cache
 
 logger = logging.getLogger(__name__)
 
@@ -16,6 +17,16 @@ class CPIService(BaseTaxDataService):
     
     @staticmethod
     def get_cpi_data(start_year: int, end_year: int) -> List[Dict]:
+        """
+        Get CPI data (served from the tax data cache)
+        """
+        return tax_data_cache.get(
+            f"cpi:{start_year}:{end_year}",
+            lambda: CPIService._load_cpi_data(start_year, end_year),
+        )
+    
+    @staticmethod
+    def _load_cpi_data(start_year: int, end_year: int) -> List[Dict]:
         """
         Get CPI data from CBS API or fallback data
         """
@@ -6,18 +6,27 @@ from decimal import Decimal
 from datetime import datetime
 import logging
 from .base_service import BaseTaxDataService
+from .cache import tax_data_cache
 
 logger = logging.getLogger(__name__)
 
 class SeveranceCapsService(BaseTaxDataService):
     """Service for managing severance payment caps"""
     
+    CACHE_KEY = "severance_caps"
+    
     @classmethod
     def get_severance_caps(cls) -> List[Dict]:
         """
-        Get all severance payment caps by year
+        Get all severance payment caps by year (served from the tax data cache)
+        """
+        return tax_data_cache.get(cls.CACHE_KEY, cls._load_severance_caps)
+    
+    @classmethod
+    def _load_severance_caps(cls) -> List[Dict]:
+        """
+        Load severance caps from storage, falling back to default values
         """
-        # Get from storage or cache if available
         try:
             # Try to load from storage
             caps = cls._load_severance_caps_from_storage()
@@ -75,6 +84,7 @@ class SeveranceCapsService(BaseTaxDataService):
             # In a real implementation, this would save to a database or file
             # For now, we'll use a simple approach with localStorage in the frontend
             logger.info(f"Updated {len(caps)} severance caps")
+            tax_data_cache.invalidate(cls.CACHE_KEY)
             return True
         except Exception as e:
             logger.error(f"Error updating severance caps: {e}")
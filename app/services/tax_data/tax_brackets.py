@@ -4,6 +4,7 @@ Tax brackets management service
 from typing import Dict, List
 import logging
 from .base_service import BaseTaxDataService
+from .cache import tax_data_cache
 
 logger = logging.getLogger(__name__)
 
@@ -12,6 +13,16 @@ class TaxBracketsService(BaseTaxDataService):
     
     @staticmethod
     def get_tax_brackets(year: int) -> List[Dict]:
+        """
+        Get tax brackets for the specified year (served from the tax data cache)
+        """
+        return tax_data_cache.get(
+            f"tax_brackets:{year}",
+            lambda: TaxBracketsService._load_tax_brackets(year),
+        )
+    
+    @staticmethod
+    def _load_tax_brackets(year: int) -> List[Dict]:
         """
         Get tax brackets for the specified year from Tax Authority or fallback data
         """
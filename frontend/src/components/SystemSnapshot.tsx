@@ -27,10 +27,11 @@ interface SystemSnapshotProps {
 }
 
 interface SnapshotData {
+  snapshot_id?: number; // snapshot שמור בצד השרת
   client_id: number;
   snapshot_name: string;
   created_at: string;
-  data: any;
+  data?: any; // snapshot ישן שנשמר במלואו ב-localStorage
   pension_portfolio?: any[]; // נתוני התיק הפנסיוני
   converted_accounts?: any[]; // חשבונות שהומרו
 }
@@ -66,11 +67,17 @@ const SystemSnapshot: React.FC<SystemSnapshotProps> = ({ clientId, onSnapshotRes
         (headers as any)['X-System-Password'] = systemPassword;
       }
 
+      const pensionPortfolio = loadPensionDataFromStorage(String(clientId)) || [];
+      const convertedAccountsSet = loadConvertedAccountsFromStorage(String(clientId));
+      const convertedAccounts = Array.from(convertedAccountsSet);
+
       const response = await fetch(`${API_BASE}/clients/${clientId}/snapshot/save`, {
         method: 'POST',
         headers,
         body: JSON.stringify({
-          snapshot_name: `שמירה ידנית ${new Date().toLocaleString('he-IL')}`
+          snapshot_name: `שמירה ידנית ${new Date().toLocaleString('he-IL')}`,
+          pension_portfolio: pensionPortfolio,
+          converted_accounts: convertedAccounts,
         })
       });
 
@@ -80,15 +87,13 @@ const SystemSnapshot: React.FC<SystemSnapshotProps> = ({ clientId, onSnapshotRes
       }
 
       const data = await response.json();
-      
-      const pensionPortfolio = loadPensionDataFromStorage(String(clientId)) || [];
-      const convertedAccountsSet = loadConvertedAccountsFromStorage(String(clientId));
-      const convertedAccounts = Array.from(convertedAccountsSet);
-      
-      const snapshotData = {
-        ...data.snapshot,
-        pension_portfolio: pensionPortfolio,
-        converted_accounts: convertedAccounts,
+
+      // ה-snapshot נשמר בשרת - בצד הלקוח נשמר רק המזהה שלו
+      const snapshotData: SnapshotData = {
+        snapshot_id: data.snapshot_id,
+        client_id: clientId,
+        snapshot_name: data.snapshot_name,
+        created_at: data.created_at,
       };
 
       saveSnapshotRawToStorage(clientId, JSON.stringify(snapshotData));
@@ -135,7 +140,9 @@ const SystemSnapshot: React.FC<SystemSnapshotProps> = ({ clientId, onSnapshotRes
       const response = await fetch(`${API_BASE}/clients/${clientId}/snapshot/restore`, {
         method: 'POST',
         headers,
-        body: JSON.stringify(savedSnapshot)
+        body: JSON.stringify(
+          savedSnapshot.snapshot_id ? { snapshot_id: savedSnapshot.snapshot_id } : savedSnapshot
+        )
       });
 
       if (!response.ok) {
@@ -150,21 +157,24 @@ const SystemSnapshot: React.FC<SystemSnapshotProps> = ({ clientId, onSnapshotRes
         text: `✅ ${data.message}`
       });
 
+      // נתוני צד הלקוח מגיעים מהשרת (או מה-snapshot הישן ב-localStorage)
+      const pensionPortfolio = savedSnapshot.snapshot_id ? data.pension_portfolio : savedSnapshot.pension_portfolio;
+      const convertedAccounts = savedSnapshot.snapshot_id ? data.converted_accounts : savedSnapshot.converted_accounts;
+
       // שחזור נתוני PensionPortfolio מה-snapshot
-      if (savedSnapshot.pension_portfolio && Array.isArray(savedSnapshot.pension_portfolio)) {
-        savePensionDataToStorage(String(clientId), savedSnapshot.pension_portfolio as any[]);
-        console.log(`✅ Restored ${savedSnapshot.pension_portfolio.length} pension accounts to localStorage`);
-        console.log('Sample account:', savedSnapshot.pension_portfolio[0]);
+      if (pensionPortfolio && Array.isArray(pensionPortfolio)) {
+        savePensionDataToStorage(String(clientId), pensionPortfolio as any[]);
+        console.log(`✅ Restored ${pensionPortfolio.length} pension accounts to localStorage`);
       } else {
         removePensionDataFromStorage(String(clientId));
         console.log('⚠️ No pension portfolio data in snapshot');
       }
 
-      if (savedSnapshot.converted_accounts) {
+      if (convertedAccounts) {
         const convertedSet = new Set<string>(
-          (Array.isArray(savedSnapshot.converted_accounts)
-            ? savedSnapshot.converted_accounts
-            : [savedSnapshot.converted_accounts]
+          (Array.isArray(convertedAccounts)
+            ? convertedAccounts
+            : [convertedAccounts]
           ).map((id: any) => String(id))
         );
         saveConvertedAccountsToStorage(String(clientId), convertedSet);
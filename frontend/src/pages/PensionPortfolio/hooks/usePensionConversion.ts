@@ -86,7 +86,55 @@ export function usePensionConversion(
 
       // טיפול בהמרות לקצבה
       if (pensionConversions.length > 0) {
-        for (const conversion of pensionConversions) {
+        // גיל פרישה ומקדמי קצבה לכל התכניות - בקריאה מרוכזת אחת
+        let coefficientResults: any[] = [];
+        try {
+          let retirementAge = 67;
+          if (clientData) {
+            const retResponse: any = await apiFetch('/retirement-age/calculate-simple', {
+              method: 'POST',
+              body: JSON.stringify({
+                birth_date: clientData.birth_date,
+                gender: clientData.gender
+              })
+            });
+            retirementAge = retResponse.retirement_age;
+          }
+
+          const coefficientResponse: any = await apiFetch('/annuity-coefficient/calculate-batch', {
+            method: 'POST',
+            body: JSON.stringify({
+              items: pensionConversions.map(({ account }) => {
+                // עבור גמל להשקעה נשתמש במקדם של קרן פנסיה
+                let coefficientProductType = account.סוג_מוצר || 'ביטוח מנהלים';
+                const coefficientProductLower = (coefficientProductType || '').toLowerCase();
+                if (coefficientProductLower.includes('גמל להשקעה')) {
+                  coefficientProductType = 'קרן פנסיה';
+                }
+
+                return {
+                  product_type: coefficientProductType,
+                  start_date: account.תאריך_התחלה || paymentDateISO,
+                  gender: clientData?.gender || 'זכר',
+                  retirement_age: retirementAge,
+                  company_name: account.חברה_מנהלת,
+                  option_name: null,
+                  survivors_option: 'תקנוני',
+                  spouse_age_diff: 0,
+                  target_year: new Date(paymentDateISO).getFullYear(),
+                  birth_date: clientData?.birth_date || null,
+                  pension_start_date: paymentDateISO
+                };
+              })
+            })
+          });
+          coefficientResults = coefficientResponse.results || [];
+        } catch (error) {
+          console.error(`[מקדם קצבה] שגיאה בחישוב מקדמים:`, error);
+        }
+
+        for (let conversionIndex = 0; conversionIndex < pensionConversions.length; conversionIndex++) {
+          const conversion = pensionConversions[conversionIndex];
           const {account, amountToConvert, specificAmounts} = conversion;
           
           let conversionDetails = '';
@@ -116,50 +164,14 @@ export function usePensionConversion(
           let factorSource = 'default';
           let factorNotes = '';
           
-          try {
-            let retirementAge = 67;
-            if (clientData) {
-              const retResponse: any = await apiFetch('/retirement-age/calculate-simple', {
-                method: 'POST',
-                body: JSON.stringify({
-                  birth_date: clientData.birth_date,
-                  gender: clientData.gender
-                })
-              });
-              retirementAge = retResponse.retirement_age;
-            }
-
-            // עבור גמל להשקעה נשתמש במקדם של קרן פנסיה
-            let coefficientProductType = account.סוג_מוצר || 'ביטוח מנהלים';
-            const coefficientProductLower = (coefficientProductType || '').toLowerCase();
-            if (coefficientProductLower.includes('גמל להשקעה')) {
-              coefficientProductType = 'קרן פנסיה';
-            }
-            
-            const coefficientResponse: any = await apiFetch('/annuity-coefficient/calculate', {
-              method: 'POST',
-              body: JSON.stringify({
-                product_type: coefficientProductType,
-                start_date: account.תאריך_התחלה || paymentDateISO,
-                gender: clientData?.gender || 'זכר',
-                retirement_age: retirementAge,
-                company_name: account.חברה_מנהלת,
-                option_name: null,
-                survivors_option: 'תקנוני',
-                spouse_age_diff: 0,
-                target_year: new Date(paymentDateISO).getFullYear(),
-                birth_date: clientData?.birth_date || null,
-                pension_start_date: paymentDateISO
-              })
-            });
-            
-            annuityFactor = coefficientResponse.factor_value;
-            factorSource = coefficientResponse.source_table;
-            factorNotes = coefficientResponse.notes || '';
-            
+          const coefficientResult = coefficientResults[conversionIndex];
+          if (coefficientResult && !coefficientResult.error) {
+            annuityFactor = coefficientResult.factor_value;
+            factorSource = coefficientResult.source_table;
+            factorNotes = coefficientResult.notes || '';
             console.log(`[מקדם קצבה] ${account.שם_תכנית}: ${annuityFactor} (מקור: ${factorSource})`);
-          } catch (error) {
-            console.error(`[מקדם קצבה] שגיאה בחישוב מקדם:`, error);
+          } else if (coefficientResult?.error) {
+            console.error(`[מקדם קצבה] שגיאה בחישוב מקדם:`, coefficientResult.error);
           }
           
           let fundNamePrefix = '';
@@ -61,7 +61,9 @@ export async function restoreSnapshotBeforeScenario(
     const response = await fetch(`${API_BASE}/clients/${clientId}/snapshot/restore`, {
       method: "POST",
       headers,
-      body: JSON.stringify(snapshotData),
+      body: JSON.stringify(
+        snapshotData.snapshot_id ? { snapshot_id: snapshotData.snapshot_id } : snapshotData
+      ),
     });
 
     if (!response.ok) {
@@ -77,12 +79,18 @@ export async function restoreSnapshotBeforeScenario(
       return false;
     }
 
+    let restored: any = {};
     try {
-      await response.json();
+      restored = await response.json();
     } catch {
       // ignore
     }
 
+    // snapshot בצד השרת מחזיר את נתוני צד הלקוח בתגובה; snapshot ישן מכיל אותם בעצמו
+    if (snapshotData.snapshot_id) {
+      snapshotData = { ...snapshotData, ...restored };
+    }
+
     const pensionPortfolio = snapshotData.pension_portfolio;
     if (Array.isArray(pensionPortfolio)) {
       savePensionDataToStorage(clientId, pensionPortfolio);
@@ -1,115 +1,162 @@
 """
 מודול למילוי טפסי PDF עם נתונים
 משתמש ב-pdfrw למילוי שדות AcroForm
+
+הטופס נקרא ומנותח פעם אחת בלבד (מטמון לפי נתיב וזמן שינוי), עם מיפוי
+מוכן משם שדה לאובייקט השדה. בכל מילוי משתנים רק הערכים הנדרשים, הקובץ
+נכתב, והערכים המקוריים משוחזרים - כך שמילוי מאות טפסים חסום בכתיבה ולא בניתוח.
 """
+from dataclasses import dataclass, field
+from functools import lru_cache
 from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Tuple
 from pdfrw import PdfReader, PdfWriter, PdfDict, PdfObject, PdfString
 import logging
+import threading
 
 logger = logging.getLogger(__name__)
 
+TEMPLATE_CACHE_SIZE = 8
+
+
+@dataclass
+class _ParsedTemplate:
+    """טופס מנותח: ה-reader המשותף ומיפוי שם שדה -> אובייקט השדה"""
+    reader: Optional[PdfReader]
+    fields: Dict[str, PdfDict]
+    lock: threading.Lock = field(default_factory=threading.Lock)
+
+
+def _clean_field_name(name) -> str:
+    # הסרת סימני מרכאות מהשם
+    return name[1:-1] if name.startswith('(') else str(name)
+
+
+@lru_cache(maxsize=TEMPLATE_CACHE_SIZE)
+def _parse_template(path: str, mtime_ns: int, size: int) -> _ParsedTemplate:
+    logger.info(f"📖 Parsing template: {path}")
+    reader = PdfReader(path)
+
+    if not reader.Root.AcroForm:
+        return _ParsedTemplate(reader=None, fields={})
+
+    # אפשור הצגת שדות ממולאים
+    reader.Root.AcroForm.update(PdfDict(NeedAppearances=PdfObject("true")))
+
+    fields = {}
+    for pdf_field in reader.Root.AcroForm.Fields or []:
+        if pdf_field.T:
+            fields.setdefault(_clean_field_name(pdf_field.T), pdf_field)
+
+    logger.info(f"📋 Template {Path(path).name} has {len(fields)} fields")
+    logger.debug(f"Template fields: {list(fields)}")
+    return _ParsedTemplate(reader=reader, fields=fields)
+
+
+def load_template(template_path: Path) -> _ParsedTemplate:
+    """מחזיר את הטופס המנותח מהמטמון (נותח מחדש רק אם הקובץ השתנה)"""
+    path = Path(template_path).resolve()
+    stat = path.stat()
+    return _parse_template(str(path), stat.st_mtime_ns, stat.st_size)
+
+
+def clear_template_cache() -> None:
+    _parse_template.cache_clear()
+
+
+def _write_filled(template: _ParsedTemplate, output_path: Path, field_data: dict) -> int:
+    """כותב עותק ממולא של הטופס ומשחזר את ערכי השדות המקוריים. מחזיר מספר שדות שמולאו"""
+    originals = []
+    with template.lock:
+        try:
+            for name, value in field_data.items():
+                pdf_field = template.fields.get(name)
+                if pdf_field is None:
+                    continue
+                originals.append((pdf_field, pdf_field.V, pdf_field.AP))
+                pdf_field.V = PdfString.from_unicode(str(value))
+                # ניקוי appearance stream כדי לאלץ יצירה מחדש
+                pdf_field.AP = PdfDict()
+
+            output_path.parent.mkdir(parents=True, exist_ok=True)
+            PdfWriter(str(output_path), trailer=template.reader).write()
+        finally:
+            for pdf_field, value, appearance in originals:
+                pdf_field.V = value
+                pdf_field.AP = appearance
+    return len(originals)
+
 
 def fill_acroform(template_path: Path, output_path: Path, field_data: dict) -> Path:
     """
     ממלא טופס PDF עם נתונים
-    
+
     Args:
         template_path: נתיב לטופס PDF ריק
         output_path: נתיב לקובץ מלא
         field_data: מילון של שדות ועריכים
-        
+
     Returns:
         Path to filled PDF
     """
     try:
-        logger.info(f"📖 Reading template: {template_path}")
-        
-        # קריאת הטופס
-        reader = PdfReader(str(template_path))
-        
-        # אפשור הצגת שדות ממולאים
-        if reader.Root.AcroForm:
-            reader.Root.AcroForm.update(PdfDict(NeedAppearances=PdfObject("true")))
-            logger.info(f"✅ AcroForm found, NeedAppearances set")
-        else:
+        template = load_template(template_path)
+        if template.reader is None:
             logger.warning("⚠️ No AcroForm found in PDF!")
             return None
-        
-        # קודם נאסוף את כל שמות השדות
-        pdf_fields = []
-        if reader.Root.AcroForm and reader.Root.AcroForm.Fields:
-            for field in reader.Root.AcroForm.Fields:
-                if field.T:
-                    clean_name = field.T[1:-1] if field.T.startswith('(') else str(field.T)
-                    pdf_fields.append(clean_name)
-        
-        logger.info(f"📋 PDF has {len(pdf_fields)} fields:")
-        for fname in pdf_fields[:10]:  # הצג רק 10 ראשונים
-            logger.info(f"   - {fname}")
-        if len(pdf_fields) > 10:
-            logger.info(f"   ... and {len(pdf_fields) - 10} more")
-        
-        logger.info(f"📝 Attempting to fill {len(field_data)} data fields")
-        
-        # מילוי השדות
-        filled_count = 0
-        if reader.Root.AcroForm and reader.Root.AcroForm.Fields:
-            for field in reader.Root.AcroForm.Fields:
-                # קבלת שם השדה
-                field_name = field.T
-                if field_name:
-                    # הסרת סימני מרכאות מהשם
-                    clean_name = field_name[1:-1] if field_name.startswith('(') else str(field_name)
-                    
-                    # אם יש ערך בנתונים, ממלאים את השדה
-                    if clean_name in field_data:
-                        value = str(field_data[clean_name])
-                        field.V = PdfString.from_unicode(value)
-                        
-                        # ניקוי appearance stream כדי לאלץ יצירה מחדש
-                        if hasattr(field, 'AP'):
-                            field.AP = PdfDict()
-                        
-                        filled_count += 1
-                        logger.info(f"✅ Filled '{clean_name}' = '{value}'")
-        
-        logger.info(f"📊 Successfully filled {filled_count} out of {len(field_data)} fields")
-        
-        # שמירת ה-PDF
-        output_path.parent.mkdir(parents=True, exist_ok=True)
-        PdfWriter(str(output_path), trailer=reader).write()
-        
-        logger.info(f"💾 PDF saved: {output_path}")
+
+        filled_count = _write_filled(template, output_path, field_data)
+        logger.info(f"💾 PDF saved: {output_path} ({filled_count} out of {len(field_data)} fields filled)")
         return output_path
-        
+
     except Exception as e:
         logger.error(f"❌ Error filling PDF: {e}", exc_info=True)
         raise
 
 
+def fill_acroform_batch(template_path: Path, forms: Iterable[Tuple[Path, dict]]) -> List[Optional[Path]]:
+    """
+    ממלא את אותו טופס עבור רשימת (נתיב פלט, נתונים) במעבר אחד
+
+    Args:
+        template_path: נתיב לטופס PDF ריק
+        forms: זוגות של נתיב פלט ומילון שדות
+
+    Returns:
+        List of filled PDF paths (None for a form that failed)
+    """
+    template = load_template(template_path)
+    if template.reader is None:
+        logger.warning("⚠️ No AcroForm found in PDF!")
+        return [None for _ in forms]
+
+    results: List[Optional[Path]] = []
+    for output_path, field_data in forms:
+        try:
+            _write_filled(template, output_path, field_data)
+            results.append(output_path)
+        except Exception as e:
+            logger.error(f"❌ Error filling PDF {output_path}: {e}")
+            results.append(None)
+
+    logger.info(f"💾 Batch filled {sum(1 for r in results if r)} out of {len(results)} forms")
+    return results
+
+
 def get_pdf_fields(template_path: Path) -> list:
     """
     מחזיר רשימת שדות הטופס
     שימושי לדיבוג ומיפוי
-    
+
     Args:
         template_path: נתיב לטופס PDF
-        
+
     Returns:
         List of field names
     """
     try:
-        reader = PdfReader(str(template_path))
-        fields = []
-        
-        if reader.Root.AcroForm and reader.Root.AcroForm.Fields:
-            for field in reader.Root.AcroForm.Fields:
-                if field.T:
-                    clean_name = field.T[1:-1] if field.T.startswith('(') else str(field.T)
-                    fields.append(clean_name)
-        
-        return fields
-        
+        return list(load_template(template_path).fields)
+
     except Exception as e:
         logger.error(f"Error reading PDF fields: {e}")
         return []
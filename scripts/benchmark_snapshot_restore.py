@@ -0,0 +1,123 @@
+"""
+Benchmark snapshot and scenario-state restore for clients with many assets
+
+Runs against a throwaway SQLite database, so it never touches retire.db:
+
+    python scripts/benchmark_snapshot_restore.py --assets 50 --rounds 20
+    python scripts/benchmark_snapshot_restore.py --assets 200
+"""
+import argparse
+import json
+import os
+import statistics
+import sys
+import tempfile
+import time
+from datetime import date
+
+# Add the project root to the path so we can import the app modules
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sqlalchemy import create_engine, event
+from sqlalchemy.orm import sessionmaker
+
+import app.models  # noqa: F401
+from app.database import Base
+from app.models.additional_income import AdditionalIncome
+from app.models.capital_asset import CapitalAsset
+from app.models.client import Client
+from app.models.pension_fund import PensionFund
+from app.services.retirement.services.state_service import StateService
+from app.services.snapshot_service import SnapshotService
+
+
+def seed_client(db, assets: int) -> int:
+    """Create one client with `assets` rows in each of the restored tables"""
+    client = Client(
+        id_number="000000018",
+        id_number_raw="000000018",
+        full_name="Benchmark Client",
+        birth_date=date(1960, 1, 1),
+        gender="male",
+    )
+    db.add(client)
+    db.flush()
+    for i in range(assets):
+        db.add(PensionFund(
+            client_id=client.id, fund_name=f"Fund {i}", input_mode="manual",
+            pension_amount=1000 + i, pension_start_date=date(2026, 1 + i % 12, 1),
+        ))
+        db.add(CapitalAsset(
+            client_id=client.id, asset_name=f"Asset {i}", asset_type="deposits",
+            current_value=10000 + i, annual_return_rate=0.03, payment_frequency="monthly",
+            start_date=date(2026, 1, 1),
+        ))
+        db.add(AdditionalIncome(
+            client_id=client.id, source_type="other", amount=500 + i,
+            frequency="monthly", start_date=date(2026, 1, 1),
+        ))
+    db.commit()
+    return client.id
+
+
+def time_rounds(fn, rounds: int) -> dict:
+    durations = []
+    for _ in range(rounds):
+        start = time.perf_counter()
+        fn()
+        durations.append((time.perf_counter() - start) * 1000)
+    return {
+        "mean_ms": round(statistics.mean(durations), 2),
+        "median_ms": round(statistics.median(durations), 2),
+        "max_ms": round(max(durations), 2),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--assets", type=int, default=50, help="rows per table (pension funds, assets, incomes)")
+    parser.add_argument("--rounds", type=int, default=10, help="timed restores per path")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as work_dir:
+        engine = create_engine(f"sqlite:///{os.path.join(work_dir, 'benchmark.db')}")
+        Base.metadata.create_all(bind=engine)
+        statements = []
+        event.listen(engine, "before_cursor_execute", lambda *a: statements.append(a[2]))
+
+        db = sessionmaker(bind=engine)()
+        try:
+            client_id = seed_client(db, args.assets)
+
+            snapshots = SnapshotService(db)
+            snapshot = snapshots.collect_snapshot(client_id)["snapshot"]
+            statements.clear()
+            snapshot_timing = time_rounds(lambda: snapshots.restore_snapshot(client_id, snapshot), args.rounds)
+            snapshot_statements = len(statements) // args.rounds
+
+            state_service = StateService(db, client_id)
+            state = state_service.save_current_state()
+
+            def restore_state():
+                state_service.restore_state(state)
+                db.commit()
+
+            statements.clear()
+            state_timing = time_rounds(restore_state, args.rounds)
+            state_statements = len(statements) // args.rounds
+        finally:
+            db.close()
+            engine.dispose()
+
+    report = {
+        "assets_per_table": args.assets,
+        "rounds": args.rounds,
+        "snapshot_restore": {**snapshot_timing, "statements_per_restore": snapshot_statements},
+        "state_restore": {**state_timing, "statements_per_restore": state_statements},
+    }
+    print(json.dumps(report, indent=2))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,164 @@
+"""
+Compare SQLite throughput with the default and the tuned ("performance") profile
+
+For each profile a throwaway database is seeded with clients, then concurrent
+workers call the scenario generation and cashflow endpoints in-process:
+
+    python scripts/benchmark_sqlite_profile.py --clients 20 --workers 8 --rounds 3
+"""
+import argparse
+import json
+import os
+import statistics
+import sys
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date
+
+# Add the project root to the path so we can import the app modules
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from fastapi.testclient import TestClient
+from sqlalchemy.orm import sessionmaker
+
+import app.models  # noqa: F401
+from app.database import Base, get_db, get_engine, get_read_db
+from app.main import app as fastapi_app
+from app.models.additional_income import AdditionalIncome
+from app.models.capital_asset import CapitalAsset
+from app.models.client import Client
+from app.models.pension_fund import PensionFund
+
+PROFILES = ("default", "performance")
+
+
+def seed(session_factory, clients: int) -> list:
+    db = session_factory()
+    try:
+        client_ids = []
+        for i in range(clients):
+            id_number = f"{i + 1:08d}"
+            id_number += str((10 - sum(
+                (d if k % 2 == 0 else (2 * d - 9 if 2 * d > 9 else 2 * d))
+                for k, d in enumerate(map(int, id_number))
+            ) % 10) % 10)
+            client = Client(
+                id_number=id_number, id_number_raw=id_number, full_name=f"Benchmark {i}",
+                birth_date=date(1965, 1, 1), gender="male",
+            )
+            db.add(client)
+            db.flush()
+            for j in range(5):
+                db.add(PensionFund(
+                    client_id=client.id, fund_name=f"Fund {j}", input_mode="calculated",
+                    balance=300000 + j * 10000, annuity_factor=200, pension_start_date=date(2032, 1, 1),
+                ))
+                db.add(CapitalAsset(
+                    client_id=client.id, asset_name=f"Asset {j}", asset_type="deposits",
+                    current_value=50000, annual_return_rate=0.03, payment_frequency="monthly",
+                    start_date=date(2032, 1, 1),
+                ))
+            db.add(AdditionalIncome(
+                client_id=client.id, source_type="rental", amount=4000,
+                frequency="monthly", start_date=date(2032, 1, 1),
+            ))
+            client_ids.append(client.id)
+        db.commit()
+        return client_ids
+    finally:
+        db.close()
+
+
+def run_profile(profile: str, args) -> dict:
+    with tempfile.TemporaryDirectory() as work_dir:
+        engine = get_engine(f"sqlite:///{os.path.join(work_dir, 'benchmark.db')}", sqlite_profile=profile)
+        Base.metadata.create_all(bind=engine)
+        session_factory = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+        client_ids = seed(session_factory, args.clients)
+
+        def override_get_db():
+            db = session_factory()
+            try:
+                yield db
+            finally:
+                db.close()
+
+        # Read-only endpoints (e.g. cashflow generation) use get_read_db
+        fastapi_app.dependency_overrides[get_db] = override_get_db
+        fastapi_app.dependency_overrides[get_read_db] = override_get_db
+        http = TestClient(fastapi_app)
+
+        def generate(client_id):
+            response = http.post(
+                f"/api/v1/clients/{client_id}/retirement-scenarios", json={"retirement_age": 67}
+            )
+            scenarios = response.json().get("scenarios", {}) if response.status_code == 200 else {}
+            return response.status_code, [s["scenario_id"] for s in scenarios.values()]
+
+        def cashflow(job):
+            client_id, scenario_id = job
+            response = http.post(
+                f"/api/v1/scenarios/{scenario_id}/cashflow/generate",
+                params={"client_id": client_id},
+                json={"from": "2032-01", "to": "2032-12", "frequency": "monthly"},
+            )
+            return response.status_code, []
+
+        def timed(fn, jobs):
+            start = time.perf_counter()
+            with ThreadPoolExecutor(max_workers=args.workers) as executor:
+                results = list(executor.map(fn, jobs))
+            elapsed = time.perf_counter() - start
+            errors = sum(1 for code, _ in results if code != 200)
+            return len(jobs) / elapsed, errors, results
+
+        try:
+            scenario_rates, cashflow_rates, errors = [], [], 0
+            for _ in range(args.rounds):
+                rate, failed, results = timed(generate, client_ids)
+                scenario_rates.append(rate)
+                errors += failed
+                jobs = [
+                    (client_id, scenario_id)
+                    for client_id, (_, scenario_ids) in zip(client_ids, results)
+                    for scenario_id in scenario_ids
+                ]
+                rate, failed, _ = timed(cashflow, jobs)
+                cashflow_rates.append(rate)
+                errors += failed
+        finally:
+            fastapi_app.dependency_overrides.pop(get_db, None)
+            fastapi_app.dependency_overrides.pop(get_read_db, None)
+            engine.dispose()
+
+    return {
+        "scenario_generation_rps": round(statistics.median(scenario_rates), 2),
+        "cashflow_rps": round(statistics.median(cashflow_rates), 2),
+        "errors": errors,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--clients", type=int, default=20, help="seeded clients (one scenario request each)")
+    parser.add_argument("--workers", type=int, default=8, help="concurrent requests")
+    parser.add_argument("--rounds", type=int, default=3, help="rounds per profile (median is reported)")
+    args = parser.parse_args()
+
+    report = {profile: run_profile(profile, args) for profile in PROFILES}
+    for key in ("scenario_generation_rps", "cashflow_rps"):
+        baseline = report["default"][key]
+        report.setdefault("speedup", {})[key] = round(report["performance"][key] / baseline, 2) if baseline else None
+
+    print(json.dumps(report, indent=2))
+    failed = {p: report[p]["errors"] for p in PROFILES if report[p]["errors"]}
+    if failed:
+        # Throughput of error responses is meaningless
+        print(f"FAILED: requests returned errors {failed}", file=sys.stderr)
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
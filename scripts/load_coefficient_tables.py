@@ -0,0 +1,38 @@
+"""
+Load the annuity coefficient tables from MEKEDMIM/*.csv
+
+Tables whose CSV content did not change since the last load are skipped:
+
+    python scripts/load_coefficient_tables.py
+    python scripts/load_coefficient_tables.py --force --table company_annuity_coefficient
+"""
+import argparse
+import json
+import sys
+import os
+
+# Add the project root to the path so we can import the app modules
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.core.coefficient_loader import COEFFICIENT_TABLE_SPECS, CoefficientCsvError, load_coefficient_tables
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--table", action="append", choices=sorted(COEFFICIENT_TABLE_SPECS),
+                        help="load only this table (may be repeated)")
+    parser.add_argument("--force", action="store_true", help="reload even if the CSV checksum is unchanged")
+    args = parser.parse_args()
+
+    try:
+        report = load_coefficient_tables(tables=args.table, force=args.force)
+    except CoefficientCsvError as e:
+        print(f"Invalid CSV: {e}", file=sys.stderr)
+        return 1
+
+    print(json.dumps(report, ensure_ascii=False, indent=2))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,44 @@
+"""
+Recompute stale rights-fixation results for all clients
+
+Run after ANNUAL_CAPS / EXEMPTION_PERCENTAGES are updated for a new year:
+
+    python scripts/recompute_fixations.py --workers 16
+    python scripts/recompute_fixations.py --dry-run
+"""
+import argparse
+import json
+import sys
+import os
+
+# Add the project root to the path so we can import the app modules
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import app.models  # noqa: F401
+from app.database import SessionLocal
+from app.services.fixation_recompute_service import DEFAULT_WORKERS, FixationRecomputeService
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--workers", type=int, default=DEFAULT_WORKERS, help="parallel calculation workers")
+    parser.add_argument("--include-missing", action="store_true", help="also create fixations for clients without one")
+    parser.add_argument("--dry-run", action="store_true", help="only report stale clients")
+    args = parser.parse_args()
+
+    db = SessionLocal()
+    try:
+        report = FixationRecomputeService(db).run(
+            workers=args.workers,
+            include_missing=args.include_missing,
+            dry_run=args.dry_run,
+        )
+    finally:
+        db.close()
+
+    print(json.dumps(report, ensure_ascii=False, indent=2))
+    return 1 if report["failed"] else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,125 @@
+"""
+Tests for the in-memory annuity coefficient index
+"""
+from datetime import date
+
+import pytest
+from sqlalchemy import text
+
+from app.services.annuity_coefficient.index import CoefficientIndex
+from app.services.annuity_coefficient.insurance import get_insurance_coefficient
+from app.services.annuity_coefficient.pension_fund import get_pension_fund_coefficient
+
+RAW_TABLES = {
+    "product_to_generation_map": """
+        CREATE TABLE product_to_generation_map (
+            id INTEGER PRIMARY KEY, product_type TEXT, rule_from_date TEXT,
+            rule_to_date TEXT, generation_code TEXT
+        )
+    """,
+    "company_annuity_coefficient": """
+        CREATE TABLE company_annuity_coefficient (
+            id INTEGER PRIMARY KEY, company_name TEXT, option_name TEXT, sex TEXT, age INTEGER,
+            base_year INTEGER, base_coefficient REAL, annual_increment_rate REAL, notes TEXT
+        )
+    """,
+    "policy_generation_coefficient": """
+        CREATE TABLE policy_generation_coefficient (
+            id INTEGER PRIMARY KEY, generation_code TEXT, generation_label TEXT, guarantee_months INTEGER,
+            age INTEGER, male_coefficient REAL, female_coefficient REAL, notes TEXT
+        )
+    """,
+}
+
+
+@pytest.fixture
+def coefficient_tables(db_session, monkeypatch):
+    for table, ddl in RAW_TABLES.items():
+        db_session.execute(text(f"DROP TABLE IF EXISTS {table}"))
+        db_session.execute(text(ddl))
+    db_session.execute(text("DELETE FROM pension_fund_coefficient"))
+    db_session.execute(text(
+        "INSERT INTO product_to_generation_map VALUES "
+        "(1, 'ביטוח מנהלים', '1900-01-01', '1989-12-31', 'PRE_1990'),"
+        "(2, 'ביטוח מנהלים', '1990-01-01', '2099-12-31', 'Y1990')"
+    ))
+    db_session.execute(text(
+        "INSERT INTO policy_generation_coefficient VALUES "
+        "(1, 'PRE_1990', 'עד 1989', 120, 65, 150.5, 170.5, NULL)"
+    ))
+    db_session.execute(text(
+        "INSERT INTO company_annuity_coefficient VALUES "
+        "(1, 'כלל', 'מינימום 180', 'זכר', 65, 2020, 200.0, 0.01, NULL)"
+    ))
+    db_session.execute(text(
+        "INSERT INTO pension_fund_coefficient (sex, retirement_age, survivors_option, spouse_age_diff, "
+        "base_coefficient, adjust_percent) VALUES ('זכר', 67, 'תקנוני', 0, 190.0, 0)"
+    ))
+    db_session.commit()
+
+    index = CoefficientIndex(check_interval=0)
+    monkeypatch.setattr("app.services.annuity_coefficient.insurance.coefficient_index", index)
+    monkeypatch.setattr("app.services.annuity_coefficient.pension_fund.coefficient_index", index)
+    yield index
+
+    for table in RAW_TABLES:
+        db_session.execute(text(f"DROP TABLE IF EXISTS {table}"))
+    db_session.execute(text("DELETE FROM pension_fund_coefficient"))
+    db_session.commit()
+
+
+def test_insurance_lookups_from_index(coefficient_tables):
+    generation = get_insurance_coefficient(date(1985, 5, 1), "נקבה", 65, None, None, 2025)
+    assert generation["factor_value"] == 170.5
+    assert generation["guarantee_months"] == 120
+
+    company = get_insurance_coefficient(date(1985, 5, 1), "זכר", 65, "כלל", "מינימום 180", 2025)
+    assert company["source_table"] == "company_annuity_coefficient"
+    assert company["factor_value"] == 210.0
+
+    missing = get_insurance_coefficient(date(1995, 5, 1), "זכר", 65, None, None, 2025)
+    assert missing["source_table"] == "default"
+
+
+def test_index_reloads_when_table_version_changes(coefficient_tables, db_session):
+    assert get_pension_fund_coefficient("זכר", 67, "תקנוני", 0)["factor_value"] == 190.0
+    loaded_at = coefficient_tables.stats()["loaded_at"]
+
+    assert get_pension_fund_coefficient("זכר", 67, "תקנוני", 0)["factor_value"] == 190.0
+    assert coefficient_tables.stats()["loaded_at"] == loaded_at
+
+    db_session.execute(text(
+        "INSERT INTO pension_fund_coefficient (sex, retirement_age, survivors_option, spouse_age_diff, "
+        "base_coefficient, adjust_percent) VALUES ('זכר', 67, 'תקנוני', 0, 195.0, 0)"
+    ))
+    db_session.commit()
+
+    assert get_pension_fund_coefficient("זכר", 67, "תקנוני", 0)["factor_value"] == 195.0
+
+
+def test_index_reloads_on_in_place_update(coefficient_tables, db_session):
+    assert get_pension_fund_coefficient("זכר", 67, "תקנוני", 0)["factor_value"] == 190.0
+
+    # Same row count and max id - only updated_at moves
+    db_session.execute(text(
+        "UPDATE pension_fund_coefficient SET base_coefficient = 185.0, updated_at = '2099-01-01 00:00:00'"
+    ))
+    db_session.commit()
+
+    assert get_pension_fund_coefficient("זכר", 67, "תקנוני", 0)["factor_value"] == 185.0
+
+
+def test_batch_endpoint_keeps_input_order(coefficient_tables, client):
+    base = {"gender": "זכר", "retirement_age": 67, "target_year": 2025}
+    response = client.post("/api/v1/annuity-coefficient/calculate-batch", json={"items": [
+        {**base, "product_type": "ביטוח מנהלים", "start_date": "1985-01-01", "retirement_age": 65},
+        {**base, "product_type": "קרן פנסיה", "start_date": "2000-01-01", "survivors_option": "תקנוני"},
+        {**base, "product_type": "ביטוח מנהלים", "start_date": "not-a-date"},
+    ]})
+
+    assert response.status_code == 200
+    results = response.json()["results"]
+    assert [item["index"] for item in results] == [0, 1, 2]
+    assert results[0]["source_table"] == "policy_generation_coefficient"
+    assert results[1]["factor_value"] == 190.0
+    assert results[2]["error"]
@@ -0,0 +1,84 @@
+"""
+Tests for the request-scoped client aggregate
+"""
+from datetime import date
+
+import pytest
+from sqlalchemy import event
+
+from app.models.additional_income import AdditionalIncome
+from app.models.capital_asset import CapitalAsset
+from app.models.client import Client
+from app.models.pension_fund import PensionFund
+from app.services.additional_income_service import AdditionalIncomeService
+from app.services.capital_asset import CapitalAssetService
+from app.services.case_service import detect_case
+from app.services.client_aggregate import AGGREGATE_COLLECTIONS, get_client_aggregate
+from app.services.documents.data_fetchers import fetch_client_data, fetch_pension_data
+from tests.utils import gen_valid_id
+
+
+@pytest.fixture
+def aggregate_client(db_session):
+    id_number = gen_valid_id()
+    client = Client(
+        id_number=id_number, id_number_raw=id_number, full_name="Aggregate Client",
+        birth_date=date(1970, 5, 1), gender="male",
+    )
+    db_session.add(client)
+    db_session.flush()
+    db_session.add_all([
+        PensionFund(client_id=client.id, fund_name="קרן", input_mode="manual",
+                    pension_amount=3000, pension_start_date=date(2037, 5, 1)),
+        CapitalAsset(client_id=client.id, asset_name="פיקדון", asset_type="deposits",
+                     current_value=100000, annual_return_rate=0.03, payment_frequency="monthly",
+                     start_date=date(2030, 1, 1)),
+        AdditionalIncome(client_id=client.id, source_type="business", amount=2000,
+                         frequency="monthly", start_date=date(2030, 1, 1)),
+    ])
+    db_session.commit()
+    client_id = client.id
+    db_session.expunge_all()
+    yield client_id
+    db_session.rollback()
+    for model in (PensionFund, CapitalAsset, AdditionalIncome):
+        db_session.query(model).filter_by(client_id=client_id).delete()
+    db_session.query(Client).filter_by(id=client_id).delete()
+    db_session.commit()
+
+
+def test_services_share_one_load(aggregate_client, db_session, engine):
+    statements = []
+
+    def count(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement)
+
+    event.listen(engine, "before_cursor_execute", count)
+    try:
+        case = detect_case(db_session, aggregate_client)
+        AdditionalIncomeService().generate_combined_cashflow(
+            db_session, aggregate_client, date(2030, 1, 1), date(2030, 12, 1)
+        )
+        CapitalAssetService().generate_combined_cashflow(
+            db_session, aggregate_client, date(2030, 1, 1), date(2030, 12, 1)
+        )
+        assert fetch_client_data(db_session, aggregate_client).full_name == "Aggregate Client"
+        assert len(fetch_pension_data(db_session, aggregate_client)) == 1
+    finally:
+        event.remove(engine, "before_cursor_execute", count)
+
+    assert case.reasons == ["no_current_employer", "has_business_income"]
+    selects = [s for s in statements if s.lstrip().startswith("SELECT")]
+    assert len(selects) == 1 + len(AGGREGATE_COLLECTIONS)
+
+
+def test_flushed_rows_show_up_in_the_aggregate(aggregate_client, db_session):
+    aggregate = get_client_aggregate(db_session, aggregate_client)
+    assert len(aggregate.pension_funds) == 1
+
+    db_session.add(PensionFund(client_id=aggregate_client, fund_name="קרן ב", input_mode="manual",
+                               pension_amount=1000, pension_start_date=date(2036, 1, 1)))
+    db_session.flush()
+
+    assert get_client_aggregate(db_session, aggregate_client) is aggregate
+    assert sorted(f.fund_name for f in aggregate.pension_funds) == ["קרן", "קרן ב"]
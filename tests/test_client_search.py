@@ -0,0 +1,154 @@
+"""
+Tests for indexed client search and keyset pagination
+"""
+from datetime import date
+
+import pytest
+
+from app.models.client import Client
+from app.services.client_search import search_clients
+from tests.utils import gen_valid_id
+
+
+@pytest.fixture
+def search_clients_book(db_session):
+    clients = []
+    for name in ["דנה מזרחי-חיפוש", "יוסי מזרחי-חיפוש", "אבי מזרחי-חיפוש", "רונית גולן-חיפוש"]:
+        id_number = gen_valid_id()
+        clients.append(Client(
+            id_number=id_number, id_number_raw=id_number, full_name=name,
+            birth_date=date(1965, 1, 1), gender="female",
+        ))
+    db_session.add_all(clients)
+    db_session.commit()
+    yield clients
+    for client in clients:
+        db_session.delete(client)
+    db_session.commit()
+
+
+def test_name_search_uses_index_and_follows_renames(search_clients_book, db_session):
+    result = search_clients(db_session, search="מזרחי-חיפ")
+    assert sorted(c.full_name for c in result.items) == ["אבי מזרחי-חיפוש", "דנה מזרחי-חיפוש", "יוסי מזרחי-חיפוש"]
+    assert result.total == 3
+
+    search_clients_book[3].full_name = "רונית מזרחי-חיפוש"
+    db_session.commit()
+    assert search_clients(db_session, search="מזרחי-חיפ").total == 4
+
+
+def test_id_number_exact_and_prefix(search_clients_book, db_session):
+    target = search_clients_book[0]
+    exact = search_clients(db_session, search=target.id_number)
+    assert [c.id for c in exact.items] == [target.id]
+
+    prefix = search_clients(db_session, search=target.id_number[:5], include_total=False)
+    assert target.id in [c.id for c in prefix.items]
+    assert prefix.total is None
+
+
+def test_keyset_pagination_endpoint(client, search_clients_book):
+    seen = []
+    cursor = None
+    while True:
+        params = {"search": "חיפוש", "sort": "full_name", "limit": 3, "include_total": "false"}
+        if cursor:
+            params["cursor"] = cursor
+        data = client.get("/api/v1/clients", params=params).json()
+        assert data["total"] is None
+        seen.extend(item["full_name"] for item in data["items"])
+        cursor = data["next_cursor"]
+        if not cursor:
+            break
+
+    assert seen == sorted(c.full_name for c in search_clients_book)
+    assert client.get("/api/v1/clients", params={"cursor": "not-a-cursor"}).status_code == 400
+
+
+def test_id_number_without_leading_zero_and_partial(db_session):
+    client = Client(
+        id_number="012345674", id_number_raw="12345674", full_name="אפס מוביל-חיפוש",
+        birth_date=date(1965, 1, 1), gender="male",
+    )
+    db_session.add(client)
+    db_session.commit()
+    try:
+        unpadded = search_clients(db_session, search="12345674")
+        assert [c.id for c in unpadded.items] == [client.id]
+
+        suffix = search_clients(db_session, search="5674")
+        assert client.id in [c.id for c in suffix.items]
+
+        # Extra leading zeros are fine, any other 10th digit is not an ID number
+        assert [c.id for c in search_clients(db_session, search="0012345674").items] == [client.id]
+        with pytest.raises(ValueError):
+            search_clients(db_session, search="1012345674")
+    finally:
+        db_session.delete(client)
+        db_session.commit()
+
+
+def test_name_search_without_trigram_tokenizer(tmp_path, monkeypatch):
+    from sqlalchemy import create_engine
+    from sqlalchemy.orm import Session
+
+    import app.services.client_search as client_search
+    from app.database import Base
+
+    monkeypatch.setattr(client_search, "_SQLITE_SEARCH_DDL", [
+        statement.replace("tokenize='trigram'", "tokenize='no_such_tokenizer'")
+        for statement in client_search._SQLITE_SEARCH_DDL
+    ])
+    engine = create_engine(f"sqlite:///{tmp_path / 'no_trigram.db'}")
+    try:
+        Base.metadata.create_all(bind=engine)
+        with Session(engine) as db:
+            assert not client_search.sqlite_search_index_available(db)
+            db.add(Client(
+                id_number="000000018", id_number_raw="000000018", full_name="שרה ללא-אינדקס",
+                birth_date=date(1965, 1, 1), gender="female",
+            ))
+            db.commit()
+            assert [c.full_name for c in search_clients(db, search="ללא-אינד").items] == ["שרה ללא-אינדקס"]
+    finally:
+        engine.dispose()
+
+
+def test_index_without_id_number_is_rebuilt(tmp_path):
+    from sqlalchemy import create_engine, text
+    from sqlalchemy.orm import Session
+
+    import app.services.client_search as client_search
+    from app.database import Base
+
+    engine = create_engine(f"sqlite:///{tmp_path / 'old_index.db'}")
+    try:
+        Base.metadata.create_all(bind=engine)
+        with Session(engine) as db:
+            db.add(Client(
+                id_number="000000018", id_number_raw="18", full_name="ישן",
+                birth_date=date(1965, 1, 1), gender="male",
+            ))
+            db.commit()
+
+        # Index layout from before id_number was indexed
+        with engine.begin() as connection:
+            for statement in client_search._SQLITE_SEARCH_CLEANUP:
+                connection.execute(text(statement))
+            connection.execute(text(
+                "CREATE VIRTUAL TABLE client_search USING fts5("
+                "full_name, content='client', content_rowid='id', tokenize='trigram')"
+            ))
+            connection.execute(text(
+                "CREATE TRIGGER client_search_ai AFTER INSERT ON client BEGIN "
+                "INSERT INTO client_search(rowid, full_name) VALUES (new.id, new.full_name); END"
+            ))
+            client_search._sqlite_index_available.clear()
+            assert client_search.ensure_client_search_index(connection)
+
+        with Session(engine) as db:
+            assert [c.full_name for c in search_clients(db, search="0001").items] == ["ישן"]
+            assert [c.full_name for c in search_clients(db, search="0018").items] == ["ישן"]
+    finally:
+        engine.dispose()
+        client_search._sqlite_index_available.clear()
@@ -0,0 +1,60 @@
+"""
+Tests for the MEKEDMIM coefficient table loader
+"""
+import shutil
+
+import pytest
+from sqlalchemy import inspect, text
+
+from app.core import coefficient_loader
+from app.core.coefficient_loader import CoefficientCsvError, load_coefficient_tables
+from app.core.system_validator import SystemValidator
+
+TABLE = "company_annuity_coefficient"
+
+
+@pytest.fixture
+def company_csv(tmp_path, monkeypatch, engine):
+    path = tmp_path / "company_annuity_coefficient.csv"
+    shutil.copy(coefficient_loader.PROJECT_ROOT / "MEKEDMIM" / "company_annuity_coefficient.csv", path)
+    monkeypatch.setitem(coefficient_loader.COEFFICIENT_TABLE_SPECS[TABLE], "csv_file", str(path))
+    yield path
+    with engine.begin() as conn:
+        conn.execute(text(f"DROP TABLE IF EXISTS {TABLE}"))
+        conn.execute(text(f"DROP TABLE IF EXISTS {coefficient_loader.CHECKSUM_TABLE}"))
+
+
+def test_load_creates_indexes_and_skips_unchanged(company_csv, engine):
+    first = load_coefficient_tables(engine, tables=[TABLE])
+    assert first[TABLE]["status"] == "loaded"
+    assert first[TABLE]["rows"] == 6
+
+    index_names = {index["name"] for index in inspect(engine).get_indexes(TABLE)}
+    assert "ix_company_annuity_coefficient_lookup" in index_names
+
+    assert load_coefficient_tables(engine, tables=[TABLE])[TABLE]["status"] == "unchanged"
+
+    with open(company_csv, "a", encoding="utf-8") as f:
+        f.write("7,הראל,מינימום 240,זכר,68,2024,198.5,0.0015,,2024-01-01,2099-12-31\n")
+    assert load_coefficient_tables(engine, tables=[TABLE])[TABLE]["rows"] == 7
+
+
+def test_invalid_csv_is_rejected_before_writing(company_csv, engine):
+    load_coefficient_tables(engine, tables=[TABLE])
+    with open(company_csv, "a", encoding="utf-8") as f:
+        f.write("8,הראל,מינימום 240,זכר,not-an-age,2024,198.5,0.0015,,,\n")
+
+    with pytest.raises(CoefficientCsvError):
+        load_coefficient_tables(engine, tables=[TABLE])
+
+    with engine.connect() as conn:
+        assert conn.execute(text(f"SELECT COUNT(*) FROM {TABLE}")).scalar() == 6
+
+
+def test_validator_skips_unchanged_table(company_csv, engine, db_session, monkeypatch):
+    load_coefficient_tables(engine, tables=[TABLE])
+    validator = SystemValidator(db_session)
+    config = dict(SystemValidator.CRITICAL_TABLES[TABLE], csv_file=str(company_csv))
+
+    monkeypatch.setattr("app.core.system_validator.inspect", lambda *_: pytest.fail("table re-inspected"))
+    assert validator._validate_table(TABLE, config) == (True, "")
@@ -0,0 +1,37 @@
+"""
+Tests for the SQLite performance profile and WAL checkpointing
+"""
+from app.database import WalCheckpointer, get_engine, uses_wal
+
+
+def test_performance_profile_applies_pragmas(tmp_path):
+    engine = get_engine(f"sqlite:///{tmp_path / 'tuned.db'}", sqlite_profile="performance")
+    plain = get_engine(f"sqlite:///{tmp_path / 'plain.db'}")
+    try:
+        with engine.connect() as connection:
+            pragma = lambda name: connection.exec_driver_sql(f"PRAGMA {name}").scalar()
+            assert pragma("journal_mode") == "wal"
+            assert pragma("synchronous") == 1  # NORMAL
+            assert pragma("busy_timeout") == 5000
+        # Opt-in: without a profile the database keeps the driver defaults
+        assert not uses_wal(plain)
+    finally:
+        engine.dispose()
+        plain.dispose()
+
+
+def test_checkpoint_moves_wal_frames_into_database(tmp_path):
+    engine = get_engine(f"sqlite:///{tmp_path / 'wal.db'}", sqlite_profile="performance")
+    try:
+        with engine.begin() as connection:
+            connection.exec_driver_sql("CREATE TABLE t (a INTEGER)")
+            connection.exec_driver_sql("INSERT INTO t VALUES (1)")
+
+        checkpointer = WalCheckpointer(engine, interval=60).start()
+        busy, wal_frames, checkpointed = checkpointer.checkpoint()
+        checkpointer.stop()
+
+        assert busy == 0 and wal_frames == checkpointed > 0
+        assert (tmp_path / "wal.db-wal").stat().st_size == 0
+    finally:
+        engine.dispose()
@@ -0,0 +1,77 @@
+"""
+Tests for the parallel, zipped document package
+"""
+import io
+import zipfile
+from datetime import date
+
+import pytest
+
+from app.models.capital_asset import CapitalAsset
+from app.models.client import Client
+from app.models.fixation_result import FixationResult
+from app.models.pension_fund import PensionFund
+from app.services.documents.data_fetchers import load_package_context
+from tests.utils import gen_valid_id
+
+
+@pytest.fixture
+def package_client(db_session):
+    id_number = gen_valid_id()
+    client = Client(
+        id_number=id_number,
+        id_number_raw=id_number,
+        full_name="Package Client",
+        first_name="Package",
+        last_name="Client",
+        birth_date=date(1958, 3, 1),
+        gender="male",
+    )
+    db_session.add(client)
+    db_session.flush()
+    db_session.add(FixationResult(
+        client_id=client.id,
+        exempt_capital_remaining=500000.0,
+        raw_result={
+            "exemption_summary": {"exempt_capital_initial": 900000, "total_impact": 400000},
+            "grants": [{"employer_name": "מעסיק", "grant_amount": 100000, "limited_indexed_amount": 120000}],
+            "eligibility_date": "2025-03-01",
+        },
+    ))
+    db_session.add(PensionFund(
+        client_id=client.id, fund_name="קרן", input_mode="manual",
+        pension_amount=4000, pension_start_date=date(2025, 3, 1),
+    ))
+    db_session.add(CapitalAsset(
+        client_id=client.id, asset_name="היוון", asset_type="provident_fund",
+        current_value=50000, annual_return_rate=0, payment_frequency="monthly",
+        start_date=date(2025, 3, 1), tax_treatment="exempt",
+        remarks="pension_fund_id=1 amount=50000",
+    ))
+    db_session.commit()
+    yield client
+    db_session.query(FixationResult).filter_by(client_id=client.id).delete()
+    db_session.query(PensionFund).filter_by(client_id=client.id).delete()
+    db_session.query(CapitalAsset).filter_by(client_id=client.id).delete()
+    db_session.delete(client)
+    db_session.commit()
+
+
+def test_package_context_is_a_read_only_snapshot(package_client, db_session):
+    context = load_package_context(db_session, package_client.id)
+
+    assert context.client.first_name == "Package"
+    assert context.effective_pension_start_date == date(2025, 3, 1)
+    assert len(context.commutations) == 1
+    with pytest.raises(TypeError):
+        context.fixation.exemption_summary["total_impact"] = 0
+
+
+def test_package_endpoint_streams_zip(client, package_client):
+    response = client.post(f"/api/v1/fixation/{package_client.id}/package")
+
+    assert response.status_code == 200
+    assert response.headers["content-type"] == "application/zip"
+    names = zipfile.ZipFile(io.BytesIO(response.content)).namelist()
+    assert names[0] == "טופס_161ד.pdf"
+    assert len(names) == 4
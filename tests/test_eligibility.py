@@ -5,10 +5,18 @@ import unittest
 from datetime import date, timedelta
 import sys
 import os
+import tempfile
+from unittest import mock
 
 # הוספת נתיב למודול app
 sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
-from app.services.retirement_age_service import calc_eligibility_date
+from app.services import retirement_age_service
+from app.services.retirement_age_service import (
+    FEMALE_RETIREMENT_AGE_TABLE,
+    calc_eligibility_date,
+    calculate_retirement_ages,
+    get_female_retirement_age_from_table,
+)
 
 # פונקציות עזר לבדיקות
 def has_started_pension(pension_start_date):
@@ -134,5 +142,41 @@ class TestEligibility(unittest.TestCase):
         self.assertTrue(result["age_condition_ok"])
         self.assertTrue(result["pension_condition_ok"])
 
+    def test_female_table_lookup_matches_ranges(self):
+        """החיפוש הבינארי בטבלה המהודרת מחזיר את אותו גיל כמו סריקת הטווחים"""
+        for year in range(1940, 1975):
+            for month in range(1, 13):
+                birth_str = f"{year:04d}-{month:02d}"
+                expected = next(
+                    age for (start, end), age in FEMALE_RETIREMENT_AGE_TABLE.items()
+                    if start <= birth_str <= end
+                )
+                self.assertEqual(get_female_retirement_age_from_table(date(year, month, 15)), expected)
+
+    def test_bulk_retirement_ages(self):
+        """חישוב מרוכז לכמה לקוחות שומר על הסדר"""
+        results = calculate_retirement_ages([(date(1960, 6, 10), "female"), (date(1958, 2, 1), "male")])
+        self.assertEqual(results[0]["retirement_date"], date(2022, 10, 10))
+        self.assertEqual(results[0]["source"], "legal_table")
+        self.assertEqual(results[1]["age_years"], 67)
+
+    def test_settings_reloaded_only_when_file_changes(self):
+        """הגדרות נטענות מהמטמון כל עוד הקובץ לא השתנה"""
+        original_path = retirement_age_service.SETTINGS_FILE
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            retirement_age_service.SETTINGS_FILE = os.path.join(tmp_dir, "settings.json")
+            try:
+                retirement_age_service.save_retirement_age_settings({"male_retirement_age": 66})
+                self.assertEqual(retirement_age_service.load_retirement_age_settings()["male_retirement_age"], 66)
+
+                with mock.patch("builtins.open", side_effect=AssertionError("settings file re-read")):
+                    self.assertEqual(retirement_age_service.load_retirement_age_settings()["male_retirement_age"], 66)
+
+                retirement_age_service.save_retirement_age_settings({"male_retirement_age": 68})
+                self.assertEqual(retirement_age_service.load_retirement_age_settings()["male_retirement_age"], 68)
+            finally:
+                retirement_age_service.SETTINGS_FILE = original_path
+                retirement_age_service._settings_cache.update(mtime=None, settings=None)
+
 if __name__ == '__main__':
     unittest.main()
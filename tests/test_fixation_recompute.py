@@ -0,0 +1,123 @@
+"""
+Tests for bulk rights-fixation recomputation
+"""
+from datetime import date
+
+import pytest
+
+from app.models.client import Client
+from app.models.fixation_result import FixationResult
+from app.models.grant import Grant
+from app.routers.rights_fixation import calculate_and_save_fixation_for_client
+from app.services.fixation_recompute_service import FixationRecomputeService
+from app.services.rights_fixation import (
+    calculate_full_fixation_memoized,
+    clear_fixation_result_cache,
+    exemption_caps,
+    indexation_factors,
+)
+from app.services.rights_fixation.payload import build_fixation_payload
+from tests.utils import gen_valid_id
+
+
+@pytest.fixture
+def fixation_client(db_session, monkeypatch):
+    monkeypatch.setattr(indexation_factors, "_fetch_factor_from_cbs", lambda f, t: 1.1)
+    indexation_factors.clear_indexation_factor_cache()
+
+    id_number = gen_valid_id()
+    client = Client(
+        id_number=id_number,
+        id_number_raw=id_number,
+        full_name="Bulk Fixation",
+        birth_date=date(1958, 3, 1),
+        gender="male",
+    )
+    db_session.add(client)
+    db_session.flush()
+    db_session.add(Grant(
+        client_id=client.id,
+        employer_name="Employer",
+        work_start_date=date(2000, 1, 1),
+        work_end_date=date(2015, 1, 1),
+        grant_date=date(2015, 1, 1),
+        grant_amount=100000,
+    ))
+    db_session.commit()
+    clear_fixation_result_cache()
+    yield client
+    indexation_factors.clear_indexation_factor_cache()
+    clear_fixation_result_cache()
+
+
+def test_recompute_creates_then_skips_up_to_date(db_session, fixation_client):
+    service = FixationRecomputeService(db_session)
+
+    first = service.run(include_missing=True, client_ids=[fixation_client.id])
+    assert first["inserted"] == 1
+    assert first["failed"] == []
+
+    second = service.run(client_ids=[fixation_client.id])
+    assert second["up_to_date"] == 1
+    assert second["recomputed"] == 0
+
+
+def test_parameter_change_marks_fixation_stale(db_session, fixation_client, monkeypatch):
+    service = FixationRecomputeService(db_session)
+    service.run(include_missing=True, client_ids=[fixation_client.id])
+
+    monkeypatch.setitem(exemption_caps.ANNUAL_CAPS, 2025, 9999)
+    report = service.run(client_ids=[fixation_client.id])
+
+    assert report["stale_client_ids"] == [fixation_client.id]
+    assert report["updated"] == 1
+    row = db_session.query(FixationResult).filter_by(client_id=fixation_client.id).one()
+    assert row.raw_payload["parameters_version"] == exemption_caps.get_parameters_version()
+
+
+def test_memoized_fixation_skips_indexation(db_session, fixation_client, monkeypatch):
+    grants = db_session.query(Grant).filter_by(client_id=fixation_client.id).all()
+    first = calculate_full_fixation_memoized(build_fixation_payload(fixation_client, grants, None))
+
+    def fail(*args, **kwargs):
+        raise AssertionError("indexation should not run for an unchanged input")
+
+    monkeypatch.setattr(indexation_factors, "_fetch_factor_from_cbs", fail)
+    indexation_factors.clear_indexation_factor_cache()
+    second = calculate_full_fixation_memoized(build_fixation_payload(fixation_client, grants, None))
+
+    assert second == first
+    assert second["grants"][0]["indexed_full"] == pytest.approx(110000)
+
+
+def test_save_for_client_keeps_unchanged_fixation(db_session, fixation_client):
+    saved = calculate_and_save_fixation_for_client(db_session, fixation_client.id)
+    saved_at = saved.created_at
+
+    clear_fixation_result_cache()
+    again = calculate_and_save_fixation_for_client(db_session, fixation_client.id)
+
+    assert again.id == saved.id
+    assert again.created_at == saved_at
+
+
+def test_recompute_endpoint_caps_workers(client):
+    from app.services.fixation_recompute_service import MAX_WORKERS
+
+    response = client.post("/api/v1/rights-fixation/recompute-all", params={"workers": 10000, "dry_run": True})
+    assert response.status_code == 422
+
+    response = client.post("/api/v1/rights-fixation/recompute-all", params={"workers": MAX_WORKERS, "dry_run": True})
+    assert response.status_code == 200
+
+
+def test_payload_hash_ignores_computation_date():
+    from types import SimpleNamespace
+
+    client = SimpleNamespace(id=1, birth_date=None, gender=None)
+    first = build_fixation_payload(client, [], None, today=date(2025, 1, 1))
+    second = build_fixation_payload(client, [], None, today=date(2025, 6, 1))
+
+    assert first["eligibility_date"] == "2025-01-01"
+    assert second["computation_date"] == "2025-06-01"
+    assert first["input_hash"] == second["input_hash"]
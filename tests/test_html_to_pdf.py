@@ -0,0 +1,59 @@
+"""
+Tests for cached wkhtmltopdf discovery and bounded HTML to PDF conversion
+"""
+import importlib
+import stat
+import subprocess
+
+import pytest
+
+converter = importlib.import_module("app.services.documents.converters.html_to_pdf")
+
+
+@pytest.fixture
+def fake_wkhtmltopdf(tmp_path, monkeypatch):
+    """A converter stand-in that copies the HTML to the PDF path (fails on 'broken' inputs)"""
+    script = tmp_path / "wkhtmltopdf"
+    script.write_text(
+        '#!/bin/sh\n'
+        'for last; do :; done\n'
+        'eval "src=\\${$(($#-1))}"\n'
+        'case "$src" in *broken*) echo "bad input" >&2; exit 1;; esac\n'
+        'cp "$src" "$last"\n'
+    )
+    script.chmod(script.stat().st_mode | stat.S_IEXEC)
+    monkeypatch.setattr(converter, "_wkhtmltopdf_path", str(script))
+    yield script
+    converter.reset_wkhtmltopdf_cache()
+
+
+def test_wkhtmltopdf_discovery_is_cached(monkeypatch):
+    converter.reset_wkhtmltopdf_cache()
+    probes = []
+
+    def fake_run(cmd, **kwargs):
+        probes.append(cmd[0])
+        if cmd[0] != "wkhtmltopdf":
+            # A non-executable candidate must not abort the search either
+            raise (PermissionError if len(probes) == 1 else FileNotFoundError)(cmd[0])
+
+    monkeypatch.setattr(subprocess, "run", fake_run)
+    assert converter.find_wkhtmltopdf() == "wkhtmltopdf"
+    assert converter.find_wkhtmltopdf() == "wkhtmltopdf"
+    assert len(probes) == 3
+    converter.reset_wkhtmltopdf_cache()
+
+
+def test_conversion_uses_the_shared_slots(tmp_path, fake_wkhtmltopdf):
+    good = tmp_path / "summary.html"
+    good.write_text("<p>summary</p>", encoding="utf-8")
+    broken = tmp_path / "broken.html"
+    broken.write_text("<p>x</p>", encoding="utf-8")
+
+    pdf = converter.html_to_pdf(good, tmp_path / "summary.pdf")
+    assert pdf.read_text(encoding="utf-8") == "<p>summary</p>"
+
+    with pytest.raises(RuntimeError):
+        converter.html_to_pdf(broken, tmp_path / "direct.pdf")
+    # A failed conversion releases its slot
+    assert converter._conversion_slots._value == converter.HTML_TO_PDF_WORKERS
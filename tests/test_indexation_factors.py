@@ -0,0 +1,78 @@
+"""
+בדיקות למטמון מקדמי ההצמדה של קיבוע הזכויות
+"""
+import pytest
+
+from app.database import SessionLocal
+from app.models.indexation_factor import IndexationFactor
+from app.services.rights_fixation import indexation_factors
+from app.services.rights_fixation.indexation import calculate_adjusted_amount
+
+
+@pytest.fixture
+def cbs_calls(monkeypatch):
+    """מחליף את קריאת הלמ"ס במקדם קבוע וסופר קריאות"""
+    calls = []
+
+    def fake_fetch(from_month, to_month):
+        calls.append((from_month, to_month))
+        return 1.25
+
+    monkeypatch.setattr(indexation_factors, "_fetch_factor_from_cbs", fake_fetch)
+    indexation_factors.clear_indexation_factor_cache()
+    with SessionLocal() as db:
+        db.query(IndexationFactor).delete()
+        db.commit()
+    yield calls
+    indexation_factors.clear_indexation_factor_cache()
+
+
+def test_month_key():
+    assert indexation_factors.month_key("2015-03-17") == "2015-03"
+
+
+def test_same_month_needs_no_lookup(cbs_calls):
+    assert indexation_factors.get_indexation_factor("2015-03-01", "2015-03-31") == 1.0
+    assert cbs_calls == []
+
+
+def test_amounts_share_one_factor_per_month_pair(cbs_calls):
+    first = calculate_adjusted_amount(100000, "2010-05-03", "2024-01-01")
+    second = calculate_adjusted_amount(40000, "2010-05-28", "2024-01-15")
+
+    assert first == 125000.0
+    assert second == 50000.0
+    assert cbs_calls == [("2010-05", "2024-01")]
+
+
+def test_final_factor_is_persisted(cbs_calls):
+    indexation_factors.get_indexation_factor("2012-01-01", "2020-06-01")
+    indexation_factors.clear_indexation_factor_cache()
+
+    # אחרי ניקוי הזיכרון המקדם נטען מהטבלה ללא קריאה נוספת ללמ"ס
+    assert indexation_factors.get_indexation_factor("2012-01-10", "2020-06-10") == 1.25
+    assert len(cbs_calls) == 1
+
+
+def test_failed_lookup_is_not_cached(monkeypatch, cbs_calls):
+    monkeypatch.setattr(indexation_factors, "_fetch_factor_from_cbs", lambda f, t: None)
+    assert calculate_adjusted_amount(1000, "2011-01-01", "2019-01-01") is None
+
+    monkeypatch.setattr(indexation_factors, "_fetch_factor_from_cbs", lambda f, t: 1.1)
+    assert calculate_adjusted_amount(1000, "2011-01-01", "2019-01-01") == 1100.0
+
+
+def test_process_grants_keeps_order_and_isolates_failures(cbs_calls):
+    from app.services.rights_fixation import process_grants
+
+    grants = [
+        {"grant_amount": 1000, "work_start_date": "2000-01-01", "work_end_date": "2012-01-01"},
+        {"grant_amount": 2000, "work_start_date": "2001-01-01"},  # חסר תאריך סיום
+        {"grant_amount": 3000, "work_start_date": "2002-01-01", "work_end_date": "2014-01-01"},
+    ]
+    processed = process_grants(grants, "2024-01-01")
+
+    assert [g["grant_amount"] for g in processed] == [1000, 2000, 3000]
+    assert processed[0]["indexed_full"] == 1250.0
+    assert "indexed_full" not in processed[1]
+    assert processed[2]["indexed_full"] == 3750.0
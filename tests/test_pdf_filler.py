@@ -0,0 +1,38 @@
+"""
+Tests for cached AcroForm filling
+"""
+from pathlib import Path
+
+from pdfrw import PdfReader
+
+import pdf_filler
+
+TEMPLATE = Path(__file__).resolve().parent.parent / "templates" / "161d.pdf"
+
+
+def _values(path):
+    return {
+        pdf_filler._clean_field_name(f.T): f.V.decode() if f.V else None
+        for f in PdfReader(str(path)).Root.AcroForm.Fields
+    }
+
+
+def test_batch_fill_parses_template_once_and_keeps_forms_independent(tmp_path, monkeypatch):
+    pdf_filler.clear_template_cache()
+    parsed = []
+    original_reader = pdf_filler.PdfReader
+    monkeypatch.setattr(pdf_filler, "PdfReader", lambda path: parsed.append(path) or original_reader(path))
+
+    first, second = pdf_filler.fill_acroform_batch(TEMPLATE, [
+        (tmp_path / "a.pdf", {"ClientAddress": "רחוב הרצל 1, חיפה", "ClientBdate": "01/01/1960"}),
+        (tmp_path / "b.pdf", {"ClientBdate": "02/02/1970", "NotAField": "x"}),
+    ])
+    pdf_filler.fill_acroform(TEMPLATE, tmp_path / "c.pdf", {"ClientBdate": "03/03/1980"})
+
+    assert len(parsed) == 1
+    assert _values(first)["ClientAddress"] == "רחוב הרצל 1, חיפה"
+    assert _values(first)["ClientBdate"] == "01/01/1960"
+    assert _values(second)["ClientAddress"] is None
+    assert _values(second)["ClientBdate"] == "02/02/1970"
+    assert _values(tmp_path / "c.pdf")["ClientBdate"] == "03/03/1980"
+    assert "ClientAddress" in pdf_filler.get_pdf_fields(TEMPLATE)
@@ -0,0 +1,57 @@
+"""
+Tests for the cached report chart rendering
+"""
+import os
+
+import pytest
+
+from utils import pdf_graphs
+
+CASHFLOW = [
+    {"year": 2030 + i, "gross_income": 1000.0 * i, "net_income": 800.0 * i, "tax": 200.0 * i}
+    for i in range(5)
+]
+
+
+@pytest.fixture
+def chart_cache(tmp_path, monkeypatch):
+    monkeypatch.setattr(pdf_graphs, "CHART_CACHE_DIR", tmp_path)
+    monkeypatch.setattr(pdf_graphs, "RENDER_IN_WORKER", False)
+    pdf_graphs.clear_chart_cache()
+    yield tmp_path
+    pdf_graphs.clear_chart_cache()
+
+
+def test_unchanged_series_reuse_cached_chart(chart_cache, monkeypatch):
+    first = pdf_graphs.render_cumulative_chart(CASHFLOW).getvalue()
+    assert first.startswith(b"\x89PNG")
+    assert len(list(chart_cache.glob("*.png"))) == 1
+
+    def fail(chart_type, args):
+        raise AssertionError("chart should come from the cache")
+
+    monkeypatch.setattr(pdf_graphs, "_render_png", fail)
+    assert pdf_graphs.render_cumulative_chart(CASHFLOW).getvalue() == first
+
+    pdf_graphs.clear_chart_cache()
+    assert pdf_graphs.render_cumulative_chart(CASHFLOW).getvalue() == first
+
+
+def test_disk_cache_drops_least_recently_used_charts(chart_cache, monkeypatch):
+    pdf_graphs.render_cumulative_chart(CASHFLOW)
+    first = next(chart_cache.glob("*.png"))
+    os.utime(first, (0, 0))
+    monkeypatch.setattr(pdf_graphs, "DISK_CACHE_MAX_BYTES", first.stat().st_size * 3 // 2)
+
+    pdf_graphs.render_cumulative_chart(CASHFLOW, title="Other")
+
+    assert not first.exists()
+    assert len(list(chart_cache.glob("*.png"))) == 1
+
+
+def test_cache_key_depends_on_series_and_chart_type():
+    key = pdf_graphs.chart_cache_key("cashflow", ([2030], [1.0], [1.0], [0.0], "t"))
+
+    assert key == pdf_graphs.chart_cache_key("cashflow", ([2030], [1.0], [1.0], [0.0], "t"))
+    assert key != pdf_graphs.chart_cache_key("cashflow", ([2030], [2.0], [1.0], [0.0], "t"))
+    assert key != pdf_graphs.chart_cache_key("tax_analysis", ([2030], [1.0], [1.0], [0.0], "t"))
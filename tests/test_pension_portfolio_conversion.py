@@ -0,0 +1,102 @@
+"""
+Tests for bulk conversion of pension portfolio accounts
+"""
+from datetime import date
+
+import pytest
+from sqlalchemy import event
+
+from app.models.capital_asset import CapitalAsset
+from app.models.client import Client
+from app.models.pension_fund import PensionFund
+from app.services.retirement.services.portfolio_import_service import PortfolioImportService
+from tests.utils import gen_valid_id
+
+
+@pytest.fixture
+def portfolio_client(db_session):
+    id_number = gen_valid_id()
+    client = Client(
+        id_number=id_number,
+        id_number_raw=id_number,
+        full_name="Bulk Conversion",
+        birth_date=date(1965, 6, 1),
+        gender="male",
+    )
+    db_session.add(client)
+    db_session.commit()
+    yield client
+    db_session.query(PensionFund).filter_by(client_id=client.id).delete()
+    db_session.query(CapitalAsset).filter_by(client_id=client.id).delete()
+    db_session.commit()
+
+
+@pytest.fixture
+def statement_counter(engine):
+    statements = []
+
+    def count(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement)
+
+    event.listen(engine, "before_cursor_execute", count)
+    yield statements
+    event.remove(engine, "before_cursor_execute", count)
+
+
+def _accounts(count):
+    return [
+        {
+            "מספר_חשבון": f"ACC-{i}",
+            "שם_תכנית": f"תכנית {i}",
+            "סוג_מוצר": "קרן השתלמות" if i % 3 == 0 else "קרן פנסיה",
+            "חברה_מנהלת": "מגדל",
+            "יתרה": 1000.0 * (i + 1),
+            "תגמולי_עובד_אחרי_2000": 1000.0 * (i + 1),
+            "conversion_type": "capital_asset" if i % 2 else "pension",
+        }
+        for i in range(count)
+    ]
+
+
+def test_convert_endpoint_uses_constant_statements(client, portfolio_client, db_session, statement_counter):
+    response = client.post(
+        f"/api/v1/clients/{portfolio_client.id}/pension-portfolio/convert",
+        json={"accounts": _accounts(30) + [{"יתרה": 0}]},
+    )
+
+    assert response.status_code == 200
+    assert response.json()["converted_count"] == 30
+    inserts = [s for s in statement_counter if s.startswith("INSERT")]
+    assert len(inserts) == 2
+
+    db_session.expire_all()
+    funds = db_session.query(PensionFund).filter_by(client_id=portfolio_client.id).all()
+    assert len(funds) == 15
+    assert {f.tax_treatment for f in funds if "השתלמות" in f.fund_type} == {"exempt"}
+    assert db_session.query(CapitalAsset).filter_by(client_id=portfolio_client.id).count() == 15
+    assert db_session.get(Client, portfolio_client.id).pension_start_date == date(2025, 1, 1)
+
+
+def test_import_service_updates_existing_and_inserts_new_in_bulk(portfolio_client, db_session):
+    actions = []
+    service = PortfolioImportService(
+        db_session, portfolio_client.id, 67, add_action_callback=lambda *a, **k: actions.append(a)
+    )
+    service.import_pension_portfolio(_accounts(4))
+    db_session.commit()
+
+    accounts = _accounts(5)
+    accounts[0]["תגמולי_עובד_אחרי_2000"] = 99.0
+    accounts.append(dict(accounts[4], **{"תגמולי_עובד_אחרי_2000": 7.0}))
+    service.import_pension_portfolio(accounts)
+    db_session.commit()
+
+    funds = {
+        f.deduction_file: f
+        for f in db_session.query(PensionFund).filter_by(client_id=portfolio_client.id).all()
+    }
+    assert sorted(funds) == ["ACC-0", "ACC-1", "ACC-2", "ACC-3", "ACC-4"]
+    assert funds["ACC-0"].balance == 99.0
+    assert funds["ACC-4"].balance == 7.0
+    assert funds["ACC-0"].tax_treatment == "exempt"
+    assert len(actions) == 10
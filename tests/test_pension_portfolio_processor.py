@@ -0,0 +1,201 @@
+"""
+Tests for the streaming pension clearing-house file processor
+"""
+import logging
+import uuid
+
+import pytest
+
+from app.services.pension_portfolio.parallel import (
+    UnsupportedEncodingError,
+    decode_pension_file,
+    decoded_chunks,
+    detect_xml_encoding,
+    process_pension_file,
+)
+from app.services.pension_portfolio.processor import (
+    PensionPortfolioProcessor,
+    _PensionFileProcessor,
+    _StreamingPensionFileProcessor,
+)
+
+LOGGER = logging.getLogger(__name__)
+PROCESS_XML_URL = "/api/v1/clients/{client_id}/pension-portfolio/process-xml"
+
+MISLAKA_XML = """<?xml version="1.0" encoding="utf-8"?>
+<Mimshak>
+  <YeshutYatzran>
+    <SHEM-YATZRAN>מגדל מקפת</SHEM-YATZRAN>
+    <KOD-MEZAHE-YATZRAN>512</KOD-MEZAHE-YATZRAN>
+    <Mutzarim>
+      <Mutzar>
+        <SUG-MUTZAR>2</SUG-MUTZAR>
+        <YeshutMaasik><SHEM-MAASIK>חברה א</SHEM-MAASIK></YeshutMaasik>
+        <HeshbonotOPolisot>
+          <HeshbonOPolisa>
+            <MISPAR-POLISA-O-HESHBON>1001</MISPAR-POLISA-O-HESHBON>
+            <SHEM-TOCHNIT>מגדל מקפת אישית</SHEM-TOCHNIT>
+            <TAARICH-NECHONUT-YITROT>20241231</TAARICH-NECHONUT-YITROT>
+            <TAARICH-HITZTARFUT-RISHON>20100101</TAARICH-HITZTARFUT-RISHON>
+            <BlockItrot>
+              <PerutYitrot>
+                <TOTAL-CHISACHON-MTZBR>1,500.50</TOTAL-CHISACHON-MTZBR>
+                <SUG-HAFRASHA>2</SUG-HAFRASHA>
+              </PerutYitrot>
+              <PerutYitrot>
+                <TOTAL-CHISACHON-MTZBR>500</TOTAL-CHISACHON-MTZBR>
+              </PerutYitrot>
+            </BlockItrot>
+            <PerutYitraLeTkufa>
+              <KOD-TECHULAT-SHICHVA>1</KOD-TECHULAT-SHICHVA>
+              <SUG-REKIV-ITRA>1</SUG-REKIV-ITRA>
+              <SACH-ITRA-LESHICHVA-BESHACH>800</SACH-ITRA-LESHICHVA-BESHACH>
+            </PerutYitraLeTkufa>
+          </HeshbonOPolisa>
+          <HeshbonOPolisa>
+            <MISPAR-POLISA-O-HESHBON>1002</MISPAR-POLISA-O-HESHBON>
+            <SHEM-TOCHNIT>קרן השתלמות</SHEM-TOCHNIT>
+            <YeshutMaasik><SHEM-MAASIK>חברה ב</SHEM-MAASIK></YeshutMaasik>
+            <BlockItrot>
+              <PerutYitrot><TOTAL-ERKEI-PIDION>250</TOTAL-ERKEI-PIDION></PerutYitrot>
+            </BlockItrot>
+          </HeshbonOPolisa>
+          <HeshbonOPolisa>
+            <SHEM-MAASIK>ריק</SHEM-MAASIK>
+          </HeshbonOPolisa>
+        </HeshbonotOPolisot>
+      </Mutzar>
+    </Mutzarim>
+  </YeshutYatzran>
+  <YeshutYatzran>
+    <Mutzarim>
+      <Mutzar>
+        <HeshbonotOPolisot>
+          <HeshbonOPolisa>
+            <MISPAR-POLISA-O-HESHBON>2001</MISPAR-POLISA-O-HESHBON>
+            <SHEM-TOCHNIT>ביטוח מנהלים</SHEM-TOCHNIT>
+          </HeshbonOPolisa>
+        </HeshbonotOPolisot>
+      </Mutzar>
+    </Mutzarim>
+  </YeshutYatzran>
+</Mimshak>
+"""
+
+
+def _without_timestamp(result):
+    return {key: value for key, value in result.items() if key != "processed_at"}
+
+
+def test_streaming_matches_dom_processor(monkeypatch):
+    monkeypatch.setattr("app.services.pension_portfolio.processor.STREAM_CHUNK_SIZE", 64)
+
+    streamed = _StreamingPensionFileProcessor(MISLAKA_XML, "mislaka.xml", LOGGER).process()
+    expected = _PensionFileProcessor(MISLAKA_XML, "mislaka.xml", LOGGER).process()
+
+    assert _without_timestamp(streamed) == _without_timestamp(expected)
+    accounts = streamed["accounts"]
+    assert [account["מספר_חשבון"] for account in accounts] == ["1001", "1002", "2001"]
+    assert accounts[0]["חברה_מנהלת"] == "מגדל מקפת"
+    assert accounts[1]["מעסיקים_היסטוריים"] == "חברה ב, ריק, חברה א"
+    assert accounts[2]["חברה_מנהלת"] == "מגדל מקפת"
+
+
+def test_byte_chunks_streamed_without_decoding_whole_file():
+    hebrew = MISLAKA_XML.replace('encoding="utf-8"', 'encoding="windows-1255"')
+    data = hebrew.encode("windows-1255") + b"\x1a"
+
+    # 7-byte chunks split the Hebrew text and the tags at arbitrary points
+    chunked = PensionPortfolioProcessor(LOGGER).process_chunks(
+        lambda: decoded_chunks(data, "cp1255", chunk_size=7), "mislaka.xml"
+    )
+    expected = _PensionFileProcessor(hebrew, "mislaka.xml", LOGGER).process()
+
+    assert _without_timestamp(chunked) == _without_timestamp(expected)
+    assert _without_timestamp(process_pension_file(data, "mislaka.xml")) == _without_timestamp(expected)
+
+
+def test_file_without_account_tags_uses_dom_fallback():
+    content = """<Root><Item><MISPAR-HESHBON>77</MISPAR-HESHBON>
+        <SHEM-TOCHNIT>קופת גמל</SHEM-TOCHNIT></Item></Root>"""
+
+    result = PensionPortfolioProcessor(LOGGER).process_file(content, "other.xml")
+
+    assert [account["מספר_חשבון"] for account in result["accounts"]] == ["77"]
+    assert result["accounts"][0]["סוג_מוצר"] == "קופת גמל"
+
+
+def test_encoding_read_from_declaration_or_bom():
+    hebrew = MISLAKA_XML.replace('encoding="utf-8"', 'encoding="windows-1255"')
+
+    assert detect_xml_encoding(hebrew.encode("windows-1255")) == "cp1255"
+    assert detect_xml_encoding(b"\xef\xbb\xbf<a/>") == "utf-8-sig"
+    assert detect_xml_encoding(b"<a/>") is None
+    assert decode_pension_file(hebrew.encode("windows-1255")) == hebrew
+
+
+def test_undecodable_file_rejected(client):
+    # 0xff is invalid UTF-8 and unassigned in both Hebrew code pages
+    data = b"<a>\xff</a>"
+    with pytest.raises(UnsupportedEncodingError):
+        decode_pension_file(data, "bad.xml")
+
+    files = [("files", ("bad.xml", data, "text/xml"))]
+    response = client.post(PROCESS_XML_URL.format(client_id=client.id), files=files)
+    assert response.status_code == 400
+
+
+def test_upload_processes_files_in_parallel(client):
+    hebrew = MISLAKA_XML.replace('encoding="utf-8"', 'encoding="windows-1255"')
+    files = [
+        ("files", ("first.xml", MISLAKA_XML.encode("utf-8"), "text/xml")),
+        ("files", ("notes.txt", b"ignored", "text/plain")),
+        ("files", ("second.dat", hebrew.encode("windows-1255"), "application/octet-stream")),
+    ]
+
+    response = client.post(PROCESS_XML_URL.format(client_id=client.id), files=files)
+
+    assert response.status_code == 200
+    body = response.json()
+    assert [item["file"] for item in body["processed_files"]] == ["first.xml", "second.dat"]
+    assert body["skipped_files_count"] == 1
+    assert body["total_accounts"] == 6
+    assert body["processed_files"][1]["accounts"][0]["חברה_מנהלת"] == "מגדל מקפת"
+
+
+def test_reupload_served_from_content_hash_cache(client, monkeypatch):
+    content = MISLAKA_XML.replace("</Mimshak>", f"<!-- {uuid.uuid4()} --></Mimshak>").encode("utf-8")
+    url = PROCESS_XML_URL.format(client_id=client.id)
+
+    first = client.post(url, files=[("files", ("a.xml", content, "text/xml"))]).json()
+
+    async def fail(files):
+        raise AssertionError("a stored file should not be parsed again")
+
+    monkeypatch.setattr("app.routers.pension_portfolio.process_pension_files", fail)
+    second = client.post(url, files=[("files", ("renamed.xml", content, "text/xml"))]).json()
+
+    assert first["processed_files"][0]["from_cache"] is False
+    assert second["processed_files"][0]["from_cache"] is True
+    assert second["processed_files"][0]["file"] == "renamed.xml"
+    assert [a["מספר_חשבון"] for a in second["accounts"]] == [a["מספר_חשבון"] for a in first["accounts"]]
+    assert {a["קובץ_מקור"] for a in second["accounts"]} == {"renamed.xml"}
+
+
+def test_saved_portfolio_is_referenceable_by_id(client, db_session):
+    from app.routers.scenarios.retirement.router import _load_saved_pension_portfolio
+
+    accounts = [{"מספר_חשבון": str(uuid.uuid4()), "יתרה": 1000.0, "פיצויים_מעסיק_נוכחי": 300.0}]
+    base = f"/api/v1/clients/{client.id}/pension-portfolio"
+
+    saved = client.post(f"{base}/save", json={"accounts": accounts}).json()
+    again = client.post(f"{base}/save", json={"accounts": accounts}).json()
+
+    assert again["portfolio_id"] == saved["portfolio_id"]
+    assert client.get(f"{base}/").json() == accounts
+    assert client.get(f"{base}/{saved['portfolio_id']}").json()["accounts"] == accounts
+    assert client.get(f"{base}/999999").status_code == 404
+
+    resolved = _load_saved_pension_portfolio(db_session, client.id, saved["portfolio_id"], False)
+    assert resolved[0]["פיצויים_מעסיק_נוכחי"] == 0
+    assert _load_saved_pension_portfolio(db_session, client.id, saved["portfolio_id"], True) == accounts
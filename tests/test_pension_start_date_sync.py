@@ -0,0 +1,67 @@
+"""
+Tests for the flush-level Client.pension_start_date sync
+"""
+from datetime import date
+
+import pytest
+from sqlalchemy import event
+
+from app.models.client import Client
+from app.models.pension_fund import PensionFund
+from tests.utils import gen_valid_id
+
+
+@pytest.fixture
+def sync_client(db_session):
+    id_number = gen_valid_id()
+    client = Client(
+        id_number=id_number, id_number_raw=id_number, full_name="Sync Client",
+        birth_date=date(1962, 3, 1), gender="female",
+    )
+    db_session.add(client)
+    db_session.commit()
+    yield client
+    db_session.rollback()
+    db_session.query(PensionFund).filter_by(client_id=client.id).delete()
+    db_session.delete(client)
+    db_session.commit()
+
+
+def test_one_client_update_per_flush(sync_client, db_session, engine):
+    client_updates = []
+
+    def count(conn, cursor, statement, parameters, context, executemany):
+        if statement.startswith("UPDATE client"):
+            client_updates.append(statement)
+
+    event.listen(engine, "before_cursor_execute", count)
+    try:
+        db_session.add_all([
+            PensionFund(client_id=sync_client.id, fund_name=f"קרן {i}", input_mode="manual",
+                        pension_amount=1000, pension_start_date=date(2030 - i, 1, 1))
+            for i in range(20)
+        ])
+        db_session.flush()
+    finally:
+        event.remove(engine, "before_cursor_execute", count)
+
+    assert len(client_updates) == 1
+    assert sync_client.pension_start_date == date(2011, 1, 1)
+
+
+def test_update_and_delete_recompute_start_date(sync_client, db_session):
+    early = PensionFund(client_id=sync_client.id, fund_name="מוקדמת", input_mode="manual",
+                        pension_amount=1000, pension_start_date=date(2027, 1, 1))
+    late = PensionFund(client_id=sync_client.id, fund_name="מאוחרת", input_mode="manual",
+                       pension_amount=1000, pension_start_date=date(2032, 1, 1))
+    db_session.add_all([early, late])
+    db_session.commit()
+    assert sync_client.pension_start_date == date(2027, 1, 1)
+
+    early.pension_start_date = date(2035, 1, 1)
+    db_session.commit()
+    assert sync_client.pension_start_date == date(2032, 1, 1)
+
+    db_session.delete(late)
+    db_session.commit()
+    assert sync_client.pension_start_date == date(2035, 1, 1)
@@ -0,0 +1,78 @@
+"""
+Tests for read-replica routing and pool metrics
+"""
+import threading
+import time
+
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+from app import database
+
+
+def test_read_db_falls_back_to_primary_when_replica_is_down(monkeypatch, tmp_path):
+    replica = create_engine(f"sqlite:///{tmp_path / 'replica.db'}")
+    router = database.ReplicaRouter(replica, max_lag=30, retry_after=60, check_interval=0)
+    monkeypatch.setattr(database, "read_engine", replica)
+    monkeypatch.setattr(database, "ReadSessionLocal", sessionmaker(bind=replica))
+    monkeypatch.setattr(database, "replica_router", router)
+
+    def read_bind():
+        session_gen = database.get_read_db()
+        db = next(session_gen)
+        bind = db.get_bind()
+        session_gen.close()
+        return bind
+
+    assert read_bind() is replica
+
+    monkeypatch.setattr(router, "lag_seconds", lambda: 120.0)
+    assert read_bind() is not replica
+
+    def unreachable():
+        raise ConnectionError("replica down")
+
+    monkeypatch.setattr(router, "lag_seconds", unreachable)
+    assert read_bind() is not replica
+    monkeypatch.setattr(router, "lag_seconds", lambda: 0.0)
+    assert read_bind() is not replica  # still inside retry_after
+
+    assert router.stats()["replica_reads"] == 1
+    assert router.stats()["fallback_reads"] == 3
+    metrics = database.get_pool_metrics()
+    assert metrics["read"]["pool"] == type(replica.pool).__name__
+    assert metrics["read_routing"]["last_lag_seconds"] == 120.0
+    replica.dispose()
+
+
+def test_slow_probe_does_not_block_other_readers(tmp_path):
+    replica = create_engine(f"sqlite:///{tmp_path / 'replica.db'}")
+    router = database.ReplicaRouter(replica, max_lag=30, retry_after=60, check_interval=0)
+    probing, release = threading.Event(), threading.Event()
+
+    def hanging_probe():
+        probing.set()
+        release.wait(5)
+        return 0.0
+
+    router.lag_seconds = hanging_probe
+    prober = threading.Thread(target=router.available)
+    prober.start()
+    try:
+        assert probing.wait(5)
+        started = time.monotonic()
+        assert router.available() is False  # cached state, no second probe
+        assert time.monotonic() - started < 1
+    finally:
+        release.set()
+        prober.join()
+    assert router.available() is True
+    replica.dispose()
+
+
+def test_pool_metrics_endpoint(client):
+    response = client.get("/api/v1/system/db/pools")
+
+    assert response.status_code == 200
+    assert response.json()["read"] is None
+    assert "checkedout" in response.json()["primary"]
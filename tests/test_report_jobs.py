@@ -0,0 +1,120 @@
+"""
+Tests for background PDF report jobs
+"""
+import asyncio
+from concurrent.futures import Future, ThreadPoolExecutor
+
+import pytest
+
+from app.routers import report_generation
+from app.services import report_jobs as jobs
+
+FAKE_PDF = b"%PDF-1.4\n" + b"0" * 200 + b"\n%%EOF"
+
+
+def _fake_report(db, params):
+    return FAKE_PDF
+
+
+@pytest.fixture
+def manager(tmp_path, monkeypatch):
+    monkeypatch.setitem(jobs._JOB_RENDERERS, "client_report", _fake_report)
+    # In-process pool, so the patched renderer is the one that runs
+    manager = jobs.ReportJobManager(jobs.ArtifactStore(tmp_path), max_workers=1, executor_factory=ThreadPoolExecutor)
+    monkeypatch.setattr(report_generation, "report_jobs", manager)
+    yield manager
+    manager.shutdown()
+
+
+def test_identical_requests_reuse_the_stored_artifact(manager):
+    params = {"client_id": 1, "scenario_ids": [1], "report_type": "comprehensive"}
+
+    first = manager.submit("client_report", params, "fingerprint", "a.pdf")
+    asyncio.run(manager.wait(first))
+    assert first.status == jobs.JOB_DONE
+    assert manager.artifact_path(first).read_bytes() == FAKE_PDF
+
+    second = manager.submit("client_report", params, "fingerprint", "b.pdf")
+    assert second.future is None
+    assert second.status == jobs.JOB_DONE
+    assert second.artifact == first.artifact
+
+    changed = manager.submit("client_report", params, "other-fingerprint", "c.pdf")
+    asyncio.run(manager.wait(changed))
+    assert changed.artifact == first.artifact
+    assert changed.request_key != first.request_key
+
+
+def test_job_finished_before_callback_registration(manager, monkeypatch):
+    class InlineExecutor:
+        def submit(self, fn, *args):
+            future = Future()
+            future.set_result(_fake_report(None, None))
+            return future
+
+    monkeypatch.setattr(manager, "_get_executor", lambda: InlineExecutor())
+    job = manager.submit("client_report", {"client_id": 2}, "fingerprint", "inline.pdf")
+
+    assert job.done.is_set()
+    assert asyncio.run(manager.wait(job)).status == jobs.JOB_DONE
+    joined = manager.submit("client_report", {"client_id": 2}, "fingerprint", "inline.pdf")
+    assert joined.status == jobs.JOB_DONE
+
+
+def test_report_job_endpoints(client, manager):
+    response = client.post(
+        "/api/v1/scenarios/999999/report/pdf/jobs",
+        params={"client_id": client.id},
+        json={"from": "2025-01", "to": "2025-12"},
+    )
+    assert response.status_code == 404
+
+    job = manager.submit("client_report", {"client_id": client.id}, "fingerprint", "report.pdf")
+    status = client.get(f"/api/v1/reports/jobs/{job.id}")
+    assert status.status_code == 200
+    assert status.json()["job_id"] == job.id
+
+    asyncio.run(manager.wait(job))
+    download = client.get(f"/api/v1/reports/jobs/{job.id}/download")
+    assert download.status_code == 200
+    assert download.headers["content-type"] == "application/pdf"
+    assert download.content == FAKE_PDF
+
+    partial = client.get(f"/api/v1/reports/jobs/{job.id}/download", headers={"Range": "bytes=0-7"})
+    assert partial.status_code == 206
+    assert partial.content == FAKE_PDF[:8]
+
+    assert client.get("/api/v1/reports/jobs/missing").status_code == 404
+
+
+def test_fixation_change_renders_a_new_artifact(manager, client, db_session):
+    from app.models import FixationResult
+
+    params = {"client_id": client.id, "scenario_ids": [], "report_type": "comprehensive"}
+    first = manager.submit("client_report", params, jobs.report_data_fingerprint(db_session, client.id), "a.pdf")
+    asyncio.run(manager.wait(first))
+    assert first.status == jobs.JOB_DONE
+
+    fixation = FixationResult(client_id=client.id, exempt_capital_remaining=1000.0)
+    db_session.add(fixation)
+    db_session.commit()
+    try:
+        fingerprint = jobs.report_data_fingerprint(db_session, client.id)
+        assert manager.store.lookup(jobs.report_request_key("client_report", params, fingerprint)) is None
+
+        second = manager.submit("client_report", params, fingerprint, "b.pdf")
+        asyncio.run(manager.wait(second))
+        assert second.request_key != first.request_key
+        assert second.status == jobs.JOB_DONE
+        assert manager.store.lookup(second.request_key) == second.artifact
+    finally:
+        db_session.delete(fixation)
+        db_session.commit()
+
+
+def test_default_pool_does_not_fork():
+    pool = jobs._process_pool(1)
+    try:
+        assert pool._mp_context.get_start_method() in ("forkserver", "spawn")
+    finally:
+        pool.shutdown()
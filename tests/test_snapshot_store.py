@@ -0,0 +1,133 @@
+"""
+Tests for the server-side snapshot store
+"""
+import zlib
+from datetime import date
+
+import pytest
+from sqlalchemy import event
+
+from app.models.client import Client
+from app.models.pension_fund import PensionFund
+from app.models.snapshot import ClientSnapshot, SnapshotBlob
+from app.services.retirement.services.state_service import StateService
+from app.services.snapshot_service import SnapshotService
+from tests.utils import gen_valid_id
+
+
+@pytest.fixture
+def snapshot_client(db_session):
+    id_number = gen_valid_id()
+    client = Client(
+        id_number=id_number,
+        id_number_raw=id_number,
+        full_name="Snapshot Client",
+        birth_date=date(1960, 1, 1),
+        gender="female",
+    )
+    db_session.add(client)
+    db_session.flush()
+    db_session.add(PensionFund(
+        client_id=client.id, fund_name="קרן א", input_mode="manual",
+        pension_amount=3000, pension_start_date=date(2026, 1, 1),
+    ))
+    db_session.commit()
+    yield client
+    db_session.query(ClientSnapshot).filter_by(client_id=client.id).delete()
+    db_session.query(PensionFund).filter_by(client_id=client.id).delete()
+    db_session.delete(client)
+    db_session.commit()
+
+
+def test_unchanged_sections_are_stored_once(client, snapshot_client, db_session):
+    url = f"/api/v1/clients/{snapshot_client.id}/snapshot/save"
+    first = client.post(url, json={"snapshot_name": "first", "pension_portfolio": [{"מספר_חשבון": "1"}]}).json()
+    second = client.post(url, json={"snapshot_name": "second", "pension_portfolio": [{"מספר_חשבון": "1"}]}).json()
+
+    assert "snapshot" not in first
+    assert second["new_sections"] == 0
+    assert second["reused_sections"] == first["new_sections"] + first["reused_sections"]
+
+    stored = db_session.get(ClientSnapshot, first["snapshot_id"])
+    blob = db_session.query(SnapshotBlob).filter_by(content_sha256=stored.sections["pension_funds"]).one()
+    assert b"pension_start_date" in zlib.decompress(blob.data)
+
+    history = client.get(f"/api/v1/clients/{snapshot_client.id}/snapshots").json()["snapshots"]
+    assert [s["snapshot_name"] for s in history] == ["second", "first"]
+
+
+def test_restore_by_snapshot_id(client, snapshot_client, db_session):
+    saved = client.post(
+        f"/api/v1/clients/{snapshot_client.id}/snapshot/save",
+        json={"snapshot_name": "before", "converted_accounts": ["A1"]},
+    ).json()
+
+    db_session.query(PensionFund).filter_by(client_id=snapshot_client.id).delete()
+    db_session.commit()
+
+    response = client.post(
+        f"/api/v1/clients/{snapshot_client.id}/snapshot/restore",
+        json={"snapshot_id": saved["snapshot_id"]},
+    )
+
+    assert response.status_code == 200
+    assert response.json()["converted_accounts"] == ["A1"]
+    funds = db_session.query(PensionFund).filter_by(client_id=snapshot_client.id).all()
+    assert [f.fund_name for f in funds] == ["קרן א"]
+    assert funds[0].pension_start_date == date(2026, 1, 1)
+
+
+def test_bulk_restore_uses_one_insert_per_table(snapshot_client, db_session, engine):
+    for i in range(50):
+        db_session.add(PensionFund(
+            client_id=snapshot_client.id, fund_name=f"קרן {i}", input_mode="manual",
+            pension_amount=1000, pension_start_date=date(2030, 1, 1),
+        ))
+    db_session.commit()
+    service = SnapshotService(db_session)
+    snapshot = service.collect_snapshot(snapshot_client.id)["snapshot"]
+    state_service = StateService(db_session, snapshot_client.id)
+    state = state_service.save_current_state()
+
+    statements = []
+
+    def count(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement)
+
+    event.listen(engine, "before_cursor_execute", count)
+    try:
+        result = service.restore_snapshot(snapshot_client.id, snapshot)
+        state_service.restore_state(state)
+        db_session.commit()
+    finally:
+        event.remove(engine, "before_cursor_execute", count)
+
+    assert result["restored_count"] == 51
+    assert len([s for s in statements if s.startswith("INSERT")]) == 2
+    assert db_session.query(PensionFund).filter_by(client_id=snapshot_client.id).count() == 51
+    assert db_session.get(Client, snapshot_client.id).pension_start_date == date(2026, 1, 1)
+
+
+def test_unknown_snapshot_restore_is_404(client, snapshot_client):
+    response = client.post(
+        f"/api/v1/clients/{snapshot_client.id}/snapshot/restore",
+        json={"snapshot_id": 999999},
+    )
+    assert response.status_code == 404
+
+
+def test_deleted_history_releases_unshared_blobs(snapshot_client, db_session):
+    service = SnapshotService(db_session)
+    shared = service.save_snapshot(snapshot_client.id, "shared", {"converted_accounts": ["A1"]})
+    only = service.save_snapshot(snapshot_client.id, "only", {"converted_accounts": ["B2"]})
+    kept = db_session.get(ClientSnapshot, shared["snapshot_id"])
+    removed = db_session.get(ClientSnapshot, only["snapshot_id"])
+    unshared = removed.sections["converted_accounts"]
+    common = removed.sections["pension_funds"]
+
+    db_session.delete(removed)
+    db_session.commit()
+
+    digests = {row.content_sha256 for row in db_session.query(SnapshotBlob.content_sha256)}
+    assert unshared not in digests
+    assert common in digests and kept.sections["pension_funds"] == common
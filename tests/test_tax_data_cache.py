@@ -0,0 +1,42 @@
+"""
+Tests for the tax data reference cache
+"""
+import time
+
+from app.services.tax_data.cache import TaxDataCache
+
+
+def test_hit_after_miss(tmp_path):
+    cache = TaxDataCache(ttl_seconds=60, persist_path=str(tmp_path / "cache.json"))
+    calls = []
+
+    def loader():
+        calls.append(1)
+        return [{"year": 2025, "monthly_cap": 13750}]
+
+    assert cache.get("severance_caps", loader) == cache.get("severance_caps", loader)
+    assert len(calls) == 1
+    assert cache.stats()["hits"] == 1
+    assert cache.stats()["misses"] == 1
+
+
+def test_entries_survive_restart(tmp_path):
+    path = str(tmp_path / "cache.json")
+    TaxDataCache(ttl_seconds=60, persist_path=path).get("tax_brackets:2025", lambda: [{"rate": 0.1}])
+
+    restarted = TaxDataCache(ttl_seconds=60, persist_path=path)
+    assert restarted.get("tax_brackets:2025", lambda: [{"rate": 0.5}]) == [{"rate": 0.1}]
+    assert restarted.stats()["misses"] == 0
+
+
+def test_stale_value_served_while_refreshing(tmp_path):
+    cache = TaxDataCache(ttl_seconds=0, persist_path=str(tmp_path / "cache.json"))
+    cache.set("cpi:2020:2025", [100.0], stored_at=time.time() - 10)
+
+    assert cache.get("cpi:2020:2025", lambda: [117.5]) == [100.0]
+
+    deadline = time.time() + 5
+    while cache.stats()["refreshes"] == 0 and time.time() < deadline:
+        time.sleep(0.01)
+    assert cache.get("cpi:2020:2025", lambda: [0.0]) == [117.5]
+    assert cache.stats()["stale_hits"] >= 1
@@ -1,181 +1,156 @@
 """
 PDF Graph generation utilities using matplotlib
+
+Charts are cached as PNG bytes by a hash of the chart type and its input series,
+in memory and on disk, so regenerating a report for unchanged data reuses every
+chart. matplotlib is imported on first render only, and figures are rendered in
+a worker process.
 """
-import matplotlib.pyplot as plt
-import matplotlib.dates as mdates
-from matplotlib.backends.backend_agg import FigureCanvasAgg
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from itertools import accumulate
+from pathlib import Path
+from typing import List, Dict, Any, Optional
+import hashlib
 import io
-import base64
-from typing import List, Dict, Any
-import numpy as np
-from datetime import datetime, date
+import json
+import logging
+import multiprocessing
+import os
+import tempfile
+import threading
 
-# Set matplotlib to use non-interactive backend
-plt.switch_backend('Agg')
+logger = logging.getLogger(__name__)
 
-def render_cashflow_chart(cashflow: List[Dict[str, Any]], title: str = "Cashflow Projection") -> io.BytesIO:
-    """
-    Render cashflow chart as PNG image buffer
-    """
-    if not cashflow:
-        return create_empty_chart("No cashflow data available")
-    
-    # Extract data
-    years = [entry['year'] for entry in cashflow]
-    gross_income = [entry['gross_income'] for entry in cashflow]
-    net_income = [entry['net_income'] for entry in cashflow]
-    tax = [entry['tax'] for entry in cashflow]
-    
-    # Create figure
+# Bump when chart styling changes - invalidates cached PNGs
+RENDER_VERSION = "1"
+
+CHART_CACHE_DIR = Path(os.getenv("PDF_CHART_CACHE_DIR", Path(tempfile.gettempdir()) / "retire_chart_cache"))
+MEMORY_CACHE_SIZE = int(os.getenv("PDF_CHART_MEMORY_CACHE_SIZE", "64"))
+# Least recently used PNGs are removed once the disk cache grows past this size
+DISK_CACHE_MAX_BYTES = int(os.getenv("PDF_CHART_DISK_CACHE_MB", "256")) * 1024 * 1024
+RENDER_IN_WORKER = os.getenv("PDF_CHART_RENDER_IN_WORKER", "1") != "0"
+
+_memory_cache: "OrderedDict[str, bytes]" = OrderedDict()
+_cache_lock = threading.Lock()
+_executor: Optional[ProcessPoolExecutor] = None
+_plt = None
+
+
+def _pyplot():
+    """Import matplotlib (non-interactive backend) on first use"""
+    global _plt
+    if _plt is None:
+        import matplotlib
+        matplotlib.use('Agg')
+        import matplotlib.pyplot as plt
+        _plt = plt
+    return _plt
+
+
+def _figure_png(fig) -> bytes:
+    plt = _pyplot()
+    buf = io.BytesIO()
+    plt.savefig(buf, format='png', dpi=300, bbox_inches='tight')
+    plt.close(fig)
+    return buf.getvalue()
+
+
+def _thousands_formatter():
+    return _pyplot().FuncFormatter(lambda x, p: f'{x:,.0f}')
+
+
+def _draw_cashflow(years, gross_income, net_income, tax, title) -> bytes:
+    plt = _pyplot()
     fig, ax = plt.subplots(figsize=(12, 8))
-    
+
     # Plot lines
     ax.plot(years, gross_income, label='Gross Income', linewidth=2, color='#2E86AB')
     ax.plot(years, net_income, label='Net Income', linewidth=2, color='#A23B72')
     ax.plot(years, tax, label='Tax', linewidth=2, color='#F18F01')
-    
+
     # Formatting
     ax.set_title(title, fontsize=16, fontweight='bold', pad=20)
     ax.set_xlabel('Year', fontsize=12)
     ax.set_ylabel('Amount (NIS)', fontsize=12)
     ax.legend(loc='upper right', fontsize=10)
     ax.grid(True, alpha=0.3)
-    
-    # Format y-axis with thousands separator
-    ax.yaxis.set_major_formatter(plt.FuncFormatter(lambda x, p: f'{x:,.0f}'))
-    
+    ax.yaxis.set_major_formatter(_thousands_formatter())
+
     # Rotate x-axis labels if many years
     if len(years) > 10:
         plt.xticks(rotation=45)
-    
+
     plt.tight_layout()
-    
-    # Save to buffer
-    buf = io.BytesIO()
-    plt.savefig(buf, format='png', dpi=300, bbox_inches='tight')
-    buf.seek(0)
-    plt.close(fig)
-    
-    return buf
+    return _figure_png(fig)
 
-def render_income_breakdown_chart(cashflow: List[Dict[str, Any]], title: str = "Income Breakdown") -> io.BytesIO:
-    """
-    Render stacked bar chart showing income breakdown by source
-    """
-    if not cashflow:
-        return create_empty_chart("No income data available")
-    
-    # Extract data
-    years = [entry['year'] for entry in cashflow]
-    pension_income = [entry.get('pension_income', 0) for entry in cashflow]
-    grant_income = [entry.get('grant_income', 0) for entry in cashflow]
-    other_income = [entry.get('other_income', 0) for entry in cashflow]
-    
-    # Create figure
+
+def _draw_income_breakdown(years, pension_income, grant_income, other_income, title) -> bytes:
+    plt = _pyplot()
     fig, ax = plt.subplots(figsize=(12, 8))
-    
+
     # Create stacked bar chart
     width = 0.8
     ax.bar(years, pension_income, width, label='Pension Income', color='#2E86AB')
     ax.bar(years, grant_income, width, bottom=pension_income, label='Grant Income', color='#A23B72')
-    
+
     # Add other income on top
     bottom_values = [p + g for p, g in zip(pension_income, grant_income)]
     ax.bar(years, other_income, width, bottom=bottom_values, label='Other Income', color='#F18F01')
-    
+
     # Formatting
     ax.set_title(title, fontsize=16, fontweight='bold', pad=20)
     ax.set_xlabel('Year', fontsize=12)
     ax.set_ylabel('Amount (NIS)', fontsize=12)
     ax.legend(loc='upper right', fontsize=10)
     ax.grid(True, alpha=0.3, axis='y')
-    
-    # Format y-axis
-    ax.yaxis.set_major_formatter(plt.FuncFormatter(lambda x, p: f'{x:,.0f}'))
-    
+    ax.yaxis.set_major_formatter(_thousands_formatter())
+
     # Rotate x-axis labels if many years
     if len(years) > 10:
         plt.xticks(rotation=45)
-    
+
     plt.tight_layout()
-    
-    # Save to buffer
-    buf = io.BytesIO()
-    plt.savefig(buf, format='png', dpi=300, bbox_inches='tight')
-    buf.seek(0)
-    plt.close(fig)
-    
-    return buf
+    return _figure_png(fig)
 
-def render_cumulative_chart(cashflow: List[Dict[str, Any]], title: str = "Cumulative Income") -> io.BytesIO:
-    """
-    Render cumulative income chart
-    """
-    if not cashflow:
-        return create_empty_chart("No cumulative data available")
-    
-    # Calculate cumulative values
-    years = [entry['year'] for entry in cashflow]
-    net_income = [entry['net_income'] for entry in cashflow]
-    cumulative_net = np.cumsum(net_income)
-    
-    # Create figure
+
+def _draw_cumulative(years, cumulative_net, title) -> bytes:
+    plt = _pyplot()
     fig, ax = plt.subplots(figsize=(12, 8))
-    
+
     # Plot area chart
     ax.fill_between(years, cumulative_net, alpha=0.6, color='#2E86AB', label='Cumulative Net Income')
     ax.plot(years, cumulative_net, linewidth=2, color='#1B5E7A')
-    
+
     # Formatting
     ax.set_title(title, fontsize=16, fontweight='bold', pad=20)
     ax.set_xlabel('Year', fontsize=12)
     ax.set_ylabel('Cumulative Amount (NIS)', fontsize=12)
     ax.legend(loc='upper left', fontsize=10)
     ax.grid(True, alpha=0.3)
-    
-    # Format y-axis
-    ax.yaxis.set_major_formatter(plt.FuncFormatter(lambda x, p: f'{x:,.0f}'))
-    
+    ax.yaxis.set_major_formatter(_thousands_formatter())
+
     # Rotate x-axis labels if many years
     if len(years) > 10:
         plt.xticks(rotation=45)
-    
+
     plt.tight_layout()
-    
-    # Save to buffer
-    buf = io.BytesIO()
-    plt.savefig(buf, format='png', dpi=300, bbox_inches='tight')
-    buf.seek(0)
-    plt.close(fig)
-    
-    return buf
+    return _figure_png(fig)
 
-def render_tax_analysis_chart(cashflow: List[Dict[str, Any]], title: str = "Tax Analysis") -> io.BytesIO:
-    """
-    Render tax rate and burden analysis chart
-    """
-    if not cashflow:
-        return create_empty_chart("No tax data available")
-    
-    # Calculate tax rates
-    years = [entry['year'] for entry in cashflow]
-    gross_income = [entry['gross_income'] for entry in cashflow]
-    tax = [entry['tax'] for entry in cashflow]
-    
-    # Calculate effective tax rates (avoid division by zero)
-    tax_rates = [t/g * 100 if g > 0 else 0 for t, g in zip(tax, gross_income)]
-    
-    # Create figure with dual y-axis
+
+def _draw_tax_analysis(years, tax, tax_rates, title) -> bytes:
+    plt = _pyplot()
     fig, ax1 = plt.subplots(figsize=(12, 8))
-    
+
     # Tax amounts (left y-axis)
     color1 = '#F18F01'
     ax1.set_xlabel('Year', fontsize=12)
     ax1.set_ylabel('Tax Amount (NIS)', color=color1, fontsize=12)
     ax1.bar(years, tax, alpha=0.7, color=color1, label='Tax Amount')
     ax1.tick_params(axis='y', labelcolor=color1)
-    ax1.yaxis.set_major_formatter(plt.FuncFormatter(lambda x, p: f'{x:,.0f}'))
-    
+    ax1.yaxis.set_major_formatter(_thousands_formatter())
+
     # Tax rates (right y-axis)
     ax2 = ax1.twinx()
     color2 = '#A23B72'
@@ -183,82 +158,249 @@ def render_tax_analysis_chart(cashflow: List[Dict[str, Any]], title: str = "Tax
     ax2.plot(years, tax_rates, color=color2, marker='o', linewidth=2, label='Tax Rate %')
     ax2.tick_params(axis='y', labelcolor=color2)
     ax2.set_ylim(0, max(tax_rates) * 1.1 if tax_rates else 50)
-    
+
     # Title and grid
     ax1.set_title(title, fontsize=16, fontweight='bold', pad=20)
     ax1.grid(True, alpha=0.3)
-    
+
     # Rotate x-axis labels if many years
     if len(years) > 10:
         plt.xticks(rotation=45)
-    
+
     plt.tight_layout()
-    
-    # Save to buffer
-    buf = io.BytesIO()
-    plt.savefig(buf, format='png', dpi=300, bbox_inches='tight')
-    buf.seek(0)
-    plt.close(fig)
-    
-    return buf
+    return _figure_png(fig)
 
-def create_empty_chart(message: str) -> io.BytesIO:
-    """
-    Create an empty chart with a message
-    """
+
+def _draw_empty(message) -> bytes:
+    plt = _pyplot()
     fig, ax = plt.subplots(figsize=(8, 6))
-    ax.text(0.5, 0.5, message, ha='center', va='center', fontsize=14, 
+    ax.text(0.5, 0.5, message, ha='center', va='center', fontsize=14,
             transform=ax.transAxes, bbox=dict(boxstyle="round,pad=0.3", facecolor="lightgray"))
     ax.set_xlim(0, 1)
     ax.set_ylim(0, 1)
     ax.axis('off')
-    
-    buf = io.BytesIO()
-    plt.savefig(buf, format='png', dpi=300, bbox_inches='tight')
-    buf.seek(0)
-    plt.close(fig)
-    
-    return buf
+    return _figure_png(fig)
 
-def create_summary_pie_chart(summary_data: Dict[str, float], title: str = "Income Summary") -> io.BytesIO:
-    """
-    Create pie chart for income summary
-    """
-    if not summary_data or all(v <= 0 for v in summary_data.values()):
-        return create_empty_chart("No summary data available")
-    
-    # Filter out zero values
-    filtered_data = {k: v for k, v in summary_data.items() if v > 0}
-    
-    if not filtered_data:
-        return create_empty_chart("No positive values to display")
-    
-    # Create figure
+
+def _draw_summary_pie(labels, sizes, title) -> bytes:
+    plt = _pyplot()
     fig, ax = plt.subplots(figsize=(10, 8))
-    
-    # Data for pie chart
-    labels = list(filtered_data.keys())
-    sizes = list(filtered_data.values())
     colors = ['#2E86AB', '#A23B72', '#F18F01', '#C73E1D', '#7209B7'][:len(labels)]
-    
+
     # Create pie chart
     wedges, texts, autotexts = ax.pie(sizes, labels=labels, colors=colors, autopct='%1.1f%%',
                                       startangle=90, textprops={'fontsize': 10})
-    
+
     # Formatting
     ax.set_title(title, fontsize=16, fontweight='bold', pad=20)
-    
+
     # Make percentage text bold
     for autotext in autotexts:
         autotext.set_color('white')
         autotext.set_fontweight('bold')
-    
+
     plt.tight_layout()
-    
-    # Save to buffer
-    buf = io.BytesIO()
-    plt.savefig(buf, format='png', dpi=300, bbox_inches='tight')
-    buf.seek(0)
-    plt.close(fig)
-    
-    return buf
+    return _figure_png(fig)
+
+
+_RENDERERS = {
+    'cashflow': _draw_cashflow,
+    'income_breakdown': _draw_income_breakdown,
+    'cumulative': _draw_cumulative,
+    'tax_analysis': _draw_tax_analysis,
+    'empty': _draw_empty,
+    'summary_pie': _draw_summary_pie,
+}
+
+
+def _render(chart_type: str, args: tuple) -> bytes:
+    """Render a chart to PNG bytes (runs in the worker process)"""
+    return _RENDERERS[chart_type](*args)
+
+
+def chart_cache_key(chart_type: str, args: tuple) -> str:
+    payload = json.dumps([RENDER_VERSION, chart_type, args], default=str, ensure_ascii=False)
+    return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+
+def _get_executor() -> ProcessPoolExecutor:
+    global _executor
+    with _cache_lock:
+        if _executor is None:
+            # Not forked - the worker must not inherit the server's threads and locks
+            start_method = "forkserver" if "forkserver" in multiprocessing.get_all_start_methods() else "spawn"
+            _executor = ProcessPoolExecutor(max_workers=1, mp_context=multiprocessing.get_context(start_method))
+        return _executor
+
+
+def _render_png(chart_type: str, args: tuple) -> bytes:
+    global _executor
+    if RENDER_IN_WORKER:
+        try:
+            return _get_executor().submit(_render, chart_type, args).result()
+        except BrokenProcessPool as e:
+            logger.warning(f"Chart worker failed ({e}) - rendering {chart_type} in process")
+            with _cache_lock:
+                _executor = None
+    return _render(chart_type, args)
+
+
+def _remember(key: str, png: bytes) -> None:
+    with _cache_lock:
+        _memory_cache[key] = png
+        _memory_cache.move_to_end(key)
+        while len(_memory_cache) > MEMORY_CACHE_SIZE:
+            _memory_cache.popitem(last=False)
+
+
+def _cached_chart(chart_type: str, *args) -> io.BytesIO:
+    """Chart PNG from the memory cache, the disk cache or a fresh render"""
+    key = chart_cache_key(chart_type, args)
+
+    with _cache_lock:
+        png = _memory_cache.get(key)
+        if png is not None:
+            _memory_cache.move_to_end(key)
+    if png is not None:
+        return io.BytesIO(png)
+
+    path = CHART_CACHE_DIR / f"{key}.png"
+    try:
+        png = path.read_bytes()
+        os.utime(path)  # mtime marks last use for _prune_disk_cache
+    except OSError:
+        png = None
+
+    if png is None:
+        png = _render_png(chart_type, args)
+        try:
+            CHART_CACHE_DIR.mkdir(parents=True, exist_ok=True)
+            tmp_path = path.with_suffix(f".{os.getpid()}.tmp")
+            tmp_path.write_bytes(png)
+            os.replace(tmp_path, path)
+        except OSError as e:
+            logger.warning(f"Could not write chart cache {path}: {e}")
+        else:
+            _prune_disk_cache()
+
+    _remember(key, png)
+    return io.BytesIO(png)
+
+
+def _prune_disk_cache() -> None:
+    """Delete the least recently used PNGs until the disk cache fits DISK_CACHE_MAX_BYTES"""
+    entries = []
+    for path in CHART_CACHE_DIR.glob("*.png"):
+        try:
+            stat = path.stat()
+        except OSError:
+            continue
+        entries.append((stat.st_mtime, stat.st_size, path))
+
+    total = sum(size for _, size, _ in entries)
+    if total <= DISK_CACHE_MAX_BYTES:
+        return
+    for _, size, path in sorted(entries, key=lambda entry: entry[0]):
+        path.unlink(missing_ok=True)
+        total -= size
+        if total <= DISK_CACHE_MAX_BYTES:
+            break
+
+
+def clear_chart_cache(disk: bool = False) -> None:
+    """Drop cached charts from memory (and from disk when disk=True)"""
+    with _cache_lock:
+        _memory_cache.clear()
+    if disk and CHART_CACHE_DIR.exists():
+        for path in CHART_CACHE_DIR.glob("*.png"):
+            path.unlink(missing_ok=True)
+
+
+def shutdown_chart_worker() -> None:
+    global _executor
+    with _cache_lock:
+        if _executor is not None:
+            _executor.shutdown(wait=False, cancel_futures=True)
+            _executor = None
+
+
+def render_cashflow_chart(cashflow: List[Dict[str, Any]], title: str = "Cashflow Projection") -> io.BytesIO:
+    """
+    Render cashflow chart as PNG image buffer
+    """
+    if not cashflow:
+        return create_empty_chart("No cashflow data available")
+
+    # Extract data
+    years = [entry['year'] for entry in cashflow]
+    gross_income = [entry['gross_income'] for entry in cashflow]
+    net_income = [entry['net_income'] for entry in cashflow]
+    tax = [entry['tax'] for entry in cashflow]
+
+    return _cached_chart('cashflow', years, gross_income, net_income, tax, title)
+
+def render_income_breakdown_chart(cashflow: List[Dict[str, Any]], title: str = "Income Breakdown") -> io.BytesIO:
+    """
+    Render stacked bar chart showing income breakdown by source
+    """
+    if not cashflow:
+        return create_empty_chart("No income data available")
+
+    # Extract data
+    years = [entry['year'] for entry in cashflow]
+    pension_income = [entry.get('pension_income', 0) for entry in cashflow]
+    grant_income = [entry.get('grant_income', 0) for entry in cashflow]
+    other_income = [entry.get('other_income', 0) for entry in cashflow]
+
+    return _cached_chart('income_breakdown', years, pension_income, grant_income, other_income, title)
+
+def render_cumulative_chart(cashflow: List[Dict[str, Any]], title: str = "Cumulative Income") -> io.BytesIO:
+    """
+    Render cumulative income chart
+    """
+    if not cashflow:
+        return create_empty_chart("No cumulative data available")
+
+    # Calculate cumulative values
+    years = [entry['year'] for entry in cashflow]
+    cumulative_net = list(accumulate(entry['net_income'] for entry in cashflow))
+
+    return _cached_chart('cumulative', years, cumulative_net, title)
+
+def render_tax_analysis_chart(cashflow: List[Dict[str, Any]], title: str = "Tax Analysis") -> io.BytesIO:
+    """
+    Render tax rate and burden analysis chart
+    """
+    if not cashflow:
+        return create_empty_chart("No tax data available")
+
+    # Calculate tax rates
+    years = [entry['year'] for entry in cashflow]
+    gross_income = [entry['gross_income'] for entry in cashflow]
+    tax = [entry['tax'] for entry in cashflow]
+
+    # Calculate effective tax rates (avoid division by zero)
+    tax_rates = [t/g * 100 if g > 0 else 0 for t, g in zip(tax, gross_income)]
+
+    return _cached_chart('tax_analysis', years, tax, tax_rates, title)
+
+def create_empty_chart(message: str) -> io.BytesIO:
+    """
+    Create an empty chart with a message
+    """
+    return _cached_chart('empty', message)
+
+def create_summary_pie_chart(summary_data: Dict[str, float], title: str = "Income Summary") -> io.BytesIO:
+    """
+    Create pie chart for income summary
+    """
+    if not summary_data or all(v <= 0 for v in summary_data.values()):
+        return create_empty_chart("No summary data available")
+
+    # Filter out zero values
+    filtered_data = {k: v for k, v in summary_data.items() if v > 0}
+
+    if not filtered_data:
+        return create_empty_chart("No positive values to display")
+
+    return _cached_chart('summary_pie', list(filtered_data.keys()), list(filtered_data.values()), title)